@@ -184,6 +184,30 @@ def section_presence(text: str) -> dict[str, bool]:
     return {s: (s in keys) for s in CANONICAL_SECTIONS}
 
 
+def condition_overlay(cond: str) -> str | None:
+    """The togo_mcp MIE overlay spec that serves `cond` from the baseline corpus.
+
+    The server can drop/keep sections in memory (togo_mcp.mie_corpus), so every
+    variant this script writes is also expressible as an overlay over
+    mie_variants/baseline — which is what lets run_ablation.py --warm-server run
+    the whole sweep against ONE server. Returns "" for a verbatim condition
+    (baseline, no_mie) and None for one that is a different corpus, not a view
+    of this one (smoke_*, full_v3).
+    """
+    if cond in ("baseline", "no_mie"):
+        return ""
+    if cond.startswith("ablate_group_") and cond[len("ablate_group_"):] in GROUPS:
+        return "drop:" + ",".join(GROUPS[cond[len("ablate_group_"):]])
+    if cond.startswith("keep_") and cond[len("keep_"):] in GROUPS:
+        keep = cond[len("keep_"):]
+        # mirrors --keep-groups: strip the OTHER groups' sections, touch nothing else
+        return "drop:" + ",".join(s for g, members in GROUPS.items() if g != keep
+                                  for s in members)
+    if cond.startswith("ablate_") and cond[len("ablate_"):] in CANONICAL_SECTIONS:
+        return "drop:" + cond[len("ablate_"):]
+    return None
+
+
 def _validates(text: str) -> bool:
     if yaml is None:
         return True  # can't check; assume ok
@@ -26,6 +26,7 @@ Usage:
     python run_ablation.py --model claude-sonnet-4-5-20250929 --judge-model claude-opus-4-8
     python run_ablation.py --runs 5                      # 5 answer+judge reps/question
     python run_ablation.py --runs 1 --judge-runs 5       # 1 answer x 5 judges/question
+    python run_ablation.py --warm-server                 # one server, overlay per condition
 
 Two independent replication axes, both averaged per question_id into the flat
 <cond>-scored.csv that ablation_analysis.py consumes:
@@ -45,6 +46,7 @@ conditions-study design (1 answer x 5 judges) that produced significant results.
 from __future__ import annotations
 
 import argparse
+import contextlib
 import csv
 import os
 import subprocess
@@ -57,7 +59,7 @@ from statistics import mean
 
 import yaml
 
-from ablate_mie import CANONICAL_SECTIONS, GROUPS  # single source of truth
+from ablate_mie import CANONICAL_SECTIONS, GROUPS, condition_overlay  # single source of truth
 
 HERE = Path(__file__).resolve().parent
 REPO_ROOT = HERE.parents[2]  # benchmark/studies/ablation/ -> repo root
@@ -158,13 +160,26 @@ def preflight(python: str, required: dict[str, str]) -> None:
         raise SystemExit("\n".join(lines))
 
 
-def render_config(base_config: Path, port: int, out_path: Path) -> None:
-    """Clone the base benchmark config, redirecting only the togomcp server URL."""
+# Request header selecting the server's in-memory MIE overlay (the value of
+# togo_mcp.rdf_portal.MIE_OVERLAY_HEADER; not imported, so this script keeps
+# needing only pyyaml).
+MIE_OVERLAY_HEADER = "X-TogoMCP-MIE-Overlay"
+
+
+def render_config(base_config: Path, port: int, out_path: Path,
+                  overlay: str | None = None) -> None:
+    """Clone the base benchmark config, redirecting only the togomcp server URL.
+
+    With `overlay` (warm-server mode) the togomcp entry also sends the overlay
+    header, so the shared server serves this condition's view of the corpus.
+    """
     cfg = yaml.safe_load(base_config.read_text(encoding="utf-8"))
     servers = cfg.setdefault("mcp_servers", {})
     if "togomcp" not in servers:
         raise SystemExit(f"base config {base_config} has no mcp_servers.togomcp to redirect")
     servers["togomcp"] = {"type": "http", "url": f"http://127.0.0.1:{port}/mcp"}
+    if overlay is not None:
+        servers["togomcp"]["headers"] = {MIE_OVERLAY_HEADER: overlay}
     out_path.parent.mkdir(parents=True, exist_ok=True)
     out_path.write_text(yaml.safe_dump(cfg, sort_keys=False, allow_unicode=True), encoding="utf-8")
 
@@ -286,25 +301,66 @@ def _server_log_tail(log_path: Path, n: int = 15) -> str:
     return "\n".join("    " + ln for ln in tail)
 
 
+@contextlib.contextmanager
+def local_server(label: str, mie_dir: Path, port: int, python: str):
+    """Boot _serve.py on `mie_dir`, wait until it routes, and tear it down on exit."""
+    env = dict(os.environ)
+    env["TOGOMCP_MIE_DIR"] = str(mie_dir)
+    env["TOGOMCP_MIE_OVERLAY_HEADER"] = "1"  # --warm-server selects conditions by header
+    env["ABLATION_PORT"] = str(port)
+    print(f"[{label}] booting local server on :{port} (MIE={mie_dir.name})")
+    server_log = RESULTS_DIR / f"{label}-server.log"
+    log_fh = server_log.open("w", encoding="utf-8")
+    server = subprocess.Popen(
+        [python, str(HERE / "_serve.py")], env=env,
+        stdout=log_fh, stderr=subprocess.STDOUT,
+    )
+    try:
+        if not wait_ready(port, server):
+            died = server.poll() is not None
+            why = "server process exited during startup" if died else f"timed out on :{port}"
+            raise SystemExit(
+                f"[{label}] server failed to become ready ({why}). Last server output:\n"
+                f"{_server_log_tail(server_log)}\n"
+                f"  (full log: {server_log})"
+            )
+        yield server
+    finally:
+        log_fh.close()
+        server.terminate()
+        try:
+            server.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+        print(f"[{label}] server stopped")
+
+
 def run_condition(cond: str, questions: list[str], base_config: Path, port: int,
                   model: str, judge_model: str | None, force: bool, dry_run: bool,
                   python: str, runs: int = 1, judge_use_api: bool = False,
-                  answer_use_api: bool = False, judge_runs: int = 1) -> str:
+                  answer_use_api: bool = False, judge_runs: int = 1,
+                  warm: bool = False) -> str:
+    """Answer, judge and average one condition.
+
+    `warm` means a shared server is already up on `port` serving the baseline
+    corpus; the condition is then selected per request by its MIE overlay
+    instead of by booting a server on its own variant dir.
+    """
     final_scored = RESULTS_DIR / f"{cond}-scored.csv"
     if final_scored.exists() and not force:
         print(f"[{cond}] scored CSV exists — skipping (delete it or --force to re-run)")
         return "skipped"
 
     variant_dir = VARIANTS_DIR / cond
-    if not variant_dir.is_dir():
+    if not warm and not variant_dir.is_dir():
         raise SystemExit(f"[{cond}] variant dir missing: {variant_dir} — run ablate_mie.py")
 
     cfg_path = RENDERED_DIR / f"{cond}.config.yaml"
-    render_config(base_config, port, cfg_path)
+    render_config(base_config, port, cfg_path,
+                  overlay=condition_overlay(cond) if warm else None)
 
     env = dict(os.environ)
-    env["TOGOMCP_MIE_DIR"] = str(variant_dir)
-    env["ABLATION_PORT"] = str(port)
 
     # Answering runs on the claude_agent_sdk bundled CLI. If ANTHROPIC_API_KEY is in
     # its env, the CLI bills the Anthropic API; if absent, it uses the `claude login`
@@ -346,22 +402,9 @@ def run_condition(cond: str, questions: list[str], base_config: Path, port: int,
 
     # --- answering passes: one server boot serves every run that needs answers ---
     if any(p["need_answer"] for p in plan):
-        print(f"[{cond}] booting local server on :{port} (MIE={variant_dir.name})")
-        server_log = RESULTS_DIR / f"{cond}-server.log"
-        log_fh = server_log.open("w", encoding="utf-8")
-        server = subprocess.Popen(
-            [python, str(HERE / "_serve.py")], env=env,
-            stdout=log_fh, stderr=subprocess.STDOUT,
-        )
-        try:
-            if not wait_ready(port, server):
-                died = server.poll() is not None
-                why = "server process exited during startup" if died else f"timed out on :{port}"
-                raise SystemExit(
-                    f"[{cond}] server failed to become ready ({why}). Last server output:\n"
-                    f"{_server_log_tail(server_log)}\n"
-                    f"  (full log: {server_log})"
-                )
+        boot = (contextlib.nullcontext() if warm
+                else local_server(cond, variant_dir, port, python))
+        with boot:
             if dry_run:
                 print(f"[{cond}] DRY-RUN: server ready; would run {runs} pass(es) over "
                       f"{len(questions)} questions with config {cfg_path.name}")
@@ -377,15 +420,6 @@ def run_condition(cond: str, questions: list[str], base_config: Path, port: int,
                      "-c", str(cfg_path), "--model", model, "-o", str(p["answers"])],
                     check=True, cwd=str(SCRIPTS_DIR), env=answer_env,
                 )
-        finally:
-            log_fh.close()
-            server.terminate()
-            try:
-                server.wait(timeout=15)
-            except subprocess.TimeoutExpired:
-                server.kill()
-                server.wait()
-            print(f"[{cond}] server stopped")
     elif dry_run:
         # every replicate already answered — honor the dry-run contract without a boot
         print(f"[{cond}] DRY-RUN: all {runs} run(s) already answered; nothing to do")
@@ -461,6 +495,13 @@ def main() -> int:
                          "'Not logged in' login-error stubs under sustained load. Without this, "
                          "answering stays on the subscription and the key is withheld from it.")
     ap.add_argument("--port", type=int, default=8971, help="loopback port for the local server")
+    ap.add_argument("--warm-server", action="store_true",
+                    help="boot ONE server on mie_variants/baseline for the whole sweep and "
+                         "select each condition per request with its MIE overlay header "
+                         "(sections dropped in memory by the server) instead of booting a "
+                         "server per condition on its own variant dir. Conditions that are a "
+                         "different corpus rather than a view of the baseline (smoke_*, "
+                         "full_v3) cannot run this way.")
     ap.add_argument("--python", default=sys.executable,
                     help="interpreter for the server + benchmark subprocesses "
                          "(default: this one; must import togo_mcp, claude_agent_sdk, pandas, anthropic)")
@@ -542,17 +583,29 @@ def main() -> int:
 
     summary: dict[str, str] = {}
     started = time.monotonic()
-    for cond in conditions:
-        try:
-            summary[cond] = run_condition(cond, questions, base_config, args.port,
-                                          args.model, args.judge_model, args.force,
-                                          args.dry_run, args.python, args.runs,
-                                          args.judge_use_api, args.answer_use_api,
-                                          args.judge_runs)
-        except SystemExit as e:
-            print(f"[{cond}] ABORTED: {e}", file=sys.stderr)
-            summary[cond] = "error"
-        print()
+    shared = contextlib.nullcontext()
+    if args.warm_server:
+        not_views = [c for c in conditions if condition_overlay(c) is None]
+        if not_views:
+            raise SystemExit(f"--warm-server cannot serve {', '.join(not_views)}: each is a "
+                             "separate corpus, not an overlay of the baseline. Run them "
+                             "without --warm-server.")
+        if not (VARIANTS_DIR / "baseline").is_dir():
+            raise SystemExit(f"baseline corpus missing: {VARIANTS_DIR / 'baseline'} — "
+                             "run ablate_mie.py")
+        shared = local_server("warm", VARIANTS_DIR / "baseline", args.port, args.python)
+    with shared:
+        for cond in conditions:
+            try:
+                summary[cond] = run_condition(cond, questions, base_config, args.port,
+                                              args.model, args.judge_model, args.force,
+                                              args.dry_run, args.python, args.runs,
+                                              args.judge_use_api, args.answer_use_api,
+                                              args.judge_runs, warm=args.warm_server)
+            except SystemExit as e:
+                print(f"[{cond}] ABORTED: {e}", file=sys.stderr)
+                summary[cond] = "error"
+            print()
 
     mins = (time.monotonic() - started) / 60
     print("=" * 60)
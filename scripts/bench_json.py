@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Compare the JSON codec backends on the shapes TogoMCP actually encodes.
+
+`togo_mcp.json_codec` picks orjson when it is installed and the stdlib
+otherwise. This script times both on:
+
+  * ``log_record`` — a tool-call log record as `_ToolCallLogger` writes it
+    (arguments, client info, SPARQL extras), encoded to a JSONL line;
+  * ``log_line`` — the same line parsed back, as ``/stats`` does per record;
+  * ``togovar_page`` — a 100-row TogoVar variant search page with statistics,
+    decoded from the upstream body;
+  * ``togoid_convert`` — a 1,000-pair TogoID conversion result, decoded from
+    the upstream body.
+
+(Tool payloads themselves are still encoded by the stdlib, in its default
+spaced formatting, so only their decoding is timed.)
+
+and reports microseconds per operation and the speed-up over the stdlib.
+
+Usage:
+    python scripts/bench_json.py               # human-readable table
+    python scripts/bench_json.py --json        # machine-readable
+    python scripts/bench_json.py --number 200  # fewer repetitions
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from togo_mcp import json_codec  # noqa: E402
+
+
+def _log_record() -> dict:
+    return {
+        "ts": "2026-08-14T09:12:33.481+00:00",
+        "tool": "run_sparql",
+        "status": "ok",
+        "elapsed_ms": 412.7,
+        "args": {
+            "dbname": "uniprot",
+            "sparql_query": "PREFIX up: <http://purl.uniprot.org/core/>\n"
+            "SELECT ?protein ?name WHERE { ?protein a up:Protein ; "
+            "up:recommendedName/up:fullName ?name . FILTER(CONTAINS(?name, \"kinase\")) } "
+            "LIMIT 100",
+        },
+        "result_bytes": 18_342,
+        "meta": {
+            "client": {"name": "claude-ai", "version": "0.1.0"},
+            "session": "5f1d8a2c",
+            "ip": "c3a9f2e1b07d",
+            "user_agent": "python-httpx/0.28.1",
+        },
+        "extra": {
+            "endpoint": "https://rdfportal.org/sib/sparql",
+            "sparql_status": "ok",
+            "n_rows": 100,
+            "databases": ["uniprot"],
+        },
+        "trace_id": "9c1b5e7a3d204f68",
+    }
+
+
+def _togovar_page() -> dict:
+    row = {
+        "id": "tgv421843",
+        "type": "SNV",
+        "chromosome": "12",
+        "position": 111766887,
+        "reference": "G",
+        "alternate": "A",
+        "existing_variations": ["rs671"],
+        "symbols": [{"name": "ALDH2", "id": 404}],
+        "most_severe_consequence": "missense_variant",
+        "significance": [{"interpretations": ["drug_response"], "conditions": ["Alcohol sensitivity"]}],
+        "frequencies": [
+            {"source": "jga_wgs", "ac": 3012, "an": 18_612, "af": 0.16183},
+            {"source": "tommo", "ac": 12_411, "an": 107_824, "af": 0.1151},
+            {"source": "gnomad_genomes", "ac": 1721, "an": 152_170, "af": 0.01131},
+        ],
+    }
+    return {
+        "data": [dict(row, position=row["position"] + i) for i in range(100)],
+        "total": 412_338,
+        "filtered": 100,
+        "statistics": {
+            "type": {"SO_0001483": 96, "SO_0000667": 4},
+            "consequence": {"SO_0001583": 100, "SO_0001819": 31},
+        },
+    }
+
+
+def _togoid_body() -> bytes:
+    pairs = [[f"P{10000 + i}", f"ENSG{i:011d}"] for i in range(1000)]
+    return json.dumps({"results": pairs, "total": len(pairs)}).encode("utf-8")
+
+
+def _cases() -> dict:
+    record = _log_record()
+    line = json_codec.dumps_bytes(record, default=str)
+    page = json.dumps(_togovar_page()).encode("utf-8")
+    body = _togoid_body()
+    return {
+        "log_record": lambda: json_codec.dumps_bytes(record, default=str),
+        "log_line": lambda: json_codec.loads(line),
+        "togovar_page": lambda: json_codec.loads(page),
+        "togoid_convert": lambda: json_codec.loads(body)["results"],
+    }
+
+
+def bench(number: int = 2000) -> dict:
+    """``{case: {backend: µs per op, ..., "speedup": x}}`` over the available backends."""
+    previous = json_codec.BACKEND
+    results: dict[str, dict[str, float]] = {}
+    try:
+        for backend in json_codec.AVAILABLE:
+            json_codec.use(backend)
+            for name, fn in _cases().items():
+                best = min(timeit.repeat(fn, number=number, repeat=3))
+                results.setdefault(name, {})[backend] = round(best / number * 1e6, 2)
+    finally:
+        json_codec.use(previous)
+    for row in results.values():
+        fastest = min(row.values())
+        row["speedup"] = round(row["json"] / fastest, 2) if fastest else 1.0
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000, help="operations per timing")
+    parser.add_argument("--json", action="store_true", help="print JSON")
+    args = parser.parse_args(argv)
+    results = bench(args.number)
+    if args.json:
+        print(json.dumps({"available": list(json_codec.AVAILABLE), "cases": results}, indent=2))
+        return 0
+    backends = list(json_codec.AVAILABLE)
+    print(f"{'case':<16}" + "".join(f"{b + ' µs':>12}" for b in backends) + f"{'speedup':>10}")
+    for name, row in results.items():
+        cells = "".join(f"{row[b]:>12.2f}" for b in backends)
+        print(f"{name:<16}{cells}{row['speedup']:>9.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
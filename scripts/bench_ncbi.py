@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""Benchmark the NCBI E-utilities call path against a local stand-in server.
+
+NCBI itself must not be load-tested (it blocks addresses that exceed 3 or 10
+requests a second), so this starts a tiny HTTP/1.1 stand-in on localhost that
+answers ``esearch.fcgi`` / ``esummary.fcgi`` / ``efetch.fcgi`` with canned
+bodies. Two costs of the real service are simulated:
+
+  * ``--handshake-ms`` — paid once per NEW connection, before its first byte
+    (DNS + TCP + TLS to eutils.ncbi.nlm.nih.gov is a few round trips);
+  * ``--service-ms`` — paid by every request (NCBI's own processing; 300 ms is
+    typical of esummary).
+
+Three modes are compared, all at the same rate:
+
+  * ``per_call`` — a fresh ``httpx.AsyncClient`` per request, with the rate
+    slot (a ``Semaphore(1)`` plus a sleep) held for the whole round trip;
+  * ``serialized`` — one keep-alive client, the slot still held per round trip;
+  * ``bucket`` — ``togo_mcp.ncbi_tools`` as it is: one keep-alive client and a
+    token bucket that spaces request starts but lets requests overlap.
+
+and for each reports per-call latency (mean, p50, p95), requests per second
+and the connections the stand-in accepted. ``max_starts_per_s`` is the most
+requests the client sent in any one-second window, which ``bucket`` must keep
+within the rate. (Arrival times at the server also carry connection-setup and
+network jitter; the limiter's 2% spacing margin is what absorbs that.)
+
+Usage:
+    python scripts/bench_ncbi.py                       # 30 calls, 3 callers
+    python scripts/bench_ncbi.py --rate 10             # the keyed rate
+    python scripts/bench_ncbi.py --rate 1000           # connection cost alone
+    python scripts/bench_ncbi.py --calls 60 --concurrency 6 --json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from togo_mcp import ncbi_tools  # noqa: E402
+from togo_mcp.server import LazyAsyncClient  # noqa: E402
+
+
+class StandIn:
+    """A keep-alive HTTP/1.1 server answering like E-utilities, on localhost."""
+
+    def __init__(self, *, handshake_ms: float = 100.0, service_ms: float = 300.0) -> None:
+        self.handshake_s = handshake_ms / 1000
+        self.service_s = service_ms / 1000
+        self.connections = 0
+        self.requests: list[tuple[str, str, dict[str, list[str]]]] = []
+        self._server: asyncio.base_events.Server | None = None
+        self.url = ""
+
+    async def __aenter__(self) -> "StandIn":
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        host, port = self._server.sockets[0].getsockname()[:2]
+        self.url = f"http://{host}:{port}"
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    def body(self, path: str, params: dict[str, list[str]]) -> tuple[bytes, str]:
+        ids = ",".join(params.get("id", [])).split(",") if params.get("id") else []
+        if path.endswith("esearch.fcgi"):
+            doc = {"esearchresult": {"count": "2", "retmax": "2", "retstart": "0",
+                                     "idlist": ["672", "675"], "querytranslation": "x"}}
+        elif path.endswith("esummary.fcgi"):
+            doc = {"result": {"uids": ids, **{i: {"uid": i, "name": f"rec{i}"} for i in ids}}}
+        else:
+            return "".join(f">{i}\nACGT\n" for i in ids).encode(), "text/plain"
+        return json.dumps(doc).encode(), "application/json"
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        await asyncio.sleep(self.handshake_s)
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                lines = head.decode("latin-1").split("\r\n")
+                method, target, _ = lines[0].split(" ", 2)
+                headers = {
+                    k.strip().lower(): v.strip()
+                    for k, _, v in (line.partition(":") for line in lines[1:] if line)
+                }
+                payload = await reader.readexactly(int(headers.get("content-length", 0)))
+                url = urlsplit(target)
+                params = parse_qs(url.query)
+                if payload:
+                    params.update(parse_qs(payload.decode()))
+                self.requests.append((method, url.path, params))
+                await asyncio.sleep(self.service_s)
+                body, ctype = self.body(url.path, params)
+                writer.write(
+                    f"HTTP/1.1 200 OK\r\nContent-Type: {ctype}\r\n"
+                    f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    return
+        finally:
+            writer.close()
+
+
+_held_slot = asyncio.Semaphore(1)
+_sent: list[float] = []  # monotonic time each request left the client
+
+
+async def _on_request(request: httpx.Request) -> None:
+    _sent.append(time.monotonic())
+
+
+async def _per_call(url: str) -> None:
+    """The first path: a new client (and connection) per request, slot held."""
+    async with _held_slot:
+        await asyncio.sleep(ncbi_tools._bucket.interval)
+        async with httpx.AsyncClient(timeout=30.0, event_hooks={"request": [_on_request]}) as client:
+            response = await client.get(f"{url}/esearch.fcgi", params={"db": "gene", "term": "x"})
+            response.raise_for_status()
+
+
+async def _serialized(url: str) -> None:
+    """The pooled client, with the slot still held for the round trip."""
+    async with _held_slot:
+        await asyncio.sleep(ncbi_tools._bucket.interval)
+        response = await ncbi_tools._client.get("/esearch.fcgi", params={"db": "gene", "term": "x"})
+        response.raise_for_status()
+
+
+async def _bucket(url: str) -> None:
+    await ncbi_tools._ncbi_esearch_api(db="gene", term="x")
+
+
+_MODES = {"per_call": _per_call, "serialized": _serialized, "bucket": _bucket}
+
+
+def _max_per_second(starts: list[float]) -> int:
+    """Most timestamps in any half-open one-second window."""
+    best, lo = 0, 0
+    for hi, t in enumerate(starts):
+        while t - starts[lo] >= 1.0:
+            lo += 1
+        best = max(best, hi - lo + 1)
+    return best
+
+
+async def _run(mode: str, calls: int, concurrency: int, stand_in: StandIn) -> dict:
+    latencies: list[float] = []
+    queue = list(range(calls))
+    call = _MODES[mode]
+
+    async def worker() -> None:
+        while queue:
+            queue.pop()
+            t0 = time.perf_counter()
+            await call(stand_in.url)
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    before = stand_in.connections
+    first = len(_sent)
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - t0
+    latencies.sort()
+    return {
+        "calls": calls,
+        "mean_ms": round(statistics.fmean(latencies), 1),
+        "p50_ms": round(latencies[len(latencies) // 2], 1),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 1),
+        "req_per_s": round(calls / wall, 2),
+        "connections": stand_in.connections - before,
+        "max_starts_per_s": _max_per_second(_sent[first:]),
+    }
+
+
+async def bench(
+    *,
+    calls: int = 30,
+    concurrency: int = 3,
+    handshake_ms: float = 100.0,
+    service_ms: float = 300.0,
+    rate: float | None = None,
+    modes: tuple[str, ...] = tuple(_MODES),
+) -> dict:
+    """Run ``modes`` against one stand-in; ``rate`` overrides the module's NCBI_RATE."""
+    saved = ncbi_tools._client, ncbi_tools._bucket
+    rate = rate or ncbi_tools.NCBI_RATE
+    results = {}
+    try:
+        async with StandIn(handshake_ms=handshake_ms, service_ms=service_ms) as stand_in:
+            ncbi_tools._client = LazyAsyncClient(
+                base_url=stand_in.url, timeout=30.0, event_hooks={"request": [_on_request]}
+            )
+            try:
+                for mode in modes:
+                    ncbi_tools._bucket = ncbi_tools._TokenBucket(rate)
+                    results[mode] = await _run(mode, calls, concurrency, stand_in)
+            finally:
+                await ncbi_tools._client.aclose()
+    finally:
+        ncbi_tools._client, ncbi_tools._bucket = saved
+    return {
+        "rate_per_s": round(rate, 2),
+        "handshake_ms": handshake_ms,
+        "service_ms": service_ms,
+        "concurrency": concurrency,
+        **results,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=3, help="concurrent callers")
+    parser.add_argument("--handshake-ms", type=float, default=100.0)
+    parser.add_argument("--service-ms", type=float, default=300.0)
+    parser.add_argument("--rate", type=float, default=None,
+                        help="requests per second (default: the module's NCBI_RATE)")
+    parser.add_argument("--json", action="store_true", help="print JSON")
+    args = parser.parse_args(argv)
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # one INFO line per request
+    report = asyncio.run(bench(
+        calls=args.calls, concurrency=args.concurrency, handshake_ms=args.handshake_ms,
+        service_ms=args.service_ms, rate=args.rate,
+    ))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    print(f"rate {report['rate_per_s']}/s, handshake "
+          f"{args.handshake_ms} ms, service {args.service_ms} ms, "
+          f"{args.concurrency} concurrent callers")
+    print(f"{'mode':<12}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'req/s':>9}"
+          f"{'conns':>7}{'max/s':>7}")
+    for mode in _MODES:
+        r = report[mode]
+        print(f"{mode:<12}{r['mean_ms']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}"
+              f"{r['req_per_s']:>9}{r['connections']:>7}{r['max_starts_per_s']:>7}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
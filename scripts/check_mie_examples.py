@@ -54,6 +54,7 @@ Usage:
 """
 import argparse
 import csv
+import importlib.util
 import json
 import re
 import sys
@@ -63,16 +64,17 @@ import urllib.parse
 import urllib.request
 from pathlib import Path
 
-try:
-    import yaml
-except ImportError:
-    print("ERROR: PyYAML not installed. Run: uv sync")
-    sys.exit(2)
-
 ROOT = Path(__file__).resolve().parents[1]
 MIE_DIR = ROOT / "togo_mcp" / "data" / "mie"
 ENDPOINTS_CSV = ROOT / "togo_mcp" / "data" / "resources" / "endpoints.csv"
 
+# Loaded by path (not `import togo_mcp...`, which would boot the whole server):
+# parsed MIEs come from the compiled bundle when it is fresh.
+_spec = importlib.util.spec_from_file_location("_togo_mie_bundle", ROOT / "togo_mcp" / "mie_bundle.py")
+_mie_bundle = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_mie_bundle)
+load_mie_entries = _mie_bundle.load_mie_entries
+
 # Keys whose value is a query the reader is meant to COPY. `wrong_sparql` is
 # excluded on purpose — anti-pattern "wrong" queries are supposed to misbehave.
 COPY_KEYS = {"sparql", "correct_sparql", "query"}
@@ -192,19 +194,16 @@ def main():
     args = ap.parse_args()
 
     endpoints = load_endpoint_map()
-    files = sorted(MIE_DIR.glob("*.yaml"))
+    entries = load_mie_entries(MIE_DIR)
     if args.dbs:
         want = set(args.dbs)
-        files = [f for f in files if f.stem in want]
+        entries = {db: e for db, e in entries.items() if db in want}
 
     zero, errs, netfail, stale, skips, ok = [], [], [], [], 0, 0
-    for f in files:
-        db = f.stem
-        text = f.read_text(encoding="utf-8")
-        try:
-            d = yaml.safe_load(text)
-        except yaml.YAMLError as e:
-            print(f"  ⚠  {db}: YAML parse error ({e})")
+    for db, entry in entries.items():
+        text, d = entry.text, entry.doc
+        if d is None and text.strip():
+            print(f"  ⚠  {db}: YAML parse error")
             continue
         file_prefixes = harvest_prefixes(text)
         ep = endpoints.get(db)
@@ -71,7 +71,16 @@ PROD_CONFIRM_PHRASE="togomcp.rdfportal.org"
 TOGOMCP_PERSERVICE_VARS=(TOGOMCP_ALLOWED_HOSTS TOGOMCP_FORWARDED_ALLOW_IPS \
                          TOGOMCP_QUERY_LOG TOGOMCP_LOG_QUERY_TEXT \
                          TOGOMCP_STATS_USER TOGOMCP_STATS_PASSWORD TOGOMCP_LOG_HASH_SALT \
-                         TOGOMCP_LOG_RAW_IP TOGOMCP_STATS_EXCLUDE_CLIENTS)
+                         TOGOMCP_LOG_RAW_IP TOGOMCP_STATS_EXCLUDE_CLIENTS \
+                         TOGOMCP_LOG_QUEUE_SIZE TOGOMCP_LOG_FSYNC \
+                         TOGOMCP_STATS_JOBS TOGOMCP_LOG_COMPRESS \
+                         TOGOMCP_LOG_RETAIN_MB TOGOMCP_LOG_RETAIN_DAYS \
+                         TOGOMCP_LOG_EXPORT TOGOMCP_TRACE_LOG \
+                         TOGOMCP_TRACE_OTEL TOGOMCP_TRACE_MIN_MS \
+                         TOGOMCP_LOG_SAMPLE TOGOMCP_LOG_SAMPLE_IP_BUDGET \
+                         TOGOMCP_LOG_KEEP_SLOW_MS TOGOMCP_JSON_CODEC \
+                         TOGOMCP_NCBI_RATE TOGOMCP_NCBI_CACHE_TTL \
+                         TOGOMCP_NCBI_CACHE_MB)
 TOGOMCP_SHARED_VARS=(NCBI_API_KEY)
 
 # --------------------------------------------------------------------------- #
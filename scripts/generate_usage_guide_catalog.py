@@ -26,12 +26,11 @@ drift guard regenerates and asserts byte-identical to the committed file.
 from __future__ import annotations
 
 import argparse
+import importlib.util
 import re
 import sys
 from pathlib import Path
 
-import yaml
-
 REPO_ROOT = Path(__file__).resolve().parent.parent
 MIE_DIR = REPO_ROOT / "togo_mcp" / "data" / "mie"
 GUIDE_DIR = REPO_ROOT / "togo_mcp" / "data" / "resources" / "usage_guide_v6"
@@ -71,6 +70,16 @@ def _first_sentence(text: str, cap: int = 200) -> str:
     return out
 
 
+def _mie_bundle():
+    """`togo_mcp/mie_bundle.py`, loaded by path: importing the package would boot the server."""
+    spec = importlib.util.spec_from_file_location(
+        "_togo_mie_bundle", REPO_ROOT / "togo_mcp" / "mie_bundle.py"
+    )
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
 def load_records(mie_dir: Path = MIE_DIR) -> list[dict]:
     """Read the discovery block of every served MIE into catalog records.
 
@@ -78,12 +87,10 @@ def load_records(mie_dir: Path = MIE_DIR) -> list[dict]:
     `schema_info` (v2), lowercase keywords/categories. Database key = filename.
     """
     records: list[dict] = []
-    for path in sorted(mie_dir.glob("*.yaml")):
-        db = path.stem
-        try:
-            data = yaml.safe_load(path.read_text(encoding="utf-8"))
-        except yaml.YAMLError as exc:  # pragma: no cover - corrupt file
-            raise SystemExit(f"catalog: cannot parse {path}: {exc}")
+    for db, entry in _mie_bundle().load_mie_entries(mie_dir).items():
+        data = entry.doc
+        if data is None and entry.text.strip():  # pragma: no cover - corrupt file
+            raise SystemExit(f"catalog: cannot parse {mie_dir / entry.name}")
         disc = {}
         if isinstance(data, dict):
             disc = data.get("discovery") or data.get("schema_info") or {}
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Measure TogoMCP's cold start: import, sub-server setup, first tool list.
+
+Every stdio launch (`togo-mcp-local`) pays the whole import graph before the
+client sees a single tool, so the cost is a budget to watch, not a one-off. This
+script starts a FRESH interpreter (nothing cached in-process — the only honest
+"cold"), runs the same path `run_local` does up to the first `tools/list`, and
+reports:
+
+  * phase timings — import of `togo_mcp.main`, `setup()`, first tool list;
+  * the slowest modules by SELF import time, from `python -X importtime`, with
+    TogoMCP's own modules listed separately (third-party cost is context; ours
+    is what a change here can move);
+  * any `LazyAsyncClient` that was built before the first call — there should be
+    none, since no tool has run yet;
+  * any sub-server module (NCBI, TogoID, TogoVar) loaded by the import itself —
+    there should be none, since `setup()` imports them when it mounts them.
+
+Usage:
+    python scripts/profile_startup.py                # human-readable report
+    python scripts/profile_startup.py --json         # machine-readable
+    python scripts/profile_startup.py --budget 5     # exit 1 if cold start > 5 s
+    python scripts/profile_startup.py --http         # the HTTP server's setup()
+
+`tests/test_startup.py` runs the same measurement as a regression guard.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Run inside the child interpreter. Prints one JSON line on stdout; the
+# importtime table goes to stderr.
+_CHILD = r"""
+import asyncio, json, sys, time
+t0 = time.perf_counter()
+import togo_mcp.main as main
+t1 = time.perf_counter()
+eager = [m for m in %(subservers)r if m in sys.modules]
+
+async def _cold(local):
+    await main.setup(local=local)
+    t2 = time.perf_counter()
+    tools = await main.mcp._list_tools()
+    return t2, len(tools)
+
+t2, n_tools = asyncio.run(_cold(%(local)r))
+t3 = time.perf_counter()
+
+from togo_mcp.server import LazyAsyncClient
+built = sorted(
+    f"{name}.{attr}"
+    for name, mod in list(sys.modules.items()) if name.startswith("togo_mcp")
+    for attr, val in list(vars(mod).items())
+    if isinstance(val, LazyAsyncClient) and val.built
+)
+print(json.dumps({
+    "import_s": t1 - t0, "setup_s": t2 - t1, "list_tools_s": t3 - t2,
+    "total_s": t3 - t0, "tools": n_tools, "built_clients": built,
+    "eager_subservers": eager,
+}))
+"""
+
+# `import time: <self us> | <cumulative us> | <indented module name>`
+# Sub-server modules main.setup() imports; importing the package must not.
+SUBSERVER_MODULES = ("togo_mcp.ncbi_tools", "togo_mcp.togoid", "togo_mcp.togovar")
+
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def parse_importtime(stderr: str) -> list[dict]:
+    """Rows of `-X importtime` output as {module, self_s, cumulative_s}."""
+    rows = []
+    for line in stderr.splitlines():
+        m = _IMPORTTIME_RE.match(line)
+        if m:
+            rows.append({
+                "module": m.group(4),
+                "self_s": int(m.group(1)) / 1e6,
+                "cumulative_s": int(m.group(2)) / 1e6,
+            })
+    return rows
+
+
+def measure(*, local: bool = True, python: str = sys.executable) -> dict:
+    """Cold-start one interpreter and return its phase timings and import table."""
+    env = dict(os.environ)
+    env.setdefault("NCBI_EMAIL", "profile@example.org")  # silence the startup warning
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c",
+         _CHILD % {"local": local, "subservers": SUBSERVER_MODULES}],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"cold start failed:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["imports"] = parse_importtime(proc.stderr)
+    return result
+
+
+def render(result: dict, top: int = 15) -> str:
+    imports = sorted(result["imports"], key=lambda r: -r["self_s"])
+    ours = [r for r in imports if r["module"].split(".")[0] == "togo_mcp"]
+    lines = [
+        f"cold start to first tool list: {result['total_s']:.3f} s ({result['tools']} tools)",
+        f"  import togo_mcp.main  {result['import_s']:.3f} s",
+        f"  setup()               {result['setup_s']:.3f} s",
+        f"  first tool list       {result['list_tools_s']:.3f} s",
+        "",
+        f"slowest {top} modules by self import time:",
+    ]
+    lines += [f"  {r['self_s'] * 1e3:8.1f} ms  {r['module']}" for r in imports[:top]]
+    lines += ["", "togo_mcp modules (self / cumulative):"]
+    lines += [
+        f"  {r['self_s'] * 1e3:8.1f} ms / {r['cumulative_s'] * 1e3:8.1f} ms  {r['module']}"
+        for r in ours
+    ]
+    built = result["built_clients"]
+    lines += ["", f"HTTP clients built before any call: {', '.join(built) if built else 'none'}"]
+    eager = result["eager_subservers"]
+    lines += [f"sub-servers loaded by the import: {', '.join(eager) if eager else 'none'}"]
+    return "\n".join(lines)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--json", action="store_true", help="print the raw measurement as JSON")
+    ap.add_argument("--top", type=int, default=15, help="modules to list (default 15)")
+    ap.add_argument("--budget", type=float, default=None,
+                    help="fail (exit 1) when cold start exceeds this many seconds")
+    ap.add_argument("--http", action="store_true",
+                    help="profile the HTTP server's setup() instead of run_local's")
+    args = ap.parse_args()
+
+    result = measure(local=not args.http)
+    print(json.dumps(result, indent=2) if args.json else render(result, args.top))
+    if args.budget is not None and result["total_s"] > args.budget:
+        print(f"\nover budget: {result['total_s']:.3f} s > {args.budget:.3f} s", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,7 @@
+"""Shared pytest configuration."""
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "own_bucket: the test installs its own NCBI rate-limit bucket"
+    )
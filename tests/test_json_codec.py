@@ -0,0 +1,140 @@
+"""Tests for the JSON codec seam (togo_mcp.json_codec): same output on every backend."""
+import dataclasses
+import enum
+import importlib.util
+import json
+import math
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from togo_mcp import json_codec
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(params=json_codec.AVAILABLE)
+def backend(request):
+    previous = json_codec.BACKEND
+    json_codec.use(request.param)
+    yield request.param
+    json_codec.use(previous)
+
+
+@dataclasses.dataclass
+class _Point:
+    x: int
+
+
+class _Color(enum.Enum):
+    RED = "red"
+
+
+class _Level(enum.IntEnum):
+    HIGH = 3
+
+
+class _Tag(str):
+    def __str__(self) -> str:
+        return "tag:" + super().__str__()
+
+
+def _stdlib(obj, **kw):
+    return json.dumps(obj, separators=(",", ":"), **kw)
+
+
+RECORDS = [
+    {
+        "ts": "2026-08-14T09:12:33.481+00:00", "tool": "run_sparql", "status": "ok",
+        "elapsed_ms": 412.7, "args": {"dbname": "uniprot", "limit": 100, "flags": None},
+        "meta": {"client": {"name": "claude-ai", "version": "0.1.0"}, "ip": "c3a9f2e1"},
+        "extra": {"sparql_status": "ok", "n_rows": 100, "databases": ["uniprot"]},
+    },
+    {"data": [{"id": "tgv421843", "position": 111766887, "af": 0.16183, "ok": True}] * 3},
+    [["P12345", "ENSG00000111275"], ["Q9Y6K9", None]],
+    {"unicode": "β-D-グルコース", "escapes": "tab\tquote\"slash\\", "empty": {}},
+]
+
+
+@pytest.mark.parametrize("obj", RECORDS)
+def test_record_shapes_match_the_stdlib_byte_for_byte(backend, obj):
+    assert json_codec.dumps(obj) == _stdlib(obj)
+    assert json_codec.dumps(obj, ensure_ascii=False) == _stdlib(obj, ensure_ascii=False)
+    assert json_codec.dumps_bytes(obj, default=str) == _stdlib(obj, default=str).encode()
+    assert json_codec.loads(json_codec.dumps_bytes(obj)) == json.loads(_stdlib(obj))
+
+
+def test_default_sees_what_the_stdlib_would_hand_it(backend):
+    when = datetime(2026, 8, 14, 9, 12, tzinfo=timezone.utc)
+    obj = {"ts": when, "point": _Point(3), "tags": {"a"}}
+    assert json_codec.dumps(obj, default=str) == _stdlib(obj, default=str)
+    assert '"2026-08-14 09:12:00+00:00"' in json_codec.dumps(obj, default=str)
+    with pytest.raises(TypeError):
+        json_codec.dumps({"ts": when})
+
+
+@pytest.mark.parametrize("value", [
+    _Color.RED,
+    _Level.HIGH,
+    _Tag("x"),
+    datetime(2026, 8, 14, 9, 12, tzinfo=timezone.utc),
+    _Point(3),
+    [{"nested": _Color.RED}],
+])
+def test_enum_datetime_and_dataclass_values_match_the_stdlib(backend, value):
+    obj = {"a": value, "n": 1}
+    assert json_codec.dumps(obj, default=str) == _stdlib(obj, default=str)
+    assert json_codec.dumps_bytes(obj, default=repr) == _stdlib(obj, default=repr).encode()
+    try:
+        expected = _stdlib(obj)
+    except TypeError:
+        with pytest.raises(TypeError):
+            json_codec.dumps(obj)
+    else:
+        assert json_codec.dumps(obj) == expected
+
+
+def test_what_orjson_refuses_falls_back_to_the_stdlib(backend):
+    for obj in ({1: "int key", None: "none key"}, {"n": 2**70}, {"s": "\ud800"}):
+        assert json_codec.dumps(obj) == _stdlib(obj)
+    nan, big = json_codec.loads("[NaN, 123456789012345678901234567890]")
+    assert math.isnan(nan) and big == 123456789012345678901234567890
+    with pytest.raises(ValueError):
+        json_codec.loads(b'{"torn": ')
+
+
+def test_stats_parse_line_and_the_log_writer_use_the_codec(backend, tmp_path):
+    from togo_mcp.stats import parse_line
+    from togo_mcp.toolcall_log import JsonlLogWriter
+
+    writer = JsonlLogWriter(str(tmp_path / "calls.jsonl"))
+    writer.submit({**RECORDS[0], "when": datetime(2026, 8, 14, tzinfo=timezone.utc)})
+    writer.close()
+    line = (tmp_path / "calls.jsonl").read_bytes()
+    assert line.isascii() and line.endswith(b"\n")
+    rec = parse_line(line)
+    assert rec["when"] == "2026-08-14 00:00:00+00:00"
+    assert rec["meta"] == RECORDS[0]["meta"]
+    assert parse_line(b"[1, 2]") is None and parse_line("{bad") is None
+
+
+def test_unknown_backend_falls_back_to_the_stdlib():
+    previous = json_codec.BACKEND
+    try:
+        assert json_codec.use("msgspec-or-whatever") == "json"
+        assert json_codec.use(None) == json_codec.AVAILABLE[0]
+    finally:
+        json_codec.use(previous)
+
+
+def test_benchmark_covers_every_backend_and_case():
+    spec = importlib.util.spec_from_file_location(
+        "bench_json", REPO_ROOT / "scripts" / "bench_json.py"
+    )
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    results = mod.bench(number=5)
+    assert set(results) == {"log_record", "log_line", "togovar_page", "togoid_convert"}
+    for row in results.values():
+        assert set(row) == {*json_codec.AVAILABLE, "speedup"}
@@ -0,0 +1,70 @@
+"""Tests for the in-memory last-24-hours window behind /stats/live (togo_mcp.live)."""
+import time
+
+from togo_mcp.live import LiveWindow, render_html
+
+
+class _Clock:
+    def __init__(self, t: float) -> None:
+        self.t = t
+
+    def __call__(self) -> float:
+        return self.t
+
+
+def test_window_sums_minutes_and_ranks_failures_first():
+    clock = _Clock(1_800_000_000.0)  # on a minute boundary
+    live = LiveWindow(clock=clock)
+    for i in range(10):
+        live.add("run_sparql", error=i < 3, elapsed_ms=100.0 * (i + 1), bytes_out=10,
+                 endpoint="sib")
+    clock.t += 60
+    live.add("get_MIE_file", error=False, elapsed_ms=5.0)
+    snap = live.snapshot(60)
+    assert snap["totals"]["calls"] == 11 and snap["totals"]["errors"] == 3
+    assert snap["totals"]["bytes_out"] == 100
+    assert list(snap["tools"]) == ["run_sparql", "get_MIE_file"]
+    sparql = snap["tools"]["run_sparql"]
+    assert sparql["error_rate"] == 0.3 and sparql["p50_ms"] == 550.0
+    assert snap["endpoints"] == {"sib": sparql}
+    assert [m["calls"] for m in snap["series"]] == [10, 1]
+    assert snap["series"][0]["minute"] == "2027-01-15T08:00Z"
+    assert live.snapshot(1)["totals"]["calls"] == 1  # only the current minute
+
+
+def test_old_minutes_leave_the_window_and_their_slots_are_reused():
+    clock = _Clock(1_800_000_000.0)
+    live = LiveWindow(minutes=10, clock=clock)
+    live.add("a", error=True, elapsed_ms=1.0)
+    clock.t += 5 * 60
+    live.add("b", error=False, elapsed_ms=1.0)
+    assert live.snapshot(10)["totals"]["calls"] == 2
+    clock.t += 5 * 60  # "a" is now 10 minutes old: outside a 10-minute window
+    snap = live.snapshot(10)
+    assert list(snap["tools"]) == ["b"] and snap["totals"]["errors"] == 0
+    live.add("c", error=False, elapsed_ms=1.0)  # lands on a's slot, overwriting it
+    assert set(live.snapshot(10)["tools"]) == {"b", "c"}
+    assert live.snapshot(10_000)["window_minutes"] == 10  # clamped
+    clock.t += 24 * 3600
+    assert live.snapshot(10)["totals"]["calls"] == 0
+
+
+def test_recording_is_constant_time_and_rendering_is_bounded():
+    live = LiveWindow()
+    t0 = time.perf_counter()
+    for i in range(50_000):
+        live.add(f"tool{i % 40}", error=i % 7 == 0, elapsed_ms=float(i % 900),
+                 bytes_out=100, endpoint=f"ep{i % 8}")
+    assert (time.perf_counter() - t0) / 50_000 < 50e-6
+    t0 = time.perf_counter()
+    html = render_html(live.snapshot(1440))
+    assert time.perf_counter() - t0 < 1.0
+    assert "tool0" in html and "ep7" in html and "<script" not in html
+
+
+def test_html_escapes_and_handles_an_empty_window():
+    live = LiveWindow()
+    assert "No calls in this window" in render_html(live.snapshot())
+    live.add("<b>x</b>", error=False, elapsed_ms=1.0)
+    html = render_html(live.snapshot())
+    assert "&lt;b&gt;x&lt;/b&gt;" in html and "<b>x</b>" not in html
@@ -0,0 +1,224 @@
+"""Tests for the columnar export of the tool-call log (togo_mcp.log_export)."""
+import json
+import math
+import random
+import sqlite3
+import time
+
+import pytest
+
+from togo_mcp import log_export, stats
+from togo_mcp.log_export import COLUMN_NAMES, SqliteStore, export_log, to_row
+from togo_mcp.log_index import RecordKeys, compress_segment
+
+
+def _rec(i, day=1):
+    return {
+        "ts": f"2026-06-{day:02d}T10:00:{i % 60:02d}+00:00",
+        "tool": "run_sparql",
+        "args": {"database": "uniprot", "query": "SELECT * WHERE { ?s ?p ?o }"},
+        "status": "ok",
+        "elapsed_ms": 100 + i,
+        "ip": "192.0.2.1",
+        "ip_hash": f"h{i % 3}",
+        "extra": {
+            "endpoint_url": "https://rdfportal.org/sib/sparql",
+            "sparql_status": "ok",
+            "n_rows": i % 4,
+            "n_bytes": 1000,
+            "query_sha256": "ab" * 32,
+            "query_shape": {"form": "select", "from": [], "predicates": ["up:Protein"],
+                            "n_predicates": 1, "flags": {"limit": True}, "len": 40},
+        },
+    }
+
+
+def _write(path, recs):
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.writelines(json.dumps(r) + "\n" for r in recs)
+
+
+def _rows(db):
+    con = sqlite3.connect(db)
+    try:
+        return con.execute("SELECT elapsed_ms, day FROM calls ORDER BY elapsed_ms").fetchall()
+    finally:
+        con.close()
+
+
+def test_row_is_typed_flat_and_private():
+    row = dict(zip(COLUMN_NAMES, to_row(_rec(4), {"https://rdfportal.org/sib/sparql": "sib"})))
+    assert row["day"] == "2026-06-01" and row["elapsed_ms"] == 104.0
+    assert row["database"] == "uniprot" and row["endpoint"] == "sib"
+    assert row["sparql_class"] == "empty_result" and row["n_rows"] == 0
+    assert row["shape_predicates"] == "up:Protein" and row["flag_limit"] == 1
+    assert row["flag_union"] == 0
+    assert "192.0.2.1" not in map(str, row.values())
+    assert "SELECT" not in " ".join(map(str, row.values()))
+    plain = dict(zip(COLUMN_NAMES, to_row({"tool": "list_databases", "elapsed_ms": True}, {})))
+    assert plain["shape_form"] is None and plain["flag_limit"] is None
+    assert plain["elapsed_ms"] is None
+
+
+def test_export_is_incremental_across_rotation_and_compression(tmp_path):
+    base, db = tmp_path / "log.jsonl", str(tmp_path / "calls.sqlite")
+    _write(base, [_rec(i) for i in range(10)])
+    assert export_log(str(base), db) == 10
+    assert export_log(str(base), db) == 0  # idempotent
+
+    _write(base, [_rec(i) for i in range(10, 15)])
+    with open(base, "a", encoding="utf-8") as fh:
+        fh.write('{"ts": "2026-06-02')  # mid-write: not exported yet
+    assert export_log(str(base), db) == 5
+
+    with open(base, "a", encoding="utf-8") as fh:
+        fh.write('T00:00:00+00:00", "tool": "x", "elapsed_ms": 999}\n')
+    base.rename(tmp_path / "log.jsonl.1")  # rotation with an unexported tail
+    _write(base, [_rec(i, day=3) for i in range(20, 23)])
+    compress_segment(str(tmp_path / "log.jsonl.1"), RecordKeys())
+    assert export_log(str(base), db) == 4
+    assert export_log(str(base), db) == 0
+    assert [r[0] for r in _rows(db)] == [100.0 + i for i in range(15)] + [120.0, 121.0, 122.0, 999.0]
+
+
+def test_stats_cli_export_subcommand(tmp_path, capsys):
+    base = tmp_path / "log.jsonl"
+    _write(base, [_rec(i) for i in range(3)])
+    db = str(tmp_path / "calls.sqlite")
+    assert stats._main(["export", db, "--log", str(base), "--format", "sqlite"]) == 0
+    assert "3 rows appended" in capsys.readouterr().out
+    assert len(_rows(db)) == 3
+
+
+def test_p95_by_endpoint_by_day_is_fast(tmp_path):
+    db = str(tmp_path / "calls.sqlite")
+    store = SqliteStore(db)
+    rng = random.Random(0)
+    width = len(COLUMN_NAMES)
+    ep, day, ms = (COLUMN_NAMES.index(c) for c in ("endpoint", "day", "elapsed_ms"))
+    rows = []
+    for i in range(200_000):  # months of traffic at today's rate, several times over
+        row = [None] * width
+        row[ep] = f"ep{i % 12}"
+        row[day] = f"2026-{1 + i % 6:02d}-{1 + i % 28:02d}"
+        row[ms] = rng.lognormvariate(6, 1)
+        rows.append(tuple(row))
+    store.append("synthetic", 0, rows)
+    store.close()
+    con = sqlite3.connect(db)
+    t0 = time.perf_counter()
+    out = con.execute(
+        """
+        SELECT endpoint, day, MIN(elapsed_ms) FROM (
+          SELECT endpoint, day, elapsed_ms,
+                 CUME_DIST() OVER (PARTITION BY endpoint, day ORDER BY elapsed_ms) AS cd
+          FROM calls WHERE endpoint IS NOT NULL)
+        WHERE cd >= 0.95 GROUP BY endpoint, day
+        """
+    ).fetchall()
+    elapsed = time.perf_counter() - t0
+    con.close()
+    assert len(out) == len({(r[ep], r[day]) for r in rows})
+    ordered = sorted(r[ms] for r in rows if (r[ep], r[day]) == out[0][:2])
+    assert out[0][2] == ordered[math.ceil(0.95 * len(ordered)) - 1]
+    assert elapsed < 1.0, elapsed
+
+
+def test_parquet_store(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    base = tmp_path / "log.jsonl"
+    _write(base, [_rec(i) for i in range(7)])
+    dest = str(tmp_path / "calls.parquet")
+    assert export_log(str(base), dest, fmt="parquet") == 7
+    assert export_log(str(base), dest, fmt="parquet") == 0
+    table = pq.read_table(dest)
+    assert table.num_rows == 7 and table.column_names == list(COLUMN_NAMES)
+
+
+def test_writer_exports_after_each_rotation(tmp_path):
+    from togo_mcp.toolcall_log import JsonlLogWriter
+
+    base, db = tmp_path / "log.jsonl", str(tmp_path / "calls.sqlite")
+    w = JsonlLogWriter(str(base), max_bytes=2000, batch_size=5,
+                       after_rotate=lambda: log_export.export_log(str(base), db))
+    for i in range(40):
+        w.submit(_rec(i))
+    w.close()
+    assert w.counters()["rotations"] > 0
+    exported = len(_rows(db))
+    assert 0 < exported <= 40
+    export_log(str(base), db)  # a final run catches up with the active file
+    assert len(_rows(db)) == 40
+
+
+def _sources(db):
+    con = sqlite3.connect(db)
+    try:
+        return dict(con.execute("SELECT key, offset FROM _sources"))
+    finally:
+        con.close()
+
+
+def _reuse_inode(db, old_key, path):
+    """Hand ``old_key``'s progress to ``path``, as ext4 does by reusing the inode."""
+    st = path.stat()
+    con = sqlite3.connect(db)
+    with con:
+        con.execute("UPDATE _sources SET key = ? WHERE key = ?",
+                    (log_export._key(st.st_dev, st.st_ino), old_key))
+    con.close()
+
+
+def test_reused_inode_is_read_from_the_start(tmp_path):
+    base, db = tmp_path / "log.jsonl", str(tmp_path / "calls.sqlite")
+    _write(base, [_rec(i) for i in range(100)])
+    assert export_log(str(base), db) == 100
+    (old_key,) = _sources(db)
+    base.unlink()
+    _write(base, [_rec(i, day=2) for i in range(150)])
+    _reuse_inode(db, old_key, base)
+    assert export_log(str(base), db) == 150
+    assert export_log(str(base), db) == 0
+
+
+def test_reused_source_inode_does_not_shorten_a_segment(tmp_path):
+    base, db = tmp_path / "log.jsonl", str(tmp_path / "calls.sqlite")
+    _write(base, [_rec(i) for i in range(100)])
+    assert export_log(str(base), db) == 100
+    (old_key,) = _sources(db)
+    base.unlink()  # the exported file is gone; a new one gets its inode
+    _write(base, [_rec(i, day=2) for i in range(150)])
+    _reuse_inode(db, old_key, base)
+    base.rename(tmp_path / "log.jsonl.1")
+    compress_segment(str(tmp_path / "log.jsonl.1"), RecordKeys())
+    assert export_log(str(base), db) == 150
+
+
+def test_progress_of_vanished_files_is_dropped(tmp_path):
+    base, db = tmp_path / "log.jsonl", str(tmp_path / "calls.sqlite")
+    _write(base, [_rec(i) for i in range(5)])
+    export_log(str(base), db)
+    base.rename(tmp_path / "log.jsonl.1")
+    _write(base, [_rec(i) for i in range(5, 8)])
+    compress_segment(str(tmp_path / "log.jsonl.1"), RecordKeys())
+    assert export_log(str(base), db) == 3
+    assert len(_sources(db)) == 3  # live file, the segment, and the file it came from
+    (tmp_path / "log.jsonl.1.gz").unlink()
+    assert export_log(str(base), db) == 0
+    st = base.stat()
+    assert list(_sources(db)) == [log_export._key(st.st_dev, st.st_ino)]
+
+
+def test_store_without_marks_is_upgraded(tmp_path):
+    base, db = tmp_path / "log.jsonl", str(tmp_path / "calls.sqlite")
+    _write(base, [_rec(i) for i in range(4)])
+    st = base.stat()
+    con = sqlite3.connect(db)
+    with con:
+        con.execute("CREATE TABLE _sources (key TEXT PRIMARY KEY, offset INTEGER)")
+        con.execute("INSERT INTO _sources VALUES (?, ?)",
+                    (log_export._key(st.st_dev, st.st_ino), st.st_size))
+    con.close()
+    assert export_log(str(base), db) == 0  # old progress is trusted
+    _write(base, [_rec(4)])
+    assert export_log(str(base), db) == 1
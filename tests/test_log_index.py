@@ -0,0 +1,172 @@
+"""Tests for the tool-call log's sidecar block index (togo_mcp.log_index)."""
+import json
+import os
+
+import pytest
+
+from togo_mcp import log_index
+from togo_mcp.log_index import RecordKeys, build_index, iter_filtered, load_blocks, plan_ranges
+from togo_mcp.toolcall_log import JsonlLogWriter
+
+
+def _rec(day, tool, db=None, pad=0):
+    args = {"database": db} if db else {}
+    return {"ts": f"2026-06-{day:02d}T12:00:00+00:00", "tool": tool, "args": args,
+            "pad": "x" * pad}
+
+
+def _records(days=10, per_day=200):
+    out = []
+    for d in range(1, days + 1):
+        for i in range(per_day):
+            out.append(_rec(d, ["run_sparql", "get_MIE_file", "search_uniprot_entity"][i % 3],
+                            ["uniprot", "pdb"][i % 2], pad=100))
+    return out
+
+
+def _served(paths, **filters):
+    return b"".join(iter_filtered(paths, **filters))
+
+
+def _expected(paths, keep):
+    out = []
+    for p in paths:
+        with open(p, "rb") as fh:
+            out += [line for line in fh if keep(json.loads(line))]
+    return b"".join(out)
+
+
+def test_writer_indexes_blocks_by_day_and_prunes_reads(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_index, "BLOCK_BYTES", 8 * 1024)
+    path = str(tmp_path / "log.jsonl")
+    w = JsonlLogWriter(path, index_keys=RecordKeys())
+    for rec in _records():
+        w.submit(rec)
+    w.close()
+
+    st = os.stat(path)
+    blocks, use_dbs = load_blocks(path, st, RecordKeys().fingerprint)
+    assert use_dbs and len(blocks) > 10
+    assert sum(b["r"] for b in blocks) == 2000 and sum(b["n"] for b in blocks) == st.st_size
+    assert all(b["d"] for b in blocks)
+
+    one_day = plan_ranges(blocks, st.st_size, since="2026-06-04", until="2026-06-04",
+                          tool=None, database=None)
+    assert len(one_day) == 1
+    assert one_day[0][1] - one_day[0][0] < st.st_size / 5  # only that day is read
+
+    got = _served([path], since="2026-06-04", until="2026-06-05", tool="get_MIE_file")
+    assert got == _expected(
+        [path], lambda r: r["ts"][:10] in ("2026-06-04", "2026-06-05")
+        and r["tool"] == "get_MIE_file")
+    assert _served([path], database="pdb") == _expected(
+        [path], lambda r: r["args"].get("database") == "pdb")
+
+
+def test_sidecars_follow_rotation(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    w = JsonlLogWriter(path, max_bytes=25_000, backup_count=3, batch_size=50,
+                       index_keys=RecordKeys())
+    for rec in _records(days=4, per_day=100):
+        w.submit(rec)
+    w.close()
+    files = [path] + [f"{path}.{i}" for i in (1, 2, 3) if os.path.exists(f"{path}.{i}")]
+    assert len(files) >= 3
+    for f in files:
+        blocks, _ = load_blocks(f, os.stat(f), RecordKeys().fingerprint)
+        assert blocks and sum(b["n"] for b in blocks) == os.path.getsize(f)
+    ordered = list(reversed(files))
+    assert _served(ordered, since="2026-06-03") == _expected(
+        ordered, lambda r: r["ts"][:10] >= "2026-06-03")
+
+
+def test_missing_stale_or_partial_index_only_costs_a_scan(tmp_path):
+    path = tmp_path / "log.jsonl"
+    path.write_text("".join(json.dumps(r) + "\n" for r in _records(days=3, per_day=30)))
+    keep = lambda r: r["ts"].startswith("2026-06-02")  # noqa: E731
+    f = {"since": "2026-06-02", "until": "2026-06-02"}
+
+    assert _served([str(path)], **f) == _expected([str(path)], keep)  # no sidecar
+
+    assert build_index(str(path), RecordKeys()) == 3
+    with open(path, "a", encoding="utf-8") as fh:  # unindexed tail
+        fh.write(json.dumps(_rec(2, "run_sparql")) + "\n")
+    assert _served([str(path)], **f) == _expected([str(path)], keep)
+
+    other = tmp_path / "other.jsonl"  # a sidecar that describes another file
+    other.write_text("")
+    os.replace(f"{path}.idx", f"{other}.idx")
+    build_index(str(other), RecordKeys())
+    os.replace(f"{other}.idx", f"{path}.idx")
+    assert load_blocks(str(path), os.stat(path), RecordKeys().fingerprint) == ([], False)
+    assert _served([str(path)], **f) == _expected([str(path)], keep)
+
+
+def test_index_failure_never_loses_records(tmp_path):
+    class Broken(RecordKeys):
+        __slots__ = ()
+
+        def __call__(self, rec):
+            raise RuntimeError("boom")
+
+    path = tmp_path / "log.jsonl"
+    w = JsonlLogWriter(str(path), index_keys=Broken())
+    for i in range(5):
+        w.submit({"i": i})
+    w.close()
+    assert len(path.read_text().splitlines()) == 5
+    assert w.counters()["errors"] == 0
+
+
+def test_compressed_segment_serves_only_matching_members(tmp_path, monkeypatch):
+    import gzip
+
+    from togo_mcp.log_index import compress_segment, compressed_source
+
+    monkeypatch.setattr(log_index, "BLOCK_BYTES", 8 * 1024)
+    plain = tmp_path / "log.jsonl.1"
+    plain.write_text("".join(json.dumps(r) + "\n" for r in _records(days=5, per_day=100)))
+    st = plain.stat()
+    expected = _expected([str(plain)], lambda r: r["ts"].startswith("2026-06-03")
+                         and r["tool"] == "run_sparql")
+    whole = plain.read_bytes()
+
+    gz = compress_segment(str(plain), RecordKeys())
+    assert not plain.exists() and not os.path.exists(f"{plain}.idx")
+    assert gzip.decompress(open(gz, "rb").read()) == whole  # an ordinary .gz
+    assert os.stat(gz).st_mtime == st.st_mtime
+    assert compressed_source(gz, os.stat(gz)) == (st.st_dev, st.st_ino, st.st_size)
+
+    blocks, _ = load_blocks(gz, os.stat(gz), RecordKeys().fingerprint)
+    assert sum(b["n"] for b in blocks) == len(whole)
+    decompressed = []
+    real = gzip.decompress
+    monkeypatch.setattr(log_index.gzip, "decompress",
+                        lambda data: decompressed.append(len(data)) or real(data))
+    assert _served([gz], since="2026-06-03", until="2026-06-03", tool="run_sparql") == expected
+    assert 0 < sum(decompressed) < os.path.getsize(gz) / 3
+
+    os.remove(f"{gz}.idx")  # without its sidecar the segment is scanned whole
+    assert _served([gz], since="2026-06-03", until="2026-06-03", tool="run_sparql") == expected
+
+
+def test_cli_rebuild_leaves_compressed_segments_alone(tmp_path, capsys):
+    path = str(tmp_path / "log.jsonl")
+    with open(path + ".1", "w", encoding="utf-8") as fh:
+        fh.writelines(json.dumps(r) + "\n" for r in _records(days=2, per_day=20))
+    gz = log_index.compress_segment(path + ".1", RecordKeys())
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.writelines(json.dumps(r) + "\n" for r in _records(days=1, per_day=5))
+    size = log_index.uncompressed_size(gz)
+    assert size is not None
+    with open(log_index.index_path(gz), "rb") as fh:
+        sidecar = fh.read()
+
+    assert log_index._main([path]) == 0
+    out = capsys.readouterr().out
+    assert f"{gz}: skipped" in out and f"{path}: 1 blocks" in out
+    with open(log_index.index_path(gz), "rb") as fh:
+        assert fh.read() == sidecar
+    assert log_index.uncompressed_size(gz) == size
+    with pytest.raises(ValueError):
+        build_index(gz, RecordKeys())
@@ -0,0 +1,83 @@
+"""Tests for tool-call log sampling (togo_mcp.log_sampling)."""
+import itertools
+
+from togo_mcp.log_sampling import MAX_WEIGHT, LogSampler, from_env, parse_rules
+
+
+def _ok(sampler, **kw):
+    args = {"tool": "run_sparql", "client": "mcp", "ip": "10.0.0.1", "error": False,
+            "elapsed_ms": 10.0, "extra": None}
+    return sampler.weight(**{**args, **kw})
+
+
+def test_rules_parse_to_one_in_k_and_skip_bad_entries():
+    assert parse_rules("client:mcp=0.1, tool:get_MIE_file = 0.5, *=1, bogus=0.2, "
+                       "tool:x=0, tool:y=2, tool:z=abc") == {
+        "client:mcp": 10, "tool:get_MIE_file": 2, "*": 1,
+    }
+    assert parse_rules(None) == {}
+
+
+def test_sparsest_matching_rule_wins_and_kept_records_carry_k():
+    rolls = itertools.cycle([0.05, 0.5])  # kept, dropped, kept, ...
+    s = LogSampler({"client:mcp": 10, "tool:run_sparql": 2}, rng=lambda: next(rolls))
+    assert [_ok(s) for _ in range(4)] == [10, 0, 10, 0]
+    assert _ok(s, client="claude-code", tool="list_databases") == 1
+    assert s.counters() == {"sampled_kept": 2, "sampled_out": 2}
+
+
+def test_errors_failed_or_empty_sparql_and_slow_calls_are_always_kept():
+    s = LogSampler({"*": 1000}, keep_slow_ms=2000, rng=lambda: 0.99)
+    assert _ok(s) == 0
+    assert _ok(s, error=True) == 1
+    assert _ok(s, elapsed_ms=2500.0) == 1
+    assert _ok(s, extra={"sparql_status": "timeout"}) == 1
+    assert _ok(s, extra={"sparql_status": "ok", "n_rows": 0}) == 1
+    assert _ok(s, extra={"sparql_status": "ok", "n_rows": 3}) == 0
+
+
+def test_ip_budget_thins_a_flood_per_address_and_minute():
+    now = [0.0]
+    s = LogSampler(ip_budget=3, rng=lambda: 0.0, clock=lambda: now[0])
+    weights = [_ok(s) for _ in range(7)]
+    assert weights == [1, 1, 1, 2, 2, 2, 3]
+    assert _ok(s, ip="10.0.0.2") == 1  # another address has its own budget
+    now[0] = 61.0
+    assert _ok(s) == 1  # a new minute starts the budget again
+
+
+def test_weight_is_capped_however_long_the_flood():
+    s = LogSampler({"client:mcp": 50}, ip_budget=2, rng=lambda: 0.0, clock=lambda: 0.0)
+    weights = [_ok(s) for _ in range(200)]
+    assert max(weights) == MAX_WEIGHT and weights[-1] == MAX_WEIGHT
+    assert LogSampler({"*": 10**9}, rng=lambda: 0.0).weight(
+        tool="x", client=None, ip=None, error=False, elapsed_ms=1.0) == MAX_WEIGHT
+
+
+def test_weighted_records_estimate_calls_without_bias():
+    import random
+
+    from togo_mcp.stats import aggregate
+
+    rng = random.Random(7)
+    s = LogSampler({"client:mcp": 10}, rng=rng.random)
+    records = []
+    for i in range(20_000):
+        w = _ok(s)
+        if w:
+            rec = {"ts": "2026-08-01T00:00:00+00:00", "tool": "run_sparql", "status": "ok",
+                   "elapsed_ms": 10.0, "meta": {"client": {"name": "mcp"}}}
+            if w > 1:
+                rec["sample_weight"] = w
+            records.append(rec)
+    month = aggregate(records)["by_month"]["2026-08"]
+    assert len(records) < 2_500
+    assert abs(month["tool_calls"] - 20_000) < 1_000
+    assert month["clients"][0]["calls"] == month["tool_calls"]
+
+
+def test_from_env_is_off_unless_a_sampling_variable_is_set():
+    assert from_env({"TOGOMCP_LOG_KEEP_SLOW_MS": "100"}) is None
+    assert from_env({"TOGOMCP_LOG_SAMPLE_IP_BUDGET": "lots"}) is None
+    s = from_env({"TOGOMCP_LOG_SAMPLE_IP_BUDGET": "600", "TOGOMCP_LOG_KEEP_SLOW_MS": "x"})
+    assert s.ip_budget == 600 and s.rules == {} and s.keep_slow_ms == 5000.0
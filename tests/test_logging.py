@@ -51,6 +51,35 @@ def test_result_size():
     assert server._result_size(12345) == len("12345")
 
 
+def test_result_size_reads_blocks_without_copying_them():
+    import time
+
+    from mcp.types import ImageContent, TextContent
+
+    big_ascii = "x" * 5_000_000
+    big_utf8 = "日本語 text, " * 300_000
+    short_utf8 = "é" * 100
+
+    class _Result:
+        content = [
+            TextContent(type="text", text=big_ascii),
+            TextContent(type="text", text=short_utf8),
+            ImageContent(type="image", data="QUJD", mimeType="image/png"),
+        ]
+
+    assert server._result_size(_Result()) == len(big_ascii) + 200 + 4
+    estimate = server._utf8_len(big_utf8)
+    assert abs(estimate - len(big_utf8.encode())) / len(big_utf8.encode()) < 0.05
+
+    n = 2_000
+    t0 = time.perf_counter()
+    for _ in range(n):
+        server._result_size(_Result())
+        server._utf8_len(big_utf8)
+    per_call = (time.perf_counter() - t0) / n
+    assert per_call < 20e-6, per_call
+
+
 # --------------------------------------------------------------------------- #
 # Client-IP source and the raw-IP opt-in (TOGOMCP_LOG_RAW_IP).
 # --------------------------------------------------------------------------- #
@@ -150,8 +179,7 @@ def _emit_one(monkeypatch, tmp_path, *, raw_ip, peer="203.0.113.7", headers=None
     try:
         asyncio.run(mw.on_call_tool(_FakeContext(), _ok))
     finally:
-        for h in mw._log.handlers:
-            h.close()
+        mw._writer.close()
     return json.loads(log_path.read_text().strip())
 
 
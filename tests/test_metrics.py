@@ -0,0 +1,158 @@
+"""Tests for the live /metrics counters and histograms (togo_mcp.metrics)."""
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+import respx
+
+from togo_mcp import metrics
+from togo_mcp.metrics import Counter, Gauge, Histogram, Registry
+
+
+def test_histogram_renders_cumulative_prometheus_buckets():
+    h = Histogram("t_seconds", "Help text.", ("tool", "status"), buckets=(0.1, 1.0))
+    for v in (0.05, 0.1, 0.5, 3.0):
+        h.observe(v, 'a"b', "ok")
+    reg = Registry()
+    reg.register(h)
+    reg.register(Counter("t_total", "Count.", ("host",)))
+    reg.register(Gauge("t_open", "Open.", ("endpoint",), lambda: [(("ebi",), 1), (("sib",), 0)]))
+    reg.register(Gauge("t_broken", "Broken.", (), lambda: 1 / 0))
+    text = reg.render()
+    assert text.splitlines()[:8] == [
+        "# HELP t_seconds Help text.",
+        "# TYPE t_seconds histogram",
+        't_seconds_bucket{tool="a\\"b",status="ok",le="0.1"} 2',
+        't_seconds_bucket{tool="a\\"b",status="ok",le="1"} 3',
+        't_seconds_bucket{tool="a\\"b",status="ok",le="+Inf"} 4',
+        't_seconds_sum{tool="a\\"b",status="ok"} 3.65',
+        't_seconds_count{tool="a\\"b",status="ok"} 4',
+        "# HELP t_total Count.",
+    ]
+    assert 't_open{endpoint="ebi"} 1\nt_open{endpoint="sib"} 0\n' in text
+    assert "t_broken" not in text  # a failing gauge is dropped, not half-rendered
+    assert h.count('a"b', "ok") == 4
+
+
+def test_hot_path_update_costs_microseconds():
+    h = Histogram("bench_seconds", "", ("tool", "status"))
+    c = Counter("bench_total", "", ("cache", "result"))
+    n = 100_000
+    t0 = time.perf_counter()
+    for i in range(n):
+        h.observe(0.02 * (i % 50), "run_sparql", "ok")
+        c.inc("kegg_kgml", "hit")
+    per_call = (time.perf_counter() - t0) / n
+    assert per_call < 5e-6, per_call
+    assert h.count("run_sparql", "ok") == n
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_are_counted_by_tool_and_status():
+    from fastmcp.exceptions import NotFoundError
+
+    from togo_mcp import server as srv
+
+    mw = srv._ToolCallMetrics()
+    before = {k: metrics.TOOL_CALL_SECONDS.count(*k)
+              for k in (("list_databases", "ok"), ("list_databases", "error"), ("unknown", "error"))}
+
+    async def ok(_ctx):
+        return "result"
+
+    async def boom(_ctx):
+        raise ValueError("bad")
+
+    async def missing(_ctx):
+        raise NotFoundError("Unknown tool: 'made_up_tool'")
+
+    def ctx(name):
+        return SimpleNamespace(message=SimpleNamespace(name=name, arguments={}))
+
+    assert await mw.on_call_tool(ctx("list_databases"), ok) == "result"
+    with pytest.raises(ValueError):
+        await mw.on_call_tool(ctx("list_databases"), boom)
+    with pytest.raises(NotFoundError):
+        await mw.on_call_tool(ctx("made_up_tool"), missing)
+    after = {k: metrics.TOOL_CALL_SECONDS.count(*k) for k in before}
+    assert {k: after[k] - before[k] for k in before} == dict.fromkeys(before, 1)
+    assert metrics.TOOL_CALL_SECONDS.count("made_up_tool", "error") == 0
+
+
+@pytest.mark.asyncio
+async def test_sparql_latency_pool_wait_and_breaker(monkeypatch):
+    from togo_mcp import server as srv
+
+    srv._endpoint_down_until.clear()
+    url = srv.SPARQL_ENDPOINT["uniprot"]["url"]
+    group = srv.registry().url_endpoints[url]
+    waits = metrics.POOL_WAIT_SECONDS.count()
+
+    async def ok(*a, extensions=None, **k):
+        await extensions["trace"]("connection.connect_tcp.started", {})
+        await extensions["trace"]("http11.send_request_headers.started", {})
+        return httpx.Response(200, text="s\na\n", request=httpx.Request("POST", url))
+
+    monkeypatch.setattr(srv._sparql_client, "post", ok)
+    oks = metrics.SPARQL_SECONDS.count(group, "ok")
+    await srv.execute_sparql("SELECT * WHERE { ?s ?p ?o }", database="uniprot")
+    assert metrics.SPARQL_SECONDS.count(group, "ok") == oks + 1
+    assert metrics.POOL_WAIT_SECONDS.count() == waits + 1  # first trace event only
+
+    async def refused(*a, **k):
+        raise httpx.ConnectError("refused")
+
+    monkeypatch.setattr(srv._sparql_client, "post", refused)
+    trips = metrics.BREAKER_TRIPS.value(group)
+    for _ in range(2):  # the second call is refused by the open breaker
+        with pytest.raises(ValueError):
+            await srv.execute_sparql("SELECT * WHERE { ?s ?p ?o }", database="uniprot")
+    assert metrics.BREAKER_TRIPS.value(group) == trips + 1
+    assert metrics.SPARQL_SECONDS.count(group, "endpoint_unresponsive") >= 1
+    states = dict(srv._breaker_states())
+    assert states[(group,)] == 1 and sum(states.values()) == 1
+
+    with pytest.raises(ValueError):
+        await srv.execute_sparql("ASK {}", endpoint_url="https://example.org/sparql")
+    assert metrics.SPARQL_SECONDS.count("other", "network_error") >= 1
+    srv._endpoint_down_until.clear()
+    assert not any(dict(srv._breaker_states()).values())
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_rest_retries_are_counted_by_host(monkeypatch):
+    from togo_mcp import api_tools
+
+    monkeypatch.setattr(api_tools, "_REST_BACKOFF_BASE", 0)
+    respx.get("https://api.example.org/x").mock(
+        side_effect=[httpx.Response(503), httpx.ReadTimeout("slow"), httpx.Response(200)]
+    )
+    before = metrics.REST_RETRIES.value("api.example.org")
+    async with httpx.AsyncClient(base_url="https://api.example.org") as client:
+        response = await api_tools._rest_get(client, "/x", context="test")
+    assert response.status_code == 200
+    assert metrics.REST_RETRIES.value("api.example.org") == before + 2
+
+
+def test_metrics_route_shares_the_stats_auth_gate(monkeypatch):
+    from starlette.testclient import TestClient
+
+    from togo_mcp.main import mcp
+
+    monkeypatch.delenv("TOGOMCP_STATS_USER", raising=False)
+    monkeypatch.delenv("TOGOMCP_STATS_PASSWORD", raising=False)
+    with TestClient(mcp.http_app()) as c:
+        assert c.get("/metrics").status_code == 503
+    monkeypatch.setenv("TOGOMCP_STATS_USER", "u")
+    monkeypatch.setenv("TOGOMCP_STATS_PASSWORD", "p")
+    with TestClient(mcp.http_app()) as c:
+        assert c.get("/metrics").status_code == 401
+        assert c.get("/metrics", auth=("u", "nope")).status_code == 401
+        resp = c.get("/metrics", auth=("u", "p"))
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == metrics.CONTENT_TYPE
+    for name in ("togomcp_tool_call_duration_seconds", "togomcp_sparql_breaker_open",
+                 "togomcp_cache_lookups_total", "togomcp_rest_retries_total"):
+        assert f"# TYPE {name} " in resp.text
@@ -0,0 +1,88 @@
+"""Tests for the compiled MIE bundle (togo_mcp.mie_bundle)."""
+import shutil
+
+import yaml
+
+from togo_mcp import server
+from togo_mcp.mie_bundle import (
+    BUNDLE_FILENAME,
+    compile_bundle,
+    corpus_fingerprint,
+    load_mie_entries,
+)
+
+_A = "database: a\nexamples:\n  - id: one\n    sparql: SELECT * WHERE { ?s ?p ?o }\n"
+_B = "database: b\n# a comment\ngraphs:\n  primary: http://example.org/b\n"
+
+
+def _corpus(tmp_path):
+    d = tmp_path / "mie"
+    d.mkdir()
+    (d / "a.yaml").write_text(_A, encoding="utf-8")
+    (d / "b.yaml").write_text(_B, encoding="utf-8")
+    return d
+
+
+def test_bundle_round_trips_text_and_parsed_doc(tmp_path):
+    d = _corpus(tmp_path)
+    assert compile_bundle(d) == d / BUNDLE_FILENAME
+    entries = load_mie_entries(d)
+    assert list(entries) == ["a", "b"]
+    assert entries["a"].text == _A
+    assert entries["b"].doc == yaml.safe_load(_B)
+    assert entries["b"].database == "b"
+
+
+def test_bundle_entries_are_used_only_while_the_file_hash_matches(tmp_path, monkeypatch):
+    d = _corpus(tmp_path)
+    compile_bundle(d)
+    import togo_mcp.mie_bundle as mb
+
+    parsed = []
+    real_parse = mb._parse
+    monkeypatch.setattr(mb, "_parse", lambda name, *a: parsed.append(name) or real_parse(name, *a))
+
+    load_mie_entries(d)
+    assert parsed == []  # fresh bundle: nothing re-parsed
+
+    (d / "b.yaml").write_text(_B + "extra: 1\n", encoding="utf-8")
+    entries = load_mie_entries(d)
+    assert parsed == ["b.yaml"]
+    assert entries["b"].doc["extra"] == 1
+    assert entries["a"].doc == yaml.safe_load(_A)
+
+
+def test_removed_and_added_files_track_the_directory(tmp_path):
+    d = _corpus(tmp_path)
+    compile_bundle(d)
+    (d / "a.yaml").unlink()
+    (d / "c.yaml").write_text("database: c\n", encoding="utf-8")
+    assert list(load_mie_entries(d)) == ["b", "c"]
+
+
+def test_corrupt_or_foreign_bundle_is_ignored(tmp_path):
+    d = _corpus(tmp_path)
+    path = compile_bundle(d)
+    blob = bytearray(path.read_bytes())
+    blob[-1] ^= 0xFF
+    path.write_bytes(bytes(blob))
+    assert load_mie_entries(d)["a"].doc == yaml.safe_load(_A)
+
+    path.write_bytes(b"not a bundle")
+    assert load_mie_entries(d)["b"].text == _B
+
+
+def test_unparseable_file_keeps_its_text_with_no_doc(tmp_path):
+    d = _corpus(tmp_path)
+    (d / "bad.yaml").write_text("key: [unclosed\n", encoding="utf-8")
+    compile_bundle(d)
+    bad = load_mie_entries(d)["bad"]
+    assert bad.doc is None and bad.text == "key: [unclosed\n"
+
+
+def test_fingerprint_matches_the_server_log_stamp(tmp_path, monkeypatch):
+    d = tmp_path / "mie"
+    shutil.copytree(server.MIE_DIR, d)
+    monkeypatch.setattr(server, "MIE_DIR", str(d))
+    assert corpus_fingerprint(load_mie_entries(d)) == server._detect_mie_bundle_version()
+    assert corpus_fingerprint({}) is None
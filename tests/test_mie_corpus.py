@@ -0,0 +1,132 @@
+"""Tests for the in-memory MIE corpus and its section overlays (togo_mcp.mie_corpus)."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+import yaml
+
+from togo_mcp import mie_corpus
+from togo_mcp.mie_corpus import MieCorpus, parse_overlay, strip_section
+
+_DOC = """\
+mie_spec: 3
+database: demo
+# docs for graphs
+graphs:
+  primary: http://example.org/g
+# docs for gotchas
+global_gotchas:
+  - id: trap
+    say: "TRAP: a bad thing."
+examples:
+  - id: one
+    sparql: |
+      SELECT * WHERE { ?s ?p ?o }
+"""
+
+
+def test_strip_takes_the_sections_own_comment_block_only():
+    text, removed = strip_section(_DOC, "global_gotchas")
+    assert removed
+    assert "docs for gotchas" not in text and "TRAP" not in text
+    # the neighbours keep their own documentation comments
+    assert "# docs for graphs" in text
+    assert strip_section(_DOC, "absent") == (_DOC, False)
+
+
+def test_parse_overlay():
+    assert parse_overlay(None) is None
+    assert parse_overlay("  ") is None
+    ov = parse_overlay("drop: examples , graphs")
+    assert ov.mode == "drop" and ov.sections == {"examples", "graphs"}
+    assert ov == parse_overlay("drop:graphs,examples")  # order-insensitive
+    for bad in ("examples", "drop:", "hide:examples"):
+        with pytest.raises(ValueError):
+            parse_overlay(bad)
+
+
+def test_drop_and_keep_views(tmp_path):
+    (tmp_path / "demo.yaml").write_text(_DOC, encoding="utf-8")
+    corpus = MieCorpus(tmp_path)
+
+    dropped = yaml.safe_load(corpus.text("demo", parse_overlay("drop:global_gotchas")))
+    assert "global_gotchas" not in dropped and "examples" in dropped
+
+    kept = yaml.safe_load(corpus.text("demo", parse_overlay("keep:database,examples")))
+    assert set(kept) == {"database", "examples"}
+
+    assert corpus.text("demo") == _DOC
+
+
+def test_raw_text_is_read_once_and_views_memoized(tmp_path):
+    path = tmp_path / "demo.yaml"
+    path.write_text(_DOC, encoding="utf-8")
+    corpus = MieCorpus(tmp_path)
+    ov = parse_overlay("drop:graphs")
+    first = corpus.text("demo", ov)
+    path.write_text("mie_spec: 3\n", encoding="utf-8")
+    assert corpus.text("demo") == _DOC
+    assert corpus.text("demo", parse_overlay("drop:graphs")) is first
+
+
+def test_unknown_sections_share_one_view_and_views_are_bounded(tmp_path, monkeypatch):
+    (tmp_path / "demo.yaml").write_text(_DOC, encoding="utf-8")
+    corpus = MieCorpus(tmp_path)
+    view = corpus.text("demo", parse_overlay("drop:graphs"))
+    for i in range(50):
+        assert corpus.text("demo", parse_overlay(f"drop:graphs,nope{i}")) is view
+        assert corpus.text("demo", parse_overlay(f"drop:nope{i}")) == _DOC
+    assert len(corpus._views) == 1
+
+    monkeypatch.setattr(mie_corpus, "VIEW_CACHE_MAX", 2)
+    for spec in ("drop:examples", "keep:database", "keep:graphs"):
+        corpus.text("demo", parse_overlay(spec))
+        corpus.doc("demo", parse_overlay(spec))
+    assert len(corpus._views) == 2 and len(corpus._docs) == 2
+    assert yaml.safe_load(corpus.text("demo", parse_overlay("keep:graphs"))) == {
+        "graphs": {"primary": "http://example.org/g"}
+    }
+
+
+def test_missing_or_escaping_names_are_none(tmp_path):
+    (tmp_path / "demo.yaml").write_text(_DOC, encoding="utf-8")
+    corpus = MieCorpus(tmp_path)
+    assert corpus.text("nope") is None
+    assert corpus.raw("../demo") is None
+
+
+def test_get_mie_file_applies_server_and_request_overlays(monkeypatch):
+    from togo_mcp import rdf_portal
+
+    def no_http():
+        raise RuntimeError("no active HTTP request")
+
+    monkeypatch.setattr(rdf_portal, "MIE_OVERLAY_HEADER_ENABLED", True)
+    monkeypatch.setattr(rdf_portal, "get_http_request", no_http)
+    full = asyncio.run(rdf_portal.get_MIE_file("uniprot"))
+    assert "\nexamples:" in full
+
+    monkeypatch.setattr(rdf_portal, "MIE_OVERLAY", parse_overlay("drop:examples"))
+    assert "\nexamples:" not in asyncio.run(rdf_portal.get_MIE_file("uniprot"))
+
+    # a request header overrides the server-wide overlay; empty = verbatim
+    def with_header(value):
+        req = SimpleNamespace(headers={rdf_portal.MIE_OVERLAY_HEADER: value})
+        monkeypatch.setattr(rdf_portal, "get_http_request", lambda: req)
+
+    with_header("")
+    assert asyncio.run(rdf_portal.get_MIE_file("uniprot")) == full
+    with_header("keep:database")
+    out = asyncio.run(rdf_portal.get_MIE_file("uniprot"))
+    assert "\ndatabase: uniprot" in out and "\nexamples:" not in out
+    with_header("bogus")
+    assert asyncio.run(rdf_portal.get_MIE_file("uniprot")).startswith("Error: Malformed MIE overlay")
+
+
+def test_request_overlay_header_needs_opt_in(monkeypatch):
+    from togo_mcp import rdf_portal
+
+    req = SimpleNamespace(headers={rdf_portal.MIE_OVERLAY_HEADER: "keep:database"})
+    monkeypatch.setattr(rdf_portal, "get_http_request", lambda: req)
+    monkeypatch.setattr(rdf_portal, "MIE_OVERLAY_HEADER_ENABLED", False)
+    assert "\nexamples:" in asyncio.run(rdf_portal.get_MIE_file("uniprot"))
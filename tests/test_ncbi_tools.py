@@ -1,7 +1,41 @@
 """Tests for togo_mcp.ncbi_tools module."""
 
+import asyncio
+import importlib.util
+import json
+from pathlib import Path
+from urllib.parse import parse_qs
 
-from togo_mcp.ncbi_tools import _validate_query_field_tags
+import httpx
+import pytest
+import respx
+
+from togo_mcp import ncbi_tools
+from togo_mcp.ncbi_tools import NCBI_DATABASES, _validate_query_field_tags, list_databases
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+EUTILS = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+
+
+@pytest.fixture(autouse=True)
+def _fresh_summary_cache(monkeypatch):
+    monkeypatch.setattr(ncbi_tools, "_summary_cache", ncbi_tools._SummaryCache(3600.0, 1 << 20))
+
+
+@pytest.fixture(autouse=True)
+def _fast_bucket(request, monkeypatch):
+    """Lift the E-utilities rate limit unless the test installs its own bucket."""
+    if request.node.get_closest_marker("own_bucket") is None:
+        monkeypatch.setattr(ncbi_tools, "_bucket", ncbi_tools._TokenBucket(1000.0))
+
+
+def _load_bench():
+    spec = importlib.util.spec_from_file_location(
+        "bench_ncbi", REPO_ROOT / "scripts" / "bench_ncbi.py"
+    )
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
 
 
 class TestValidateQueryFieldTags:
@@ -79,3 +113,378 @@ class TestValidateQueryFieldTags:
         result = _validate_query_field_tags("test query", "unknown_db")
         assert result["is_critical"] is False
         assert isinstance(result["issues"], list)
+
+
+class TestListDatabases:
+    """Tests for the prerendered list_databases response."""
+
+    def test_same_result_every_call(self) -> None:
+        """The text is built once at import and reused."""
+        first = asyncio.run(list_databases())
+        assert asyncio.run(list_databases()) is first
+
+    def test_lists_every_database(self) -> None:
+        text = asyncio.run(list_databases()).content[0].text
+        assert text.startswith("Supported NCBI Databases")
+        for db_name in NCBI_DATABASES:
+            assert f'(database="{db_name}")' in text
+
+
+class TestPooledClient:
+    """Every E-utilities call goes through one shared keep-alive client."""
+
+    @pytest.mark.asyncio
+    async def test_all_tools_share_one_client(self) -> None:
+        with respx.mock(using="httpx") as router:
+            router.get(f"{EUTILS}/esearch.fcgi").mock(
+                return_value=httpx.Response(200, json={"esearchresult": {"idlist": ["672"]}})
+            )
+            router.get(f"{EUTILS}/esummary.fcgi").mock(
+                return_value=httpx.Response(200, json={"result": {"uids": ["672"]}})
+            )
+            router.get(f"{EUTILS}/efetch.fcgi").mock(
+                return_value=httpx.Response(200, text=">672\nACGT\n")
+            )
+            await ncbi_tools._ncbi_esearch_api(db="gene", term="BRCA1[Gene Name]")
+            client = ncbi_tools._client.unwrap()
+            summary = await ncbi_tools.esummary(database="gene", ids="672")
+            fetched = await ncbi_tools.efetch(database="gene", ids=["672"])
+            assert [c.request.url.params["id"] for c in router.calls[1:]] == ["672", "672"]
+        assert ncbi_tools._client.unwrap() is client
+        assert '"uids"' in summary[0].text and fetched[0].text == ">672\nACGT\n"
+
+    @pytest.mark.asyncio
+    async def test_bench_stand_in_sees_one_connection_when_pooled(self) -> None:
+        report = await _load_bench().bench(calls=4, concurrency=1, handshake_ms=5,
+                                           service_ms=1, rate=1000.0)
+        assert report["per_call"]["connections"] == 4
+        assert report["serialized"]["connections"] == 1
+        assert report["bucket"]["connections"] == 0  # the same pooled connection
+
+
+class TestRateLimit:
+    """Process-wide token bucket: spaced starts, overlapping requests."""
+
+    def test_rate_is_configurable_only_with_a_key(self) -> None:
+        rate = ncbi_tools._configured_rate
+        assert rate({"TOGOMCP_NCBI_RATE": "50"}, has_key=False) == 3.0
+        assert rate({}, has_key=True) == 10.0
+        assert rate({"TOGOMCP_NCBI_RATE": "20"}, has_key=True) == 20.0
+        assert rate({"TOGOMCP_NCBI_RATE": "fast"}, has_key=True) == 10.0
+        assert rate({"TOGOMCP_NCBI_RATE": "-1"}, has_key=True) == 10.0
+        assert ncbi_tools._TokenBucket(3.0).interval == pytest.approx(0.34)
+
+    @pytest.mark.asyncio
+    @pytest.mark.own_bucket
+    async def test_starts_are_spaced_but_requests_overlap(self, monkeypatch) -> None:
+        from togo_mcp import metrics
+
+        bucket = ncbi_tools._TokenBucket(20.0)
+        monkeypatch.setattr(ncbi_tools, "_bucket", bucket)
+        before = metrics.RATE_LIMIT_WAIT_SECONDS.count("ncbi")
+        starts = []
+
+        async def request() -> None:
+            await ncbi_tools._throttle()
+            starts.append(asyncio.get_running_loop().time())
+            await asyncio.sleep(0.3)  # the round trip, outside the limiter
+
+        t0 = asyncio.get_running_loop().time()
+        await asyncio.gather(*(request() for _ in range(5)))
+        elapsed = asyncio.get_running_loop().time() - t0
+        gaps = [b - a for a, b in zip(starts, starts[1:])]
+        assert min(gaps) >= bucket.interval - 0.005
+        assert elapsed < 5 * 0.3  # a held slot would take 5 round trips and more
+        assert metrics.RATE_LIMIT_WAIT_SECONDS.count("ncbi") == before + 5
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_never_exceed_the_rate(self) -> None:
+        report = await _load_bench().bench(calls=14, concurrency=5, handshake_ms=1,
+                                           service_ms=150, rate=10.0, modes=("bucket",))
+        assert report["bucket"]["max_starts_per_s"] <= 10
+
+
+def _summary_page(request: httpx.Request) -> httpx.Response:
+    start = int(request.url.params["retstart"])
+    count = int(request.url.params["retmax"])
+    uids = [str(1000 + i) for i in range(start, start + count)]
+    return httpx.Response(
+        200, json={"result": {"uids": uids, **{u: {"uid": u} for u in uids}}}
+    )
+
+
+class TestHistoryServer:
+    """esearch(use_history) hands back a WebEnv that esummary/efetch page through."""
+
+    @pytest.mark.asyncio
+    async def test_esearch_returns_a_handle(self) -> None:
+        body = {"esearchresult": {"count": "3000", "retmax": "20", "retstart": "0",
+                                  "idlist": ["672"], "querykey": "1",
+                                  "webenv": "MCID_65f0abc"}}
+        with respx.mock(using="httpx") as router:
+            router.get(f"{EUTILS}/esearch.fcgi").mock(return_value=httpx.Response(200, json=body))
+            result = await ncbi_tools.esearch(database="gene", query="kinase", use_history=True)
+            assert router.calls[0].request.url.params["usehistory"] == "y"
+        assert 'history="1:MCID_65f0abc"' in result[0].text
+
+    @pytest.mark.asyncio
+    async def test_esummary_pages_a_large_window_in_batches(self) -> None:
+        with respx.mock(using="httpx") as router:
+            router.get(f"{EUTILS}/esummary.fcgi").mock(side_effect=_summary_page)
+            result = await ncbi_tools.esummary(
+                database="gene", history="1:MCID_65f0abc", retstart=100, retmax=1200
+            )
+            sent = [c.request.url.params for c in router.calls]
+            assert [(p["retstart"], p["retmax"]) for p in sent] == [
+                ("100", "500"), ("600", "500"), ("1100", "200"),
+            ]
+            assert all(p["WebEnv"] == "MCID_65f0abc" and "id" not in p for p in sent)
+        data = json.loads(result[0].text)
+        assert data["result"]["uids"] == [str(1000 + i) for i in range(100, 1300)]
+        assert len(data["result"]) == 1201
+
+    @pytest.mark.asyncio
+    async def test_efetch_concatenates_batches_in_order(self) -> None:
+        def page(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, text=f">batch{request.url.params['retstart']}\nACGT\n")
+
+        with respx.mock(using="httpx") as router:
+            router.get(f"{EUTILS}/efetch.fcgi").mock(side_effect=page)
+            result = await ncbi_tools.efetch(
+                database="nuccore", history="2:MCID_x", rettype="fasta", retmax=700
+            )
+        assert result[0].text == ">batch0\nACGT\n>batch500\nACGT\n"
+
+    @pytest.mark.asyncio
+    async def test_expired_handle_says_to_search_again(self) -> None:
+        with respx.mock(using="httpx") as router:
+            router.get(f"{EUTILS}/esummary.fcgi").mock(return_value=httpx.Response(
+                200, json={"esummaryresult": ["Unable to obtain query #1"]}
+            ))
+            router.get(f"{EUTILS}/efetch.fcgi").mock(return_value=httpx.Response(
+                200, text="<eFetchResult><ERROR>Cannot retrieve query from history</ERROR>"
+                          "</eFetchResult>"
+            ))
+            summary = await ncbi_tools.esummary(database="gene", history="1:MCID_old")
+            fetched = await ncbi_tools.efetch(database="gene", history="1:MCID_old")
+        assert summary[0].text.startswith("Error:") and "Unable to obtain" in summary[0].text
+        assert fetched[0].text.startswith("Error:") and "use_history=True" in fetched[0].text
+
+    @pytest.mark.asyncio
+    async def test_bad_arguments_are_reported_without_a_request(self) -> None:
+        with respx.mock(using="httpx") as router:
+            both = await ncbi_tools.esummary(database="gene", ids="672", history="1:MCID_x")
+            bad = await ncbi_tools.efetch(database="gene", history="MCID_x")
+            neither = await ncbi_tools.esummary(database="gene")
+            assert not router.calls
+        assert "not both" in both[0].text
+        assert "<query_key>:<WebEnv>" in bad[0].text
+        assert neither[0].text.startswith("Error:")
+
+
+def _request_ids(request: httpx.Request) -> list[str]:
+    if request.method == "POST":
+        return parse_qs(request.content.decode())["id"][0].split(",")
+    return request.url.params["id"].split(",")
+
+
+class TestIdChunking:
+    """Long ID lists go out as rate-limited chunks, POSTed, and come back in order."""
+
+    def test_chunk_size_is_per_database(self) -> None:
+        ids = [str(i) for i in range(450)]
+        assert [len(c) for c in ncbi_tools._id_chunks("gene", ids)] == [200, 200, 50]
+        assert [len(c) for c in ncbi_tools._id_chunks("nuccore", ids)] == [100] * 4 + [50]
+        assert sum(ncbi_tools._id_chunks("pubmed", ids), []) == ids
+
+    @pytest.mark.asyncio
+    async def test_esummary_posts_chunks_and_keeps_request_order(self) -> None:
+        ids = [f"10{i:04d}" for i in range(450)]
+
+        def summary(request: httpx.Request) -> httpx.Response:
+            got = _request_ids(request)
+            return httpx.Response(200, json={"result": {"uids": got, **{u: {"uid": u} for u in got}}})
+
+        with respx.mock(using="httpx") as router:
+            router.get(f"{EUTILS}/esummary.fcgi").mock(side_effect=summary)
+            router.post(f"{EUTILS}/esummary.fcgi").mock(side_effect=summary)
+            result = await ncbi_tools.esummary(database="gene", ids=ids)
+            assert [c.request.method for c in router.calls] == ["POST", "POST", "GET"]
+        data = json.loads(result[0].text)
+        assert data["result"]["uids"] == ids and "chunk_errors" not in data
+
+    @pytest.mark.asyncio
+    async def test_a_failed_chunk_is_reported_not_fatal(self) -> None:
+        ids = [str(i) for i in range(250)]
+
+        def summary(request: httpx.Request) -> httpx.Response:
+            got = _request_ids(request)
+            if got[0] == "200":
+                return httpx.Response(502, text="Bad Gateway")
+            return httpx.Response(200, json={"result": {"uids": got}})
+
+        def fetch(request: httpx.Request) -> httpx.Response:
+            got = _request_ids(request)
+            if got[0] == "0":
+                return httpx.Response(500, text="boom")
+            return httpx.Response(200, text="".join(f">{i}\nACGT\n" for i in got))
+
+        with respx.mock(using="httpx") as router:
+            router.route(url__startswith=f"{EUTILS}/esummary.fcgi").mock(side_effect=summary)
+            router.route(url__startswith=f"{EUTILS}/efetch.fcgi").mock(side_effect=fetch)
+            summary_result = await ncbi_tools.esummary(database="gene", ids=ids)
+            fetched = await ncbi_tools.efetch(database="gene", ids=ids, rettype="fasta")
+        data = json.loads(summary_result[0].text)
+        assert data["result"]["uids"] == ids[:200]
+        assert data["chunk_errors"][0]["ids"] == ids[200:]
+        assert "502" in data["chunk_errors"][0]["error"]
+        body, _, note = fetched[0].text.partition("Warning: 1 of 2 ID chunks failed")
+        assert body.startswith(">200\nACGT\n") and body.count(">") == 50
+        assert note.count(",") == 199
+
+    @pytest.mark.asyncio
+    async def test_every_chunk_failing_is_an_error(self) -> None:
+        with respx.mock(using="httpx") as router:
+            router.route(url__startswith=f"{EUTILS}/efetch.fcgi").mock(
+                return_value=httpx.Response(500, text="boom")
+            )
+            result = await ncbi_tools.efetch(database="gene", ids=[str(i) for i in range(300)])
+        assert result[0].text.startswith("Error fetching records:")
+
+
+def _summaries(request: httpx.Request) -> httpx.Response:
+    got = _request_ids(request)
+    records = {u: {"uid": u, "name": f"gene{u}"} for u in got if u != "404"}
+    if "404" in got:
+        records["404"] = {"uid": "404", "error": "cannot get document summary"}
+    return httpx.Response(200, json={"header": {"type": "esummary", "version": "0.3"},
+                                     "result": {"uids": got, **records}})
+
+
+class TestSummaryCache:
+    """esummary serves cached records and fetches only the missing IDs."""
+
+    @pytest.mark.asyncio
+    async def test_partial_hit_fetches_only_the_missing_ids(self) -> None:
+        with respx.mock(using="httpx") as router:
+            router.get(f"{EUTILS}/esummary.fcgi").mock(side_effect=_summaries)
+            await ncbi_tools.esummary(database="ncbigene", ids="672,675")
+            result = await ncbi_tools.esummary(database="gene", ids="7157,672,404,675")
+            again = await ncbi_tools.esummary(database="gene", ids=["675", "672"])
+            assert [c.request.url.params["id"] for c in router.calls] == ["672,675", "7157,404"]
+        data = json.loads(result[0].text)
+        assert data["result"]["uids"] == ["7157", "672", "404", "675"]
+        assert data["result"]["672"] == {"uid": "672", "name": "gene672"}
+        assert "error" in data["result"]["404"]
+        assert json.loads(again[0].text)["result"]["uids"] == ["675", "672"]
+        assert ("gene", "404") not in ncbi_tools._summary_cache._entries
+
+    @pytest.mark.asyncio
+    async def test_full_hit_looks_like_a_fetched_response(self) -> None:
+        with respx.mock(using="httpx") as router:
+            router.get(f"{EUTILS}/esummary.fcgi").mock(side_effect=_summaries)
+            fetched = await ncbi_tools.esummary(database="gene", ids="672,675")
+            cached = await ncbi_tools.esummary(database="gene", ids="672,675")
+            assert len(router.calls) == 1
+        assert json.loads(cached[0].text) == json.loads(fetched[0].text)
+
+    @pytest.mark.asyncio
+    async def test_history_pages_seed_the_cache(self) -> None:
+        with respx.mock(using="httpx") as router:
+            router.get(f"{EUTILS}/esummary.fcgi").mock(side_effect=_summary_page)
+            await ncbi_tools.esummary(database="gene", history="1:MCID_x", retmax=3)
+            result = await ncbi_tools.esummary(database="gene", ids="1001,1002")
+            assert len(router.calls) == 1
+        assert json.loads(result[0].text)["result"]["uids"] == ["1001", "1002"]
+
+    def test_entries_expire_and_bytes_are_bounded(self, monkeypatch) -> None:
+        now = [1000.0]
+        monkeypatch.setattr(ncbi_tools.time, "monotonic", lambda: now[0])
+        record = {"uid": "1", "name": "x" * 80}
+        size = len(ncbi_tools._json_codec.dumps_bytes(record))
+        cache = ncbi_tools._SummaryCache(60.0, 3 * size)
+        for uid in "1234":
+            cache.put("gene", uid, dict(record, uid=uid))
+        assert len(cache) == 3 and cache.nbytes == 3 * size
+        assert cache.get("gene", "1") is None  # least recently used, evicted
+        assert cache.get("gene", "2")["uid"] == "2"
+        cache.put("gene", "5", dict(record, uid="5"))
+        assert cache.get("gene", "2") is not None and cache.get("gene", "3") is None
+        now[0] += 61
+        assert cache.get("gene", "2") is None and cache.nbytes == 2 * size
+        cache.put("gene", "big", {"uid": "big", "name": "x" * (4 * size)})
+        assert cache.get("gene", "big") is None
+
+    def test_ttl_zero_disables_and_bad_values_fall_back(self) -> None:
+        configured = ncbi_tools._configured_cache
+        assert configured({}) == (3600.0, 32 * 1024 * 1024)
+        assert configured({"TOGOMCP_NCBI_CACHE_TTL": "0", "TOGOMCP_NCBI_CACHE_MB": "1"}) == (
+            0.0, 1024 * 1024,
+        )
+        assert configured({"TOGOMCP_NCBI_CACHE_TTL": "soon", "TOGOMCP_NCBI_CACHE_MB": "-2"}) == (
+            3600.0, 32 * 1024 * 1024,
+        )
+        cache = ncbi_tools._SummaryCache(0.0, 1 << 20)
+        cache.put("gene", "1", {"uid": "1"})
+        assert len(cache) == 0 and cache.get("gene", "1") is None
+
+
+class TestSummaryBatcher:
+    """Concurrent esummary calls for the same database share one request."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_request(self) -> None:
+        asks = [["672", "675"], ["7157"], ["675", "1956"], ["7157", "672"], ["404"]]
+        with respx.mock(using="httpx") as router:
+            router.get(f"{EUTILS}/esummary.fcgi").mock(side_effect=_summaries)
+            results = await asyncio.gather(
+                *(ncbi_tools.esummary(database="gene", ids=ids) for ids in asks),
+                ncbi_tools.esummary(database="pubmed", ids="12345"),
+            )
+            sent = sorted(c.request.url.params["db"] + ":" + c.request.url.params["id"]
+                          for c in router.calls)
+        assert sent == ["gene:672,675,7157,1956,404", "pubmed:12345"]
+        for ids, result in zip(asks, results):
+            uids = json.loads(result[0].text)["result"]["uids"]
+            assert uids == ids
+        assert json.loads(results[1][0].text)["result"]["7157"]["name"] == "gene7157"
+
+    @pytest.mark.asyncio
+    @pytest.mark.own_bucket
+    async def test_callers_join_while_the_batch_waits_for_its_token(self, monkeypatch) -> None:
+        bucket = ncbi_tools._TokenBucket(5.0)
+        monkeypatch.setattr(ncbi_tools, "_bucket", bucket)
+        await bucket.acquire()  # the next token is ~0.2 s away
+
+        async def late(ids: str, delay: float):
+            await asyncio.sleep(delay)
+            return await ncbi_tools.esummary(database="gene", ids=ids)
+
+        with respx.mock(using="httpx") as router:
+            router.get(f"{EUTILS}/esummary.fcgi").mock(side_effect=_summaries)
+            await asyncio.gather(late("1", 0), late("2", 0.05), late("3", 0.1))
+            assert [c.request.url.params["id"] for c in router.calls] == ["1,2,3"]
+
+    @pytest.mark.asyncio
+    async def test_accessions_are_not_coalesced(self) -> None:
+        with respx.mock(using="httpx") as router:
+            router.get(f"{EUTILS}/esummary.fcgi").mock(side_effect=_summaries)
+            await asyncio.gather(
+                ncbi_tools.esummary(database="nuccore", ids="NM_000546.6"),
+                ncbi_tools.esummary(database="nuccore", ids="NM_007294.4"),
+            )
+            assert len(router.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_a_failed_batch_fails_every_caller(self) -> None:
+        with respx.mock(using="httpx") as router:
+            router.get(f"{EUTILS}/esummary.fcgi").mock(
+                return_value=httpx.Response(503, text="Service Unavailable")
+            )
+            results = await asyncio.gather(
+                ncbi_tools.esummary(database="gene", ids="1"),
+                ncbi_tools.esummary(database="gene", ids="2"),
+            )
+            assert len(router.calls) == 1
+        assert all(r[0].text.startswith("Error fetching summaries:") for r in results)
+        assert not ncbi_tools._summary_batcher._pending
@@ -0,0 +1,103 @@
+"""Tests for the MIE-generated routing index (togo_mcp.schema_index)."""
+import asyncio
+
+import pytest
+
+from togo_mcp.schema_index import build_schema_index
+
+_MIE = """\
+mie_spec: 3
+graphs:
+  primary: http://example.org/graph/{db}
+  supporting: [bare_name, http://example.org/graph/{db}-extra]
+examples:
+  - id: one
+    sparql: |
+      PREFIX {p}: <{ns}>
+      PREFIX obo: <http://purl.obolibrary.org/obo/>
+      SELECT ?s WHERE {{ ?s a {p}:Thing ; {p}:name "ex:notATerm" ; obo:RO_0002211 obo:GO_0000001 . }}
+"""
+
+
+def _write(tmp_path, db, prefix, ns):
+    (tmp_path / f"{db}.yaml").write_text(
+        _MIE.format(db=db, p=prefix, ns=ns), encoding="utf-8"
+    )
+
+
+@pytest.fixture()
+def index(tmp_path):
+    _write(tmp_path, "alpha", "al", "http://alpha.example/")
+    _write(tmp_path, "beta", "sch", "https://schema.org/")
+    _write(tmp_path, "go", "sch", "https://other.example/schema/")
+    return build_schema_index(tmp_path)
+
+
+def test_terms_are_expanded_through_each_querys_prefixes(index):
+    assert index.terms["http://alpha.example/Thing"] == {"alpha"}
+    assert index.terms["http://alpha.example/name"] == {"alpha"}
+    # string contents are never terms
+    assert not any(iri.endswith("notATerm") for iri in index.terms)
+
+
+def test_graphs_keep_only_absolute_iris(index):
+    assert index.graphs["alpha"] == (
+        "http://example.org/graph/alpha",
+        "http://example.org/graph/alpha-extra",
+    )
+
+
+def test_colliding_prefix_expands_once_per_namespace(index):
+    iris = {m["iri"]: m["databases"] for m in index.lookup("sch:name")}
+    assert iris == {
+        "https://schema.org/name": ["beta"],
+        "https://other.example/schema/name": ["go"],
+    }
+
+
+def test_unknown_local_falls_back_to_namespace(index):
+    [m] = index.lookup("al:neverUsed")
+    assert m["match"] == "namespace" and m["databases"] == ["alpha"]
+    [m] = index.lookup("<http://alpha.example/Thing>")
+    assert m["match"] == "term"
+    assert index.lookup("nope:thing") == []
+
+
+def test_obo_id_space_owner_is_the_database_of_that_name(index):
+    assert index.id_spaces == {"http://purl.obolibrary.org/obo/GO_": "go"}
+    [m] = index.lookup("obo:GO_0099999")
+    assert m["owner"] == "go"
+    assert index.owners("obo:GO_0099999") == {"go"}
+    # used by all three, owned by none
+    assert index.owners("obo:RO_0002211") == frozenset()
+    assert index.owners("al:Thing") == frozenset()
+
+
+def test_owner_memo_is_bounded(index, monkeypatch):
+    from togo_mcp import schema_index
+
+    monkeypatch.setattr(schema_index, "_OWNER_CACHE_MAX", 3)
+    for i in range(10):
+        assert index.owners(f"obo:GO_{i:07d}") == {"go"}
+    assert list(index._owner_cache) == [f"obo:GO_{i:07d}" for i in (7, 8, 9)]
+
+
+def test_bundled_corpus_covers_obo_databases():
+    from pathlib import Path
+
+    from togo_mcp import schema_index
+
+    ix = build_schema_index(Path(schema_index.__file__).parent / "data" / "mie")
+    assert set(ix.id_spaces.values()) >= {"go", "chebi", "mondo"}
+    [m] = ix.lookup("cco:hasMolecule")
+    assert m["databases"] == ["chembl"]
+
+
+def test_tool_attaches_endpoint_and_graphs():
+    from togo_mcp.rdf_portal import find_databases_for_term
+
+    out = asyncio.run(find_databases_for_term("up:enzyme"))
+    [m] = out["matches"]
+    by_db = {d["database"]: d for d in m["databases"]}
+    assert by_db["uniprot"]["endpoint_name"] == "sib"
+    assert by_db["uniprot"]["graphs"]
@@ -171,6 +171,110 @@ class TestResolveEndpointUrl:
             resolve_endpoint_url(database="", endpoint_name="", endpoint_url="")
 
 
+# ---------------------------------------------------------------------------
+# Registry snapshot
+# ---------------------------------------------------------------------------
+
+
+class TestRegistrySnapshot:
+    """Tests for the precomputed, versioned endpoint registry."""
+
+    def _rows(self) -> list[list[str]]:
+        return [
+            ["UniProt", "https://sib.example.com/sparql", "sib", ""],
+            ["Rhea", "https://sib.example.com/sparql", "sib", ""],
+            ["ChEMBL", "https://ebi.example.com/sparql", "ebi", "kw"],
+        ]
+
+    def test_lookups_match_csv(self, tmp_path: Path) -> None:
+        """Derived lookups mirror the CSV, and the snapshot is read-only."""
+        from togo_mcp.server import build_registry_snapshot
+
+        snap = build_registry_snapshot(_write_csv(tmp_path, self._rows()))
+        assert snap.database_names == ("uniprot", "rhea", "chembl")
+        assert snap.endpoint_names == ("sib", "ebi")
+        assert snap.endpoint_databases["sib"] == ("uniprot", "rhea")
+        assert snap.endpoint_urls["ebi"] == "https://ebi.example.com/sparql"
+        with pytest.raises(TypeError):
+            snap.databases["uniprot"]["url"] = "x"  # type: ignore[index]
+
+    def test_prebuilt_result_is_the_tool_payload(self, tmp_path: Path) -> None:
+        """The cached result carries the same JSON as text and structured content."""
+        from togo_mcp.server import build_registry_snapshot
+
+        snap = build_registry_snapshot(_write_csv(tmp_path, self._rows()))
+        result = snap.endpoints_result
+        payload = json.loads(result.content[0].text)
+        assert payload == result.structured_content
+        assert payload["endpoints"]["sib"] == {
+            "url": "https://sib.example.com/sparql",
+            "databases": ["uniprot", "rhea"],
+        }
+        assert payload["databases"]["chembl"]["keyword_search"] == "kw"
+        assert result.meta == {"registry_version": snap.version}
+
+    def test_version_tracks_file_bytes(self, tmp_path: Path) -> None:
+        """Identical CSV bytes give the same version; any edit changes it."""
+        from togo_mcp.server import build_registry_snapshot
+
+        path = _write_csv(tmp_path, self._rows())
+        v1 = build_registry_snapshot(path).version
+        assert build_registry_snapshot(path).version == v1
+        path = _write_csv(tmp_path, self._rows()[:2])
+        assert build_registry_snapshot(path).version != v1
+
+    def test_reload_swaps_only_on_change(self, tmp_path: Path) -> None:
+        """reload_registry keeps an unchanged snapshot and swaps a changed one."""
+        import togo_mcp.server as srv
+
+        original = srv.registry()
+        try:
+            path = _write_csv(tmp_path, self._rows())
+            first = srv.reload_registry(path)
+            assert srv.reload_registry(path) is first
+            assert resolve_endpoint_url("rhea", "", "") == "https://sib.example.com/sparql"
+            path = _write_csv(tmp_path, self._rows()[2:])
+            second = srv.reload_registry(path)
+            assert second is not first
+            with pytest.raises(ValueError, match="Unknown database"):
+                resolve_endpoint_url("rhea", "", "")
+        finally:
+            srv._registry = original
+
+    def test_changed_csv_is_picked_up_without_a_restart(
+        self, tmp_path: Path, monkeypatch
+    ) -> None:
+        """registry() reloads a changed endpoints.csv, at most once per check interval."""
+        import os
+
+        import togo_mcp.server as srv
+
+        path = _write_csv(tmp_path, self._rows())
+        monkeypatch.setattr(srv, "ENDPOINTS_CSV", path)
+        monkeypatch.setattr(srv, "_registry", srv._registry)
+        monkeypatch.setattr(srv, "_registry_signature", None)
+        monkeypatch.setattr(srv, "_registry_checked", float("-inf"))
+        assert srv.registry().database_names == ("uniprot", "rhea", "chembl")
+
+        _write_csv(tmp_path, self._rows()[2:])
+        os.utime(path, ns=(0, 10**18))  # a distinct mtime even on a coarse clock
+        assert "rhea" in srv.registry().database_names  # within the interval
+        monkeypatch.setattr(srv, "_registry_checked", float("-inf"))
+        assert srv.registry().database_names == ("chembl",)
+
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write("not,a,registry\n")
+        monkeypatch.setattr(srv, "_registry_checked", float("-inf"))
+        assert srv.registry().database_names == ("chembl",)  # kept, not crashed
+
+    def test_get_sparql_endpoints_serves_snapshot(self) -> None:
+        """The tool returns the current snapshot's prebuilt result unchanged."""
+        from togo_mcp.rdf_portal import get_sparql_endpoints
+        from togo_mcp.server import registry
+
+        assert asyncio.run(get_sparql_endpoints()) is registry().endpoints_result
+
+
 # ---------------------------------------------------------------------------
 # _ToolCallLogger middleware
 # ---------------------------------------------------------------------------
@@ -228,8 +332,7 @@ class TestToolCallLogger:
         out = asyncio.run(mw.on_call_tool(_build_ctx("run_sparql", {"database": "uniprot"}), call_next))
         assert out == "ok"
 
-        for h in mw._log.handlers:  # type: ignore[union-attr]
-            h.flush()
+        mw.flush()
         records = _read_jsonl(log_path)
         assert len(records) == 1
         rec = records[0]
@@ -250,8 +353,7 @@ class TestToolCallLogger:
         with pytest.raises(ValueError):
             asyncio.run(mw.on_call_tool(_build_ctx("run_sparql"), call_next))
 
-        for h in mw._log.handlers:  # type: ignore[union-attr]
-            h.flush()
+        mw.flush()
         rec = _read_jsonl(log_path)[0]
         assert rec["status"] == "error"
         assert rec["error_class"] == "ValueError"
@@ -268,13 +370,79 @@ class TestToolCallLogger:
 
         asyncio.run(mw.on_call_tool(_build_ctx("run_sparql"), call_next))
 
-        for h in mw._log.handlers:  # type: ignore[union-attr]
-            h.flush()
+        mw.flush()
         rec = _read_jsonl(log_path)[0]
         assert rec["extra"]["endpoint_url"] == "https://x/sparql"
         assert rec["extra"]["sparql_status"] == "ok"
         assert rec["extra"]["n_rows"] == 3
 
+    def test_feeds_the_live_window(self, monkeypatch, tmp_path: Path) -> None:
+        mw, srv, _log_path = _make_logger(monkeypatch, tmp_path, enabled=True)
+        url = srv.SPARQL_ENDPOINT["uniprot"]["url"]
+
+        async def sparql(_ctx):
+            srv._sparql_extra_var.set({"endpoint_url": url, "sparql_status": "ok"})
+            return "csv body"
+
+        async def missing(_ctx):
+            from fastmcp.exceptions import NotFoundError
+
+            raise NotFoundError("Unknown tool")
+
+        asyncio.run(mw.on_call_tool(_build_ctx("run_sparql"), sparql))
+        with pytest.raises(Exception):
+            asyncio.run(mw.on_call_tool(_build_ctx("made_up"), missing))
+        mw.flush()
+        snap = mw.live.snapshot(5)
+        assert snap["totals"]["calls"] == 2 and snap["totals"]["errors"] == 1
+        assert set(snap["tools"]) == {"run_sparql", "unknown"}
+        assert snap["endpoints"][srv.registry().url_endpoints[url]]["calls"] == 1
+
+    def test_live_window_fills_with_logging_disabled(self, monkeypatch, tmp_path: Path) -> None:
+        mw, srv, log_path = _make_logger(monkeypatch, tmp_path, enabled=False)
+        url = srv.SPARQL_ENDPOINT["uniprot"]["url"]
+
+        async def sparql(_ctx):
+            srv._sparql_extra_var.set({"endpoint_url": url, "sparql_status": "ok"})
+            return "csv body"
+
+        async def boom(_ctx):
+            raise ValueError("bad")
+
+        asyncio.run(mw.on_call_tool(_build_ctx("run_sparql"), sparql))
+        with pytest.raises(ValueError):
+            asyncio.run(mw.on_call_tool(_build_ctx("run_sparql"), boom))
+        snap = mw.live.snapshot(5)
+        assert snap["totals"]["calls"] == 2 and snap["totals"]["errors"] == 1
+        assert snap["endpoints"][srv.registry().url_endpoints[url]]["calls"] == 1
+        assert mw.counters() is None and not Path(log_path).exists()
+
+    def test_sampled_calls_skip_the_log_but_not_the_live_window(
+        self, monkeypatch, tmp_path: Path
+    ) -> None:
+        monkeypatch.setenv("TOGOMCP_LOG_SAMPLE", "tool:list_databases=0.25")
+        mw, _srv, log_path = _make_logger(monkeypatch, tmp_path, enabled=True)
+        rolls = iter([0.1, 0.9, 0.9, 0.9])
+        mw._sampler._rng = lambda: next(rolls)
+
+        async def ok(_ctx):
+            return "ok"
+
+        async def boom(_ctx):
+            raise ValueError("bad")
+
+        for _ in range(4):
+            asyncio.run(mw.on_call_tool(_build_ctx("list_databases"), ok))
+        with pytest.raises(ValueError):
+            asyncio.run(mw.on_call_tool(_build_ctx("list_databases"), boom))
+        mw.flush()
+        records = _read_jsonl(log_path)
+        assert [(r["status"], r.get("sample_weight")) for r in records] == [
+            ("ok", 4), ("error", None),
+        ]
+        assert mw.live.snapshot(5)["totals"]["calls"] == 5
+        assert mw.counters()["sampled_out"] == 3
+
 
 # ---------------------------------------------------------------------------
 # _IgnoreUnknownSearchKwargs middleware — mounted sub-server regression
@@ -916,6 +1084,36 @@ class TestRawLogDownload:
         # reports versus the dashboard that aggregates them.
         assert [x["n"] for x in rows] == [1, 2, 3]
 
+    def test_gzipped_segments_are_served_decompressed(self, tmp_path, monkeypatch) -> None:
+        import json as _json
+
+        from togo_mcp.log_index import RecordKeys, compress_segment, index_path
+
+        with self._client(tmp_path, monkeypatch) as c:
+            plain = sum(p.stat().st_size for p in tmp_path.glob("log.jsonl*"))
+            gz = compress_segment(str(tmp_path / "log.jsonl.1"), RecordKeys())
+            r = c.get("/stats/log", auth=("u", "p"))
+            assert [_json.loads(x)["n"] for x in r.text.splitlines()] == [1, 2, 3]
+            # counted as served (decompressed), not as stored on disk
+            assert int(r.headers["x-log-bytes"]) == len(r.content) == plain
+            Path(index_path(gz)).unlink()
+            r = c.get("/stats/log", auth=("u", "p"))
+            assert "x-log-bytes" not in r.headers and len(r.content) == plain
+            r = c.get("/stats/log?until=2026-07-28", auth=("u", "p"))
+            assert [_json.loads(x)["n"] for x in r.text.splitlines()] == [1]
+
+    def test_filters_by_day_and_tool(self, tmp_path, monkeypatch) -> None:
+        import json as _json
+
+        with self._client(tmp_path, monkeypatch) as c:
+            r = c.get("/stats/log?since=2026-07-29&until=2026-07-30", auth=("u", "p"))
+            assert r.status_code == 200
+            assert "filtered" in r.headers["content-disposition"]
+            assert [_json.loads(x)["n"] for x in r.text.splitlines()] == [2, 3]
+            r = c.get("/stats/log?tool=run_sparql", auth=("u", "p"))
+            assert r.status_code == 200 and r.text == ""
+            assert c.get("/stats/log?since=yesterday", auth=("u", "p")).status_code == 400
+
     def test_404_when_no_log_exists(self, tmp_path, monkeypatch) -> None:
         from starlette.testclient import TestClient
 
@@ -936,3 +1134,82 @@ class TestRawLogDownload:
             href = re.search(r"<a href='([^']+)' download", html).group(1)
             assert href == "/stats/log"
             assert c.get(href, auth=("u", "p")).status_code == 200
+
+    def test_dashboard_is_rendered_once_per_version_and_revalidates(
+        self, tmp_path, monkeypatch
+    ) -> None:
+        import json as _json
+
+        from togo_mcp import server as srv
+        from togo_mcp import stats as _stats
+
+        renders = []
+        real_render = _stats.render_html
+
+        def counting_render(data):
+            renders.append(1)
+            return real_render(data)
+
+        monkeypatch.setattr(_stats, "render_html", counting_render)
+        srv._stats_cache["ts"] = 0.0  # not another test's still-fresh stats
+        with self._client(tmp_path, monkeypatch) as c:
+            r = c.get("/stats", auth=("u", "p"), headers={"Accept-Encoding": "gzip"})
+            assert r.status_code == 200 and "<html" in r.text
+            assert r.headers["content-encoding"] == "gzip"
+            etag, modified = r.headers["etag"], r.headers["last-modified"]
+
+            srv._stats_cache["ts"] = 0.0  # TTL expired, but no new records
+            r = c.get("/stats", auth=("u", "p"), headers={"If-None-Match": etag})
+            assert r.status_code == 304 and r.content == b""
+            assert r.headers["etag"] == etag
+            r = c.get("/stats", auth=("u", "p"), headers={"If-Modified-Since": modified})
+            assert r.status_code == 304
+            assert len(renders) == 1
+            assert c.get("/stats", headers={"If-None-Match": etag}).status_code == 401
+
+            with open(tmp_path / "log.jsonl", "a") as fh:
+                fh.write(_json.dumps({"ts": "2026-07-31T00:00:00+00:00", "tool": "x"}) + "\n")
+            srv._stats_cache["ts"] = 0.0
+            r = c.get("/stats", auth=("u", "p"), headers={"If-None-Match": etag})
+            assert r.status_code == 200 and r.headers["etag"] != etag
+            assert len(renders) == 2
+
+            r = c.get("/stats.json", auth=("u", "p"))
+            assert r.status_code == 200 and r.json()["n_records"] == 4
+            assert "log_writer" not in r.json()
+            written = iter(range(100, 200))
+            monkeypatch.setattr(
+                srv._tool_call_logger, "counters",
+                lambda: {"written": next(written), "queued": 1, "dropped": 0},
+            )
+            r2 = c.get("/stats.json", auth=("u", "p"), headers={"If-None-Match": r.headers["etag"]})
+            assert r2.status_code == 304  # live writer counters do not move the ETag
+            live = c.get("/stats/log_writer.json", auth=("u", "p"))
+            assert live.json()["log_writer"]["written"] == 100
+            assert live.headers["cache-control"] == "no-store"
+            assert c.get("/stats/log_writer.json", auth=("u", "p")).json()["log_writer"]["written"] == 101
+            assert c.get("/stats/log_writer.json").status_code == 401
+
+
+class TestLiveStats:
+    """/stats/live serves the in-memory window behind the /stats Basic auth."""
+
+    def test_auth_validation_and_both_views(self, monkeypatch) -> None:
+        from starlette.testclient import TestClient
+
+        from togo_mcp import server as srv
+        from togo_mcp.main import mcp
+
+        monkeypatch.setenv("TOGOMCP_STATS_USER", "u")
+        monkeypatch.setenv("TOGOMCP_STATS_PASSWORD", "p")
+        srv._tool_call_logger.live.add("run_sparql", error=True, elapsed_ms=12.0)
+        with TestClient(mcp.http_app()) as c:
+            assert c.get("/stats/live").status_code == 401
+            assert c.get("/stats/live.json").status_code == 401
+            assert c.get("/stats/live.json?minutes=0", auth=("u", "p")).status_code == 400
+            assert c.get("/stats/live?minutes=x", auth=("u", "p")).status_code == 400
+            data = c.get("/stats/live.json?minutes=15", auth=("u", "p")).json()
+            html = c.get("/stats/live", auth=("u", "p")).text
+        assert data["window_minutes"] == 15
+        assert data["tools"]["run_sparql"]["errors"] >= 1
+        assert "run_sparql" in html and "last 60 min" in html
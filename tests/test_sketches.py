@@ -0,0 +1,95 @@
+"""Tests for the mergeable quantile / distinct-count summaries (togo_mcp.sketches)."""
+import pickle
+import random
+
+from togo_mcp.sketches import (
+    EXACT_LIMIT,
+    DistinctCounter,
+    QuantileSketch,
+    exact_percentile,
+)
+
+
+def _sketch(values):
+    sk = QuantileSketch()
+    for v in values:
+        sk.add(v)
+    return sk
+
+
+def test_quantiles_are_exact_below_the_limit():
+    values = [random.Random(1).uniform(0, 5000) for _ in range(EXACT_LIMIT)]
+    sk = _sketch(values)
+    assert sk.exact
+    for pct in (0, 50, 95, 100):
+        assert sk.percentile(pct) == exact_percentile(sorted(values), pct)
+    assert sk.mean() == round(sum(values) / len(values), 2)
+    assert QuantileSketch().percentile(50) == 0.0 and QuantileSketch().mean() == 0.0
+
+
+def test_quantiles_stay_within_relative_error_beyond_the_limit():
+    rng = random.Random(2)
+    values = [rng.lognormvariate(6, 1.5) for _ in range(50_000)] + [0.0] * 500
+    sk = _sketch(values)
+    assert not sk.exact and sk.count == len(values)
+    ordered = sorted(values)
+    for pct in (1, 50, 90, 95, 99):
+        true = ordered[int(pct / 100 * (len(ordered) - 1))]
+        assert abs(sk.percentile(pct) - true) <= 0.011 * true + 0.01
+    assert sk.percentile(0) == 0.0
+
+
+def test_quantile_merge_equals_one_pass_across_the_boundary():
+    rng = random.Random(3)
+    values = [rng.uniform(1, 1000) for _ in range(3 * EXACT_LIMIT)]
+    whole = _sketch(values)
+    small, big = _sketch(values[:100]), _sketch(values[100:])
+    for a, b in ((small, big), (big, small)):
+        merged = pickle.loads(pickle.dumps(a))
+        merged.merge(b)
+        assert merged.count == whole.count
+        assert merged._buckets == whole._buckets and merged._zeros == whole._zeros
+        assert merged.percentile(95) == whole.percentile(95)
+    halves = _sketch(values[:EXACT_LIMIT // 2])
+    halves.merge(_sketch(values[EXACT_LIMIT // 2:EXACT_LIMIT]))
+    assert halves.exact and halves.percentile(50) == _sketch(values[:EXACT_LIMIT]).percentile(50)
+
+
+def test_weighted_add_equals_repeated_adds():
+    rng = random.Random(5)
+    values = [rng.uniform(1, 1000) for _ in range(EXACT_LIMIT)]
+    for n in (3, 7):  # 3/4 of EXACT_LIMIT stays exact; 7/4 crosses into buckets
+        weighted, repeated = QuantileSketch(), QuantileSketch()
+        for v in values[: EXACT_LIMIT // 4]:
+            weighted.add(v, n)
+            for _ in range(n):
+                repeated.add(v)
+        assert weighted.count == repeated.count and weighted.exact == repeated.exact
+        assert weighted.percentile(95) == repeated.percentile(95)
+        assert weighted.mean() == repeated.mean()
+
+
+def test_huge_weight_goes_straight_to_buckets():
+    sk = _sketch([1.0, 2.0])
+    sk.add(5.0, 10**9)  # a flood's sample weight: never n list entries
+    assert not sk.exact and sk.count == 10**9 + 2
+    assert sk.percentile(50) == 5.0 and abs(sk.percentile(0) - 1.0) <= 0.011
+
+
+def test_distinct_count_is_exact_then_close():
+    small = DistinctCounter(f"ip{i % 300}" for i in range(5000))
+    assert small.exact and len(small) == 300
+    big = DistinctCounter(f"ip{i}" for i in range(100_000))
+    assert not big.exact
+    assert abs(len(big) - 100_000) < 5_000
+
+
+def test_distinct_merge_equals_one_pass():
+    items = [f"h{i}" for i in range(10_000)]
+    whole = DistinctCounter(items)
+    a, b = DistinctCounter(items[:50]), DistinctCounter(items[25:])  # overlapping
+    a.merge(pickle.loads(pickle.dumps(b)))
+    assert a._registers == whole._registers and len(a) == len(whole)
+    c, d = DistinctCounter(items[:10]), DistinctCounter(items[5:20])
+    c.merge(d)
+    assert c.exact and len(c) == 20
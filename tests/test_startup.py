@@ -0,0 +1,67 @@
+"""Cold-start budget: a fresh interpreter must reach its first tool list quickly.
+
+Every stdio launch pays this cost before the client sees a tool, so a change
+that quietly adds an eager client, a corpus parse or a heavy import at module
+level shows up here rather than as "TogoMCP feels slow to start".
+
+Measured with `scripts/profile_startup.py` (run it for the full report). The
+default budget is several times the ~1.4 s measured on a development machine, so
+only a real regression — not a slow CI runner — trips it; override with
+TOGOMCP_STARTUP_BUDGET_S.
+"""
+import asyncio
+import importlib.util
+import os
+from pathlib import Path
+
+import pytest
+
+from togo_mcp.server import LazyAsyncClient
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+PROFILER = REPO_ROOT / "scripts" / "profile_startup.py"
+BUDGET_S = float(os.environ.get("TOGOMCP_STARTUP_BUDGET_S", "6.0"))
+
+
+def _load_profiler():
+    spec = importlib.util.spec_from_file_location("profile_startup", PROFILER)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+@pytest.fixture(scope="module")
+def cold_start():
+    return _load_profiler().measure(local=True)
+
+
+def test_cold_start_to_first_tool_list_is_within_budget(cold_start):
+    assert cold_start["tools"] >= 29
+    assert cold_start["total_s"] < BUDGET_S, (
+        f"cold start took {cold_start['total_s']:.2f} s (budget {BUDGET_S} s); "
+        "run scripts/profile_startup.py to see where it went"
+    )
+
+
+def test_no_http_client_is_built_before_the_first_call(cold_start):
+    assert cold_start["built_clients"] == []
+
+
+def test_sub_servers_are_not_loaded_by_the_import(cold_start):
+    assert cold_start["eager_subservers"] == []
+
+
+def test_importtime_rows_are_parsed(cold_start):
+    mods = {r["module"] for r in cold_start["imports"]}
+    assert {"togo_mcp.server", "togo_mcp.main"} <= mods
+
+
+def test_lazy_client_builds_on_first_attribute_access():
+    lazy = LazyAsyncClient(base_url="https://example.org", timeout=3.0)
+    assert not lazy.built
+    asyncio.run(lazy.aclose())  # closing an unbuilt client must not build it
+    assert not lazy.built
+    assert lazy.timeout.read == 3.0
+    assert lazy.built and str(lazy.unwrap().base_url) == "https://example.org"
+    asyncio.run(lazy.aclose())
+    assert lazy.is_closed
@@ -1,5 +1,6 @@
 """Tests for the usage-log analysis engine (togo_mcp.stats)."""
 import json
+import pickle
 import re
 from pathlib import Path
 
@@ -141,6 +142,18 @@ def test_co_query_ignores_non_sparql_and_shared_vocabularies():
     assert stats.co_queried_databases(grp, "togovar (cross-db)") == set()
 
 
+def test_obo_id_spaces_credit_go_chebi_and_mondo():
+    """obo: is shared by every OBO ontology, so the prefix says nothing — but the
+    ID space in the local name does, and the MIE-generated index resolves it."""
+    rec = _sparql("ok", db="uniprot", rows=4)
+    rec["extra"]["query_shape"] = _shape("obo:GO_0005515", "obo:CHEBI_15377",
+                                         "obo:MONDO_0005148", "up:classifiedWith")
+    assert stats.co_queried_databases(rec, "uniprot") == {"go", "chebi", "mondo"}
+    # an ID space with no database of its own (BFO, RO) still credits nobody
+    rec["extra"]["query_shape"] = _shape("obo:RO_0002211", "obo:BFO_0000050")
+    assert stats.co_queried_databases(rec, "uniprot") == set()
+
+
 def test_co_query_is_counted_separately_from_calls():
     rec = _sparql("ok", db="uniprot", rows=5)
     rec["extra"]["query_shape"] = _shape("up:enzyme", "rhea:accession")
@@ -638,3 +651,225 @@ def test_load_mie_dates_skips_unrecognized_spec(tmp_path):
     out = stats.load_mie_dates(str(tmp_path))
     assert "old" not in out
     assert out["new"] == "2026-07-22"
+
+
+def _append(path, recs):
+    with open(path, "a", encoding="utf-8") as fh:
+        for r in recs:
+            fh.write(json.dumps(r) + "\n")
+
+
+def _same(a, b):
+    a, b = dict(a), dict(b)
+    a.pop("generated_at"), b.pop("generated_at")
+    assert a == b
+
+
+def _mixed(n, day="01"):
+    out = []
+    for i in range(n):
+        r = _sparql(["ok", "empty_result", "timeout"][i % 3], db=["uniprot", "pdb"][i % 2])
+        r["ts"] = f"2026-06-{day}T10:00:{i % 60:02d}+00:00"
+        r["ip_hash"] = f"ip{i % 4}"
+        r["extra"]["query_sha256"] = f"q{i % 6}"  # one query, one database and class
+        out.append(r)
+    return out
+
+
+def test_incremental_stats_reads_only_appended_bytes(tmp_path, monkeypatch):
+    monkeypatch.delenv("TOGOMCP_STATS_EXCLUDE_CLIENTS", raising=False)
+    base = tmp_path / "log.jsonl"
+    _append(base, _mixed(30))
+    inc = stats.IncrementalStats(str(base))
+    first = inc.refresh()
+    assert first["n_records"] == 30
+    [(_, acc, _)] = inc._files.values()
+
+    _append(base, _mixed(12, day="02"))
+    with open(base, "a", encoding="utf-8") as fh:
+        fh.write('{"ts": "2026-06-03T00:00:00+00:00", "tool": "half-wri')  # mid-write
+    out = inc.refresh()
+    assert [a for _, a, _ in inc._files.values()] == [acc]  # folded in, not rebuilt
+    assert out["n_records"] == 42
+    _same(out, stats.aggregate(stats.iter_records([str(base)])) | {"log_files": out["log_files"]})
+
+    with open(base, "a", encoding="utf-8") as fh:
+        fh.write('tten"}\n')  # the record completes
+    assert inc.refresh()["n_records"] == 43
+
+
+def test_incremental_stats_reuses_its_result_until_the_log_grows(tmp_path, monkeypatch):
+    monkeypatch.delenv("TOGOMCP_STATS_EXCLUDE_CLIENTS", raising=False)
+    base = tmp_path / "log.jsonl"
+    _append(base, _mixed(5))
+    inc = stats.IncrementalStats(str(base))
+    first = inc.refresh()
+    version = inc.version
+    assert inc.refresh() is first and inc.version == version
+    _append(base, _mixed(1, day="02"))
+    assert inc.refresh()["n_records"] == 6 and inc.version != version
+
+
+def test_incremental_stats_follows_rotation_and_drops_deleted_files(tmp_path, monkeypatch):
+    monkeypatch.delenv("TOGOMCP_STATS_EXCLUDE_CLIENTS", raising=False)
+    base = tmp_path / "log.jsonl"
+    _append(base, _mixed(20))
+    inc = stats.IncrementalStats(str(base))
+    inc.refresh()
+    [(_, old, _)] = inc._files.values()
+
+    # rotation renames base -> base.1: same inode, so its partial carries over
+    base.rename(tmp_path / "log.jsonl.1")
+    _append(base, _mixed(7, day="02"))
+    out = inc.refresh()
+    assert old in [a for _, a, _ in inc._files.values()]
+    _same(out, stats.compute_stats(str(base)))
+    assert out["n_records"] == 27
+    [new] = [a for _, a, _ in inc._files.values() if a is not old]
+
+    # the oldest backup is deleted: its records leave the aggregate, and the
+    # surviving file's partial is kept rather than re-read
+    (tmp_path / "log.jsonl.1").unlink()
+    out = inc.refresh()
+    assert [a for _, a, _ in inc._files.values()] == [new]
+    assert out["n_records"] == 7
+    _same(out, stats.compute_stats(str(base)))
+
+    # truncation in place: that file is re-read from the start
+    base.write_text("")
+    _append(base, _mixed(3, day="03"))
+    assert inc.refresh()["n_records"] == 3
+
+
+def _reuse_inode(inc, path):
+    """Hand the only tracked partial to ``path``, as ext4 does by reusing the inode."""
+    [(_, partial)] = inc._files.items()
+    st = path.stat()
+    inc._files = {(st.st_dev, st.st_ino): partial}
+
+
+def test_incremental_stats_rereads_a_file_on_a_reused_inode(tmp_path, monkeypatch):
+    monkeypatch.delenv("TOGOMCP_STATS_EXCLUDE_CLIENTS", raising=False)
+    base = tmp_path / "log.jsonl"
+    _append(base, _mixed(20))
+    inc = stats.IncrementalStats(str(base))
+    inc.refresh()
+    base.unlink()
+    _append(base, _mixed(30, day="02"))
+    _reuse_inode(inc, base)
+    out = inc.refresh()
+    assert out["n_records"] == 30
+    _same(out, stats.compute_stats(str(base)))
+
+
+def test_incremental_stats_reparses_mie_dates_only_when_a_file_changes(tmp_path, monkeypatch):
+    calls = []
+    real = stats.load_mie_dates
+    monkeypatch.setattr(stats, "load_mie_dates", lambda d: calls.append(d) or real(d))
+    (tmp_path / "demo.yaml").write_text("mie_spec: 3\nexamples: []\n", encoding="utf-8")
+    inc = stats.IncrementalStats(str(tmp_path / "log.jsonl"), mie_dir=str(tmp_path))
+    inc.refresh()
+    inc.refresh()
+    assert len(calls) == 1
+    (tmp_path / "demo.yaml").write_text("mie_spec: 3\nexamples: [] \n", encoding="utf-8")
+    inc.refresh()
+    assert len(calls) == 2
+
+
+def test_merged_partials_equal_one_pass():
+    recs = _mixed(60) + _mixed(30, day="02") + [_call("b", "ip1"), _call("a", "ip2")]
+    recs[5]["extra"].pop("query_sha256")  # an unhashed trap on each side
+    recs[70]["extra"].pop("query_sha256")
+    parts = [stats.StatsAccumulator() for _ in range(3)]
+    for i, rec in enumerate(recs):
+        parts[i * 3 // len(recs)].add(rec)
+    merged = stats.StatsAccumulator()
+    for part in parts:
+        merged.merge(pickle.loads(pickle.dumps(part)))  # crosses a process boundary
+    _same(merged.result(), stats.aggregate(recs))
+    assert parts[0].result()["n_records"] < len(recs)  # merge left its input alone
+
+
+def test_aggregate_is_independent_of_record_order():
+    recs = _mixed(40) + [_call("b", "ip1"), _call("a", "ip2")]
+    _same(stats.aggregate(recs), stats.aggregate(list(reversed(recs))))
+
+
+def test_split_ranges_cut_on_line_starts_and_partials_merge(tmp_path):
+    base = tmp_path / "log.jsonl"
+    _append(base, _mixed(50))
+    with open(base, "a", encoding="utf-8") as fh:
+        fh.write('{"ts": "2026-06-03T00:00:00+00:00", "tool": "half')  # mid-write
+    data = base.read_bytes()
+    ranges = stats.split_ranges(str(base), 0, len(data), 700)
+    assert len(ranges) > 3 and ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    assert all(a == 0 or data[a - 1:a] == b"\n" for a, _ in ranges)
+    assert all(b == c for (_, b), (c, _) in zip(ranges, ranges[1:]))
+
+    stats._init_worker({}, {}, frozenset())
+    merged = stats.StatsAccumulator()
+    for a, b in ranges:
+        consumed, part = stats._ingest_range((str(base), a, b, None))
+        merged.merge(part)
+    assert consumed == data.rindex(b"\n") + 1  # the partial line is left for later
+    _same(merged.result(), stats.aggregate(_mixed(50)))
+    st = base.stat()
+    assert stats._ingest_range((str(base), 0, 10, (st.st_dev, st.st_ino + 1))) is None
+
+
+def test_parallel_ingestion_matches_serial(tmp_path, monkeypatch, capsys):
+    monkeypatch.delenv("TOGOMCP_STATS_EXCLUDE_CLIENTS", raising=False)
+    base = tmp_path / "log.jsonl"
+    _append(tmp_path / "log.jsonl.1", _mixed(40))
+    _append(base, _mixed(25, day="02"))
+    inc = stats.IncrementalStats(str(base), jobs=2, chunk_bytes=1)
+    _same(inc.refresh(), stats.compute_stats(str(base)))
+    inc.chunk_bytes = 1 << 20  # small appends are tailed in-thread
+    _append(base, _mixed(5, day="03"))
+    assert inc.refresh()["n_records"] == 70
+
+    assert stats._main([str(base), "--jobs", "2"]) == 0
+    parallel = json.loads(capsys.readouterr().out)
+    assert stats._main([str(base)]) == 0
+    _same(parallel, json.loads(capsys.readouterr().out))
+
+
+def test_incremental_stats_carries_a_partial_over_to_its_gzipped_segment(tmp_path, monkeypatch):
+    from togo_mcp.log_index import RecordKeys, compress_segment
+
+    monkeypatch.delenv("TOGOMCP_STATS_EXCLUDE_CLIENTS", raising=False)
+    base = tmp_path / "log.jsonl"
+    _append(base, _mixed(30))
+    inc = stats.IncrementalStats(str(base))
+    inc.refresh()
+    [(_, acc, _)] = inc._files.values()
+
+    base.rename(tmp_path / "log.jsonl.1")
+    _append(base, _mixed(4, day="02"))
+    compress_segment(str(tmp_path / "log.jsonl.1"), RecordKeys())
+    assert stats.log_paths(str(base))[1].endswith(".jsonl.1.gz")
+    out = inc.refresh()
+    assert acc in [a for _, a, _ in inc._files.values()]  # not decompressed and re-parsed
+    assert out["n_records"] == 34
+    _same(out, stats.compute_stats(str(base)))
+    _same(stats.aggregate_files(stats.log_paths(str(base))), stats.aggregate(
+        stats.iter_records(stats.log_paths(str(base)))))
+
+
+def test_gzipped_segment_does_not_inherit_a_reused_source_inode(tmp_path, monkeypatch):
+    from togo_mcp.log_index import RecordKeys, compress_segment
+
+    monkeypatch.delenv("TOGOMCP_STATS_EXCLUDE_CLIENTS", raising=False)
+    base = tmp_path / "log.jsonl"
+    _append(base, _mixed(30))
+    inc = stats.IncrementalStats(str(base))
+    inc.refresh()
+    base.unlink()  # gone before the next refresh; a new file gets its inode
+    _append(base, _mixed(12, day="02"))
+    _reuse_inode(inc, base)
+    base.rename(tmp_path / "log.jsonl.1")
+    _append(base, _mixed(4, day="03"))
+    compress_segment(str(tmp_path / "log.jsonl.1"), RecordKeys())
+    out = inc.refresh()
+    assert out["n_records"] == 16
+    _same(out, stats.compute_stats(str(base)))
@@ -0,0 +1,191 @@
+"""Tests for the background tool-call log writer (togo_mcp.toolcall_log)."""
+import asyncio
+import json
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+from togo_mcp.toolcall_log import JsonlLogWriter, parse_fsync_policy
+
+
+class _GatedWriter(JsonlLogWriter):
+    """A writer whose thread blocks in _write until the gate opens: a stalled disk."""
+
+    def __init__(self, *a, **kw):
+        self.gate = threading.Event()
+        super().__init__(*a, **kw)
+
+    def _write(self, records):
+        self.gate.wait(5)
+        super()._write(records)
+
+
+def _lines(path):
+    return [json.loads(x) for x in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_records_are_written_in_order_and_flush_waits(tmp_path):
+    w = JsonlLogWriter(str(tmp_path / "log.jsonl"))
+    for i in range(100):
+        assert w.submit({"i": i})
+    w.flush()
+    assert [r["i"] for r in _lines(tmp_path / "log.jsonl")] == list(range(100))
+    c = w.counters()
+    assert c["written"] == 100 and c["dropped"] == 0 and c["queued"] == 0
+    assert c["batches"] <= 100
+    w.close()
+    assert not w.submit({"late": True})
+
+
+def test_full_queue_drops_and_counts_without_blocking(tmp_path):
+    w = _GatedWriter(str(tmp_path / "log.jsonl"), queue_size=2)
+    w.submit({"i": 0})  # taken by the thread, which then stalls
+    deadline = time.monotonic() + 2
+    while w.counters()["queued"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    t0 = time.perf_counter()
+    accepted = [w.submit({"i": i}) for i in range(1, 6)]
+    assert time.perf_counter() - t0 < 0.5  # never waited on the stalled disk
+    assert accepted == [True, True, False, False, False]
+    w.gate.set()
+    w.close()
+    assert w.counters()["dropped"] == 3
+    assert [r["i"] for r in _lines(tmp_path / "log.jsonl")] == [0, 1, 2]
+
+
+def test_rotation_keeps_the_rotating_file_handler_layout(tmp_path):
+    path = tmp_path / "log.jsonl"
+    w = JsonlLogWriter(str(path), max_bytes=200, backup_count=2, batch_size=1)
+    for i in range(30):
+        w.submit({"i": i, "pad": "x" * 40})
+    w.close()
+    assert path.exists() and (tmp_path / "log.jsonl.1").exists()
+    assert (tmp_path / "log.jsonl.2").exists() and not (tmp_path / "log.jsonl.3").exists()
+    assert all(p.stat().st_size <= 200 for p in tmp_path.iterdir())
+    assert _lines(path)[-1]["i"] == 29
+    assert w.counters()["rotations"] >= 2
+
+
+def test_unserializable_value_is_stringified_and_bad_record_counted(tmp_path):
+    w = JsonlLogWriter(str(tmp_path / "log.jsonl"))
+    w.submit({"obj": object()})  # default=str
+    w.submit({1j: "complex keys cannot serialize"})
+    w.close()
+    assert len(_lines(tmp_path / "log.jsonl")) == 1
+    assert w.counters()["errors"] == 1
+
+
+def test_a_failing_batch_is_counted_and_the_writer_keeps_going(tmp_path, monkeypatch):
+    calls = []
+    real_rotate = JsonlLogWriter._rotate
+
+    def flaky_rotate(self):
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("unexpected")
+        real_rotate(self)
+
+    monkeypatch.setattr(JsonlLogWriter, "_rotate", flaky_rotate)
+    w = JsonlLogWriter(str(tmp_path / "log.jsonl"), max_bytes=60, batch_size=1)
+    for i in range(4):
+        w.submit({"i": i, "pad": "x" * 30})
+    assert w.flush(timeout=5)
+    w.close()
+    c = w.counters()
+    assert c["errors"] == 1 and c["written"] == 3  # the lost batch, then on as normal
+
+
+def test_flush_and_close_give_up_instead_of_hanging(tmp_path):
+    w = _GatedWriter(str(tmp_path / "log.jsonl"), queue_size=1)
+    w.submit({"i": 0})
+    t0 = time.perf_counter()
+    assert w.flush(timeout=0.2) is False
+    assert time.perf_counter() - t0 < 2
+    w.gate.set()
+    assert w.flush(timeout=5) is True
+    w.close()
+    w._queue.put({"orphan": True})  # nobody drains this any more
+    assert w.flush(timeout=5) is False
+
+
+def test_fsync_policy():
+    assert parse_fsync_policy(None) is None
+    assert parse_fsync_policy("off") is None
+    assert parse_fsync_policy("batch") == 0.0
+    assert parse_fsync_policy("2.5") == 2.5
+    assert parse_fsync_policy("sometimes") is None
+
+
+def test_tool_call_does_not_wait_for_log_io(monkeypatch, tmp_path):
+    from togo_mcp import server
+
+    monkeypatch.setenv("TOGOMCP_QUERY_LOG", str(tmp_path / "calls.jsonl"))
+    mw = server._ToolCallLogger()
+    mw._writer.close()
+    mw._writer = _GatedWriter(str(tmp_path / "calls.jsonl"))
+    ctx = SimpleNamespace(
+        message=SimpleNamespace(name="run_sparql", arguments={}), fastmcp_context=None
+    )
+
+    async def call_next(_ctx):
+        return "ok"
+
+    t0 = time.perf_counter()
+    for _ in range(20):
+        assert asyncio.run(mw.on_call_tool(ctx, call_next)) == "ok"
+    assert time.perf_counter() - t0 < 1.0  # the writer is stalled the whole time
+    mw._writer.gate.set()
+    mw.flush()
+    assert len(_lines(tmp_path / "calls.jsonl")) == 20
+    assert mw.counters()["written"] == 20
+    mw._writer.close()
+
+
+def test_rotated_segments_are_gzipped_and_pruned_by_size(tmp_path):
+    from togo_mcp import stats
+    from togo_mcp.log_index import RecordKeys
+
+    path = tmp_path / "log.jsonl"
+    w = JsonlLogWriter(str(path), max_bytes=4000, backup_count=None, batch_size=10,
+                       index_keys=RecordKeys(), compress=True, retain_bytes=6000)
+    for i in range(400):
+        w.submit({"ts": "2026-06-01T00:00:00+00:00", "tool": "t", "i": i,
+                  "pad": os.urandom(20).hex()})  # does not compress away
+    w.close()
+    paths = stats.log_paths(str(path))
+    assert paths[0] == str(path) and all(p.endswith(".gz") for p in paths[1:])
+    assert [p.rsplit(".", 2)[-2] for p in paths[1:]] == [str(i) for i in range(1, len(paths))]
+    assert sum(os.path.getsize(p) for p in paths) <= 6000
+    c = w.counters()
+    assert c["compressed"] == c["rotations"] and c["pruned"] > 0
+    # what is left is the newest records, contiguous and readable through gzip
+    kept = sorted(r["i"] for r in stats.iter_records(paths))
+    assert kept == list(range(400 - len(kept), 400)) and len(kept) >= 50
+
+
+def test_age_retention_drops_old_segments(tmp_path):
+    path = tmp_path / "log.jsonl"
+    for i in (1, 2):
+        seg = tmp_path / f"log.jsonl.{i}"
+        seg.write_text('{"i": -1}\n')
+        os.utime(seg, (time.time() - 10 * 86400,) * 2)
+    w = JsonlLogWriter(str(path), max_bytes=100, backup_count=None, batch_size=1,
+                       retain_days=5)
+    for i in range(3):
+        w.submit({"i": i, "pad": "x" * 60})
+    w.close()
+    assert w.counters()["pruned"] == 2
+    remaining = [json.loads(x)["i"] for p in tmp_path.iterdir() for x in p.read_text().splitlines()]
+    assert -1 not in remaining and sorted(remaining) == [0, 1, 2]
+
+
+def test_retention_policy_from_env():
+    from togo_mcp.toolcall_log import parse_retention
+
+    assert parse_retention({}) == {"backup_count": None, "compress": True,
+                                   "retain_bytes": 550_000_000, "retain_days": None}
+    got = parse_retention({"TOGOMCP_LOG_COMPRESS": "off", "TOGOMCP_LOG_RETAIN_MB": "0",
+                           "TOGOMCP_LOG_RETAIN_DAYS": "30"})
+    assert got["compress"] is False and got["retain_bytes"] is None and got["retain_days"] == 30
+    assert parse_retention({"TOGOMCP_LOG_RETAIN_MB": "lots"})["retain_bytes"] == 550_000_000
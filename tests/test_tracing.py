@@ -0,0 +1,172 @@
+"""Tests for trace spans (togo_mcp.tracing) and their JSONL sink."""
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+import respx
+
+from togo_mcp import tracing
+
+
+@pytest.fixture
+def span_log(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracing.configure(log_path=str(path))
+    yield path
+    tracing.configure()
+
+
+def _traces(path):
+    tracing.flush()
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_disabled_tracing_is_a_shared_noop():
+    tracing.configure()
+    with tracing.span("anything", x=1) as sp:
+        sp.set(y=2)
+    assert sp is tracing.span("other")
+
+
+@pytest.mark.asyncio
+async def test_spans_nest_across_gathered_tasks(span_log):
+    async def child(i):
+        with tracing.span("child", i=i):
+            await asyncio.sleep(0)
+
+    with tracing.span("tool demo", tool="demo") as root:
+        with tracing.span("phase"):
+            pass
+        await asyncio.gather(child(0), child(1))
+        root.set(done=True)
+
+    [trace] = _traces(span_log)
+    assert trace["name"] == "tool demo"
+    assert trace["attrs"] == {"tool": "demo", "done": True}
+    spans = trace["spans"]
+    assert [(s["name"], s["parent"]) for s in spans] == [
+        ("phase", 0), ("child", 0), ("child", 0),
+    ]
+    assert sorted(s["attrs"]["i"] for s in spans[1:]) == [0, 1]
+    assert all(s["duration_ms"] >= 0 and s["offset_ms"] >= 0 for s in spans)
+
+
+def test_errors_are_recorded_and_fast_traces_filtered(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracing.configure(log_path=str(path), min_ms=10_000)
+    try:
+        with tracing.span("tool fast"):
+            pass
+        tracing.configure(log_path=str(path))
+        with pytest.raises(KeyError):
+            with tracing.span("tool failing"):
+                with tracing.span("inner"):
+                    raise KeyError("x")
+        traces = _traces(path)
+    finally:
+        tracing.configure()
+    assert [t["name"] for t in traces] == ["tool failing"]
+    assert traces[0]["error"] == "KeyError"
+    assert traces[0]["spans"][0]["error"] == "KeyError"
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_http_requests_and_rest_retries_are_spanned(span_log, monkeypatch):
+    from togo_mcp import api_tools
+
+    monkeypatch.setattr(api_tools, "_REST_BACKOFF_BASE", 0)
+    respx.get("https://api.example.org/x").mock(
+        side_effect=[httpx.Response(503), httpx.Response(200)]
+    )
+    with tracing.span("tool demo"):
+        async with tracing.TracedAsyncClient(base_url="https://api.example.org") as client:
+            response = await api_tools._rest_get(client, "/x", context="test")
+    assert response.status_code == 200
+
+    [trace] = _traces(span_log)
+    by_id = {s["id"]: s for s in trace["spans"]}
+    rows = [
+        (s["name"], s["attrs"].get("attempt") or s["attrs"].get("status"),
+         by_id[s["parent"]]["name"] if s["parent"] else "root")
+        for s in trace["spans"]
+    ]
+    assert rows == [
+        ("attempt", 1, "root"),
+        ("http api.example.org", 503, "attempt"),
+        ("backoff", None, "root"),
+        ("attempt", 2, "root"),
+        ("http api.example.org", 200, "attempt"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_tool_call_middleware_opens_the_root_span(span_log):
+    from togo_mcp import server as srv
+
+    async def call_next(_ctx):
+        with tracing.span("sparql"):
+            return "result"
+
+    ctx = SimpleNamespace(message=SimpleNamespace(name="list_databases", arguments={}))
+    assert await srv._ToolCallMetrics().on_call_tool(ctx, call_next) == "result"
+    [trace] = _traces(span_log)
+    assert trace["name"] == "tool list_databases"
+    assert [s["name"] for s in trace["spans"]] == ["sparql"]
+
+
+def test_otel_spans_mirror_the_tree():
+    opened = []
+
+    class FakeCM:
+        def __init__(self, name):
+            self.span = SimpleNamespace(name=name, attrs={})
+            self.span.set_attributes = self.span.attrs.update
+
+        def __enter__(self):
+            opened.append(self.span)
+            return self.span
+
+        def __exit__(self, *exc):
+            return None
+
+    tracing.configure(otel=True)
+    tracing._otel_tracer = SimpleNamespace(start_as_current_span=FakeCM)
+    try:
+        with tracing.span("tool demo", tool="demo"):
+            with tracing.span("attempt", attempt=1, skipped=[1]):
+                pass
+    finally:
+        tracing.configure()
+    assert [(s.name, s.attrs) for s in opened] == [
+        ("tool demo", {"tool": "demo"}), ("attempt", {"attempt": 1}),
+    ]
+
+
+def test_summary_ranks_self_time(tmp_path, capsys):
+    trace = {
+        "name": "tool pathway_paths", "duration_ms": 100.0,
+        "spans": [
+            {"id": 1, "parent": 0, "name": "http rest.kegg.jp", "duration_ms": 30.0},
+            {"id": 2, "parent": 0, "name": "parse_kgml", "duration_ms": 60.0},
+            {"id": 3, "parent": 2, "name": "inner", "duration_ms": 20.0},
+        ],
+    }
+    assert tracing.self_times(trace) == [
+        ("tool pathway_paths", 10.0), ("http rest.kegg.jp", 30.0),
+        ("parse_kgml", 40.0), ("inner", 20.0),
+    ]
+    rows = tracing.summarize([trace, {"name": "tool other", "duration_ms": 5.0}],
+                             tool="pathway_paths")
+    assert [r["span"] for r in rows] == [
+        "parse_kgml", "http rest.kegg.jp", "inner", "tool pathway_paths",
+    ]
+    assert rows[0]["share"] == 0.4
+
+    path = tmp_path / "spans.jsonl"
+    path.write_text(json.dumps(trace) + "\n")
+    assert tracing._main([str(path), "--top", "1"]) == 0
+    out = capsys.readouterr().out.splitlines()
+    assert len(out) == 2 and out[1].endswith("tool pathway_paths / parse_kgml")
@@ -1,4 +1,19 @@
 from .server import *
 from .rdf_portal import *
 from .api_tools import *
-from .togoid import convertId, countId, getAllDataset, getDataset, getAllRelation, getRelation, getDescription
+
+# The TogoID tools are re-exported lazily (PEP 562): importing the package must
+# not build the TogoID sub-server, which main.setup() imports when it mounts it.
+_TOGOID_EXPORTS = frozenset({
+    "convertId", "countId", "getAllDataset", "getDataset", "getAllRelation", "getRelation",
+    "getDescription",
+})
+
+
+def __getattr__(name):
+    if name in _TOGOID_EXPORTS:
+        from . import togoid
+
+        return getattr(togoid, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
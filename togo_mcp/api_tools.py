@@ -6,15 +6,18 @@ from typing import Annotated, Literal
 import httpx
 from pydantic import Field
 
+from . import json_codec as _json_codec
+from . import metrics as _metrics
+from . import tracing as _tracing
 from .server import *
 
 # Shared httpx clients for connection reuse
-_uniprot_client = httpx.AsyncClient(base_url="https://rest.uniprot.org", timeout=30.0)
-_pubchem_client = httpx.AsyncClient(timeout=30.0)
-_pdbj_client = httpx.AsyncClient(base_url="https://pdbj.org", timeout=30.0)
-_mesh_client = httpx.AsyncClient(base_url="https://id.nlm.nih.gov", timeout=30.0)
-_reactome_client = httpx.AsyncClient(base_url="https://reactome.org", timeout=30.0)
-_rhea_client = httpx.AsyncClient(base_url="https://www.rhea-db.org", timeout=30.0)
+_uniprot_client = LazyAsyncClient(base_url="https://rest.uniprot.org", timeout=30.0)
+_pubchem_client = LazyAsyncClient(timeout=30.0)
+_pdbj_client = LazyAsyncClient(base_url="https://pdbj.org", timeout=30.0)
+_mesh_client = LazyAsyncClient(base_url="https://id.nlm.nih.gov", timeout=30.0)
+_reactome_client = LazyAsyncClient(base_url="https://reactome.org", timeout=30.0)
+_rhea_client = LazyAsyncClient(base_url="https://www.rhea-db.org", timeout=30.0)
 
 
 # Aliases LLMs commonly use in place of `query` when calling search tools.
@@ -136,14 +139,17 @@ async def _rest_get(
     for attempt in range(_REST_MAX_ATTEMPTS):
         last = attempt == _REST_MAX_ATTEMPTS - 1
         try:
-            response = await client.get(path, params=params, headers=headers)
+            with _tracing.span("attempt", context=context, attempt=attempt + 1):
+                response = await client.get(path, params=params, headers=headers)
         except httpx.HTTPError as e:  # includes TimeoutException
             last_error = f"{type(e).__name__}: {e}"
             last_status, last_body = None, None
             logger.warning(f"{context} attempt {attempt + 1} failed: {last_error}")
             if last:
                 break
-            await asyncio.sleep(_REST_BACKOFF_BASE * (attempt + 1))
+            _metrics.REST_RETRIES.inc(client.base_url.host or "other")
+            with _tracing.span("backoff", context=context):
+                await asyncio.sleep(_REST_BACKOFF_BASE * (attempt + 1))
             continue
         if response.is_success:
             return response
@@ -151,7 +157,9 @@ async def _rest_get(
         if 500 <= response.status_code < 600 and not last:
             last_error = f"HTTP {response.status_code}"
             logger.warning(f"{context} attempt {attempt + 1}: {last_error}, retrying")
-            await asyncio.sleep(_REST_BACKOFF_BASE * (attempt + 1))
+            _metrics.REST_RETRIES.inc(client.base_url.host or "other")
+            with _tracing.span("backoff", context=context):
+                await asyncio.sleep(_REST_BACKOFF_BASE * (attempt + 1))
             continue
         # Terminal: a 4xx, or a 5xx after retries are exhausted.
         last_error = f"HTTP {response.status_code}: {_strip_html(response.text)}"
@@ -634,7 +642,7 @@ async def search_pdb_entity(
             {"error": _rest_fail_msg("PDBj REST API request", resp.message, "pdb")}
         )
     try:
-        payload = resp.json()
+        payload = _json_codec.loads(resp.content)
     except ValueError as e:
         detail = f"malformed JSON body: {_strip_html(resp.text)}"
         logger.warning(f"PDBj search returned non-JSON for db={db!r}: {e}")
@@ -25,7 +25,7 @@ from .api_tools import (
 
 # ChEMBL REST client (EBI). The RDF Portal SPARQL endpoint is reached via
 # execute_sparql (from .server), not this client.
-_chembl_client = httpx.AsyncClient(base_url="https://www.ebi.ac.uk", timeout=30.0)
+_chembl_client = LazyAsyncClient(base_url="https://www.ebi.ac.uk", timeout=30.0)
 
 
 # DB: ChEMBL
@@ -0,0 +1,150 @@
+"""One JSON codec for the hot paths: the tool-call log, stats parsing, tool payloads.
+
+Every tool call ends in a log record ``json.dumps``, ``/stats`` parses every
+log line with ``json.loads``, and the REST tools decode every upstream body.
+The stdlib ``json`` module does all of that correctly but not quickly. This
+module puts one seam in front of it: :func:`dumps`, :func:`dumps_bytes` and
+:func:`loads` use `orjson <https://github.com/ijl/orjson>`_ when it is
+installed and the stdlib otherwise, and ``TOGOMCP_JSON_CODEC=json`` forces the
+stdlib.
+
+The output is the same on either backend, which ``tests/test_json_codec.py``
+checks record shape by record shape:
+
+  * COMPACT separators (``,`` and ``:``) always, which is all orjson can emit;
+    the stdlib path passes ``separators=(",", ":")`` to match;
+  * ``ensure_ascii`` is honoured: orjson never escapes, so output that is not
+    pure ASCII when ASCII was asked for is re-encoded by the stdlib (a C-speed
+    ``isascii`` check on the fast path, a second encode only on the rare record
+    that needs it);
+  * orjson only ever sees plain JSON trees: dicts with ``str`` keys, lists,
+    tuples, and exact ``str``/``int``/``float``/``bool``/``None`` leaves. Any
+    other value — a datetime, a dataclass, an Enum, a ``str`` or ``int``
+    subclass, a non-string key — sends the whole document to the stdlib, so
+    ``default`` is called for exactly what the stdlib would call it for. orjson
+    would otherwise encode those itself, and differently: an Enum as its value
+    where ``default=str`` gives ``"C.A"``, a datetime with ``T`` where ``str``
+    gives a space. The check is one pass over the containers, cheaper than the
+    encode it guards;
+  * whatever orjson still refuses — integers past 64 bits, lone surrogates —
+    falls back to the stdlib, and so does a document orjson will not parse
+    (``NaN``, huge integers). Errors stay the stdlib's: ``TypeError`` for an
+    unserializable value, ``ValueError`` for a malformed document.
+
+One difference is inherent: orjson writes a non-finite float as ``null`` where
+the stdlib writes the non-standard ``NaN``. Nothing we log or return carries
+one.
+
+msgspec is not used: its encoder always encodes datetimes and enums natively,
+so ``default=str`` semantics could not be kept.
+
+Tool payloads — what an agent receives from KEGG, NCBI, TogoVar, TogoID and
+PDBj — are decoded here but still encoded by the stdlib, in the formatting they
+have always had (spaced separators, NCBI's ``indent=2``): compact output would
+change what agents see and move the size budgets (KEGG's, TogoVar's
+``_MAX_RESPONSE_CHARS``) that are defined in that formatting. Hashes that must
+stay stable across installs (:func:`togo_mcp.log_index.groups_fingerprint`)
+stay on it too.
+
+``python scripts/bench_json.py`` compares the backends on real record shapes.
+"""
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Callable
+
+try:
+    import orjson as _orjson
+except ImportError:  # pragma: no cover - exercised where orjson is absent
+    _orjson = None
+
+AVAILABLE = ("orjson", "json") if _orjson is not None else ("json",)
+
+BACKEND = "json"
+_fast = False
+
+_LEAVES = frozenset({str, int, float, bool, type(None)})
+
+
+def use(name: str | None) -> str:
+    """Select the backend (``"orjson"`` or ``"json"``; None = best available).
+
+    An unavailable or unknown name falls back to the stdlib. Returns the backend
+    now in use.
+    """
+    global BACKEND, _fast
+    if name in (None, "", "auto"):
+        name = AVAILABLE[0]
+    BACKEND = name if name in AVAILABLE else "json"
+    _fast = BACKEND == "orjson"
+    return BACKEND
+
+
+def _plain(obj: Any) -> bool:
+    """Whether ``obj`` is built only of exact JSON types (see the module docstring)."""
+    stack = [obj]
+    while stack:
+        node = stack.pop()
+        kind = type(node)
+        if kind in _LEAVES:
+            continue
+        if kind is dict:
+            for key in node:
+                if type(key) is not str:
+                    return False
+            stack.extend(node.values())
+        elif kind is list or kind is tuple:
+            stack.extend(node)
+        else:
+            return False
+    return True
+
+
+def _stdlib(obj: Any, ensure_ascii: bool, default: Callable[[Any], Any] | None) -> str:
+    return json.dumps(obj, ensure_ascii=ensure_ascii, default=default, separators=(",", ":"))
+
+
+def dumps_bytes(
+    obj: Any, *, ensure_ascii: bool = True, default: Callable[[Any], Any] | None = None
+) -> bytes:
+    """``obj`` as compact UTF-8 JSON bytes (a JSONL line without its newline)."""
+    if _fast and _plain(obj):
+        try:
+            out = _orjson.dumps(obj)
+        except TypeError:
+            pass
+        else:
+            if not ensure_ascii or out.isascii():
+                return out
+    return _stdlib(obj, ensure_ascii, default).encode("utf-8")
+
+
+def dumps(
+    obj: Any, *, ensure_ascii: bool = True, default: Callable[[Any], Any] | None = None
+) -> str:
+    """``obj`` as compact JSON text."""
+    if _fast and _plain(obj):
+        try:
+            out = _orjson.dumps(obj)
+        except TypeError:
+            pass
+        else:
+            if not ensure_ascii or out.isascii():
+                return out.decode("utf-8")
+    return _stdlib(obj, ensure_ascii, default)
+
+
+def loads(data: str | bytes | bytearray | memoryview) -> Any:
+    """Parse one JSON document; ``ValueError`` if it is not one."""
+    if _fast:
+        try:
+            return _orjson.loads(data)
+        except ValueError:
+            pass  # let the stdlib decide: NaN, huge ints, or really malformed
+    if isinstance(data, memoryview):
+        data = bytes(data)
+    return json.loads(data)
+
+
+use(os.environ.get("TOGOMCP_JSON_CODEC"))
@@ -71,6 +71,8 @@ from typing import Annotated, Any
 import httpx
 from pydantic import Field
 
+from . import metrics as _metrics
+from . import tracing as _tracing
 from .kgml import (
     KGMLParseError,
     find_cycles,
@@ -84,7 +86,7 @@ from .server import *
 
 kegg_mcp = FastMCP("KEGG API server")
 
-_client = httpx.AsyncClient(base_url="https://rest.kegg.jp", timeout=30.0)
+_client = LazyAsyncClient(base_url="https://rest.kegg.jp", timeout=30.0)
 
 
 def _close_client():
@@ -125,11 +127,14 @@ _BACKOFF_BASE = 0.5
 
 async def _throttle() -> None:
     global _last_request_at
-    async with _rate_lock:
-        wait = _last_request_at + _MIN_INTERVAL - time.monotonic()
-        if wait > 0:
-            await asyncio.sleep(wait)
-        _last_request_at = time.monotonic()
+    start = time.monotonic()
+    with _tracing.span("rate_limit_wait", api="kegg"):
+        async with _rate_lock:
+            wait = _last_request_at + _MIN_INTERVAL - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            _last_request_at = time.monotonic()
+    _metrics.RATE_LIMIT_WAIT_SECONDS.observe(_last_request_at - start, "kegg")
 
 
 async def _kegg_get(path: str, *, context: str) -> str:
@@ -143,10 +148,13 @@ async def _kegg_get(path: str, *, context: str) -> str:
     for attempt in range(_MAX_ATTEMPTS):
         await _throttle()
         try:
-            response = await _client.get(path)
+            with _tracing.span("attempt", context=context, attempt=attempt + 1):
+                response = await _client.get(path)
         except (httpx.TimeoutException, httpx.HTTPError) as exc:
             if attempt + 1 < _MAX_ATTEMPTS:
-                await asyncio.sleep(_BACKOFF_BASE * 2**attempt)
+                _metrics.REST_RETRIES.inc("rest.kegg.jp")
+                with _tracing.span("backoff", context=context):
+                    await asyncio.sleep(_BACKOFF_BASE * 2**attempt)
                 continue
             raise ValueError(
                 f"{context}: could not reach rest.kegg.jp after {_MAX_ATTEMPTS} "
@@ -165,7 +173,9 @@ async def _kegg_get(path: str, *, context: str) -> str:
             )
 
         if response.status_code >= 500 and attempt + 1 < _MAX_ATTEMPTS:
-            await asyncio.sleep(_BACKOFF_BASE * 2**attempt)
+            _metrics.REST_RETRIES.inc("rest.kegg.jp")
+            with _tracing.span("backoff", context=context):
+                await asyncio.sleep(_BACKOFF_BASE * 2**attempt)
             continue
 
         raise_for_status_with_body(
@@ -374,6 +384,7 @@ def _section_bytes(payload: dict[str, Any], key: str) -> int:
     return len(json.dumps(value, ensure_ascii=False)) if isinstance(value, list) else 0
 
 
+@_tracing.traced("bounded")
 def _bounded(
     payload: Any,
     *,
@@ -701,6 +712,7 @@ async def get_entry(
 async def _fetch_kgml(pathway: str) -> str:
     """Fetch (and memoize) one map's KGML."""
     cached = _kgml_cache.get(pathway)
+    _metrics.cache_lookup("kegg_kgml", cached is not None)
     if cached is not None:
         _kgml_cache.move_to_end(pathway)
         return cached
@@ -727,7 +739,8 @@ async def _load_graph(pathway: str, **options: Any) -> tuple[str, dict[str, Any]
     pathway = _normalize_pathway(pathway)
     text = await _fetch_kgml(pathway)
     try:
-        return pathway, parse_kgml(text, **options)
+        with _tracing.span("parse_kgml", pathway=pathway, bytes=len(text)):
+            return pathway, parse_kgml(text, **options)
     except KGMLParseError as exc:
         raise ValueError(f"KEGG returned unusable KGML for {pathway}: {exc}") from exc
 
@@ -743,6 +756,7 @@ async def _genes_for_symbol(org: str, symbol: str) -> list[str]:
     """
     key = (org, symbol.lower())
     cached = _symbol_cache.get(key)
+    _metrics.cache_lookup("kegg_symbol", cached is not None)
     if cached is not None:
         _symbol_cache.move_to_end(key)
         return cached
@@ -924,6 +938,7 @@ def _cycle_interpretation(
     return notes
 
 
+@_tracing.traced("fit_graph_to_budget")
 def _fit_graph_to_budget(
     ordered_nodes: list[dict[str, Any]],
     all_edges: list[dict[str, Any]],
@@ -975,6 +990,7 @@ def _fit_graph_to_budget(
     return take(max(low, min(_PRIMARY_FLOOR, ceiling)))
 
 
+@_tracing.traced("fit_sections_to_budget")
 def _fit_sections_to_budget(
     sections: dict[str, list[Any]], budget: int
 ) -> dict[str, list[Any]]:
@@ -1497,14 +1513,13 @@ async def pathway_paths(
         if not hits
     ]
 
-    paths = (
-        find_paths(
-            graph, source_nodes, target_nodes,
-            max_length=max_length, max_paths=max_paths,
-        )
-        if not unresolved
-        else []
-    )
+    paths = []
+    if not unresolved:
+        with _tracing.span("find_paths", max_length=max_length, max_paths=max_paths):
+            paths = find_paths(
+                graph, source_nodes, target_nodes,
+                max_length=max_length, max_paths=max_paths,
+            )
     # A catalysis edge lets a route detour through the ENZYME box between the same
     # substrate and product, producing a second path over the identical reaction
     # sequence — chemically the same route, drawn differently. Those duplicates
@@ -0,0 +1,215 @@
+"""Rolling last-24-hours view of tool calls, kept in memory: ``/stats/live``.
+
+``/stats`` aggregates by calendar month from the log files, so "what is failing
+RIGHT NOW" meant reading the raw log. :class:`LiveWindow` answers it from a ring
+of per-minute buckets that ``_ToolCallLogger`` feeds as each call finishes:
+
+  * one slot per minute, ``minutes`` slots (default 1440 = 24 h); a slot whose
+    minute has passed out of the window is simply overwritten by the next call
+    that lands on it, so nothing ever needs expiring;
+  * per slot, one cell for all calls plus one per tool and one per SPARQL
+    endpoint group, each holding calls, errors, bytes out and a latency
+    :class:`~togo_mcp.sketches.QuantileSketch`.
+
+Recording is O(1) — a slot lookup and up to three cell updates. A snapshot is
+O(slots in the window): it merges the sketches of the minutes it covers, which
+is exact (see sketches.py), so a window's p95 is the p95 of its calls.
+
+It never touches the log files and is empty after a restart.
+"""
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from .sketches import QuantileSketch
+
+WINDOW_MINUTES = 24 * 60
+DEFAULT_VIEW_MINUTES = 60
+
+
+class _Cell:
+    """Calls, errors, bytes out and latency of one key in one minute (or window)."""
+
+    __slots__ = ("calls", "errors", "bytes_out", "latency")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.bytes_out = 0
+        self.latency = QuantileSketch()
+
+    def add(self, error: bool, elapsed_ms: float, n_bytes: int | None) -> None:
+        self.calls += 1
+        self.errors += error
+        self.bytes_out += n_bytes or 0
+        self.latency.add(elapsed_ms)
+
+    def merge(self, other: _Cell) -> None:
+        self.calls += other.calls
+        self.errors += other.errors
+        self.bytes_out += other.bytes_out
+        self.latency.merge(other.latency)
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "error_rate": round(self.errors / self.calls, 4) if self.calls else 0.0,
+            "p50_ms": self.latency.percentile(50),
+            "p95_ms": self.latency.percentile(95),
+            "bytes_out": self.bytes_out,
+        }
+
+
+class _Minute:
+    __slots__ = ("minute", "total", "tools", "endpoints")
+
+    def __init__(self, minute: int) -> None:
+        self.minute = minute
+        self.total = _Cell()
+        self.tools: dict[str, _Cell] = {}
+        self.endpoints: dict[str, _Cell] = {}
+
+
+class LiveWindow:
+    """The last ``minutes`` minutes of tool calls, one bucket per minute."""
+
+    __slots__ = ("minutes", "_ring", "_clock")
+
+    def __init__(
+        self, minutes: int = WINDOW_MINUTES, clock: Callable[[], float] = time.time
+    ) -> None:
+        self.minutes = minutes
+        self._ring: list[_Minute | None] = [None] * minutes
+        self._clock = clock
+
+    def add(
+        self,
+        tool: str,
+        *,
+        error: bool,
+        elapsed_ms: float,
+        bytes_out: int | None = None,
+        endpoint: str | None = None,
+    ) -> None:
+        """Record one finished call."""
+        minute = int(self._clock() // 60)
+        i = minute % self.minutes
+        slot = self._ring[i]
+        if slot is None or slot.minute != minute:
+            slot = self._ring[i] = _Minute(minute)
+        slot.total.add(error, elapsed_ms, bytes_out)
+        cell = slot.tools.get(tool)
+        if cell is None:
+            cell = slot.tools[tool] = _Cell()
+        cell.add(error, elapsed_ms, bytes_out)
+        if endpoint is not None:
+            cell = slot.endpoints.get(endpoint)
+            if cell is None:
+                cell = slot.endpoints[endpoint] = _Cell()
+            cell.add(error, elapsed_ms, bytes_out)
+
+    def snapshot(self, minutes: int = DEFAULT_VIEW_MINUTES) -> dict[str, Any]:
+        """Totals, per-tool and per-endpoint summaries and a per-minute series
+        for the last ``minutes`` minutes (clamped to the window)."""
+        minutes = max(1, min(minutes, self.minutes))
+        clock = self._clock()
+        now = int(clock // 60)
+        total = _Cell()
+        tools: dict[str, _Cell] = {}
+        endpoints: dict[str, _Cell] = {}
+        series: list[dict[str, Any]] = []
+        for minute in range(now - minutes + 1, now + 1):
+            slot = self._ring[minute % self.minutes]
+            if slot is None or slot.minute != minute:
+                continue
+            total.merge(slot.total)
+            for into, cells in ((tools, slot.tools), (endpoints, slot.endpoints)):
+                for key, cell in cells.items():
+                    acc = into.get(key)
+                    if acc is None:
+                        acc = into[key] = _Cell()
+                    acc.merge(cell)
+            series.append({"minute": _iso_minute(minute), **slot.total.summary()})
+
+        def ranked(cells: dict[str, _Cell]) -> dict[str, dict[str, Any]]:
+            order = sorted(cells, key=lambda k: (-cells[k].errors, -cells[k].calls, k))
+            return {k: cells[k].summary() for k in order}
+
+        return {
+            "generated_at": datetime.fromtimestamp(clock, timezone.utc).isoformat(timespec="seconds"),
+            "window_minutes": minutes,
+            "since": _iso_minute(now - minutes + 1),
+            "totals": total.summary(),
+            "tools": ranked(tools),
+            "endpoints": ranked(endpoints),
+            "series": series,
+        }
+
+
+def _iso_minute(minute: int) -> str:
+    return datetime.fromtimestamp(minute * 60, timezone.utc).strftime("%Y-%m-%dT%H:%MZ")
+
+
+def render_html(snap: dict[str, Any]) -> str:
+    """A small self-contained page for a :meth:`LiveWindow.snapshot`."""
+    from html import escape
+
+    def cell(v: Any) -> str:
+        return escape("" if v is None else str(v))
+
+    def table(title: str, rows: dict[str, dict[str, Any]]) -> list[str]:
+        out = [f"<h2>{cell(title)}</h2>"]
+        if not rows:
+            return out + ["<p class='muted'>No calls in this window.</p>"]
+        out.append("<table><tr><th></th><th>calls</th><th>errors</th><th>error rate</th>"
+                   "<th>p50 ms</th><th>p95 ms</th><th>bytes out</th></tr>")
+        for key, r in rows.items():
+            warn = " class='warn'" if r["errors"] else ""
+            out.append(
+                f"<tr><td>{cell(key)}</td><td>{cell(r['calls'])}</td><td{warn}>{cell(r['errors'])}</td>"
+                f"<td>{r['error_rate']:.1%}</td><td>{cell(r['p50_ms'])}</td>"
+                f"<td>{cell(r['p95_ms'])}</td><td>{cell(r['bytes_out'])}</td></tr>"
+            )
+        return out + ["</table>"]
+
+    minutes = snap["window_minutes"]
+    links = " · ".join(
+        f"<a href='/stats/live?minutes={m}'>{label}</a>"
+        for m, label in ((15, "15 min"), (60, "1 h"), (360, "6 h"), (1440, "24 h"))
+    )
+    parts = [
+        "<!doctype html><html lang='en'><head><meta charset='utf-8'>",
+        "<meta name='viewport' content='width=device-width, initial-scale=1'>",
+        f"<meta http-equiv='refresh' content='30'><title>TogoMCP live · {minutes} min</title><style>",
+        "body{font:14px/1.5 system-ui,sans-serif;margin:2rem;color:#1a1a1a;background:#fafafa}",
+        "h1{font-size:1.4rem}h2{font-size:1.1rem;margin-top:2rem;border-bottom:2px solid #ddd;padding-bottom:.2rem}",
+        "table{border-collapse:collapse;margin:.4rem 0 1rem;font-size:.85rem;background:#fff}",
+        "th,td{border:1px solid #ddd;padding:.25rem .5rem;text-align:right}",
+        "th:first-child,td:first-child{text-align:left}",
+        "th{background:#f0f0f0}tr:nth-child(even) td{background:#f8f8f8}",
+        ".muted{color:#888}.warn{color:#b00}",
+        "</style></head><body>",
+        f"<h1>TogoMCP · last {minutes} min</h1>",
+        f"<p class='muted'>Since {cell(snap['since'])} · generated {cell(snap['generated_at'])} · "
+        f"in memory since the last restart · {links} · "
+        f"<a href='/stats/live.json?minutes={minutes}'>JSON</a> · <a href='/stats'>monthly</a></p>",
+    ]
+    parts += table("All calls", {"total": snap["totals"]})
+    parts += table("By tool", snap["tools"])
+    parts += table("By SPARQL endpoint", snap["endpoints"])
+    parts.append("<h2>Per minute</h2>")
+    if snap["series"]:
+        parts.append("<table><tr><th>minute (UTC)</th><th>calls</th><th>errors</th>"
+                     "<th>p95 ms</th></tr>")
+        for r in reversed(snap["series"]):
+            warn = " class='warn'" if r["errors"] else ""
+            parts.append(f"<tr><td>{cell(r['minute'])}</td><td>{cell(r['calls'])}</td>"
+                         f"<td{warn}>{cell(r['errors'])}</td><td>{cell(r['p95_ms'])}</td></tr>")
+        parts.append("</table>")
+    else:
+        parts.append("<p class='muted'>No calls in this window.</p>")
+    parts.append("</body></html>")
+    return "".join(parts)
@@ -0,0 +1,413 @@
+"""Columnar export of the tool-call log, for ad-hoc analysis.
+
+Questions the ``/stats`` tables do not answer ("p95 by endpoint by day",
+"which predicates do the empty UniProt queries share") otherwise mean
+downloading the JSONL and parsing it line by line. This module appends the log
+to a typed, columnar store instead:
+
+  * **Parquet** (a directory of ``part-NNNNN.parquet`` files) when ``pyarrow``
+    is installed;
+  * otherwise **SQLite** (one ``calls`` table, indexed by day, endpoint and
+    tool), which needs nothing beyond the standard library.
+
+One row per record, with the columns in ``COLUMNS``: the timing and outcome
+fields, the SPARQL ``extra`` fields, the database as the dashboard attributes
+it, and ``query_shape`` flattened into ``shape_*`` / ``flag_*`` columns.
+``sample_weight`` is the number of calls a row stands for when the log is
+sampled (``SUM(sample_weight)``, not ``COUNT(*)``, counts calls). Like
+the aggregates, and unlike ``/stats/log``, the export never carries the raw
+``ip``, ``args``, query text or error messages.
+
+Export is incremental and idempotent. The store records, per source file
+(device, inode), how many bytes it has consumed, in the same transaction as
+the rows for SQLite. A re-run appends only what is new: it follows rotation
+(renames keep the inode) and compression (a ``.gz`` segment's sidecar names the
+plain file it came from). Each offset carries a mark of the file's first bytes
+(:func:`togo_mcp.log_index.head_mark`), so a new file that reuses a deleted
+one's inode is read from the start, and progress for files no longer in the log
+directory is dropped. Rows outlive the log's retention, so the store can hold
+more history than the log directory.
+
+    python -m togo_mcp.stats export calls.sqlite              # or: calls.parquet/
+    sqlite3 calls.sqlite "$(cat <<'SQL'
+      SELECT endpoint, day, MIN(elapsed_ms) AS p95_ms FROM (
+        SELECT endpoint, day, elapsed_ms,
+               CUME_DIST() OVER (PARTITION BY endpoint, day ORDER BY elapsed_ms) AS cd
+        FROM calls WHERE endpoint IS NOT NULL)
+      WHERE cd >= 0.95 GROUP BY endpoint, day
+    SQL
+    )"
+
+The window walks the covering ``(endpoint, day, elapsed_ms)`` index in order, so
+no sort is needed: ~0.5 s for 200k calls on one slow core.
+
+The server can keep a store current by itself: set ``TOGOMCP_LOG_EXPORT`` to
+its path and the log writer appends to it after every rotation.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import sqlite3
+from typing import Any, Iterable, Iterator
+
+from .log_index import GZ_SUFFIX, compressed_source, file_head, head_mark, same_file
+from .stats import (
+    _FLAG_WORDS,
+    client_of,
+    database_of,
+    day_of,
+    load_endpoint_groups,
+    log_paths,
+    parse_line,
+    sparql_class,
+    weight_of,
+)
+
+_SHAPE_FLAGS = (*_FLAG_WORDS, "bif_contains")
+
+# (name, SQLite type); the Parquet schema is derived from the same list.
+COLUMNS: tuple[tuple[str, str], ...] = (
+    ("ts", "TEXT"),
+    ("day", "TEXT"),
+    ("tool", "TEXT"),
+    ("status", "TEXT"),
+    ("elapsed_ms", "REAL"),
+    ("sample_weight", "INTEGER"),  # calls the row stands for; 1 unless sampled
+    ("client", "TEXT"),
+    ("ip_hash", "TEXT"),
+    ("database", "TEXT"),
+    ("error_class", "TEXT"),
+    ("endpoint", "TEXT"),
+    ("endpoint_url", "TEXT"),
+    ("sparql_status", "TEXT"),
+    ("sparql_class", "TEXT"),
+    ("http_code", "INTEGER"),
+    ("n_bytes", "INTEGER"),
+    ("n_rows", "INTEGER"),
+    ("query_sha256", "TEXT"),
+    ("shape_form", "TEXT"),
+    ("shape_len", "INTEGER"),
+    ("shape_n_predicates", "INTEGER"),
+    ("shape_predicates", "TEXT"),  # space-separated qnames
+    ("shape_from", "TEXT"),  # space-separated graph IRIs
+    *((f"flag_{f}", "INTEGER") for f in _SHAPE_FLAGS),
+)
+COLUMN_NAMES = tuple(name for name, _ in COLUMNS)
+
+_SQLITE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+
+BATCH_ROWS = 10_000
+
+
+def _num(v: Any, kind: type) -> Any:
+    if isinstance(v, bool) or not isinstance(v, (int, float)):
+        return None
+    return kind(v)
+
+
+def _str(v: Any) -> str | None:
+    return v if isinstance(v, str) and v else None
+
+
+def to_row(rec: dict[str, Any], endpoint_groups: dict[str, str]) -> tuple[Any, ...]:
+    """One record as a tuple in ``COLUMNS`` order."""
+    extra = rec.get("extra") if isinstance(rec.get("extra"), dict) else {}
+    shape = extra.get("query_shape") if isinstance(extra.get("query_shape"), dict) else None
+    url = _str(extra.get("endpoint_url"))
+    flags = shape.get("flags") if shape and isinstance(shape.get("flags"), dict) else {}
+    return (
+        _str(rec.get("ts")),
+        day_of(rec),
+        _str(rec.get("tool")),
+        _str(rec.get("status")),
+        _num(rec.get("elapsed_ms"), float),
+        weight_of(rec),
+        client_of(rec),
+        _str(rec.get("ip_hash")),
+        database_of(rec, endpoint_groups),
+        _str(rec.get("error_class")),
+        endpoint_groups.get(url, url) if url else None,
+        url,
+        _str(extra.get("sparql_status")),
+        sparql_class(rec),
+        _num(extra.get("http_code"), int),
+        _num(extra.get("n_bytes"), int),
+        _num(extra.get("n_rows"), int),
+        _str(extra.get("query_sha256")),
+        _str(shape.get("form")) if shape else None,
+        _num(shape.get("len"), int) if shape else None,
+        _num(shape.get("n_predicates"), int) if shape else None,
+        " ".join(shape.get("predicates") or ()) if shape else None,
+        " ".join(shape.get("from") or ()) if shape else None,
+        *((int(bool(flags.get(f))) if shape else None) for f in _SHAPE_FLAGS),
+    )
+
+
+# --------------------------------------------------------------------------- #
+# Sources: what is new since the last export
+# --------------------------------------------------------------------------- #
+def _key(dev: int, ino: int) -> str:
+    return f"{dev}:{ino}"
+
+
+def _pending(
+    paths: Iterable[str], done: dict[str, tuple[int, str | None]]
+) -> Iterator[tuple[str, str, bytes, Any, int]]:
+    """``(path, key, head, binary handle, uncompressed start offset)`` per file
+    with unexported bytes. Offsets are always in uncompressed bytes; ``head`` is
+    what the file's mark is taken of."""
+    for path in paths:
+        try:
+            fh = open(path, "rb")
+        except OSError:  # rotated away since log_paths looked
+            continue
+        with fh:
+            st = os.fstat(fh.fileno())
+            key = _key(st.st_dev, st.st_ino)
+            head = file_head(fh, path)
+            if path.endswith(GZ_SUFFIX):
+                if key in done and same_file(head, done[key][1]):
+                    continue  # immutable, and already read to the end
+                src = compressed_source(path, st)
+                start, mark = done.get(_key(*src[:2]), (0, None)) if src else (0, None)
+                if not same_file(head, mark):
+                    start = 0
+                yield path, key, head, gzip.GzipFile(fileobj=fh), start
+            else:
+                start, mark = done.get(key, (0, None))
+                # truncated in place, or the inode now belongs to another file
+                if st.st_size < start or not same_file(head, mark):
+                    start = 0
+                if st.st_size > start:
+                    yield path, key, head, fh, start
+
+
+def _live_keys(paths: Iterable[str]) -> set[str] | None:
+    """Keys of the files in ``paths`` and of the plain files their ``.gz``
+    segments came from; None if one vanished mid-way (a rotation in progress)."""
+    keys = set()
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        keys.add(_key(st.st_dev, st.st_ino))
+        src = compressed_source(path, st) if path.endswith(GZ_SUFFIX) else None
+        if src:
+            keys.add(_key(*src[:2]))
+    return keys
+
+
+def _read_rows(
+    fh: Any, start: int, endpoint_groups: dict[str, str]
+) -> Iterator[tuple[int, list[tuple[Any, ...]]]]:
+    """Batches of rows from ``start``, each with the offset reached after it."""
+    fh.seek(start)
+    offset = start
+    rows: list[tuple[Any, ...]] = []
+    for line in fh:
+        if not line.endswith(b"\n"):
+            break  # a record still being written
+        offset += len(line)
+        rec = parse_line(line)
+        if rec is not None:
+            rows.append(to_row(rec, endpoint_groups))
+        if len(rows) >= BATCH_ROWS:
+            yield offset, rows
+            rows = []
+    yield offset, rows
+
+
+# --------------------------------------------------------------------------- #
+# Stores
+# --------------------------------------------------------------------------- #
+class SqliteStore:
+    """``calls`` plus ``_sources`` (bytes consumed and mark per source file) in one file."""
+
+    __slots__ = ("path", "_db")
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._db = sqlite3.connect(path)
+        cols = ", ".join(f'"{name}" {kind}' for name, kind in COLUMNS)
+        self._db.executescript(
+            f"""
+            CREATE TABLE IF NOT EXISTS calls ({cols});
+            CREATE INDEX IF NOT EXISTS calls_day ON calls (day);
+            CREATE INDEX IF NOT EXISTS calls_tool_day ON calls (tool, day);
+            CREATE INDEX IF NOT EXISTS calls_endpoint_day
+                ON calls (endpoint, day, elapsed_ms);
+            CREATE TABLE IF NOT EXISTS _sources (key TEXT PRIMARY KEY, offset INTEGER,
+                                                 mark TEXT);
+            """
+        )
+        if "mark" not in {row[1] for row in self._db.execute("PRAGMA table_info(_sources)")}:
+            with self._db:  # a store written before marks existed
+                self._db.execute("ALTER TABLE _sources ADD COLUMN mark TEXT")
+
+    def done(self) -> dict[str, tuple[int, str | None]]:
+        return {
+            key: (offset, mark)
+            for key, offset, mark in self._db.execute("SELECT key, offset, mark FROM _sources")
+        }
+
+    def append(
+        self, key: str, offset: int, rows: list[tuple[Any, ...]], mark: str | None = None
+    ) -> None:
+        marks = ", ".join("?" * len(COLUMNS))
+        with self._db:  # one transaction: rows and progress land together
+            self._db.executemany(f"INSERT INTO calls VALUES ({marks})", rows)
+            self._db.execute(
+                "INSERT OR REPLACE INTO _sources (key, offset, mark) VALUES (?, ?, ?)",
+                (key, offset, mark),
+            )
+
+    def prune(self, keep: set[str]) -> None:
+        """Forget the progress of every source file not in ``keep``."""
+        stale = [(key,) for key in self.done() if key not in keep]
+        with self._db:
+            self._db.executemany("DELETE FROM _sources WHERE key = ?", stale)
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class ParquetStore:
+    """A directory of ``part-NNNNN.parquet`` files plus ``_export_state.json``.
+
+    Each ``append`` writes one part, then the state naming it, both renamed into
+    place. A part the state does not name (a crash in between) is deleted on
+    the next open, so rows are never counted twice.
+    """
+
+    __slots__ = ("path", "_state", "_schema")
+
+    STATE = "_export_state.json"
+
+    def __init__(self, path: str) -> None:
+        import pyarrow as pa
+
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        try:
+            with open(os.path.join(path, self.STATE), encoding="utf-8") as fh:
+                self._state = json.load(fh)
+        except (OSError, ValueError):
+            self._state = {"sources": {}, "parts": []}
+        for name in os.listdir(path):
+            if name.endswith(".parquet") and name not in self._state["parts"]:
+                os.remove(os.path.join(path, name))
+        types = {"TEXT": pa.string(), "REAL": pa.float64(), "INTEGER": pa.int64()}
+        self._schema = pa.schema([(name, types[kind]) for name, kind in COLUMNS])
+
+    def done(self) -> dict[str, tuple[int, str | None]]:
+        # [offset, mark]; a bare offset is from a store written before marks
+        return {
+            key: (v, None) if isinstance(v, int) else (v[0], v[1])
+            for key, v in self._state["sources"].items()
+        }
+
+    def append(
+        self, key: str, offset: int, rows: list[tuple[Any, ...]], mark: str | None = None
+    ) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if rows:
+            name = f"part-{len(self._state['parts']):05d}.parquet"
+            table = pa.Table.from_arrays(
+                [pa.array(col, type=t.type) for col, t in zip(zip(*rows), self._schema)],
+                schema=self._schema,
+            )
+            tmp = os.path.join(self.path, name + ".tmp")
+            pq.write_table(table, tmp, compression="zstd")
+            os.replace(tmp, os.path.join(self.path, name))
+            self._state["parts"].append(name)
+        self._state["sources"][key] = [offset, mark]
+        self._save()
+
+    def prune(self, keep: set[str]) -> None:
+        """Forget the progress of every source file not in ``keep``."""
+        sources = self._state["sources"]
+        if set(sources) - keep:
+            self._state["sources"] = {k: v for k, v in sources.items() if k in keep}
+            self._save()
+
+    def _save(self) -> None:
+        tmp = os.path.join(self.path, self.STATE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self._state, fh)
+        os.replace(tmp, os.path.join(self.path, self.STATE))
+
+    def close(self) -> None:
+        pass
+
+
+def have_pyarrow() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def open_store(dest: str, fmt: str = "auto") -> SqliteStore | ParquetStore:
+    """``fmt``: ``parquet``, ``sqlite``, or ``auto`` (Parquet when pyarrow is
+    installed, unless ``dest`` ends in ``.sqlite``/``.db`` or is an existing file)."""
+    if fmt == "auto":
+        sqlite_like = dest.endswith(_SQLITE_SUFFIXES) or os.path.isfile(dest)
+        fmt = "parquet" if have_pyarrow() and not sqlite_like else "sqlite"
+    if fmt == "parquet":
+        return ParquetStore(dest)
+    return SqliteStore(dest)
+
+
+def export_log(
+    log_path: str,
+    dest: str,
+    *,
+    endpoints_csv: str | None = None,
+    fmt: str = "auto",
+) -> int:
+    """Append every not-yet-exported record of ``log_path`` (and its rotated
+    segments) to the store at ``dest``; returns the number of rows added."""
+    groups = load_endpoint_groups(endpoints_csv) if endpoints_csv else {}
+    store = open_store(dest, fmt)
+    added = 0
+    try:
+        # oldest first, so rows land roughly in time order
+        for _, key, head, fh, start in _pending(reversed(log_paths(log_path)), store.done()):
+            for offset, rows in _read_rows(fh, start, groups):
+                store.append(key, offset, rows, head_mark(head, offset))
+                added += len(rows)
+        keep = _live_keys(log_paths(log_path))
+        if keep is not None:  # else a rotation is under way: prune next time
+            store.prune(keep)
+    finally:
+        store.close()
+    return added
+
+
+def _main(argv: list[str] | None = None) -> int:
+    import argparse
+
+    ap = argparse.ArgumentParser(
+        prog="python -m togo_mcp.stats export",
+        description="Append the tool-call log to a columnar store (Parquet or SQLite).",
+    )
+    ap.add_argument("dest", help="store path: a directory for Parquet, a file for SQLite")
+    ap.add_argument("--log", default=os.getenv("TOGOMCP_QUERY_LOG", ""),
+                    help="JSONL log path (default: $TOGOMCP_QUERY_LOG)")
+    ap.add_argument("--endpoints", default="", help="endpoints.csv for DB attribution")
+    ap.add_argument("--format", choices=("auto", "parquet", "sqlite"), default="auto",
+                    help="auto = Parquet if pyarrow is installed, else SQLite")
+    args = ap.parse_args(argv)
+    if not args.log:
+        ap.error("no --log given and TOGOMCP_QUERY_LOG is unset")
+    if args.format == "parquet" and not have_pyarrow():
+        ap.error("--format parquet needs pyarrow (pip install pyarrow)")
+    n = export_log(args.log, args.dest, endpoints_csv=args.endpoints or None, fmt=args.format)
+    print(f"{args.dest}: {n} rows appended")
+    return 0
@@ -0,0 +1,550 @@
+"""Sidecar block index for the tool-call log, and filtered reads through it.
+
+``/stats/log`` used to stream every rotated file in full — hundreds of MB —
+even when the question was one day or one tool. This module lets it seek to the
+parts that can match instead.
+
+Each log file ``F`` gets a sidecar ``F.idx`` (JSONL). The first line is a
+header naming the file it describes by (device, inode), which survives the
+rename-based rotation, so a sidecar is never applied to the wrong file. Every
+later line describes one BLOCK, a run of consecutive records:
+
+    {"o": <byte offset>, "n": <bytes>, "r": <records>, "d": "<UTC day>",
+     "t": [<tools>], "b": [<databases>]}
+
+A block never spans two UTC days and is closed at ``BLOCK_BYTES``. Databases
+are attributed as :func:`togo_mcp.stats.database_of` does, with the
+endpoints.csv whose fingerprint is in the header. If the reader's endpoints.csv
+differs, the ``b`` lists are ignored rather than trusted.
+
+The index only prunes. Every line actually served is parsed and checked
+against the filter, and any byte range no block covers is scanned, e.g. the
+block still open in a running writer, or a file older than the index. A
+missing, stale or damaged sidecar therefore costs speed, never correctness.
+
+:class:`BlockIndexWriter` is driven by the log writer (see
+:mod:`togo_mcp.toolcall_log`). The sidecars of plain log files can be
+(re)built from scratch at any time; a .gz segment keeps the one
+:func:`compress_segment` wrote:
+
+    python -m togo_mcp.log_index $TOGOMCP_QUERY_LOG [--endpoints resources/endpoints.csv]
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import re
+from typing import Any, Callable, Iterable, Iterator
+
+from . import json_codec
+
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 1
+BLOCK_BYTES = 256 * 1024
+
+DAY_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+# (day, tool, database) of a record
+Keys = tuple[str | None, str, str | None]
+
+
+def index_path(log_file: str) -> str:
+    return log_file + INDEX_SUFFIX
+
+
+def groups_fingerprint(endpoint_groups: dict[str, str]) -> str:
+    blob = json.dumps(sorted(endpoint_groups.items())).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()[:16]
+
+
+class RecordKeys:
+    """``(day, tool, database)`` of a record, as the stats dashboard attributes them.
+
+    endpoints.csv is read on the first call, off the constructor's path, and
+    :mod:`togo_mcp.stats` is imported there too, so building the log writer at
+    server import costs nothing.
+    """
+
+    __slots__ = ("endpoints_csv", "_groups")
+
+    def __init__(self, endpoints_csv: str | None = None) -> None:
+        self.endpoints_csv = endpoints_csv
+        self._groups: dict[str, str] | None = None
+
+    @property
+    def groups(self) -> dict[str, str]:
+        if self._groups is None:
+            from . import stats
+
+            self._groups = (
+                stats.load_endpoint_groups(self.endpoints_csv) if self.endpoints_csv else {}
+            )
+        return self._groups
+
+    @property
+    def fingerprint(self) -> str:
+        return groups_fingerprint(self.groups)
+
+    def __call__(self, rec: dict[str, Any]) -> Keys:
+        from . import stats
+
+        return (
+            stats.day_of(rec),
+            rec.get("tool") or "<unknown>",
+            stats.database_of(rec, self.groups),
+        )
+
+
+# --------------------------------------------------------------------------- #
+# Writing
+# --------------------------------------------------------------------------- #
+class BlockIndexWriter:
+    """Appends block lines to the sidecar of one log file at a time.
+
+    ``add`` is called with each record's byte offset and length as it is
+    written. ``close`` writes the open block; call it before the log file is
+    renamed and ``open`` the new file afterwards.
+    """
+
+    __slots__ = ("keys", "blocks", "_fh", "_block")
+
+    def __init__(self, keys: Callable[[dict[str, Any]], Keys]) -> None:
+        self.keys = keys
+        self.blocks = 0  # block lines written
+        self._fh: Any = None
+        self._block: dict[str, Any] | None = None
+
+    def open(self, log_file: str, log_fh: Any) -> None:
+        """Start indexing ``log_file``, whose open handle is ``log_fh``.
+
+        An existing sidecar for this very file (same inode and endpoints
+        fingerprint) is appended to; anything else is replaced. Bytes written
+        before this call and not covered by it are left to the reader's scan.
+        """
+        header = _header(os.fstat(log_fh.fileno()), getattr(self.keys, "fingerprint", ""))
+        path = index_path(log_file)
+        self._start(path, header, append=_read_header(path) == header)
+
+    def _start(self, path: str, header: dict[str, Any], *, append: bool) -> None:
+        self._fh = open(path, "ab" if append else "wb")
+        if not append:
+            self._fh.write(_line(header))
+        self._block = None
+
+    def add(self, offset: int, length: int, rec: dict[str, Any]) -> None:
+        day, tool, db = self.keys(rec)
+        b = self._block
+        if b is None or b["d"] != day or b["o"] + b["n"] != offset or b["n"] >= BLOCK_BYTES:
+            self._emit()
+            b = self._block = {"o": offset, "n": 0, "r": 0, "d": day, "t": set(), "b": set()}
+        b["n"] += length
+        b["r"] += 1
+        b["t"].add(tool)
+        if db:
+            b["b"].add(db)
+
+    def _emit(self) -> None:
+        b, self._block = self._block, None
+        if b is None or self._fh is None:
+            return
+        self._fh.write(_line({**b, "t": sorted(b["t"]), "b": sorted(b["b"])}))
+        self.blocks += 1
+
+    def flush(self) -> None:
+        if self._fh is not None:
+            self._fh.flush()
+
+    def close(self) -> None:
+        """Write the open block and close the sidecar. Idempotent."""
+        if self._fh is None:
+            return
+        try:
+            self._emit()
+        finally:
+            self._fh.close()
+            self._fh = None
+
+
+def _header(st: os.stat_result, fingerprint: str) -> dict[str, Any]:
+    return {"index": INDEX_VERSION, "dev": st.st_dev, "ino": st.st_ino, "groups": fingerprint}
+
+
+def _line(obj: dict[str, Any]) -> bytes:
+    return json_codec.dumps_bytes(obj) + b"\n"
+
+
+def _read_header(path: str) -> dict[str, Any] | None:
+    try:
+        with open(path, "rb") as fh:
+            header = json_codec.loads(fh.readline())
+    except (OSError, ValueError):
+        return None
+    return header if isinstance(header, dict) and header.get("index") == INDEX_VERSION else None
+
+
+def build_index(log_file: str, keys: RecordKeys) -> int:
+    """Rebuild ``log_file``'s sidecar from the log itself; returns the block count.
+
+    Written to a temporary file and renamed into place. A writer still
+    appending to the old sidecar keeps doing so, to the unlinked file, so new
+    blocks of the active file are scanned by readers until it next rotates.
+    Raises ValueError for a .gz segment, whose sidecar (member offsets and
+    source) only :func:`compress_segment` can write.
+    """
+    from .stats import parse_line
+
+    if log_file.endswith(GZ_SUFFIX):
+        raise ValueError(f"{log_file}: a compressed segment keeps the sidecar it was written with")
+    tmp = index_path(log_file) + ".tmp"
+    writer = BlockIndexWriter(keys)
+    with open(log_file, "rb") as log_fh:
+        writer._start(tmp, _header(os.fstat(log_fh.fileno()), keys.fingerprint), append=False)
+        try:
+            offset = 0
+            for line in log_fh:
+                if not line.endswith(b"\n"):
+                    break  # a record still being written
+                rec = parse_line(line)
+                if rec is not None:
+                    writer.add(offset, len(line), rec)
+                offset += len(line)
+        finally:
+            writer.close()
+    os.replace(tmp, index_path(log_file))
+    return writer.blocks
+
+
+# --------------------------------------------------------------------------- #
+# Compressed segments
+#
+# A rotated segment is gzipped as a CONCATENATION of gzip members, one per
+# block. The result is an ordinary .gz (gzip, zcat and gzip.open read every
+# member in sequence), but its sidecar also records where each member starts
+# ("co") and how long it is ("cn"), so a filtered read decompresses only the
+# members that can match instead of the whole file. Offsets "o"/"n" keep
+# meaning uncompressed bytes. The header's "source" names the plain file it was
+# made from, so stats can carry that file's already-parsed partial over.
+# --------------------------------------------------------------------------- #
+GZ_SUFFIX = ".gz"
+GZIP_LEVEL = 6
+
+
+def compress_segment(path: str, keys: RecordKeys | None = None, level: int = GZIP_LEVEL) -> str:
+    """Replace the rotated segment ``path`` with ``path.gz`` (and its sidecar).
+
+    Written under temporary names and renamed into place before the plain file
+    is removed, so a reader always finds one complete copy. Keeps the plain
+    file's mtime, which is what age-based retention reads. Without ``keys`` the
+    members are cut by size only and no sidecar is written.
+    """
+    from .stats import parse_line
+
+    dst = path + GZ_SUFFIX
+    tmp = dst + ".tmp"
+    blocks: list[dict[str, Any]] = []
+    with open(path, "rb") as src, open(tmp, "wb") as out:
+        st = os.fstat(src.fileno())
+        block: dict[str, Any] | None = None
+        lines: list[bytes] = []
+
+        def emit() -> None:
+            if block is None:
+                return
+            member = gzip.compress(b"".join(lines), compresslevel=level, mtime=0)
+            blocks.append({**block, "t": sorted(block["t"]), "b": sorted(block["b"]),
+                           "co": out.tell(), "cn": len(member)})
+            out.write(member)
+
+        offset = 0
+        for line in src:
+            rec = parse_line(line) if keys is not None else None
+            day, tool, db = keys(rec) if rec is not None else (None, None, None)  # type: ignore[misc]
+            if rec is None and block is not None:
+                day = block["d"]  # an unparseable line rides along; readers skip it
+            if block is None or block["d"] != day or block["n"] >= BLOCK_BYTES:
+                emit()
+                block = {"o": offset, "n": 0, "r": 0, "d": day, "t": set(), "b": set()}
+                lines = []
+            lines.append(line)
+            block["n"] += len(line)
+            offset += len(line)
+            if rec is not None:
+                block["r"] += 1
+                block["t"].add(tool)
+                if db:
+                    block["b"].add(db)
+        emit()
+    os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+    if keys is not None:
+        header = {**_header(os.stat(tmp), keys.fingerprint),
+                  "source": [st.st_dev, st.st_ino, st.st_size]}
+        with open(index_path(dst) + ".tmp", "wb") as fh:
+            fh.write(_line(header))
+            fh.writelines(_line(b) for b in blocks)
+        os.replace(index_path(dst) + ".tmp", index_path(dst))  # renamed before its file,
+    os.replace(tmp, dst)  # so the .gz never appears without its sidecar
+    for leftover in (path, index_path(path)):
+        try:
+            os.remove(leftover)
+        except FileNotFoundError:
+            pass
+    return dst
+
+
+def compressed_source(gz_path: str, st: os.stat_result) -> tuple[int, int, int] | None:
+    """``(dev, ino, size)`` of the plain file ``gz_path`` (stat'ed as ``st``) was
+    compressed from, per its sidecar; None if unknown."""
+    header = _read_header(index_path(gz_path))
+    if not header or (header.get("dev"), header.get("ino")) != (st.st_dev, st.st_ino):
+        return None
+    source = header.get("source")
+    if not isinstance(source, list) or len(source) != 3:
+        return None
+    return tuple(source)  # type: ignore[return-value]
+
+
+def uncompressed_size(path: str) -> int | None:
+    """Bytes ``path`` reads as once decompressed; None for a .gz segment whose
+    sidecar does not say (a gzip trailer only knows its last member)."""
+    st = os.stat(path)
+    if not path.endswith(GZ_SUFFIX):
+        return st.st_size
+    source = compressed_source(path, st)
+    if source is not None:
+        return source[2]
+    blocks, _ = load_blocks(path, st, "")
+    if blocks and all("co" in b for b in blocks):
+        return int(blocks[-1]["o"]) + int(blocks[-1]["n"])
+    return None
+
+
+def open_log(path: str) -> Any:
+    """Open a log file or compressed segment for binary reading, decompressed."""
+    return gzip.open(path, "rb") if path.endswith(GZ_SUFFIX) else open(path, "rb")
+
+
+# --------------------------------------------------------------------------- #
+# File identity
+#
+# Readers that resume where they stopped (stats, export) key their progress by
+# (device, inode), which follows a file through rotation. But a deleted file's
+# inode is soon handed to a new one, often the next live log, which would then
+# inherit the old file's offset. So progress also carries a MARK: the length
+# and digest of the file's first bytes up to that offset (at most HEAD_BYTES).
+# Those bytes never change in an append-only log, and every record starts with
+# its timestamp, so a file that fails the mark is another file: read it from 0.
+# --------------------------------------------------------------------------- #
+HEAD_BYTES = 4096
+
+
+def file_head(fh: Any, path: str) -> bytes:
+    """The first ``HEAD_BYTES`` the open file ``fh`` reads as, decompressed for
+    a .gz segment, without moving ``fh``."""
+    if not path.endswith(GZ_SUFFIX):
+        return os.pread(fh.fileno(), HEAD_BYTES, 0)
+    pos = fh.tell()
+    try:
+        fh.seek(0)
+        return gzip.GzipFile(fileobj=fh).read(HEAD_BYTES)
+    except (OSError, EOFError):
+        return b""  # matches no mark; the read from 0 reports the damage
+    finally:
+        fh.seek(pos)
+
+
+def head_mark(head: bytes, offset: int) -> str:
+    """The mark of a file whose first bytes are ``head``, read to ``offset``."""
+    data = head[:offset]
+    return f"{len(data)}:{hashlib.blake2b(data, digest_size=8).hexdigest()}"
+
+
+def same_file(head: bytes, mark: str | None) -> bool:
+    """Whether a file starting with ``head`` is the one ``mark`` was taken of.
+    A missing mark (progress saved before marks existed) is trusted."""
+    if not mark:
+        return True
+    n = mark.partition(":")[0]
+    return n.isdigit() and len(head) >= int(n) and head_mark(head, int(n)) == mark
+
+
+# --------------------------------------------------------------------------- #
+# Reading
+# --------------------------------------------------------------------------- #
+def load_blocks(
+    log_file: str, st: os.stat_result, fingerprint: str
+) -> tuple[list[dict[str, Any]], bool]:
+    """Blocks of ``log_file`` (stat'ed as ``st``), sorted by offset, and whether
+    their database lists apply. ``[]`` when there is no usable sidecar."""
+    path = index_path(log_file)
+    try:
+        with open(path, "rb") as fh:
+            lines = fh.read().splitlines()
+    except OSError:
+        return [], False
+    try:
+        header = json_codec.loads(lines[0])
+    except (IndexError, ValueError):
+        return [], False
+    if not isinstance(header, dict) or header.get("index") != INDEX_VERSION or (
+        header.get("dev"), header.get("ino")
+    ) != (st.st_dev, st.st_ino):
+        return [], False
+    blocks = []
+    for raw in lines[1:]:
+        try:
+            b = json_codec.loads(raw)
+            end = int(b["co"]) + int(b["cn"]) if "co" in b else int(b["o"]) + int(b["n"])
+        except (ValueError, TypeError, KeyError):
+            continue  # a torn last line
+        if end > st.st_size:  # the file was truncated under its sidecar
+            return [], False
+        blocks.append(b)
+    blocks.sort(key=lambda b: b["o"])
+    return blocks, header.get("groups") == fingerprint
+
+
+def block_matches(
+    block: dict[str, Any],
+    *,
+    since: str | None,
+    until: str | None,
+    tool: str | None,
+    database: str | None,
+    use_databases: bool = True,
+) -> bool:
+    day = block.get("d")
+    if since or until:
+        if not day or (since and day < since) or (until and day > until):
+            return False
+    if tool and tool not in block.get("t", ()):
+        return False
+    if database and use_databases and database not in block.get("b", ()):
+        return False
+    return True
+
+
+def plan_ranges(
+    blocks: list[dict[str, Any]], size: int, **filters: Any
+) -> list[tuple[int, int]]:
+    """Byte ranges of a file that can hold a match: matching blocks plus every
+    range no block covers. Adjacent ranges are coalesced into one seek."""
+    ranges: list[tuple[int, int]] = []
+
+    def take(a: int, b: int) -> None:
+        if b <= a:
+            return
+        if ranges and ranges[-1][1] == a:
+            ranges[-1] = (ranges[-1][0], b)
+        else:
+            ranges.append((a, b))
+
+    pos = 0
+    for b in blocks:
+        o, n = int(b["o"]), int(b["n"])
+        if o < pos:  # overlapping blocks: not produced by the writer; scan instead
+            continue
+        take(pos, o)
+        if block_matches(b, **filters):
+            take(o, o + n)
+        pos = o + n
+    take(pos, size)
+    return ranges
+
+
+def iter_filtered(
+    paths: Iterable[str],
+    *,
+    since: str | None = None,
+    until: str | None = None,
+    tool: str | None = None,
+    database: str | None = None,
+    keys: RecordKeys | None = None,
+    chunk_bytes: int = 64 * 1024,
+) -> Iterator[bytes]:
+    """Yield, in chunks, the log lines of ``paths`` (in the order given) that
+    fall in ``[since, until]`` (UTC days, inclusive) and match ``tool`` and
+    ``database``."""
+    from .stats import parse_line
+
+    keys = keys or RecordKeys()
+    filters = {"since": since, "until": until, "tool": tool, "database": database}
+    out: list[bytes] = []
+    n_out = 0
+    for path in paths:
+        for line in _candidate_lines(path, keys.fingerprint, filters):
+            rec = parse_line(line)
+            if rec is None:
+                continue
+            day, rec_tool, db = keys(rec)
+            if not block_matches({"d": day, "t": (rec_tool,), "b": (db,)}, **filters):
+                continue
+            out.append(line)
+            n_out += len(line)
+            if n_out >= chunk_bytes:
+                yield b"".join(out)
+                out, n_out = [], 0
+    if out:
+        yield b"".join(out)
+
+
+def _candidate_lines(path: str, fingerprint: str, filters: dict[str, Any]) -> Iterator[bytes]:
+    """Complete lines of one file that the index cannot rule out."""
+    try:
+        fh = open(path, "rb")
+    except OSError:
+        return  # rotated away since the caller listed it
+    with fh:
+        st = os.fstat(fh.fileno())
+        blocks, use_dbs = load_blocks(path, st, fingerprint)
+        if path.endswith(GZ_SUFFIX):
+            if not blocks or any("co" not in b for b in blocks):
+                yield from _complete_lines(gzip.GzipFile(fileobj=fh))
+                return
+            for b in blocks:
+                if block_matches(b, use_databases=use_dbs, **filters):
+                    fh.seek(int(b["co"]))
+                    yield from gzip.decompress(fh.read(int(b["cn"]))).splitlines(keepends=True)
+            return
+        for a, b in plan_ranges(blocks, st.st_size, use_databases=use_dbs, **filters):
+            fh.seek(a)
+            pos = a
+            while pos < b:
+                line = fh.readline()
+                if not line.endswith(b"\n"):
+                    break  # a record still being written
+                pos += len(line)
+                yield line
+
+
+def _complete_lines(fh: Any) -> Iterator[bytes]:
+    for line in fh:
+        if not line.endswith(b"\n"):
+            break
+        yield line
+
+
+def _main(argv: list[str] | None = None) -> int:
+    import argparse
+
+    from .stats import log_paths
+
+    ap = argparse.ArgumentParser(description="Rebuild the tool-call log's sidecar indexes.")
+    ap.add_argument("log_path", nargs="?", default=os.getenv("TOGOMCP_QUERY_LOG", ""),
+                    help="JSONL log path (default: $TOGOMCP_QUERY_LOG)")
+    ap.add_argument("--endpoints", default="", help="endpoints.csv for DB attribution")
+    args = ap.parse_args(argv)
+    if not args.log_path:
+        ap.error("no log path given and TOGOMCP_QUERY_LOG is unset")
+    keys = RecordKeys(args.endpoints or None)
+    for path in log_paths(args.log_path):
+        if path.endswith(GZ_SUFFIX):
+            print(f"{path}: skipped (compressed; indexed when it was written)")
+            continue
+        print(f"{path}: {build_index(path, keys)} blocks")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
@@ -0,0 +1,152 @@
+"""Sampling for the tool-call log under heavy or abusive traffic.
+
+In 2026-08 one scripted client sent 8,415 calls in ten days, and each of them
+paid the full record (argument copy, client info, IP hashing, JSON encoding) and
+took its share of the disk. :class:`LogSampler` decides, BEFORE the record is
+built, whether a finished call is logged, and with what weight:
+
+  * ALWAYS kept, weight 1: errors, SPARQL calls that did not succeed with rows
+    (failures and empty results are what the MIE-trap feed reads), and calls at
+    least ``keep_slow_ms`` slow;
+  * static rules — ``TOGOMCP_LOG_SAMPLE="client:mcp=0.1, tool:get_MIE_file=0.5"``
+    keeps 1 call in 10 from the ``mcp`` client and 1 in 2 ``get_MIE_file``
+    calls (``*=<rate>`` sets a default); where several rules match, the
+    sparsest wins;
+  * an adaptive per-address budget — ``TOGOMCP_LOG_SAMPLE_IP_BUDGET=<n>`` logs
+    the first n calls per minute from one client address in full, the next n at
+    1 in 2, the next at 1 in 3, and so on, so a flood costs a bounded number of
+    records per minute however hard it pushes.
+
+A rate becomes an integer "1 in k", and a record kept with probability 1/k
+carries ``sample_weight: k`` (omitted when k is 1). Summing weights is an
+unbiased estimate of the calls made, which is what :func:`togo_mcp.stats.aggregate`
+does, and integer weights keep every count an integer. k is capped at
+``MAX_WEIGHT``: past that a flood is logged at 1 in 1000 rather than ever more
+sparsely, so it costs a thousandth of its calls in records, and no single
+record stands for more calls than the stats and export can sensibly weigh.
+
+The in-memory views — ``/stats/live`` and ``/metrics`` — still see every call;
+only the log is sampled. With neither variable set there is no sampler at all.
+
+Standard library only.
+"""
+from __future__ import annotations
+
+import math
+import random
+import time
+from typing import Any, Callable, Mapping
+
+DEFAULT_KEEP_SLOW_MS = 5000.0
+WINDOW_S = 60.0
+MAX_WEIGHT = 1000  # the sparsest sampling, whatever the rules and budget ask for
+
+
+def parse_rules(raw: str | None) -> dict[str, int]:
+    """``"client:mcp=0.1, tool:x=0.5, *=1"`` -> ``{"client:mcp": 10, ...}`` (1 in k).
+
+    A malformed entry, or a rate outside (0, 1], is skipped rather than stopping
+    the server.
+    """
+    rules: dict[str, int] = {}
+    for part in (raw or "").split(","):
+        key, sep, value = part.strip().rpartition("=")
+        key = key.strip()
+        if not sep or not key or not (key == "*" or key.startswith(("client:", "tool:"))):
+            continue
+        try:
+            rate = float(value)
+        except ValueError:
+            continue
+        if 0 < rate <= 1:
+            rules[key] = max(1, round(1 / rate))
+    return rules
+
+
+class LogSampler:
+    """Per-call keep/drop decision and weight for the tool-call log."""
+
+    __slots__ = (
+        "rules", "ip_budget", "keep_slow_ms", "_rng", "_clock", "_window_start",
+        "_seen", "kept", "sampled_out",
+    )
+
+    def __init__(
+        self,
+        rules: dict[str, int] | None = None,
+        *,
+        ip_budget: int = 0,
+        keep_slow_ms: float = DEFAULT_KEEP_SLOW_MS,
+        rng: Callable[[], float] = random.random,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rules = rules or {}
+        self.ip_budget = ip_budget
+        self.keep_slow_ms = keep_slow_ms
+        self._rng = rng
+        self._clock = clock
+        self._window_start = clock()
+        self._seen: dict[str, int] = {}  # client address -> calls this minute
+        self.kept = 0  # records kept with a weight above 1
+        self.sampled_out = 0
+
+    def _one_in(self, tool: str, client: str | None, ip: str | None) -> int:
+        k = max(
+            self.rules.get("*", 1),
+            self.rules.get(f"tool:{tool}", 1),
+            self.rules.get(f"client:{client}", 1) if client else 1,
+        )
+        if self.ip_budget:
+            now = self._clock()
+            if now - self._window_start >= WINDOW_S:
+                self._seen.clear()
+                self._window_start = now
+            key = ip or ""
+            n = self._seen[key] = self._seen.get(key, 0) + 1
+            k *= math.ceil(n / self.ip_budget)
+        return min(k, MAX_WEIGHT)
+
+    def weight(
+        self,
+        *,
+        tool: str,
+        client: str | None,
+        ip: str | None,
+        error: bool,
+        elapsed_ms: float,
+        extra: Mapping[str, Any] | None = None,
+    ) -> int:
+        """The finished call's ``sample_weight``, or 0 to leave it out of the log."""
+        k = self._one_in(tool, client, ip)  # counted even when kept regardless
+        if (
+            k == 1
+            or error
+            or elapsed_ms >= self.keep_slow_ms
+            or (extra and (extra.get("sparql_status") != "ok" or not extra.get("n_rows")))
+        ):
+            return 1
+        if self._rng() * k < 1:
+            self.kept += 1
+            return k
+        self.sampled_out += 1
+        return 0
+
+    def counters(self) -> dict[str, int]:
+        return {"sampled_kept": self.kept, "sampled_out": self.sampled_out}
+
+
+def from_env(env: Mapping[str, str]) -> LogSampler | None:
+    """TOGOMCP_LOG_SAMPLE / TOGOMCP_LOG_SAMPLE_IP_BUDGET / TOGOMCP_LOG_KEEP_SLOW_MS;
+    None (log everything) when neither sampling variable is set."""
+    rules = parse_rules(env.get("TOGOMCP_LOG_SAMPLE"))
+    try:
+        ip_budget = max(0, int(env.get("TOGOMCP_LOG_SAMPLE_IP_BUDGET", "") or 0))
+    except ValueError:
+        ip_budget = 0
+    if not rules and not ip_budget:
+        return None
+    try:
+        keep_slow_ms = float(env.get("TOGOMCP_LOG_KEEP_SLOW_MS", "") or DEFAULT_KEEP_SLOW_MS)
+    except ValueError:
+        keep_slow_ms = DEFAULT_KEEP_SLOW_MS
+    return LogSampler(rules, ip_budget=ip_budget, keep_slow_ms=keep_slow_ms)
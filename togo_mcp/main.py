@@ -2,9 +2,6 @@ from .server import *
 from .rdf_portal import *
 from .api_tools import *
 from .chembl import *
-from .togoid import togoid_mcp
-from .ncbi_tools import ncbi_mcp
-from .togovar import togovar_mcp
 import asyncio
 import os
 
@@ -83,6 +80,13 @@ def _kegg_enabled() -> bool:
 
 
 async def setup(*, local: bool = False):
+    # Sub-servers are imported here, not at module top, so importing the package
+    # (the stats/log CLIs, tests) does not build their tool tables. A server
+    # still pays for them before its first tool list.
+    from .togoid import togoid_mcp
+    from .ncbi_tools import ncbi_mcp
+    from .togovar import togovar_mcp
+
     mcp.mount(togoid_mcp, "togoid")
     mcp.mount(ncbi_mcp, "ncbi")
     mcp.mount(togovar_mcp, "togovar")
@@ -0,0 +1,228 @@
+"""In-process metrics served at ``/metrics`` in the Prometheus text format.
+
+The JSONL log and ``/stats`` answer "what happened this month"; nothing answered
+"what is happening now" — current latency, whether the SPARQL pool is queuing,
+which breakers are open. The counters and histograms here are updated on the
+hot path and read by a scrape:
+
+  * ``togomcp_tool_call_duration_seconds{tool,status}`` — every MCP tool call
+    (its ``_count`` is calls by tool and status);
+  * ``togomcp_sparql_duration_seconds{endpoint,sparql_status}`` — execute_sparql,
+    labelled with the endpoint GROUP name (``other`` for a caller-supplied URL,
+    so a caller cannot mint label values);
+  * ``togomcp_sparql_pool_wait_seconds`` — time a query waited for a connection
+    from the shared SPARQL pool;
+  * ``togomcp_sparql_breaker_trips_total{endpoint}`` and the scrape-time gauge
+    ``togomcp_sparql_breaker_open{endpoint}``;
+  * ``togomcp_cache_lookups_total{cache,result}`` — hit/miss per in-memory cache;
+  * ``togomcp_rest_retries_total{host}`` — transient-failure retries of the
+    REST wrappers;
+  * ``togomcp_rate_limit_wait_seconds{api}`` — time a request waited for its
+    slot under a client-side rate limit (KEGG, NCBI); its ``_count`` is the
+    requests started.
+
+An update is a dict lookup plus a list increment (a few microseconds; see
+tests/test_metrics.py). Updates happen on the event loop, so there is no lock:
+a scrape renders a consistent-enough snapshot without stopping the loop.
+
+Standard library only, and no dependency on the Prometheus client: the text
+format is a dozen lines to produce.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Callable, Iterable
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds. Spans a cached local tool (~1 ms) to the 90 s SPARQL ceiling, with
+# extra resolution around the 8 s liveness-probe delay.
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 8.0, 15.0, 30.0, 60.0, 90.0,
+)
+# Pool waits are short by construction (the pool timeout is 5 s).
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Rate-limit waits: one slot is 0.1-0.34 s, and a queue of callers multiplies it.
+RATE_WAIT_BUCKETS = (0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_LE_INF = 'le="+Inf"'
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """A monotonically increasing count per label combination."""
+
+    __slots__ = ("name", "help", "labelnames", "_values")
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_num(value)}"
+
+
+class Histogram:
+    """Observations bucketed by fixed upper bounds, per label combination."""
+
+    __slots__ = ("name", "help", "labelnames", "buckets", "_series")
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [count per bucket ..., count above the last bucket, sum]
+        self._series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return int(sum(series[:-1])) if series else 0
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        names = self.labelnames
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets, series):
+                cumulative += n
+                le = _labels(names, labels, f'le="{_num(bound)}"')
+                yield f"{self.name}_bucket{le} {cumulative}"
+            cumulative += series[-2]
+            yield f"{self.name}_bucket{_labels(names, labels, _LE_INF)} {cumulative}"
+            yield f"{self.name}_sum{_labels(names, labels)} {_num(series[-1])}"
+            yield f"{self.name}_count{_labels(names, labels)} {cumulative}"
+
+
+class Gauge:
+    """A value read at scrape time from ``collect()``: ``(labels, value)`` pairs."""
+
+    __slots__ = ("name", "help", "labelnames", "collect")
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...],
+        collect: Callable[[], Iterable[tuple[tuple[str, ...], float]]],
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.collect = collect
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        for labels, value in sorted(self.collect()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_num(value)}"
+
+
+class Registry:
+    """The metrics one ``/metrics`` scrape renders, in registration order.
+
+    Registering a name again replaces the earlier metric: a module reload re-runs
+    its registrations, and the reloaded module's state is the live one.
+    """
+
+    __slots__ = ("_metrics",)
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Histogram | Gauge] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            try:
+                lines.extend(list(metric.render()))  # all of a metric, or none of it
+            except Exception:  # a broken gauge callback must not break the scrape
+                continue
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+TOOL_CALL_SECONDS = REGISTRY.register(Histogram(
+    "togomcp_tool_call_duration_seconds",
+    "MCP tool call latency by tool and outcome.",
+    ("tool", "status"),
+))
+SPARQL_SECONDS = REGISTRY.register(Histogram(
+    "togomcp_sparql_duration_seconds",
+    "execute_sparql latency by endpoint group and sparql_status.",
+    ("endpoint", "sparql_status"),
+))
+POOL_WAIT_SECONDS = REGISTRY.register(Histogram(
+    "togomcp_sparql_pool_wait_seconds",
+    "Time a SPARQL query waited for a connection from the shared pool.",
+    buckets=POOL_WAIT_BUCKETS,
+))
+BREAKER_TRIPS = REGISTRY.register(Counter(
+    "togomcp_sparql_breaker_trips_total",
+    "Times the circuit breaker opened for an endpoint group.",
+    ("endpoint",),
+))
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "togomcp_cache_lookups_total",
+    "In-memory cache lookups by cache and result (hit/miss).",
+    ("cache", "result"),
+))
+REST_RETRIES = REGISTRY.register(Counter(
+    "togomcp_rest_retries_total",
+    "Transient-failure retries of REST API calls, by host.",
+    ("host",),
+))
+RATE_LIMIT_WAIT_SECONDS = REGISTRY.register(Histogram(
+    "togomcp_rate_limit_wait_seconds",
+    "Time an upstream request waited for its client-side rate-limit slot, by API.",
+    ("api",),
+    buckets=RATE_WAIT_BUCKETS,
+))
+
+
+def cache_lookup(cache: str, hit: bool) -> None:
+    """Count one lookup of the in-memory cache ``cache``."""
+    CACHE_LOOKUPS.inc(cache, "hit" if hit else "miss")
@@ -0,0 +1,160 @@
+"""Compiled MIE bundle: the whole corpus, pre-parsed, in one file.
+
+Parsing ~37 YAML files is the slowest part of anything that loads the full MIE
+corpus (the schema index, trap-candidate dates, the usage-guide catalog, the
+example checker). A bundle stores, per file, the raw text, its parsed structure
+and the sha256 of the bytes it was compiled from; loading it is one unpickle.
+
+The YAML files stay the source of truth. `load_mie_entries` hashes every
+``*.yaml`` on each load — cheap next to parsing — and reuses a bundle entry only
+when its hash still matches, re-parsing just the files that changed, so a stale
+or missing bundle costs speed, never correctness. A bundle whose own checksum
+does not verify is ignored as a whole.
+
+The bundle is trusted like the code beside it: it is written by this module into
+the MIE directory at build time (see the Dockerfile), never fetched. Build it with
+
+    python -m togo_mcp.mie_bundle [MIE_DIR]
+
+Standard library plus PyYAML only, with no package-relative imports, so scripts
+can load this file directly without importing the server.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import pickle
+import sys
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+log = logging.getLogger(__name__)
+
+BUNDLE_FILENAME = ".mie_bundle.pickle"
+# Bumped whenever the pickled layout changes; an older bundle is then ignored.
+BUNDLE_FORMAT = 1
+_MAGIC = b"TOGOMIE" + bytes([BUNDLE_FORMAT])
+_DIGEST_LEN = 32
+
+# libyaml parses ~10x faster; the pure-Python loader is the fallback.
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+class MieEntry:
+    """One MIE file: verbatim text, parsed document, and the sha256 of its bytes."""
+
+    __slots__ = ("name", "sha256", "text", "doc")
+
+    def __init__(self, name: str, sha256: str, text: str, doc: Any) -> None:
+        self.name = name
+        self.sha256 = sha256
+        self.text = text
+        self.doc = doc
+
+    @property
+    def database(self) -> str:
+        return self.name.removesuffix(".yaml")
+
+
+def _parse(name: str, data: bytes, digest: str) -> MieEntry:
+    text = data.decode("utf-8")
+    try:
+        doc = yaml.load(text, Loader=YAML_LOADER)
+    except yaml.YAMLError as exc:
+        log.warning("MIE %s does not parse (%s)", name, exc)
+        doc = None
+    return MieEntry(name, digest, text, doc)
+
+
+def _read_bundle(path: Path) -> dict[str, MieEntry]:
+    """Entries from a bundle file, or {} if it is absent, foreign or corrupt."""
+    try:
+        blob = path.read_bytes()
+    except OSError:
+        return {}
+    body = len(_MAGIC) + _DIGEST_LEN
+    head, digest, payload = blob[:len(_MAGIC)], blob[len(_MAGIC):body], blob[body:]
+    if head != _MAGIC or hashlib.sha256(payload).digest() != digest:
+        log.warning("MIE bundle %s is from another format or corrupt; ignoring it", path)
+        return {}
+    try:
+        rows = pickle.loads(payload)
+    except Exception as exc:  # a verified checksum makes this near-impossible
+        log.warning("MIE bundle %s does not unpickle (%s); ignoring it", path, exc)
+        return {}
+    return {row[0]: MieEntry(*row) for row in rows}
+
+
+def load_mie_entries(mie_dir: str | Path) -> dict[str, MieEntry]:
+    """Every ``*.yaml`` in ``mie_dir`` as {database: MieEntry}, in file-name order.
+
+    Served from the compiled bundle where its per-file hash still matches the
+    bytes on disk; anything else is parsed from the YAML.
+    """
+    mie_dir = Path(mie_dir)
+    try:
+        paths = sorted(mie_dir.glob("*.yaml"))
+    except OSError:
+        return {}
+    compiled = _read_bundle(mie_dir / BUNDLE_FILENAME) if paths else {}
+    out: dict[str, MieEntry] = {}
+    stale = 0
+    for path in paths:
+        try:
+            data = path.read_bytes()
+        except OSError:
+            continue
+        digest = hashlib.sha256(data).hexdigest()
+        entry = compiled.get(path.name)
+        if entry is None or entry.sha256 != digest:
+            stale += 1
+            entry = _parse(path.name, data, digest)
+        out[path.stem] = entry
+    if compiled and stale:
+        log.info("MIE bundle in %s is stale for %d file(s); parsed them from YAML", mie_dir, stale)
+    return out
+
+
+def corpus_fingerprint(entries: dict[str, MieEntry]) -> str | None:
+    """sha256[:12] over sorted '<file>=<sha256(bytes)>' (see server._detect_mie_bundle_version)."""
+    items = sorted(f"{e.name}={e.sha256}" for e in entries.values())
+    if not items:
+        return None
+    return hashlib.sha256("\n".join(items).encode("utf-8")).hexdigest()[:12]
+
+
+def compile_bundle(mie_dir: str | Path, out: str | Path | None = None) -> Path:
+    """Parse every MIE in ``mie_dir`` and write the bundle (default: into mie_dir)."""
+    mie_dir = Path(mie_dir)
+    out = Path(out) if out is not None else mie_dir / BUNDLE_FILENAME
+    rows = []
+    for path in sorted(mie_dir.glob("*.yaml")):
+        data = path.read_bytes()
+        e = _parse(path.name, data, hashlib.sha256(data).hexdigest())
+        rows.append((e.name, e.sha256, e.text, e.doc))
+    payload = pickle.dumps(rows, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp = out.with_name(out.name + ".tmp")
+    tmp.write_bytes(_MAGIC + hashlib.sha256(payload).digest() + payload)
+    tmp.replace(out)  # atomic: a concurrent reader sees the old bundle or the new one
+    return out
+
+
+def _main(argv: list[str] | None = None) -> int:
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Compile the MIE corpus into a fast-loading bundle.")
+    ap.add_argument("mie_dir", nargs="?",
+                    default=str(Path(__file__).parent / "data" / "mie"),
+                    help="MIE directory (default: the bundled corpus)")
+    ap.add_argument("-o", "--out", default=None,
+                    help=f"output path (default: <mie_dir>/{BUNDLE_FILENAME})")
+    args = ap.parse_args(argv)
+    out = compile_bundle(args.mie_dir, args.out)
+    print(f"wrote {out} ({out.stat().st_size:,} bytes)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
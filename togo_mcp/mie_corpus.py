@@ -0,0 +1,277 @@
+"""In-memory MIE corpus with section-level overlays.
+
+``get_MIE_file`` serves the YAML files under MIE_DIR. This module reads each file
+ONCE, keeps the raw text, and can serve a *view* of it with a set of top-level
+sections dropped (``drop:``) or with only a set kept (``keep:``) — an overlay.
+An overlay used to be a full rewritten copy of the corpus on disk (one per
+ablation condition, each served by its own server through TOGOMCP_MIE_DIR); now
+one warm server can serve every condition side by side.
+
+Removal is TEXTUAL, not a YAML round-trip. MIE files use extensive `|` block
+scalars and column-0 comments that a YAML dump would reformat, which would
+contaminate an ablation (the model would see a differently-formatted file, not
+just a missing section). We instead delete the exact line range of the section's
+top-level key — plus the contiguous comment/blank block immediately above it,
+which documents that section — and leave every other byte untouched.
+
+An overlay is written ``drop:<section>,<section>`` or ``keep:<section>,...``.
+The server-wide default comes from TOGOMCP_MIE_OVERLAY; a single HTTP request
+can choose its own with the ``X-TogoMCP-MIE-Overlay`` header, but only on a
+server started with TOGOMCP_MIE_OVERLAY_HEADER=1 (the ablation harness's). Each
+overlay is narrowed to the sections the file actually has before a view is
+built, and views are kept in a bounded LRU, so arbitrary specs cannot grow the
+cache. Texts and parsed documents come from the compiled MIE bundle when it is
+fresh (see :mod:`togo_mcp.mie_bundle`).
+"""
+from __future__ import annotations
+
+import re
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+from .mie_bundle import YAML_LOADER, MieEntry, load_mie_entries
+
+# A column-0 top-level YAML key line, e.g. "schema_info:" or "critical_warnings: |".
+TOP_KEY_RE = re.compile(r"^([A-Za-z_][A-Za-z0-9_]*):(\s|$)")
+
+OVERLAY_MODES = ("drop", "keep")
+
+# Overlay views (texts and parsed documents) kept per corpus, least recently
+# used evicted first. An ablation sweep uses a few dozen.
+VIEW_CACHE_MAX = 256
+
+
+def _top_key(line: str) -> str | None:
+    """Return the top-level key named on `line`, or None if it isn't one."""
+    m = TOP_KEY_RE.match(line)
+    return m.group(1) if m else None
+
+
+def top_level_keys(text: str) -> list[str]:
+    """Top-level keys of MIE `text`, in file order."""
+    return [k for k in (_top_key(line) for line in text.splitlines()) if k]
+
+
+def find_section_span(lines: list[str], section: str) -> tuple[int, int] | None:
+    """Return (start, end) half-open line indices covering `section` in `lines`.
+
+    Convention: the comment/blank block between two sections documents the LOWER
+    (next) section. So the span (a) absorbs the contiguous comment/blank block
+    immediately ABOVE this section's key line — its own docs — and (b) runs up to
+    the next top-level key, then backs off over that key's own leading
+    comment/blank block so it stays attached to the next section. Otherwise
+    removing section A would also strip section B's documentation comment.
+    Returns None if the section is absent.
+    """
+    key_idx = None
+    for i, line in enumerate(lines):
+        if _top_key(line) == section:
+            key_idx = i
+            break
+    if key_idx is None:
+        return None
+
+    # End = next top-level key (or EOF).
+    end = len(lines)
+    for j in range(key_idx + 1, len(lines)):
+        if _top_key(lines[j]) is not None:
+            end = j
+            break
+
+    # Back the end off over the next section's leading comment/blank block,
+    # leaving it attached to that section (never crossing back into our own key).
+    while end - 1 > key_idx:
+        prev = lines[end - 1]
+        if prev.strip() == "" or prev.lstrip().startswith("#"):
+            end -= 1
+        else:
+            break
+
+    # Absorb the contiguous comment/blank block directly above our key line.
+    start = key_idx
+    while start - 1 >= 0:
+        prev = lines[start - 1]
+        if prev.strip() == "" or prev.lstrip().startswith("#"):
+            start -= 1
+        else:
+            break
+    return start, end
+
+
+def strip_section(text: str, section: str) -> tuple[str, bool]:
+    """Remove `section` from MIE `text`. Returns (new_text, removed?)."""
+    lines = text.splitlines(keepends=True)
+    span = find_section_span(lines, section)
+    if span is None:
+        return text, False
+    start, end = span
+    new_lines = lines[:start] + lines[end:]
+    return "".join(new_lines), True
+
+
+def strip_sections(text: str, sections: list[str]) -> tuple[str, list[str]]:
+    """Remove every section in `sections`. Returns (new_text, sections actually removed).
+
+    Applied one at a time: each strip re-scans the shrunken text, so the spans stay
+    correct as earlier removals shift line numbers.
+    """
+    removed: list[str] = []
+    for s in sections:
+        text, did = strip_section(text, s)
+        if did:
+            removed.append(s)
+    return text, removed
+
+
+class MieOverlay:
+    """A drop/keep selection of top-level MIE sections. Immutable and hashable."""
+
+    __slots__ = ("mode", "sections")
+
+    def __init__(self, mode: str, sections: frozenset[str]) -> None:
+        if mode not in OVERLAY_MODES:
+            raise ValueError(f"MIE overlay mode must be one of {OVERLAY_MODES}, got {mode!r}")
+        self.mode = mode
+        self.sections = sections
+
+    @property
+    def key(self) -> str:
+        """Canonical spelling; equal overlays have equal keys."""
+        return f"{self.mode}:{','.join(sorted(self.sections))}"
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, MieOverlay) and other.key == self.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __repr__(self) -> str:
+        return f"MieOverlay({self.key!r})"
+
+    def narrowed(self, keys: list[str]) -> MieOverlay | None:
+        """This overlay restricted to the top-level ``keys`` a file has; None
+        when it would leave the file unchanged. Unknown section names are
+        ignored, so specs that differ only in them share one view."""
+        present = self.sections.intersection(keys)
+        if self.mode == "drop":
+            return MieOverlay("drop", present) if present else None
+        return None if present.issuperset(keys) else MieOverlay("keep", present)
+
+    def apply(self, text: str) -> str:
+        """`text` with the overlay's sections removed (drop) or all others removed (keep)."""
+        if self.mode == "drop":
+            doomed = [s for s in top_level_keys(text) if s in self.sections]
+        else:
+            doomed = [s for s in top_level_keys(text) if s not in self.sections]
+        return strip_sections(text, doomed)[0]
+
+
+def parse_overlay(spec: str | None) -> MieOverlay | None:
+    """Parse ``drop:a,b`` / ``keep:a,b``. Empty or None means no overlay.
+
+    Raises ValueError on a malformed spec, so a typo fails loudly instead of
+    quietly serving the full corpus to a condition that meant to ablate it.
+    """
+    spec = (spec or "").strip()
+    if not spec:
+        return None
+    mode, sep, rest = spec.partition(":")
+    sections = frozenset(s.strip() for s in rest.split(",") if s.strip())
+    if not sep or not sections:
+        raise ValueError(
+            f"Malformed MIE overlay {spec!r}: expected 'drop:<section>,...' or "
+            "'keep:<section>,...'."
+        )
+    return MieOverlay(mode.strip().lower(), sections)
+
+
+class MieCorpus:
+    """MIE texts under one directory, loaded once, with memoized overlay views.
+
+    The first access loads the whole directory through the compiled bundle
+    (:mod:`togo_mcp.mie_bundle`), so texts AND parsed documents come from one
+    unpickle when the bundle is fresh. Up to ``VIEW_CACHE_MAX`` overlay views
+    are memoized, keyed by the overlay as narrowed to the file's sections.
+    """
+
+    def __init__(self, mie_dir: str | Path) -> None:
+        self.mie_dir = Path(mie_dir)
+        self._entries: dict[str, MieEntry] | None = None
+        self._late: dict[str, str] = {}
+        self._views: OrderedDict[tuple[str, MieOverlay], str] = OrderedDict()
+        self._docs: OrderedDict[tuple[str, MieOverlay | None], Any] = OrderedDict()
+
+    def _loaded(self) -> dict[str, MieEntry]:
+        if self._entries is None:
+            self._entries = load_mie_entries(self.mie_dir)
+        return self._entries
+
+    def raw(self, database: str) -> str | None:
+        """Verbatim text of ``<database>.yaml``, or None when there is no such file.
+
+        A file added after the first load is read on demand; a missing one is not
+        cached, so it is picked up once it appears.
+        """
+        entry = self._loaded().get(database)
+        if entry is not None:
+            return entry.text
+        text = self._late.get(database)
+        if text is None:
+            path = self.mie_dir / f"{database}.yaml"
+            # the name comes from a tool argument: never resolve outside mie_dir
+            if path.parent != self.mie_dir or not path.is_file():
+                return None
+            text = self._late[database] = path.read_text(encoding="utf-8")
+        return text
+
+    def _narrowed(self, database: str, overlay: MieOverlay | None) -> MieOverlay | None:
+        raw = self.raw(database)
+        if raw is None or overlay is None:
+            return None
+        return overlay.narrowed(top_level_keys(raw))
+
+    def text(self, database: str, overlay: MieOverlay | None = None) -> str | None:
+        """The MIE text as seen through ``overlay`` (verbatim when None)."""
+        overlay = self._narrowed(database, overlay)
+        if overlay is None:
+            return self.raw(database)
+        key = (database, overlay)
+        view = self._views.get(key)
+        if view is None:
+            view = overlay.apply(self.raw(database) or "")
+        _remember(self._views, key, view)
+        return view
+
+    def doc(self, database: str, overlay: MieOverlay | None = None) -> Any:
+        """Parsed form of :meth:`text` — from the bundle when there is no overlay.
+
+        None when the file is missing or does not parse.
+        """
+        overlay = self._narrowed(database, overlay)
+        entry = self._loaded().get(database)
+        if overlay is None and entry is not None:
+            return entry.doc
+        key = (database, overlay)
+        if key in self._docs:
+            doc = self._docs[key]
+        else:
+            text = self.text(database, overlay)
+            if text is None:
+                return None  # not cached: the file may appear later
+            try:
+                doc = yaml.load(text, Loader=YAML_LOADER)
+            except yaml.YAMLError:
+                doc = None
+        _remember(self._docs, key, doc)
+        return doc
+
+
+def _remember(cache: OrderedDict, key: Any, value: Any) -> None:
+    """Store ``key`` as the most recently used entry, evicting past ``VIEW_CACHE_MAX``."""
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > VIEW_CACHE_MAX:
+        cache.popitem(last=False)
@@ -12,20 +12,29 @@ Provides keyword search functionality for NCBI databases using the esearch API:
 - PubChem Substance (pcsubstance)
 - PubChem BioAssay (pcassay)
 
-Requires NCBI_API_KEY environment variable for optimal rate limits (10 req/sec vs 3 req/sec).
+Requires NCBI_API_KEY environment variable for optimal rate limits (10 req/sec vs 3 req/sec;
+TOGOMCP_NCBI_RATE adjusts the keyed rate).
 """
 
 import asyncio
+import atexit
+import json
 import logging
 import os
 import re
-from typing import Any
+import time
+from collections import OrderedDict
+from typing import Any, Mapping
 
 from fastmcp import FastMCP
+from fastmcp.tools import ToolResult
 import httpx
 from mcp.types import TextContent
 
-from .server import READ_ONLY_TOOL, raise_for_status_with_body
+from . import json_codec as _json_codec
+from . import metrics as _metrics
+from . import tracing as _tracing
+from .server import READ_ONLY_TOOL, LazyAsyncClient, prerender, raise_for_status_with_body
 
 # Get API key from environment
 NCBI_API_KEY = os.environ.get("NCBI_API_KEY")
@@ -36,13 +45,102 @@ if not NCBI_EMAIL:
         "NCBI_EMAIL not set. Using default: %s", NCBI_EMAIL
     )
 
-# Rate limiting
-RATE_LIMIT_DELAY = 0.1 if NCBI_API_KEY else 0.34  # 10/sec with key, 3/sec without
+# --------------------------------------------------------------------------- #
+# Rate limiting — process-wide, not per-tool.
+#
+# NCBI allows 3 requests/second per address without an API key and 10 with one
+# (more by arrangement: TOGOMCP_NCBI_RATE raises it, but only with a key). The
+# limit governs request STARTS, so the bucket below spaces starts and lets the
+# requests themselves overlap on the wire, as kegg._throttle does. The old
+# Semaphore(1) held the slot for the whole round trip, so throughput was
+# 1/(delay + latency): about 1.5 requests/second keyless against a 300 ms
+# esummary, half the allowance. `scripts/bench_ncbi.py` compares the two.
+#
+# The bucket holds ONE token. A larger burst would let a refilled bucket fire
+# back-to-back starts, and NCBI counts per second: no one-second window may see
+# more than the rate. Starts are spaced 2% wider than 1/rate (0.34 s keyless, as
+# before) so that timer and network jitter cannot squeeze rate+1 of them into a
+# second.
+# --------------------------------------------------------------------------- #
+_SPACING_MARGIN = 1.02
+
+
+def _configured_rate(env: Mapping[str, str], has_key: bool) -> float:
+    """Requests/second: TOGOMCP_NCBI_RATE with a key (default 10), else 3."""
+    if not has_key:
+        return 3.0
+    try:
+        rate = float(env.get("TOGOMCP_NCBI_RATE", "") or 10.0)
+    except ValueError:
+        rate = 10.0
+    return rate if rate > 0 else 10.0
+
+
+class _TokenBucket:
+    """A one-token bucket refilled every ``_SPACING_MARGIN / rate`` seconds.
+
+    Only the wait for the token is serialized; the request that follows is not,
+    so a slow response never delays the next start.
+    """
+
+    __slots__ = ("rate", "interval", "_next", "_lock")
+
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        self.interval = _SPACING_MARGIN / rate
+        self._next = 0.0  # monotonic time the next token is available
+        self._lock = asyncio.Lock()  # FIFO: waiters start in arrival order
+
+    async def acquire(self) -> float:
+        """Take the token, waiting for it if needed; returns the seconds waited."""
+        start = time.monotonic()
+        async with self._lock:
+            # Re-check after sleeping: the loop may wake a timer slightly early.
+            while (wait := self._next - time.monotonic()) > 0:
+                await asyncio.sleep(wait)
+            self._next = time.monotonic() + self.interval
+        return time.monotonic() - start
+
+
+NCBI_RATE = _configured_rate(os.environ, bool(NCBI_API_KEY))
+_bucket = _TokenBucket(NCBI_RATE)
+
+
+async def _throttle() -> None:
+    # Build the client BEFORE taking a token: building it after would delay the
+    # first request behind the second one's slot, and squeeze the two together.
+    _client.unwrap()
+    with _tracing.span("rate_limit_wait", api="ncbi"):
+        waited = await _bucket.acquire()
+    _metrics.RATE_LIMIT_WAIT_SECONDS.observe(waited, "ncbi")
 
 ncbi_mcp = FastMCP("NCBI API server")
 
-# Semaphore to serialize NCBI API requests and enforce rate limiting
-_ncbi_rate_limiter = asyncio.Semaphore(1)
+# One pooled, keep-alive client for every E-utilities call. A client per call
+# paid DNS, TCP and TLS setup to eutils.ncbi.nlm.nih.gov on every request, and
+# paid it INSIDE the serialized rate-limit section, so handshake time came
+# straight off the request rate. `scripts/bench_ncbi.py` measures the difference
+# against a local stand-in. Keep-alive outlives the 0.1-0.34 s spacing of calls.
+EUTILS_BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+_client = LazyAsyncClient(
+    base_url=EUTILS_BASE_URL,
+    timeout=30.0,
+    limits=httpx.Limits(max_connections=10, max_keepalive_connections=10, keepalive_expiry=30.0),
+)
+
+
+def _close_client():
+    """Close the shared httpx client on interpreter shutdown."""
+    try:
+        loop = asyncio.get_running_loop()
+        loop.create_task(_client.aclose())
+    except RuntimeError:
+        # No running loop: the loop that owned the sockets is already closed;
+        # the OS reclaims them (see kegg._close_client).
+        pass
+
+
+atexit.register(_close_client)
 
 
 class NCBISearchError(Exception):
@@ -202,6 +300,7 @@ async def _ncbi_esearch_api(
     retstart: int = 0,
     sort: str | None = None,
     field: str | None = None,
+    usehistory: bool = False,
 ) -> dict[str, Any]:
     """
     Core function to query NCBI E-utilities esearch API.
@@ -213,24 +312,21 @@ async def _ncbi_esearch_api(
         retstart: Starting index for pagination
         sort: Sort order (database-specific)
         field: Specific field to search in
+        usehistory: Keep the result set on NCBI's history server (WebEnv)
 
     Returns:
         Parsed JSON response from NCBI
     """
-    base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
-
     params = {
-        "db": db,
+        **_base_params(db),
         "term": term,
         "retmax": retmax,
         "retstart": retstart,
         "retmode": "json",
-        "tool": "TogoMCP",
-        "email": NCBI_EMAIL,
     }
 
-    if NCBI_API_KEY:
-        params["api_key"] = NCBI_API_KEY
+    if usehistory:
+        params["usehistory"] = "y"
 
     if sort:
         params["sort"] = sort
@@ -238,33 +334,29 @@ async def _ncbi_esearch_api(
     if field:
         params["field"] = field
 
-    async with _ncbi_rate_limiter:
-        await asyncio.sleep(RATE_LIMIT_DELAY)
-
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.get(base_url, params=params)
-                raise_for_status_with_body(
-                    response,
-                    context="NCBI esearch",
-                    client_error_hint=(
-                        "Verify db (e.g. gene, pubmed, clinvar) and term syntax. "
-                        "Use field tags like nifH[Gene Name] AND Archaea[Organism] "
-                        "for precision."
-                    ),
-                )
-                data = response.json()
+    try:
+        response = await _eutils_request(
+            "/esearch.fcgi",
+            params,
+            context="NCBI esearch",
+            hint=(
+                "Verify db (e.g. gene, pubmed, clinvar) and term syntax. "
+                "Use field tags like nifH[Gene Name] AND Archaea[Organism] "
+                "for precision."
+            ),
+        )
+        data = _json_codec.loads(response.content)
 
-                # Check for errors in NCBI response
-                if "error" in data:
-                    raise NCBISearchError(f"NCBI API error: {data['error']}")
+        # Check for errors in NCBI response
+        if "error" in data:
+            raise NCBISearchError(f"NCBI API error: {data['error']}")
 
-                return data
+        return data
 
-            except httpx.HTTPError as e:
-                raise NCBISearchError(f"HTTP error occurred: {str(e)}")
-            except Exception as e:
-                raise NCBISearchError(f"Error querying NCBI: {str(e)}")
+    except httpx.HTTPError as e:
+        raise NCBISearchError(f"HTTP error occurred: {str(e)}")
+    except Exception as e:
+        raise NCBISearchError(f"Error querying NCBI: {str(e)}")
 
 
 def _format_esearch_result(
@@ -295,6 +387,14 @@ Returned: {len(ids)} (showing {retstart}-{int(retstart) + len(ids)})
 {id_label}: {", ".join(ids)}
 """
 
+    handle = _history_handle(data)
+    if handle:
+        result += (
+            f'\nResult-set handle: history="{handle}"\n'
+            "Pass it to ncbi_esummary / ncbi_efetch (with retstart/retmax) instead of "
+            "copying IDs; all results stay on NCBI's history server.\n"
+        )
+
     if esearch_result.get("warninglist"):
         result += f"\nWarnings: {esearch_result['warninglist']}"
 
@@ -338,6 +438,437 @@ def _normalize_ids(ids: str | list[str]) -> list[str]:
     return [str(i).strip() for i in ids if str(i).strip()]
 
 
+def _base_params(db: str) -> dict[str, Any]:
+    """The parameters every E-utilities request carries."""
+    params: dict[str, Any] = {"db": db, "tool": "TogoMCP", "email": NCBI_EMAIL}
+    if NCBI_API_KEY:
+        params["api_key"] = NCBI_API_KEY
+    return params
+
+
+async def _eutils_request(
+    path: str, params: dict[str, Any], *, context: str, hint: str, throttle: bool = True
+) -> httpx.Response:
+    """One rate-limited E-utilities request; raises on an HTTP error status.
+
+    A GET, unless the `id` list is long enough to strain the URL: then the
+    parameters go in a form-encoded POST body, as NCBI asks for large lists.
+    ``throttle=False`` is for a caller that already holds the token.
+    """
+    if throttle:
+        await _throttle()
+    if len(str(params.get("id", ""))) > _POST_ABOVE:
+        response = await _client.post(path, data=params)
+    else:
+        response = await _client.get(path, params=params)
+    raise_for_status_with_body(response, context=context, client_error_hint=hint)
+    return response
+
+
+# --------------------------------------------------------------------------- #
+# ID-list chunking
+#
+# esummary/efetch used to join every ID into one GET: a few hundred IDs broke
+# the URL, and a few thousand timed out or came back as one response too big to
+# hold. Now an ID list is split into chunks (_ID_CHUNK, smaller for databases
+# whose records are large), each sent as its own request (POSTed once the `id`
+# parameter passes _POST_ABOVE characters). The chunks go through the rate
+# limiter like any other request, so they overlap on the wire at the allowed
+# rate, and are concatenated in request order. A chunk that fails does not fail
+# the call: its IDs are reported as missing next to the records that did come
+# back. Only when every chunk fails is the call an error.
+# --------------------------------------------------------------------------- #
+_ID_CHUNK = 200
+_ID_CHUNK_BY_DB = {"nuccore": 100, "nucleotide": 100, "protein": 100, "sra": 50}
+_POST_ABOVE = 1000
+
+
+def _id_chunks(db: str, id_list: list[str]) -> list[list[str]]:
+    """``id_list`` in request-sized chunks for ``db``."""
+    size = _ID_CHUNK_BY_DB.get(db, _ID_CHUNK)
+    return [id_list[i:i + size] for i in range(0, len(id_list), size)]
+
+
+async def _fetch_id_chunks(
+    path: str,
+    params: dict[str, Any],
+    chunks: list[list[str]],
+    *,
+    context: str,
+    hint: str,
+    prepaid: bool = False,
+) -> list[httpx.Response | Exception]:
+    """One request per chunk, in order; a failed chunk is its exception.
+
+    ``prepaid``: the caller already took the token the first chunk spends.
+    """
+    return list(await asyncio.gather(
+        *(
+            _eutils_request(
+                path, {**params, "id": ",".join(chunk)},
+                context=context, hint=hint, throttle=not (prepaid and i == 0),
+            )
+            for i, chunk in enumerate(chunks)
+        ),
+        return_exceptions=True,
+    ))
+
+
+def _chunk_failures(
+    chunks: list[list[str]], results: list[httpx.Response | Exception]
+) -> list[dict[str, Any]]:
+    """``{"ids": [...], "error": "..."}`` for each chunk that failed.
+
+    Raises the first failure when every chunk failed: nothing came back, so
+    the call itself is the error.
+    """
+    failures = [
+        {"ids": chunk, "error": str(result)}
+        for chunk, result in zip(chunks, results)
+        if isinstance(result, Exception)
+    ]
+    if failures and len(failures) == len(results):
+        raise next(r for r in results if isinstance(r, Exception))
+    return failures
+
+
+def _chunk_failure_note(failures: list[dict[str, Any]], total: int) -> str:
+    """Plain-text trailer naming the IDs a partial efetch is missing."""
+    lines = [f"Warning: {len(failures)} of {total} ID chunks failed; these records are missing:"]
+    lines += [f"  {', '.join(f['ids'])}: {f['error']}" for f in failures]
+    return "\n".join(lines) + "\n"
+
+
+# --------------------------------------------------------------------------- #
+# Per-record esummary cache
+#
+# Agents summarize overlapping ID sets turn after turn (the same gene IDs, then
+# those plus a few more), and every call used to re-fetch every ID against the
+# 3/s budget. Summary records are now kept per (db, uid): for
+# TOGOMCP_NCBI_CACHE_TTL seconds (default 3600; 0 turns the cache off) and
+# within TOGOMCP_NCBI_CACHE_MB of encoded JSON (default 32), least recently
+# used evicted first. esummary serves what it can from here, fetches only the
+# missing IDs (one request, unless there are enough to chunk) and answers in
+# request order. Records are cached under the uid NCBI returns them by; an
+# accession looked up on a sequence database comes back under its GI, so only
+# the GI hits later. Error stubs for unknown IDs are never cached.
+# --------------------------------------------------------------------------- #
+def _configured_cache(env: Mapping[str, str]) -> tuple[float, int]:
+    """(TTL seconds, byte bound) from TOGOMCP_NCBI_CACHE_TTL / TOGOMCP_NCBI_CACHE_MB."""
+
+    def number(name: str, default: float) -> float:
+        try:
+            value = float(env.get(name, "") or default)
+        except ValueError:
+            return default
+        return value if value >= 0 else default
+
+    ttl = number("TOGOMCP_NCBI_CACHE_TTL", 3600.0)
+    return ttl, int(number("TOGOMCP_NCBI_CACHE_MB", 32.0) * 1024 * 1024)
+
+
+class _SummaryCache:
+    """(db, uid) -> esummary record, bounded by age and by encoded size (LRU)."""
+
+    __slots__ = ("ttl", "max_bytes", "nbytes", "_entries")
+
+    def __init__(self, ttl: float, max_bytes: int) -> None:
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries: OrderedDict[tuple[str, str], tuple[float, int, dict[str, Any]]] = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, db: str, uid: str) -> dict[str, Any] | None:
+        if self.ttl <= 0:
+            return None
+        key = (db, uid)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            self._drop(key)
+            entry = None
+        _metrics.cache_lookup("ncbi_summary", entry is not None)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[2]
+
+    def put(self, db: str, uid: str, record: dict[str, Any]) -> None:
+        if self.ttl <= 0:
+            return
+        size = len(_json_codec.dumps_bytes(record))
+        if size > self.max_bytes:
+            return
+        key = (db, uid)
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (time.monotonic() + self.ttl, size, record)
+        self.nbytes += size
+        while self.nbytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+
+    def remember(self, db: str, data: dict[str, Any]) -> None:
+        """Cache every good record of an esummary response."""
+        result = data.get("result") or {}
+        for uid in result.get("uids") or []:
+            record = result.get(uid)
+            if isinstance(record, dict) and "error" not in record:
+                self.put(db, str(uid), record)
+
+    def _drop(self, key: tuple[str, str]) -> None:
+        self.nbytes -= self._entries.pop(key)[1]
+
+
+_summary_cache = _SummaryCache(*_configured_cache(os.environ))
+
+
+# --------------------------------------------------------------------------- #
+# Coalescing concurrent esummary calls
+#
+# Many sessions each summarizing a few IDs of the same database used to cost
+# one rate-limited request apiece, each queued behind the others for a token.
+# Now the first caller opens a batch for its parameters (db and the rest, minus
+# `id`); callers arriving while it waits _BATCH_WINDOW seconds and then for its
+# rate-limit token join it. With the token in hand the batch takes every ID
+# collected so far, sends one request (more only if they need chunking), and
+# hands each caller its own records. The request rate is unchanged; each
+# request just carries more callers. Only numeric UIDs are coalesced, since
+# NCBI answers those under the same uid; an accession may come back under a GI
+# that could not be traced to its caller. A caller whose IDs all fell in failed
+# chunks gets the error, as it would have alone.
+# --------------------------------------------------------------------------- #
+_BATCH_WINDOW = 0.005
+
+
+class _SummaryBatcher:
+    """DataLoader-style merging of concurrent esummary ID lookups."""
+
+    __slots__ = ("window", "_pending", "_tasks")
+
+    def __init__(self, window: float) -> None:
+        self.window = window
+        self._pending: dict[
+            tuple[tuple[str, str], ...], list[tuple[list[str], asyncio.Future]]
+        ] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    @staticmethod
+    def accepts(ids: list[str]) -> bool:
+        return all(uid.isdigit() for uid in ids)
+
+    async def load(
+        self, params: dict[str, Any], ids: list[str], *, context: str, hint: str
+    ) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+        """This caller's esummary response and chunk failures, fetched in a shared batch."""
+        loop = asyncio.get_running_loop()
+        key = tuple(sorted((k, str(v)) for k, v in params.items() if k != "id"))
+        waiting = self._pending.get(key)
+        if waiting is None:
+            waiting = self._pending[key] = []
+            task = loop.create_task(self._flush(key, params, context, hint))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        future = loop.create_future()
+        waiting.append((ids, future))
+        return await future
+
+    async def _flush(
+        self, key: tuple[tuple[str, str], ...], params: dict[str, Any], context: str, hint: str
+    ) -> None:
+        waiting: list[tuple[list[str], asyncio.Future]] = []
+        try:
+            await asyncio.sleep(self.window)
+            await _throttle()  # the batch keeps filling while this waits
+            waiting = self._pending.pop(key)
+            ids = list(dict.fromkeys(uid for caller_ids, _ in waiting for uid in caller_ids))
+            chunks = _id_chunks(params["db"], ids)
+            try:
+                results = await _fetch_id_chunks(
+                    "/esummary.fcgi", params, chunks, context=context, hint=hint, prepaid=True
+                )
+                pages = [
+                    _json_codec.loads(r.content)
+                    for r in results
+                    if not isinstance(r, Exception)
+                ]
+            except Exception as e:
+                for _, future in waiting:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            failed = {
+                uid: result
+                for chunk, result in zip(chunks, results)
+                if isinstance(result, Exception)
+                for uid in chunk
+            }
+            data = pages[0] if len(pages) == 1 else _merge_summaries(pages)
+            for caller_ids, future in waiting:
+                if future.done():
+                    continue
+                try:
+                    future.set_result(_batch_slice(data, caller_ids, failed))
+                except Exception as e:
+                    future.set_exception(e)
+        finally:
+            for _, future in waiting or self._pending.pop(key, []):
+                if not future.done():
+                    future.cancel()
+
+
+def _batch_slice(
+    data: dict[str, Any], ids: list[str], failed: dict[str, Exception]
+) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    """One caller's share of a batch: its records in its order, its failed chunks.
+
+    Raises the failure when none of its IDs came back.
+    """
+    mine = list(dict.fromkeys(ids))
+    lost = [uid for uid in mine if uid in failed]
+    if lost and len(lost) == len(mine):
+        raise failed[lost[0]]
+    fetched = data.get("result") or {}
+    returned = set(fetched.get("uids") or [])
+    result: dict[str, Any] = {"uids": [uid for uid in mine if uid in returned]}
+    result.update((uid, fetched[uid]) for uid in result["uids"] if uid in fetched)
+    failures: dict[int, dict[str, Any]] = {}
+    for uid in lost:
+        error = failed[uid]
+        failures.setdefault(id(error), {"ids": [], "error": str(error)})["ids"].append(uid)
+    return {**data, "result": result}, list(failures.values())
+
+
+_summary_batcher = _SummaryBatcher(_BATCH_WINDOW)
+
+
+# The header every esummary JSON response opens with. A response served
+# wholly from the cache has no fetch to take it from, so it gets this one and
+# looks the same as a fetched response.
+_SUMMARY_HEADER = {"type": "esummary", "version": "0.3"}
+
+
+def _with_cached(
+    data: dict[str, Any], id_list: list[str], cached: dict[str, dict[str, Any]]
+) -> dict[str, Any]:
+    """``data`` (the fetched part, if any) plus ``cached`` records, in request order.
+
+    Fetched records NCBI returned under a uid other than the one asked for
+    (accession -> GI) follow, in the order NCBI gave them. The fetched
+    ``header`` is kept; without one, ``_SUMMARY_HEADER`` stands in.
+    """
+    fetched = data.get("result") or {}
+    uids = [u for u in dict.fromkeys(id_list) if u in cached or u in fetched]
+    seen = set(uids)
+    uids += [u for u in fetched.get("uids") or [] if u not in seen]
+    result: dict[str, Any] = {"uids": uids}
+    for uid in uids:
+        result[uid] = cached[uid] if uid in cached else fetched[uid]
+    return {"header": dict(_SUMMARY_HEADER), **data, "result": result}
+
+
+# --------------------------------------------------------------------------- #
+# History server (usehistory / WebEnv)
+#
+# To summarize 3,000 search hits an agent used to copy the IDs out of
+# ncbi_esearch and paste them into ncbi_esummary: the list crossed the model
+# twice, and past a few hundred IDs the GET broke on URL length. NCBI can keep
+# the result set instead. esearch(use_history=True) leaves it on the history
+# server and returns a handle, "<query_key>:<WebEnv>", that esummary and efetch
+# take in place of `ids`, with a retstart/retmax window. A window wider than
+# _HISTORY_BATCH is fetched as several requests, spaced by the rate limiter and
+# overlapping on the wire, and stitched back into one answer in order. NCBI
+# drops an idle WebEnv after a while; an expired handle is reported as such,
+# with the remedy (search again).
+# --------------------------------------------------------------------------- #
+_HISTORY_BATCH = 500
+_HISTORY_MAX = 10_000
+_HISTORY_HANDLE = re.compile(r"^\s*(\d+)\s*:\s*([A-Za-z0-9_.\-]+)\s*$")
+
+
+def _history_handle(data: dict[str, Any]) -> str | None:
+    """"<query_key>:<WebEnv>" from an esearch response, if it has one."""
+    result = data.get("esearchresult", {})
+    if result.get("webenv") and result.get("querykey"):
+        return f"{result['querykey']}:{result['webenv']}"
+    return None
+
+
+def _id_or_history_params(id_list: list[str], history: str) -> dict[str, Any] | str:
+    """The `id` or `query_key`/`WebEnv` parameters, or an "Error: ..." message."""
+    if id_list and history:
+        return "Error: Pass either `ids` or `history`, not both."
+    if history:
+        match = _HISTORY_HANDLE.match(history)
+        if not match:
+            return (
+                f"Error: `history` must be the handle ncbi_esearch(use_history=True) "
+                f'returned, "<query_key>:<WebEnv>"; got {history!r}.'
+            )
+        return {"query_key": match.group(1), "WebEnv": match.group(2)}
+    if not id_list:
+        return "Error: `ids` must not be empty (or pass a `history` handle)."
+    return {"id": ",".join(id_list)}
+
+
+def _history_windows(retstart: int, retmax: int) -> list[tuple[int, int]]:
+    """(retstart, retmax) of each batch covering the requested window."""
+    start = max(0, retstart)
+    end = start + max(0, min(retmax, _HISTORY_MAX))
+    return [(s, min(_HISTORY_BATCH, end - s)) for s in range(start, end, _HISTORY_BATCH)]
+
+
+async def _fetch_history_windows(
+    path: str, params: dict[str, Any], retstart: int, retmax: int, *, context: str, hint: str
+) -> list[httpx.Response]:
+    """Every batch of a history window, in order."""
+    return list(await asyncio.gather(*(
+        _eutils_request(path, {**params, "retstart": s, "retmax": n}, context=context, hint=hint)
+        for s, n in _history_windows(retstart, retmax)
+    )))
+
+
+def _merge_summaries(pages: list[dict[str, Any]]) -> dict[str, Any]:
+    """esummary JSON pages as one response: uids in page order, records merged."""
+    if not pages:
+        return {"header": dict(_SUMMARY_HEADER), "result": {"uids": []}}
+    merged = dict(pages[0])
+    result: dict[str, Any] = {"uids": []}
+    for page in pages:
+        part = page.get("result") or {}
+        result["uids"].extend(part.get("uids") or [])
+        result.update((k, v) for k, v in part.items() if k != "uids")
+    merged["result"] = result
+    return merged
+
+
+def _history_error(data: dict[str, Any]) -> str | None:
+    """NCBI's complaint about a history handle in an esummary response, if any."""
+    if data.get("error"):
+        return str(data["error"])
+    messages = data.get("esummaryresult")
+    if isinstance(messages, list) and messages:
+        return "; ".join(str(m) for m in messages)
+    return None
+
+
+def _history_error_text(text: str) -> str | None:
+    """The <ERROR> of an efetch response that could not read the history."""
+    match = re.search(r"<ERROR>(.*?)</ERROR>", text[:2000], re.S)
+    return match.group(1).strip() if match else None
+
+
+def _expired_history_message(detail: str) -> str:
+    return (
+        f"Error: NCBI could not read the `history` result set ({detail}). "
+        "Handles expire after a period of inactivity; run ncbi_esearch with "
+        "use_history=True again for a fresh one."
+    )
+
+
 @ncbi_mcp.tool(annotations=READ_ONLY_TOOL)
 async def esearch(
     database: str = "",
@@ -348,6 +879,7 @@ async def esearch(
     search_field: str | None = None,
     db: str = "",
     term: str = "",
+    use_history: bool = False,
 ) -> list[TextContent]:
     """
     Search NCBI databases using E-utilities esearch API.
@@ -392,6 +924,10 @@ async def esearch(
         search_field: Optional specific field to search in
         db: Alias for `database`.
         term: Alias for `query`.
+        use_history: Also keep the WHOLE result set on NCBI's history server
+            and return a handle, history="<query_key>:<WebEnv>". Pass that to
+            ncbi_esummary / ncbi_efetch with retstart/retmax to page through
+            thousands of results without copying IDs (default: False)
 
     Returns:
         Formatted search results with database-specific IDs
@@ -471,6 +1007,7 @@ async def esearch(
             retstart=start_index,
             sort=sort_by,
             field=search_field,
+            usehistory=use_history,
         )
         result = _format_esearch_result(data, normalized_db, query, validation)
 
@@ -484,14 +1021,8 @@ async def esearch(
         return [TextContent(type="text", text=f"Unexpected error: {str(e)}")]
 
 
-@ncbi_mcp.tool(annotations=READ_ONLY_TOOL)
-async def list_databases() -> list[TextContent]:
-    """
-    List all supported NCBI databases with descriptions and example queries.
-
-    Returns:
-        Formatted list of available databases
-    """
+def _render_database_list() -> str:
+    """The list_databases text. NCBI_DATABASES is static, so this runs once."""
     result = "Supported NCBI Databases\n" + "=" * 50 + "\n\n"
 
     for db_name, db_info in NCBI_DATABASES.items():
@@ -510,8 +1041,21 @@ async def list_databases() -> list[TextContent]:
     result += '  Use ncbi_esearch(database="<db_name>", query="<your_query>")\n'
     result += '  Example: ncbi_esearch(database="gene", query="BRCA1[Gene Name] AND Homo sapiens[Organism]")\n'
     result += "\nLearn more: https://www.ncbi.nlm.nih.gov/books/NBK3837/\n"
+    return result
+
 
-    return [TextContent(type="text", text=result)]
+_DATABASE_LIST_RESULT = prerender(_render_database_list())
+
+
+@ncbi_mcp.tool(annotations=READ_ONLY_TOOL)
+async def list_databases() -> ToolResult:
+    """
+    List all supported NCBI databases with descriptions and example queries.
+
+    Returns:
+        Formatted list of available databases
+    """
+    return _DATABASE_LIST_RESULT
 
 
 # Additional utility functions for future use
@@ -520,20 +1064,34 @@ async def esummary(
     database: str = "",
     ids: str | list[str] = "",
     db: str = "",
+    history: str = "",
+    retstart: int = 0,
+    retmax: int = 20,
 ) -> list[TextContent]:
     """
     Fetch summary information for given IDs using esummary.
     Useful for getting detailed info after esearch.
 
     RETURNS a text item holding the parsed JSON summary data. On a
-    missing/invalid `database` or empty `ids` it returns a single text item
-    whose message begins with "Error:" — check for that prefix before use.
+    missing/invalid `database`, or neither `ids` nor `history`, it returns a
+    single text item whose message begins with "Error:" — check for that prefix
+    before use.
 
     Args:
         database: NCBI database name (alias: `db`)
         ids: IDs to fetch summaries for. Accepts either a list of strings
             (e.g., ["123", "456"]) or a comma-separated string ("123,456").
+            Long lists are fetched in chunks of 200; IDs of a chunk that
+            failed are listed under "chunk_errors" in the result. Records
+            summarized recently are answered from a local cache, and only the
+            rest are fetched.
         db: Alias for `database`.
+        history: Instead of `ids`, the result-set handle from
+            ncbi_esearch(use_history=True), e.g. "1:MCID_65f...". The records
+            stay on NCBI's side; no ID list is copied.
+        retstart: With `history`, index of the first record (default: 0)
+        retmax: With `history`, number of records (default: 20, up to 10000;
+            fetched in batches of 500)
 
     Returns:
         Parsed JSON response with summary data
@@ -547,52 +1105,71 @@ async def esummary(
                 text="Error: Missing required argument `database` (or alias `db`).",
             )
         ]
-    if not id_list:
-        return [TextContent(type="text", text="Error: `ids` must not be empty.")]
+    request = _id_or_history_params(id_list, history)
+    if isinstance(request, str):
+        return [TextContent(type="text", text=request)]
 
     # Normalize database name
     db_aliases = {"ncbigene": "gene"}
     normalized_db = db_aliases.get(database.lower(), database.lower())
 
-    base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi"
-
-    params = {
-        "db": normalized_db,
-        "id": ",".join(id_list),
-        "retmode": "json",
-        "tool": "TogoMCP",
-        "email": NCBI_EMAIL,
-    }
-
-    if NCBI_API_KEY:
-        params["api_key"] = NCBI_API_KEY
-
-    async with _ncbi_rate_limiter:
-        await asyncio.sleep(RATE_LIMIT_DELAY)
+    params = {**_base_params(normalized_db), **request, "retmode": "json"}
+    hint = (
+        "Verify db and ids. ids must be a comma-separated list of "
+        "valid identifiers for the chosen db."
+    )
 
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(base_url, params=params)
-                raise_for_status_with_body(
-                    response,
-                    context="NCBI esummary",
-                    client_error_hint=(
-                        "Verify db and ids. ids must be a comma-separated list of "
-                        "valid identifiers for the chosen db."
-                    ),
+    try:
+        if history:
+            pages = await _fetch_history_windows(
+                "/esummary.fcgi", params, retstart, retmax,
+                context="NCBI esummary", hint=hint,
+            )
+            data = _merge_summaries([_json_codec.loads(page.content) for page in pages])
+            _summary_cache.remember(normalized_db, data)
+        else:
+            cached = {}
+            for uid in id_list:
+                record = _summary_cache.get(normalized_db, uid)
+                if record is not None:
+                    cached[uid] = record
+            missing = [uid for uid in dict.fromkeys(id_list) if uid not in cached]
+            data, failures = {"result": {"uids": []}}, []
+            if missing and _summary_batcher.accepts(missing):
+                data, failures = await _summary_batcher.load(
+                    params, missing, context="NCBI esummary", hint=hint
                 )
-                data = response.json()
-
-                # Format the response nicely
-                import json
-
-                formatted_json = json.dumps(data, indent=2)
-                return [TextContent(type="text", text=formatted_json)]
+                _summary_cache.remember(normalized_db, data)
+            elif missing:
+                chunks = _id_chunks(normalized_db, missing)
+                results = await _fetch_id_chunks(
+                    "/esummary.fcgi", params, chunks, context="NCBI esummary", hint=hint
+                )
+                failures = _chunk_failures(chunks, results)
+                pages = [
+                    _json_codec.loads(r.content)
+                    for r in results
+                    if not isinstance(r, Exception)
+                ]
+                data = pages[0] if len(chunks) == 1 else _merge_summaries(pages)
+                _summary_cache.remember(normalized_db, data)
+            if cached:
+                data = _with_cached(data, id_list, cached)
+            if failures:
+                data["chunk_errors"] = failures
+        error = _history_error(data) if history else None
+        if error:
+            return [TextContent(type="text", text=_expired_history_message(error))]
+
+        # Format the response nicely. Decoding goes through json_codec; the
+        # payload keeps the stdlib's indent=2, like every tool payload.
+        formatted_json = json.dumps(data, indent=2)
+        return [TextContent(type="text", text=formatted_json)]
 
-        except Exception as e:
-            return [
-                TextContent(type="text", text=f"Error fetching summaries: {str(e)}")
-            ]
+    except Exception as e:
+        return [
+            TextContent(type="text", text=f"Error fetching summaries: {str(e)}")
+        ]
 
 
 @ncbi_mcp.tool(annotations=READ_ONLY_TOOL)
@@ -602,6 +1179,9 @@ async def efetch(
     rettype: str = "xml",
     retmode: str = "text",
     db: str = "",
+    history: str = "",
+    retstart: int = 0,
+    retmax: int = 20,
 ) -> list[TextContent]:
     """
     Fetch full records using efetch.
@@ -611,9 +1191,19 @@ async def efetch(
         database: NCBI database name (alias: `db`)
         ids: IDs to fetch. Accepts either a list of strings
             (e.g., ["123", "456"]) or a comma-separated string ("123,456").
+            Long lists are fetched in chunks of 200 (100 for sequence
+            databases) and concatenated, so an XML answer is then one document
+            per chunk; IDs of a chunk that failed are named in a closing
+            "Warning:" note.
         rettype: Return type (xml, fasta, gb, etc.)
         retmode: Return mode (text, xml, json where applicable)
         db: Alias for `database`.
+        history: Instead of `ids`, the result-set handle from
+            ncbi_esearch(use_history=True), e.g. "1:MCID_65f...".
+        retstart: With `history`, index of the first record (default: 0)
+        retmax: With `history`, number of records (default: 20, up to 10000;
+            fetched in batches of 500, and an XML answer is then one document
+            per batch)
 
     Returns:
         Response text in requested format
@@ -627,42 +1217,44 @@ async def efetch(
                 text="Error: Missing required argument `database` (or alias `db`).",
             )
         ]
-    if not id_list:
-        return [TextContent(type="text", text="Error: `ids` must not be empty.")]
+    request = _id_or_history_params(id_list, history)
+    if isinstance(request, str):
+        return [TextContent(type="text", text=request)]
 
     # Normalize database name
     db_aliases = {"ncbigene": "gene"}
     normalized_db = db_aliases.get(database.lower(), database.lower())
 
-    base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
-
-    params = {
-        "db": normalized_db,
-        "id": ",".join(id_list),
-        "rettype": rettype,
-        "retmode": retmode,
-        "tool": "TogoMCP",
-        "email": NCBI_EMAIL,
-    }
-
-    if NCBI_API_KEY:
-        params["api_key"] = NCBI_API_KEY
-
-    async with _ncbi_rate_limiter:
-        await asyncio.sleep(RATE_LIMIT_DELAY)
+    params = {**_base_params(normalized_db), **request, "rettype": rettype, "retmode": retmode}
+    hint = (
+        "Verify db, ids, rettype, and retmode. Different db's accept "
+        "different rettype/retmode combinations."
+    )
 
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(base_url, params=params)
-                raise_for_status_with_body(
-                    response,
-                    context="NCBI efetch",
-                    client_error_hint=(
-                        "Verify db, ids, rettype, and retmode. Different db's accept "
-                        "different rettype/retmode combinations."
-                    ),
-                )
-                return [TextContent(type="text", text=response.text)]
+    try:
+        if history:
+            pages = await _fetch_history_windows(
+                "/efetch.fcgi", params, retstart, retmax,
+                context="NCBI efetch", hint=hint,
+            )
+            error = _history_error_text(pages[0].text) if pages else None
+            if error:
+                return [TextContent(type="text", text=_expired_history_message(error))]
+            text = "\n".join(page.text.rstrip("\n") for page in pages if page.text.strip())
+            return [TextContent(type="text", text=text + "\n" if text else "")]
+        chunks = _id_chunks(normalized_db, id_list)
+        results = await _fetch_id_chunks(
+            "/efetch.fcgi", params, chunks, context="NCBI efetch", hint=hint
+        )
+        failures = _chunk_failures(chunks, results)
+        texts = [r.text for r in results if not isinstance(r, Exception)]
+        if len(chunks) == 1:
+            return [TextContent(type="text", text=texts[0])]
+        text = "\n".join(t.rstrip("\n") for t in texts if t.strip())
+        text = text + "\n" if text else ""
+        if failures:
+            text += _chunk_failure_note(failures, len(chunks))
+        return [TextContent(type="text", text=text)]
 
-        except Exception as e:
-            return [TextContent(type="text", text=f"Error fetching records: {str(e)}")]
+    except Exception as e:
+        return [TextContent(type="text", text=f"Error fetching records: {str(e)}")]
@@ -1,11 +1,15 @@
 import csv as _csv
 import io as _io
+import os
 from pathlib import Path
 from typing import Annotated, Any
 
+from fastmcp.server.dependencies import get_http_request
 from pydantic import Field
 import yaml
 
+from .mie_corpus import MieCorpus, MieOverlay, parse_overlay
+from .schema_index import SchemaIndex, build_schema_index
 from .server import *
 
 
@@ -118,8 +122,11 @@ async def togomcp_usage_guide() -> str:
 # --- Tools for RDF Portal --- #
 
 
-@mcp.tool(annotations=READ_ONLY_TOOL)
-async def get_sparql_endpoints() -> dict[str, Any]:
+@mcp.tool(
+    annotations=READ_ONLY_TOOL,
+    output_schema={"type": "object", "additionalProperties": True},
+)
+async def get_sparql_endpoints() -> ToolResult:
     """Get the available SPARQL endpoints for RDF Portal.
 
     RETURNS a dict with two keys: `databases` (maps each database ->
@@ -131,16 +138,62 @@ async def get_sparql_endpoints() -> dict[str, Any]:
         - databases: Dict mapping database -> {url, endpoint_name, keyword_search}
         - endpoints: Dict mapping endpoint_name -> {url, databases}
     """
-    return {
-        "databases": SPARQL_ENDPOINT,
-        "endpoints": {
-            name: {
-                "url": ENDPOINT_NAME_TO_URL[name],
-                "databases": ENDPOINT_NAME_TO_DATABASES[name],
+    # Built and serialized once per registry load; the result's _meta carries
+    # the registry_version it came from.
+    return registry().endpoints_result
+
+
+# Which databases use which predicate/class IRIs, generated from the MIE
+# examples (see togo_mcp.schema_index). Follows TOGOMCP_MIE_DIR, so an
+# alternative corpus routes by its own examples. Built on the first lookup, not
+# at import: a stdio launch should not pay for a tool it may never call. (Not
+# named `schema_index`: the package star-imports this module, and the name
+# would shadow the togo_mcp.schema_index submodule.)
+_schema_index: SchemaIndex | None = None
+
+
+def mie_schema_index() -> SchemaIndex:
+    """The schema index over MIE_DIR, built on first use."""
+    global _schema_index
+    if _schema_index is None:
+        _schema_index = build_schema_index(MIE_DIR)
+    return _schema_index
+
+
+@mcp.tool(annotations=READ_ONLY_TOOL)
+async def find_databases_for_term(term: str) -> dict[str, Any]:
+    """Find which RDF databases — and so which endpoint and graphs — use a predicate or class.
+
+    Accepts a qname (`up:enzyme`, `obo:GO_0005515`) or a full IRI, bare or in
+    `<...>`. A qname is expanded through every namespace the MIE examples bind
+    its prefix to, so a colliding prefix such as `schema:` yields one match per
+    namespace. Answered from an index built from the MIE examples —
+    no endpoint is queried.
+
+    RETURNS a dict with `term` and `matches`: one entry per expanded IRI with
+    `iri`, `match` (`term` = an MIE example uses this exact IRI; `namespace` =
+    only its namespace is known; `none`), `owner` when the IRI is in a database's
+    own OBO ID space, and `databases`: a list of {database, endpoint_name, url,
+    graphs}. An unknown prefix gives an empty `matches` list — pass a full IRI.
+
+    Args:
+        term: Predicate or class as a qname or IRI.
+    """
+    reg = registry()
+    matches = []
+    index = mie_schema_index()
+    for m in index.lookup(term):
+        m["databases"] = [
+            {
+                "database": db,
+                "endpoint_name": reg.databases[db]["endpoint_name"] if db in reg.databases else None,
+                "url": reg.databases[db]["url"] if db in reg.databases else None,
+                "graphs": list(index.graphs.get(db, ())),
             }
-            for name in ENDPOINT_NAMES
-        },
-    }
+            for db in m["databases"]
+        ]
+        matches.append(m)
+    return {"term": term, "matches": matches}
 
 
 @mcp.tool(
@@ -342,6 +395,35 @@ SELECT DISTINCT ?graph WHERE {
     return out.getvalue()
 
 
+# MIE texts are read once per process; overlays (see togo_mcp.mie_corpus) are
+# views over that cached text. TOGOMCP_MIE_OVERLAY sets the server-wide overlay,
+# and the MIE_OVERLAY_HEADER on an HTTP request overrides it for that call — an
+# empty header value asks for the verbatim corpus. The header is honoured only
+# when TOGOMCP_MIE_OVERLAY_HEADER is set, which the ablation harness does for
+# its local server: on the public server a client must not be able to change
+# what get_MIE_file serves. A malformed server-wide spec fails at startup rather
+# than silently serving the full corpus.
+MIE_CORPUS = MieCorpus(MIE_DIR)
+MIE_OVERLAY_HEADER = "X-TogoMCP-MIE-Overlay"
+MIE_OVERLAY = parse_overlay(os.getenv("TOGOMCP_MIE_OVERLAY"))
+MIE_OVERLAY_HEADER_ENABLED = os.getenv("TOGOMCP_MIE_OVERLAY_HEADER", "").strip().lower() in (
+    "1", "true", "yes"
+)
+
+
+def _request_mie_overlay() -> MieOverlay | None:
+    """The overlay for the current call: the request header if sent (and
+    enabled), else the server's."""
+    if not MIE_OVERLAY_HEADER_ENABLED:
+        return MIE_OVERLAY
+    try:
+        req = get_http_request()
+    except RuntimeError:
+        return MIE_OVERLAY
+    spec = req.headers.get(MIE_OVERLAY_HEADER)
+    return MIE_OVERLAY if spec is None else parse_overlay(spec)
+
+
 @mcp.tool(
     annotations=READ_ONLY_TOOL,
     name="get_MIE_file",
@@ -384,13 +466,17 @@ async def get_MIE_file(
     database = database or dbname or db
     if not database:
         return "Error: Missing required argument `database` (aliases: `dbname`, `db`)."
-    mie_file = Path(MIE_DIR).joinpath(f"{database}.yaml")
-    if not mie_file.exists():
+    try:
+        overlay = _request_mie_overlay()
+    except ValueError as exc:
+        return f"Error: {exc} Do not retry with the same value."
+    content = MIE_CORPUS.text(database, overlay)
+    if content is None:
         # Return a structured error string rather than raising, so the
         # downstream LLM can read the diagnostic and recover (e.g. retry
         # with a real database name) instead of seeing an opaque tool
         # exception that may break the MCP session.
-        valid = ", ".join(sorted(SPARQL_ENDPOINT.keys()))
+        valid = ", ".join(sorted(registry().database_names))
         hint = ""
         if database in ("togoid", "ncbi"):
             hint = (
@@ -403,11 +489,11 @@ async def get_MIE_file(
             f"Error: No MIE file for '{database}'. Valid database names: "
             f"{valid}.{hint} Do not retry with the same value."
         )
-    with open(mie_file, encoding="utf-8") as file:
-        content = file.read()
+    # The banner is built from the text actually served, so a dropped
+    # global_gotchas section takes its headlines with it.
     return (
         f"Content-type: application/yaml; charset=utf-8\n"
-        f"{_mie_trap_banner(content, database)}{content}"
+        f"{_mie_trap_banner(content, database, MIE_CORPUS.doc(database, overlay))}{content}"
     )
 
 
@@ -421,16 +507,20 @@ def _first_sentence(text: str, limit: int = 160) -> str:
     return flat[:limit] + ("…" if len(flat) > limit else "")
 
 
-def _mie_trap_banner(content: str, database: str) -> str:
+def _mie_trap_banner(content: str, database: str, doc: Any = None) -> str:
     """Headline the silent-failure traps ABOVE the YAML body.
 
     The traps that have caused wrong answers were already documented, in the
     right file, and simply not read at the moment a predicate was typed. The
     body still holds the authoritative text — this is a scannable index that
     is impossible to skim past, not a replacement for it.
+
+    ``doc`` is ``content`` already parsed, when the caller has it (the MIE
+    corpus does); otherwise ``content`` is parsed here.
     """
     try:
-        doc = yaml.safe_load(content)
+        if doc is None:
+            doc = yaml.safe_load(content)
         if not isinstance(doc, dict):
             return ""
         # graphs.co_hosted is {name: note} per MIE_v3_spec.md §2. The list branch is
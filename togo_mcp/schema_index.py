@@ -0,0 +1,208 @@
+"""Predicate/class -> database routing index, generated from the MIE corpus.
+
+Every MIE example is a verified SPARQL query that declares its own PREFIXes, so
+the corpus already says, term by term, which databases use which IRIs. This
+module reads that once and answers two questions with a dict lookup:
+
+  * routing — "which databases (and so which endpoint and graphs) answer this
+    predicate or class?" (`SchemaIndex.lookup`, served by the
+    `find_databases_for_term` tool);
+  * ownership — "does this qname prove a particular database was touched?"
+    (`SchemaIndex.owners`, used by stats' co-query attribution).
+
+The two are deliberately different. USE is not OWNERSHIP: rhea's examples use
+`up:` terms and uniprot's use `obo:GO_` IRIs, and crediting every user of a term
+would make the co-query column meaningless. Ownership is therefore limited to
+the one rule the corpus can decide on its own — an OBO ID space
+(`http://purl.obolibrary.org/obo/GO_`) belongs to the database of that name —
+which is exactly what the hand-kept prefix map in :mod:`togo_mcp.stats` cannot
+see: go, chebi and mondo share the `obo:` prefix with every other ontology.
+
+Pure standard library plus PyYAML (through :mod:`togo_mcp.mie_bundle`), like
+:mod:`togo_mcp.stats`.
+"""
+from __future__ import annotations
+
+import re
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from typing import Any
+
+from .mie_bundle import load_mie_entries
+
+_PREFIX_RE = re.compile(r"PREFIX\s+([A-Za-z][\w.-]*|):\s*<([^>\s]*)>", re.IGNORECASE)
+# Literal contents and <IRI> tokens are stripped before qnames are collected, so
+# a "GO:0004672" inside a string or the "urn:x" inside <urn:x> is never a term.
+_LITERAL_RE = re.compile(
+    r'"""(?:.|\n)*?"""|\'\'\'(?:.|\n)*?\'\'\'|"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\''
+)
+_IRI_RE = re.compile(r"<[^>\s]*>")
+_QNAME_RE = re.compile(r"(?<![\w:/])([A-Za-z][\w.-]*|):([A-Za-z_][\w-]*)")
+# OBO Foundry term IRIs are <obo/><IDSPACE>_<local id>; the ID space names the
+# ontology the term comes from.
+_OBO_BASE = "http://purl.obolibrary.org/obo/"
+_OBO_ID_SPACE_RE = re.compile(rf"^{re.escape(_OBO_BASE)}([A-Za-z]+)_")
+
+# qnames whose owners are memoized. They come from client queries, so the memo
+# is an LRU; a month of log repeats only a few hundred.
+_OWNER_CACHE_MAX = 4096
+
+
+def _primary_graphs(graphs: Any) -> tuple[str, ...]:
+    """The graph IRIs a database's data lives in: `primary` plus any absolute
+    `supporting` IRIs (several MIEs list supporting graphs as bare names)."""
+    if not isinstance(graphs, dict):
+        return ()
+    out: list[str] = []
+    for key in ("primary", "supporting"):
+        val = graphs.get(key)
+        for g in val if isinstance(val, list) else [val]:
+            if isinstance(g, str) and g.startswith(("http://", "https://")) and g not in out:
+                out.append(g)
+    return tuple(out)
+
+
+def _query_terms(sparql: str) -> tuple[dict[str, str], set[str]]:
+    """(prefix bindings, expanded term IRIs) for one example query."""
+    bindings = {p: ns for p, ns in _PREFIX_RE.findall(sparql)}
+    body = _PREFIX_RE.sub(" ", sparql)
+    body = _IRI_RE.sub(" ", _LITERAL_RE.sub('""', body))
+    terms = {
+        bindings[p] + local
+        for p, local in _QNAME_RE.findall(body)
+        if p in bindings
+    }
+    return bindings, terms
+
+
+class SchemaIndex:
+    """Term, namespace and graph lookups over one MIE corpus. Read-only once built."""
+
+    __slots__ = ("prefixes", "terms", "namespaces", "graphs", "id_spaces", "_owner_cache")
+
+    def __init__(
+        self,
+        prefixes: dict[str, tuple[str, ...]],
+        terms: dict[str, frozenset[str]],
+        namespaces: dict[str, frozenset[str]],
+        graphs: dict[str, tuple[str, ...]],
+        id_spaces: dict[str, str],
+    ) -> None:
+        self.prefixes = prefixes
+        self.terms = terms
+        self.namespaces = namespaces
+        self.graphs = graphs
+        self.id_spaces = id_spaces
+        self._owner_cache: OrderedDict[str, frozenset[str]] = OrderedDict()
+
+    def expand(self, term: str) -> tuple[str, ...]:
+        """Full IRI(s) for ``term``: an IRI (bare or in <>) as itself, a qname
+        through every namespace the corpus binds its prefix to."""
+        term = term.strip()
+        if term.startswith("<") and term.endswith(">"):
+            return (term[1:-1],)
+        if term.startswith(("http://", "https://", "urn:")):
+            return (term,)
+        prefix, sep, local = term.partition(":")
+        if not sep:
+            return ()
+        return tuple(ns + local for ns in self.prefixes.get(prefix, ()))
+
+    def _namespace_of(self, iri: str) -> str | None:
+        best = None
+        for ns in self.namespaces:
+            if iri.startswith(ns) and (best is None or len(ns) > len(best)):
+                best = ns
+        return best
+
+    def _id_space_owner(self, iri: str) -> str | None:
+        m = _OBO_ID_SPACE_RE.match(iri)
+        return self.id_spaces.get(m.group(0)) if m else None
+
+    def lookup(self, term: str) -> list[dict[str, Any]]:
+        """Databases whose MIE examples use ``term``, one entry per expansion.
+
+        ``match`` says how the databases were found: ``term`` (this exact IRI is
+        used), ``namespace`` (the IRI is new but its namespace is) — falling back
+        to the longest known namespace — plus ``owner`` when the IRI sits in a
+        database's own OBO ID space.
+        """
+        out = []
+        for iri in self.expand(term):
+            dbs = self.terms.get(iri)
+            match = "term"
+            if dbs is None:
+                ns = self._namespace_of(iri)
+                dbs, match = (self.namespaces[ns], "namespace") if ns else (frozenset(), "none")
+            entry: dict[str, Any] = {"iri": iri, "match": match, "databases": sorted(dbs)}
+            owner = self._id_space_owner(iri)
+            if owner is not None:
+                entry["owner"] = owner
+            out.append(entry)
+        return out
+
+    def owners(self, qname: str) -> frozenset[str]:
+        """Databases ``qname`` proves were touched, by OBO ID-space ownership.
+
+        Memoized per qname, least recently used evicted past ``_OWNER_CACHE_MAX``:
+        a log repeats the same few hundred qnames across tens of thousands of
+        records, so attribution is one dict hit per qname.
+        """
+        hit = self._owner_cache.get(qname)
+        if hit is None:
+            hit = frozenset(
+                db for db in map(self._id_space_owner, self.expand(qname)) if db
+            )
+            self._owner_cache[qname] = hit
+            while len(self._owner_cache) > _OWNER_CACHE_MAX:
+                self._owner_cache.popitem(last=False)
+        self._owner_cache.move_to_end(qname)
+        return hit
+
+
+def build_schema_index(mie_dir: str | Path) -> SchemaIndex:
+    """Index every ``*.yaml`` MIE in ``mie_dir`` (via the compiled bundle when
+    fresh). Files that do not parse are skipped."""
+    bindings: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    term_dbs: dict[str, set[str]] = defaultdict(set)
+    graphs: dict[str, tuple[str, ...]] = {}
+    for db, entry in load_mie_entries(mie_dir).items():
+        doc = entry.doc
+        if not isinstance(doc, dict):
+            continue
+        graphs[db] = _primary_graphs(doc.get("graphs"))
+        for ex in doc.get("examples") or []:
+            sparql = ex.get("sparql") if isinstance(ex, dict) else None
+            if not isinstance(sparql, str):
+                continue
+            declared, terms = _query_terms(sparql)
+            for p, ns in declared.items():
+                bindings[p][ns] += 1
+            for iri in terms:
+                term_dbs[iri].add(db)
+
+    # A namespace is credited with the databases that use a term in it, each term
+    # landing in its LONGEST declared namespace (obo/ vs obo/RO_, say).
+    ns_dbs: dict[str, set[str]] = {ns: set() for nss in bindings.values() for ns in nss}
+    for iri, dbs in term_dbs.items():
+        ns = max((n for n in ns_dbs if iri.startswith(n)), key=len, default=None)
+        if ns is not None:
+            ns_dbs[ns] |= dbs
+
+    id_spaces: dict[str, str] = {}
+    for iri in term_dbs:
+        m = _OBO_ID_SPACE_RE.match(iri)
+        if m and m.group(1).lower() in graphs:
+            id_spaces[m.group(0)] = m.group(1).lower()
+
+    return SchemaIndex(
+        # most-used binding first, so a colliding prefix expands in corpus order
+        prefixes={
+            p: tuple(sorted(nss, key=lambda ns: (-nss[ns], ns)))
+            for p, nss in bindings.items()
+        },
+        terms={iri: frozenset(dbs) for iri, dbs in term_dbs.items()},
+        namespaces={ns: frozenset(dbs) for ns, dbs in ns_dbs.items()},
+        graphs=graphs,
+        id_spaces=id_spaces,
+    )
@@ -1,4 +1,5 @@
 import asyncio
+import atexit
 import contextlib
 import csv
 import hashlib
@@ -12,21 +13,39 @@ from importlib.metadata import PackageNotFoundError
 from importlib.metadata import version as _pkg_version
 from contextvars import ContextVar
 from datetime import datetime, timezone
-from logging.handlers import RotatingFileHandler
 from pathlib import Path
+from types import MappingProxyType
 from typing import Any
 
 from fastmcp import FastMCP
+from fastmcp.exceptions import NotFoundError
 from fastmcp.server.dependencies import get_http_request
+from fastmcp.tools import ToolResult
 import httpx
+from mcp.types import TextContent
+import pydantic_core
 from starlette.requests import Request
 from starlette.responses import (
     HTMLResponse,
     JSONResponse,
     PlainTextResponse,
+    Response,
     StreamingResponse,
 )
 
+from . import json_codec as _json_codec
+from . import metrics as _metrics
+from . import tracing as _tracing
+from .live import LiveWindow
+from .log_index import RecordKeys
+from .log_sampling import from_env as _log_sampler_from_env
+from .toolcall_log import (
+    DEFAULT_QUEUE_SIZE,
+    JsonlLogWriter,
+    parse_fsync_policy,
+    parse_retention,
+)
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
@@ -99,7 +118,50 @@ _SPARQL_POOL_TIMEOUT_SECONDS = 5.0
 # the two of them protect.
 _SPARQL_MAX_CONNECTIONS = 100
 
-_sparql_client = httpx.AsyncClient(
+
+# --- Lazily built HTTP clients ------------------------------------------------
+#
+# Building an httpx.AsyncClient loads the CA bundle into a fresh SSL context:
+# ~25 ms each, and the package builds a dozen at import (SPARQL, probe, six REST
+# APIs, ChEMBL, TogoID, TogoVar). That was ~0.4 s of every stdio launch, paid
+# before the first tools/list, for clients most sessions never touch. The proxy
+# keeps the module-level `_xxx_client = ...` idiom but defers construction to
+# the first attribute access.
+#
+# Deliberately no __slots__: an attribute set ON the proxy (a test patching
+# `.post`, say) shadows the client's own, exactly as it would on the client.
+# What gets built is a tracing.TracedAsyncClient, so every upstream request is
+# a span when tracing is on.
+class LazyAsyncClient:
+    """An httpx.AsyncClient constructed on first use, from the arguments given here."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        self._kwargs = kwargs
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def built(self) -> bool:
+        return self._client is not None
+
+    # Not `get`: that name is the client's own HTTP GET.
+    def unwrap(self) -> httpx.AsyncClient:
+        """The real client, built now if this is the first use."""
+        if self._client is None:
+            self._client = _tracing.TracedAsyncClient(**self._kwargs)
+        return self._client
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.unwrap(), name)
+
+    async def aclose(self) -> None:
+        # closing a client that was never built must not build one
+        if self._client is not None:
+            await self._client.aclose()
+
+
+_sparql_client = LazyAsyncClient(
     timeout=httpx.Timeout(
         _SPARQL_TIMEOUT_SECONDS,
         connect=_SPARQL_CONNECT_TIMEOUT_SECONDS,
@@ -131,7 +193,7 @@ _PROBE_TIMEOUT_SECONDS = 5.0
 # behind the very failures it is meant to diagnose — and a probe that fails
 # because it never got a connection cannot distinguish "endpoint is down" from
 # "our pool is full". Its own small pool keeps the answer meaningful.
-_probe_client = httpx.AsyncClient(
+_probe_client = LazyAsyncClient(
     timeout=_PROBE_TIMEOUT_SECONDS,
     limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
 )
@@ -154,6 +216,8 @@ class _EndpointUnresponsive(Exception):
 
 
 def _mark_endpoint_down(url: str) -> None:
+    if _endpoint_down_remaining(url) is None:
+        _metrics.BREAKER_TRIPS.inc(_endpoint_label(url))
     _endpoint_down_until[url] = time.monotonic() + _ENDPOINT_DOWN_TTL_SECONDS
 
 
@@ -173,19 +237,68 @@ def _endpoint_down_remaining(url: str) -> float | None:
     return remaining
 
 
+def _endpoint_label(url: str) -> str:
+    """Metrics label for ``url``: its endpoint group, or ``other`` for an ad-hoc URL.
+
+    endpoint_url is caller-supplied, so it must never become a label value itself.
+    """
+    return registry().url_endpoints.get(url, "other")
+
+
+def _breaker_states() -> list[tuple[tuple[str], int]]:
+    """``/metrics`` gauge: 1 per endpoint group whose breaker is open, else 0."""
+    open_groups = {
+        _endpoint_label(url)
+        for url in list(_endpoint_down_until)
+        if _endpoint_down_remaining(url) is not None
+    }
+    groups = set(registry().endpoint_names) | open_groups
+    return [((name,), int(name in open_groups)) for name in groups]
+
+
+_metrics.REGISTRY.register(_metrics.Gauge(
+    "togomcp_sparql_breaker_open",
+    "1 while the circuit breaker refuses queries to an endpoint group.",
+    ("endpoint",),
+    _breaker_states,
+))
+
+
+def _pool_wait_tracer():
+    """httpx ``trace`` extension timing the wait for a pooled connection.
+
+    httpcore emits its first trace event (connect_tcp for a new connection,
+    send_request_headers for a reused one) only once the pool has handed the
+    request a connection, so the time to that first event is the queue wait.
+    """
+    start = time.perf_counter()
+    seen = False
+
+    async def trace(event: str, info: dict[str, Any]) -> None:
+        nonlocal seen
+        if not seen:
+            seen = True
+            _metrics.POOL_WAIT_SECONDS.observe(time.perf_counter() - start)
+
+    return trace
+
+
 async def _probe_endpoint(url: str) -> bool:
     """True if ``url`` answers a trivial ASK within the probe budget.
 
     ANY HTTP response counts as alive, including 4xx/5xx: the question is
     whether the server is answering at all, not whether it liked the query.
     """
-    try:
-        await _probe_client.post(
-            url, data={"query": "ASK {}"}, headers={"Accept": "text/csv"}
-        )
-    except httpx.HTTPError:
-        return False
-    return True
+    with _tracing.span("liveness_probe") as sp:
+        try:
+            await _probe_client.post(
+                url, data={"query": "ASK {}"}, headers={"Accept": "text/csv"}
+            )
+        except httpx.HTTPError:
+            sp.set(alive=False)
+            return False
+        sp.set(alive=True)
+        return True
 
 
 async def _post_with_liveness_watchdog(
@@ -197,7 +310,12 @@ async def _post_with_liveness_watchdog(
     timeout message — can say whether the endpoint was confirmed up.
     """
     main = asyncio.ensure_future(
-        _sparql_client.post(url, data={"query": sparql_query}, headers={"Accept": "text/csv"})
+        _sparql_client.post(
+            url,
+            data={"query": sparql_query},
+            headers={"Accept": "text/csv"},
+            extensions={"trace": _pool_wait_tracer()},
+        )
     )
     done, _pending = await asyncio.wait({main}, timeout=_PROBE_AFTER_SECONDS)
     if done:
@@ -270,8 +388,156 @@ def load_sparql_endpoints(path: str) -> dict[str, dict[str, str]]:
     return endpoints
 
 
-# The SPARQL endpoints for various RDF databases, loaded from a CSV file.
-SPARQL_ENDPOINT = load_sparql_endpoints(ENDPOINTS_CSV)
+def prerender(payload: Any, *, version: str | None = None) -> ToolResult:
+    """Serialize a static tool response ONCE, exactly as FastMCP would per call.
+
+    A tool that returns the same bytes on every call (the endpoint registry, the
+    NCBI database list) otherwise rebuilds its value and has FastMCP re-encode it
+    each time. Returning the prebuilt ToolResult skips both. A dict becomes JSON
+    text plus the identical structured content; a str is sent as-is.
+
+    ``version`` is carried in the result's ``_meta`` as ``registry_version``; when
+    omitted it is derived from the serialized bytes, so it moves on any change.
+    """
+    if isinstance(payload, str):
+        text, structured = payload, None
+    else:
+        text, structured = pydantic_core.to_json(payload, fallback=str).decode(), payload
+    if version is None:
+        version = hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+    return ToolResult(
+        content=[TextContent(type="text", text=text)],
+        structured_content=structured,
+        meta={"registry_version": version},
+    )
+
+
+# --- Registry snapshot ------------------------------------------------------
+#
+# endpoints.csv changes only on a deploy, yet every consumer used to re-derive
+# from it: get_sparql_endpoints rebuilt its nested dict and FastMCP re-encoded
+# it on every call. A snapshot derives everything ONCE per load — the lookups
+# resolve_endpoint_url needs and the tool's response, already serialized — and
+# is never mutated afterwards. A reload builds a new snapshot and swaps the one
+# module reference, so a caller that took `registry()` once sees a single
+# consistent registry for the rest of its call, whatever happens meanwhile.
+#
+# Reloads are picked up without a restart: registry() stats endpoints.csv at
+# most every _REGISTRY_CHECK_SECONDS and reloads when its mtime or size moved.
+# A file that is missing or half-written at that moment keeps the current
+# snapshot (and is retried at the next check) rather than failing the call.
+class RegistrySnapshot:
+    """One immutable, versioned view of endpoints.csv."""
+
+    __slots__ = (
+        "version",
+        "databases",
+        "endpoint_urls",
+        "url_endpoints",
+        "endpoint_databases",
+        "database_names",
+        "endpoint_names",
+        "endpoints_result",
+    )
+
+    def __init__(self, endpoints: dict[str, dict[str, str]], version: str) -> None:
+        urls: dict[str, str] = {}
+        members: dict[str, list[str]] = {}
+        for db_name, info in endpoints.items():
+            ep_name = info["endpoint_name"]
+            urls[ep_name] = info["url"]
+            members.setdefault(ep_name, []).append(db_name)
+
+        self.version = version
+        self.databases = MappingProxyType(
+            {db: MappingProxyType(dict(info)) for db, info in endpoints.items()}
+        )
+        self.endpoint_urls = MappingProxyType(urls)
+        self.url_endpoints = MappingProxyType({url: name for name, url in urls.items()})
+        self.endpoint_databases = MappingProxyType(
+            {name: tuple(dbs) for name, dbs in members.items()}
+        )
+        self.database_names = tuple(endpoints)
+        self.endpoint_names = tuple(urls)
+        # get_sparql_endpoints' response, built from plain copies so the cached
+        # payload shares nothing mutable with the lookups above.
+        self.endpoints_result = prerender(
+            {
+                "databases": {db: dict(info) for db, info in endpoints.items()},
+                "endpoints": {
+                    name: {"url": urls[name], "databases": list(members[name])}
+                    for name in urls
+                },
+            },
+            version=version,
+        )
+
+
+def build_registry_snapshot(path: str) -> RegistrySnapshot:
+    """Load ``path`` into a snapshot tagged sha256(bytes)[:12] of the CSV."""
+    with open(path, "rb") as fh:
+        version = hashlib.sha256(fh.read()).hexdigest()[:12]
+    return RegistrySnapshot(load_sparql_endpoints(path), version)
+
+
+_REGISTRY_CHECK_SECONDS = 5.0
+
+
+def _csv_signature(path: str) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+_registry = build_registry_snapshot(ENDPOINTS_CSV)
+_registry_signature = _csv_signature(ENDPOINTS_CSV)
+_registry_checked = time.monotonic()
+
+
+def registry() -> RegistrySnapshot:
+    """The current registry snapshot. Take it once per call and read only from it.
+
+    Reloads it first when endpoints.csv changed since the last check.
+    """
+    global _registry_checked, _registry_signature
+    now = time.monotonic()
+    if now - _registry_checked >= _REGISTRY_CHECK_SECONDS:
+        _registry_checked = now
+        signature = _csv_signature(ENDPOINTS_CSV)
+        if signature is not None and signature != _registry_signature:
+            try:
+                reload_registry()
+            except Exception as exc:  # mid-write or malformed: keep serving the old one
+                logger.warning("endpoints.csv reload failed, keeping %s: %s",
+                               _registry.version, exc)
+            else:
+                _registry_signature = signature
+    return _registry
+
+
+def reload_registry(path: str | None = None) -> RegistrySnapshot:
+    """Rebuild the snapshot from ``path`` (default ENDPOINTS_CSV) and swap it in.
+
+    An unchanged file keeps the existing snapshot, and so its prebuilt payloads;
+    one that yields no databases (truncated, wrong header) raises ValueError.
+    Tool DESCRIPTIONS (the valid-value lists below) are bound at import and do not
+    follow a reload; only runtime lookups do.
+    """
+    global _registry
+    fresh = build_registry_snapshot(path or ENDPOINTS_CSV)
+    if not fresh.database_names:
+        raise ValueError(f"{path or ENDPOINTS_CSV} lists no databases; not swapping it in")
+    if fresh.version != _registry.version:
+        _registry = fresh
+    return _registry
+
+
+# The SPARQL endpoints for various RDF databases, loaded from a CSV file. These
+# names are the startup snapshot's views, kept for the tool descriptions and for
+# importers; runtime lookups go through registry().
+SPARQL_ENDPOINT = _registry.databases
 DATABASE_DESCRIPTION = (
     "Name of a single RDF database. Must be exactly one of: "
     f"{', '.join(SPARQL_ENDPOINT.keys())}. "
@@ -279,18 +545,12 @@ DATABASE_DESCRIPTION = (
     "in endpoint_name instead."
 )
 
-# Build reverse lookups for endpoint_name -> url and list of databases per endpoint
-ENDPOINT_NAME_TO_URL: dict[str, str] = {}
-ENDPOINT_NAME_TO_DATABASES: dict[str, list] = {}
-for db_name, info in SPARQL_ENDPOINT.items():
-    ep_name = info["endpoint_name"]
-    ENDPOINT_NAME_TO_URL[ep_name] = info["url"]
-    if ep_name not in ENDPOINT_NAME_TO_DATABASES:
-        ENDPOINT_NAME_TO_DATABASES[ep_name] = []
-    ENDPOINT_NAME_TO_DATABASES[ep_name].append(db_name)
+# Reverse lookups: endpoint_name -> url and the databases hosted per endpoint.
+ENDPOINT_NAME_TO_URL = _registry.endpoint_urls
+ENDPOINT_NAME_TO_DATABASES = _registry.endpoint_databases
 
-ENDPOINT_NAMES = list(ENDPOINT_NAME_TO_URL.keys())
-SPARQL_ENDPOINT_KEYS = list(SPARQL_ENDPOINT.keys())
+ENDPOINT_NAMES = list(_registry.endpoint_names)
+SPARQL_ENDPOINT_KEYS = list(_registry.database_names)
 
 
 def resolve_endpoint_url(database: str, endpoint_name: str, endpoint_url: str) -> str:
@@ -313,19 +573,20 @@ def resolve_endpoint_url(database: str, endpoint_name: str, endpoint_url: str) -
     """
     if endpoint_url:
         return endpoint_url
+    reg = registry()
     if endpoint_name:
-        if endpoint_name not in ENDPOINT_NAME_TO_URL:
+        if endpoint_name not in reg.endpoint_urls:
             raise ValueError(
                 f"Unknown endpoint_name: '{endpoint_name}'. "
-                f"Valid endpoint names are: {', '.join(ENDPOINT_NAMES)}. "
+                f"Valid endpoint names are: {', '.join(reg.endpoint_names)}. "
                 f"Do not retry with the same value."
             )
-        return ENDPOINT_NAME_TO_URL[endpoint_name]
+        return reg.endpoint_urls[endpoint_name]
     if database:
-        if database not in SPARQL_ENDPOINT:
+        if database not in reg.databases:
             # Common mistake: passing an endpoint_name (e.g. 'ebi') as database.
-            if database in ENDPOINT_NAME_TO_URL:
-                members = ", ".join(ENDPOINT_NAME_TO_DATABASES.get(database, []))
+            if database in reg.endpoint_urls:
+                members = ", ".join(reg.endpoint_databases.get(database, ()))
                 raise ValueError(
                     f"'{database}' is an endpoint_name, not a database. "
                     f"Pass it as endpoint_name= for cross-database queries, "
@@ -334,14 +595,14 @@ def resolve_endpoint_url(database: str, endpoint_name: str, endpoint_url: str) -
                 )
             raise ValueError(
                 f"Unknown database: '{database}'. "
-                f"Valid databases are: {', '.join(SPARQL_ENDPOINT_KEYS)}. "
+                f"Valid databases are: {', '.join(reg.database_names)}. "
                 f"Do not retry with the same value."
             )
-        return SPARQL_ENDPOINT[database]["url"]
+        return reg.databases[database]["url"]
     raise ValueError(
         "Missing required argument. Provide one of: database (e.g. 'chembl', "
         "'uniprot'), endpoint_name (e.g. 'ebi', 'sib'), or endpoint_url. "
-        f"Valid databases: {', '.join(SPARQL_ENDPOINT_KEYS)}."
+        f"Valid databases: {', '.join(reg.database_names)}."
     )
 
 
@@ -433,6 +694,20 @@ async def execute_sparql(
         extra["query_text"] = sparql_query
     _sparql_extra_var.set(extra)
 
+    start = time.perf_counter()
+    with _tracing.span("sparql", endpoint=_endpoint_label(url)) as sp:
+        try:
+            return await _run_sparql(url, sparql_query, extra)
+        finally:
+            status = extra.get("sparql_status") or "error"
+            sp.set(sparql_status=status)
+            _metrics.SPARQL_SECONDS.observe(
+                time.perf_counter() - start, _endpoint_label(url), status
+            )
+
+
+async def _run_sparql(url: str, sparql_query: str, extra: dict[str, Any]) -> str:
+    """execute_sparql past argument resolution: breaker, POST, outcome in ``extra``."""
     # Cause 3, already established: refuse instantly rather than park another
     # connection on a dead endpoint for 90s.
     cached_down = _endpoint_down_remaining(url)
@@ -451,6 +726,7 @@ async def execute_sparql(
         # Our own client ran out of connections — neither the query nor the
         # endpoint is at fault, so neither of the timeout hints below applies.
         extra["sparql_status"] = "pool_exhausted"
+        _metrics.POOL_WAIT_SECONDS.observe(_SPARQL_POOL_TIMEOUT_SECONDS)
         raise ValueError(
             f"Could not get a connection to {url} within "
             f"{_SPARQL_POOL_TIMEOUT_SECONDS:.0f}s: this server's SPARQL connection "
@@ -752,8 +1028,55 @@ def _client_info(fctx: Any) -> dict[str, str | None] | None:
         return None
 
 
+# --- Result-size accounting -------------------------------------------------
+#
+# output_bytes is logged for EVERY call, and a result can be a 250 K-character
+# KEGG graph or a multi-MB SPARQL CSV. Encoding it (or str()-ing the result
+# object) just to take a length copied the payload twice per call. Instead:
+#
+#   * ASCII text — all json.dumps output with the default ensure_ascii — has as
+#     many UTF-8 bytes as characters, and str.isascii() reads a flag CPython
+#     keeps on every string: O(1), exact.
+#   * Short non-ASCII text is encoded; it is small by definition.
+#   * Long non-ASCII text is ESTIMATED from a few evenly spaced windows, a
+#     bounded cost of a few microseconds whatever the size.
+#   * Image/audio blocks carry base64 (ASCII) data; its length is the size.
+_UTF8_EXACT_CHARS = 4096
+_UTF8_WINDOWS = 8
+_UTF8_WINDOW_CHARS = 64
+
+
+def _utf8_len(text: str) -> int:
+    """UTF-8 byte length of ``text``: exact for ASCII or short text, else sampled."""
+    n = len(text)
+    if text.isascii():
+        return n
+    if n <= _UTF8_EXACT_CHARS:
+        return len(text.encode("utf-8", "surrogatepass"))
+    step = (n - _UTF8_WINDOW_CHARS) // (_UTF8_WINDOWS - 1)
+    sampled = 0
+    for i in range(_UTF8_WINDOWS):
+        start = i * step
+        sampled += len(text[start:start + _UTF8_WINDOW_CHARS].encode("utf-8", "surrogatepass"))
+    return sampled * n // (_UTF8_WINDOWS * _UTF8_WINDOW_CHARS)
+
+
+def _block_size(block: Any) -> int:
+    text = getattr(block, "text", None)
+    if isinstance(text, str):
+        return _utf8_len(text)
+    data = getattr(block, "data", None)  # ImageContent / AudioContent: base64
+    if isinstance(data, str):
+        return len(data)
+    resource = getattr(block, "resource", None)  # EmbeddedResource
+    if resource is not None:
+        body = getattr(resource, "text", None) or getattr(resource, "blob", None)
+        return _utf8_len(body) if isinstance(body, str) else 0
+    return 0
+
+
 def _result_size(result: Any) -> int | None:
-    """Best-effort serialized byte size of a tool result (output-size stats)."""
+    """Serialized byte size of a tool result (output-size stats); see above."""
     if result is None:
         return None
     try:
@@ -761,23 +1084,36 @@ def _result_size(result: Any) -> int | None:
         if content is not None:
             total = 0
             for block in content:
-                text = getattr(block, "text", None)
-                total += len((text if text is not None else str(block)).encode("utf-8"))
+                total += _block_size(block)
             return total
         sc = getattr(result, "structured_content", None)
         if sc is not None:
-            return len(json.dumps(sc, default=str).encode("utf-8"))
+            return len(_json_codec.dumps_bytes(sc, default=str))
         return len(str(result).encode("utf-8"))
     except Exception:
         return None
 
 
+def _log_exporter(log_path: str):
+    """The writer's after-rotation hook for TOGOMCP_LOG_EXPORT, or None."""
+    dest = os.getenv("TOGOMCP_LOG_EXPORT", "").strip()
+    if not dest:
+        return None
+
+    def export() -> None:
+        from togo_mcp.log_export import export_log
+
+        export_log(log_path, dest, endpoints_csv=ENDPOINTS_CSV)
+
+    return export
+
+
 class _ToolCallLogger(_Middleware):
     """Emit one JSONL record per MCP tool call.
 
     Enabled by setting TOGOMCP_QUERY_LOG to a filesystem path. Unset/empty =
-    disabled (the default), in which case on_call_tool short-circuits and adds
-    no measurable overhead. SPARQL calls enrich their record via
+    disabled (the default), in which case no record is built or written; the
+    call is still timed for `live` (below). SPARQL calls enrich their record via
     _sparql_extra_var (set inside execute_sparql).
 
     TOGOMCP_LOG_RAW_IP additionally records the client address in the clear, as
@@ -787,6 +1123,23 @@ class _ToolCallLogger(_Middleware):
     list — see CLAUDE.md) loses the raw address rather than silently leaking
     one. Turning it on makes the log PII, including everything /stats/log
     streams; `ip_hash` is unaffected and is written either way.
+
+    Records are handed to a background JsonlLogWriter (togo_mcp.toolcall_log),
+    so no log I/O runs on the event loop. TOGOMCP_LOG_QUEUE_SIZE bounds the
+    backlog (records beyond it are dropped and counted); TOGOMCP_LOG_FSYNC sets
+    the durability policy (off / batch / <seconds>). The writer also keeps the
+    sidecar index /stats/log filters through (togo_mcp.log_index), gzips rotated
+    segments (TOGOMCP_LOG_COMPRESS) and prunes them by total size and age
+    (TOGOMCP_LOG_RETAIN_MB / TOGOMCP_LOG_RETAIN_DAYS). With TOGOMCP_LOG_EXPORT
+    set, every rotation also appends the log to that columnar store.
+
+    Each finished call is also counted in `live`, the in-memory last-24-hours
+    window /stats/live serves (togo_mcp.live) without reading the log — with
+    logging on or off.
+
+    TOGOMCP_LOG_SAMPLE / TOGOMCP_LOG_SAMPLE_IP_BUDGET thin the log under heavy
+    traffic (togo_mcp.log_sampling): the keep/drop decision is made before the
+    record is built, and a kept record carries its `sample_weight`.
     """
 
     def __init__(self) -> None:
@@ -798,28 +1151,50 @@ class _ToolCallLogger(_Middleware):
             "yes",
             "on",
         )
-        self._log: logging.Logger | None = None
+        self._writer: JsonlLogWriter | None = None
+        self._sampler = _log_sampler_from_env(os.environ)
+        self.live = LiveWindow()
         if self._enabled:
             try:
                 log_dir = os.path.dirname(log_path)
                 if log_dir:
                     os.makedirs(log_dir, exist_ok=True)
-                handler = RotatingFileHandler(
-                    log_path, maxBytes=50_000_000, backupCount=10, encoding="utf-8"
+                try:
+                    queue_size = int(os.getenv("TOGOMCP_LOG_QUEUE_SIZE", "") or DEFAULT_QUEUE_SIZE)
+                except ValueError:
+                    queue_size = DEFAULT_QUEUE_SIZE
+                self._writer = JsonlLogWriter(
+                    log_path,
+                    queue_size=queue_size,
+                    fsync_every=parse_fsync_policy(os.getenv("TOGOMCP_LOG_FSYNC")),
+                    index_keys=RecordKeys(ENDPOINTS_CSV),
+                    after_rotate=_log_exporter(log_path),
+                    **parse_retention(os.environ),
                 )
-                handler.setFormatter(logging.Formatter("%(message)s"))
-                log = logging.getLogger("togomcp.toolcalls")
-                log.setLevel(logging.INFO)
-                log.propagate = False
-                log.handlers = [handler]
-                self._log = log
+                atexit.register(self._writer.close)
             except OSError as exc:
                 # A logging misconfiguration must never stop the server booting.
                 logger.warning(
                     "tool-call logging disabled: cannot open %s (%s)", log_path, exc
                 )
                 self._enabled = False
-                self._log = None
+                self._writer = None
+
+    def flush(self) -> bool:
+        """Wait until every record logged so far is on disk (tests, shutdown);
+        False if the writer did not get there within its timeout."""
+        if self._writer is not None:
+            return self._writer.flush()
+        return True
+
+    def counters(self) -> dict[str, int] | None:
+        """Writer counters (written / dropped / errors / ...) and, when sampling,
+        the sampler's; None when disabled."""
+        if self._writer is None:
+            return None
+        if self._sampler is None:
+            return self._writer.counters()
+        return {**self._writer.counters(), **self._sampler.counters()}
 
     @staticmethod
     def _client_ip() -> str | None:
@@ -855,9 +1230,6 @@ class _ToolCallLogger(_Middleware):
         return xff[:200] if xff else None
 
     async def on_call_tool(self, context, call_next):
-        if not self._enabled:
-            return await call_next(context)
-
         token = _sparql_extra_var.set(None)
         start = time.perf_counter()
         status = "ok"
@@ -876,15 +1248,63 @@ class _ToolCallLogger(_Middleware):
             elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
             extra = _sparql_extra_var.get()
             _sparql_extra_var.reset(token)
-            fctx = context.fastmcp_context
-            client_ip = self._client_ip()
+            tool = context.message.name
+            output_bytes = _result_size(result)
+            self.live.add(
+                # caller-supplied: a made-up tool name must not mint a row
+                "unknown" if error_class == "NotFoundError" else tool,
+                error=status == "error",
+                elapsed_ms=elapsed_ms,
+                bytes_out=output_bytes,
+                endpoint=_endpoint_label(extra["endpoint_url"])
+                if extra and "endpoint_url" in extra
+                else None,
+            )
+            if self._enabled:
+                self._log(
+                    context,
+                    status=status,
+                    elapsed_ms=elapsed_ms,
+                    output_bytes=output_bytes,
+                    extra=extra,
+                    error_class=error_class,
+                    error_message=error_message,
+                )
+
+    def _log(
+        self,
+        context,
+        *,
+        status: str,
+        elapsed_ms: float,
+        output_bytes: int | None,
+        extra: dict[str, Any] | None,
+        error_class: str | None,
+        error_message: str | None,
+    ) -> None:
+        """Build the call's record (unless sampled out) and queue it for the writer."""
+        tool = context.message.name
+        fctx = context.fastmcp_context
+        client_ip = self._client_ip()
+        client = _client_info(fctx)
+        weight = 1
+        if self._sampler is not None:
+            weight = self._sampler.weight(
+                tool=tool,
+                client=client["name"] if client else None,
+                ip=client_ip,
+                error=status == "error",
+                elapsed_ms=elapsed_ms,
+                extra=extra,
+            )
+        if weight:
             record: dict[str, Any] = {
                 "ts": datetime.now(timezone.utc).isoformat(),
-                "tool": context.message.name,
+                "tool": tool,
                 "args": context.message.arguments or {},
                 "status": status,
                 "elapsed_ms": elapsed_ms,
-                "output_bytes": _result_size(result),
+                "output_bytes": output_bytes,
                 "session_id": getattr(fctx, "session_id", None) if fctx else None,
                 "request_id": getattr(fctx, "request_id", None) if fctx else None,
                 "origin_request_id": (
@@ -893,8 +1313,10 @@ class _ToolCallLogger(_Middleware):
                 "client_id": getattr(fctx, "client_id", None) if fctx else None,
                 "transport": getattr(fctx, "transport", None) if fctx else None,
                 "ip_hash": _hash_ip(client_ip),
-                "meta": {**_STATIC_META, "client": _client_info(fctx)},
+                "meta": {**_STATIC_META, "client": client},
             }
+            if weight > 1:
+                record["sample_weight"] = weight
             if self._raw_ip:
                 record["ip"] = client_ip
                 fwd = self._forwarded_for()
@@ -905,14 +1327,44 @@ class _ToolCallLogger(_Middleware):
                 record["error_message"] = error_message
             if extra:
                 record["extra"] = extra
+            # A non-blocking enqueue: serializing, writing and rotating happen
+            # on the writer thread, so a slow disk never delays this response.
+            # A full queue drops (and counts) the record instead of waiting.
+            self._writer.submit(record)  # type: ignore[union-attr]
+
+
+_tool_call_logger = _ToolCallLogger()
+mcp.add_middleware(_tool_call_logger)
+
+# TOGOMCP_TRACE_LOG / TOGOMCP_TRACE_OTEL / TOGOMCP_TRACE_MIN_MS; off by default.
+_tracing.configure_from_env(os.environ)
+
+
+class _ToolCallMetrics(_Middleware):
+    """Count and time every tool call for /metrics, whether or not logging is on,
+    and open the call's root trace span (togo_mcp.tracing) when tracing is.
+
+    The tool name is caller-supplied; a call to a tool that does not exist is
+    labelled ``unknown`` so it cannot mint a new series.
+    """
+
+    async def on_call_tool(self, context, call_next):
+        start = time.perf_counter()
+        tool, status = context.message.name, "ok"
+        with _tracing.span(f"tool {tool}", tool=tool):
             try:
-                self._log.info(json.dumps(record, default=str))  # type: ignore[union-attr]
-            except Exception:
-                # Logging must never break a tool call.
-                pass
+                return await call_next(context)
+            except NotFoundError:
+                tool, status = "unknown", "error"
+                raise
+            except BaseException:
+                status = "error"
+                raise
+            finally:
+                _metrics.TOOL_CALL_SECONDS.observe(time.perf_counter() - start, tool, status)
 
 
-mcp.add_middleware(_ToolCallLogger())
+mcp.add_middleware(_ToolCallMetrics())
 
 
 @mcp.custom_route("/health", methods=["GET"])
@@ -933,14 +1385,29 @@ async def index(request: Request) -> HTMLResponse:
 # Reads the JSONL written by _ToolCallLogger and serves monthly aggregates.
 # Disabled unless BOTH TOGOMCP_STATS_USER and TOGOMCP_STATS_PASSWORD are set —
 # the route then refuses (503) so stats are never exposed unauthenticated.
-# Results are cached for _STATS_TTL seconds to bound recompute cost; computing
-# is read-only and cannot affect tool calls.
+# Computing is read-only and cannot affect tool calls — nor stall them: the
+# refresh runs in a worker thread, and it is incremental (stats.IncrementalStats
+# parses only the bytes appended since the previous refresh), so a dashboard
+# load costs milliseconds instead of a re-parse of every rotated file on the
+# event loop. Results are still cached for _STATS_TTL seconds. The first
+# refresh reads the whole log; TOGOMCP_STATS_JOBS > 1 parses it in that many
+# processes.
+#
+# The rendered pages are cached too. The HTML and the JSON body are built (and
+# gzipped) once per stats `version` — it moves only when a refresh folded in new
+# records — and served with an ETag and Last-Modified, so a poller that sends
+# If-None-Match gets a 304 with no body, and one that does not still skips the
+# ~200 lines of render_html.
 # --------------------------------------------------------------------------- #
 import base64 as _base64
+from email.utils import formatdate as _formatdate, parsedate_to_datetime as _parsedate
+import gzip as _gzip
 import hmac as _hmac
 
-_STATS_TTL = 60.0
-_stats_cache: dict[str, Any] = {"ts": 0.0, "data": None}
+_STATS_TTL = 10.0
+_stats_cache: dict[str, Any] = {"ts": 0.0, "data": None, "version": None}
+_stats_tail: Any = None  # stats.IncrementalStats, created on the first request
+_GZIP_MIN_BYTES = 1024
 
 
 def _stats_configured() -> tuple[str, str] | None:
@@ -962,23 +1429,101 @@ def _check_basic_auth(request: Request, creds: tuple[str, str]) -> bool:
     return _hmac.compare_digest(user, creds[0]) and _hmac.compare_digest(pw, creds[1])
 
 
-def _get_stats() -> dict[str, Any]:
+async def _get_stats() -> dict[str, Any]:
+    global _stats_tail
     now = time.monotonic()
-    if _stats_cache["data"] is not None and (now - _stats_cache["ts"]) < _STATS_TTL:
+    fresh = _stats_cache["data"] is not None and (now - _stats_cache["ts"]) < _STATS_TTL
+    _metrics.cache_lookup("stats", fresh)
+    if fresh:
         return _stats_cache["data"]
-    from togo_mcp import stats as _stats_mod
+    if _stats_tail is None:
+        from togo_mcp import stats as _stats_mod
 
-    data = _stats_mod.compute_stats(endpoints_csv=ENDPOINTS_CSV, mie_dir=MIE_DIR)
+        try:
+            jobs = int(os.getenv("TOGOMCP_STATS_JOBS", "") or 1)
+        except ValueError:
+            jobs = 1
+        _stats_tail = _stats_mod.IncrementalStats(
+            endpoints_csv=ENDPOINTS_CSV, mie_dir=MIE_DIR, jobs=jobs
+        )
+    data = await asyncio.to_thread(_stats_tail.refresh)
     _stats_cache["data"] = data
+    _stats_cache["version"] = _stats_tail.version
     _stats_cache["ts"] = now
     return data
 
 
+class _Rendered:
+    """One representation of the stats (HTML or JSON), rendered and gzipped once."""
+
+    __slots__ = ("key", "body", "gzipped", "etag", "modified", "last_modified")
+
+    def __init__(self, key: Any, body: bytes) -> None:
+        self.key = key
+        self.body = body
+        self.gzipped = _gzip.compress(body, 6) if len(body) >= _GZIP_MIN_BYTES else None
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:20]}"'
+        self.modified = int(time.time())  # HTTP dates have whole seconds
+        self.last_modified = _formatdate(self.modified, usegmt=True)
+
+
+_stats_rendered: dict[str, _Rendered] = {}
+
+
+def _rendered(kind: str, key: Any, render) -> _Rendered:
+    """The cached ``kind`` representation for ``key``, rendering it on a miss."""
+    entry = _stats_rendered.get(kind)
+    hit = entry is not None and entry.key == key
+    _metrics.cache_lookup(f"stats_{kind}", hit)
+    if not hit:
+        entry = _stats_rendered[kind] = _Rendered(key, render().encode("utf-8"))
+    return entry  # type: ignore[return-value]
+
+
+def _not_modified(request: Request, entry: _Rendered) -> bool:
+    inm = request.headers.get("if-none-match")
+    if inm is not None:  # takes precedence over If-Modified-Since (RFC 9110)
+        tags = [t.strip().removeprefix("W/") for t in inm.split(",")]
+        return "*" in tags or entry.etag in tags
+    ims = request.headers.get("if-modified-since")
+    if ims:
+        try:
+            return _parsedate(ims).timestamp() >= entry.modified
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _accepts_gzip(request: Request) -> bool:
+    for part in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = part.partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            q = params.strip()
+            return not (q.startswith("q=") and q[2:].strip() in ("0", "0.0", "0.00", "0.000"))
+    return False
+
+
+def _cached_response(request: Request, entry: _Rendered, media_type: str) -> Response:
+    headers = {
+        "ETag": entry.etag,
+        "Last-Modified": entry.last_modified,
+        # behind Basic auth: never shared caches, always revalidate
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept-Encoding, Authorization",
+    }
+    if _not_modified(request, entry):
+        return Response(status_code=304, headers=headers)
+    if entry.gzipped is not None and _accepts_gzip(request):
+        headers["Content-Encoding"] = "gzip"
+        return Response(entry.gzipped, media_type=media_type, headers=headers)
+    return Response(entry.body, media_type=media_type, headers=headers)
+
+
 _AUTH_HEADERS = {"WWW-Authenticate": 'Basic realm="TogoMCP stats"'}
 
 
 @mcp.custom_route("/stats", methods=["GET"])
-async def stats_dashboard(request: Request) -> HTMLResponse:
+async def stats_dashboard(request: Request) -> Response:
     creds = _stats_configured()
     if creds is None:
         return HTMLResponse(
@@ -989,7 +1534,9 @@ async def stats_dashboard(request: Request) -> HTMLResponse:
     from togo_mcp import stats as _stats_mod
 
     try:
-        return HTMLResponse(_stats_mod.render_html(_get_stats()))
+        data = await _get_stats()
+        entry = _rendered("html", _stats_cache["version"], lambda: _stats_mod.render_html(data))
+        return _cached_response(request, entry, "text/html; charset=utf-8")
     except Exception as exc:  # never 500 with a stack trace; logging stays read-only
         logger.warning("stats render failed: %s", exc)
         return HTMLResponse("<h1>500</h1><p>Could not compute stats.</p>", status_code=500)
@@ -1010,6 +1557,12 @@ async def stats_raw_log(request: Request):
     The path comes from TOGOMCP_QUERY_LOG only; nothing is caller-supplied, so
     there is no traversal surface.
 
+    Optional filters narrow the download server-side: `since` / `until` (UTC
+    days, YYYY-MM-DD, inclusive), `tool`, and `database` (attributed as in the
+    dashboard's per-database table). With any of them, only matching records
+    are served, read by seeking to the blocks of the writer's sidecar index
+    that can match (togo_mcp.log_index) instead of reading every file.
+
     NOTE: this streams records verbatim, so under TOGOMCP_LOG_RAW_IP it serves
     raw client IPs (`ip`) to anyone holding the dashboard credentials. The
     aggregate views never do. Treat the credentials accordingly.
@@ -1021,52 +1574,162 @@ async def stats_raw_log(request: Request):
         return PlainTextResponse(
             "Authentication required", status_code=401, headers=_AUTH_HEADERS
         )
+    from togo_mcp import log_index as _log_index
     from togo_mcp import stats as _stats_mod
 
+    filters = {
+        k: request.query_params.get(k) or None for k in ("since", "until", "tool", "database")
+    }
+    for k in ("since", "until"):
+        if filters[k] and not _log_index.DAY_RE.match(filters[k]):
+            return PlainTextResponse(f"{k} must be a UTC day, YYYY-MM-DD.", status_code=400)
+
     base = os.getenv("TOGOMCP_QUERY_LOG", "").strip()
     paths = _stats_mod.log_paths(base)
     if not paths:
         return PlainTextResponse("No log file found.", status_code=404)
 
+    stamp = time.strftime("%Y%m%d", time.gmtime())
+    if any(filters.values()):
+        return StreamingResponse(
+            _log_index.iter_filtered(
+                reversed(paths), keys=_log_index.RecordKeys(ENDPOINTS_CSV), **filters
+            ),
+            media_type="application/x-ndjson",
+            headers={
+                "Content-Disposition":
+                    f'attachment; filename="togomcp-log-{stamp}-filtered.jsonl"',
+                "X-Log-Files": str(len(paths)),
+            },
+        )
+
     def _iter_chunks():
         # Reversed: log_paths returns [base (newest), base.1, base.2 (oldest)].
         for path in reversed(paths):
             try:
-                with open(path, "rb") as fh:
+                with _log_index.open_log(path) as fh:  # .gz segments decompressed
                     while chunk := fh.read(64 * 1024):
                         yield chunk
-            except OSError as exc:  # a file rotated away mid-stream — skip it
+            except (OSError, EOFError) as exc:  # a file rotated away mid-stream — skip it
                 logger.warning("stats log stream: skipping %s (%s)", path, exc)
 
-    stamp = time.strftime("%Y%m%d", time.gmtime())
-    total = sum(os.path.getsize(p) for p in paths if os.path.exists(p))
-    return StreamingResponse(
-        _iter_chunks(),
-        media_type="application/x-ndjson",
-        headers={
-            "Content-Disposition": f'attachment; filename="togomcp-log-{stamp}.jsonl"',
-            # Advisory only: rotation could change the real length mid-stream,
-            # so this is not sent as Content-Length.
-            "X-Log-Bytes": str(total),
-            "X-Log-Files": str(len(paths)),
-        },
-    )
+    headers = {
+        "Content-Disposition": f'attachment; filename="togomcp-log-{stamp}.jsonl"',
+        "X-Log-Files": str(len(paths)),
+    }
+    # The bytes the stream will carry: .gz segments count decompressed (their
+    # sidecar records the plain size), as served. Advisory only — rotation can
+    # change the real length mid-stream, so this is not Content-Length — and
+    # omitted when a segment's size cannot be known without decompressing it.
+    sizes = []
+    for path in paths:
+        try:
+            sizes.append(_log_index.uncompressed_size(path))
+        except OSError:  # rotated away since log_paths; the stream skips it too
+            pass
+    if None not in sizes:
+        headers["X-Log-Bytes"] = str(sum(sizes))
+    return StreamingResponse(_iter_chunks(), media_type="application/x-ndjson", headers=headers)
+
+
+def _live_view(request: Request) -> dict[str, Any] | str:
+    """The /stats/live snapshot for ``?minutes=``, or an error message."""
+    from togo_mcp import live as _live_mod
+
+    raw = request.query_params.get("minutes") or str(_live_mod.DEFAULT_VIEW_MINUTES)
+    try:
+        minutes = int(raw)
+    except ValueError:
+        minutes = 0
+    if not 1 <= minutes <= _live_mod.WINDOW_MINUTES:
+        return f"minutes must be an integer from 1 to {_live_mod.WINDOW_MINUTES}."
+    return _tool_call_logger.live.snapshot(minutes)
+
+
+@mcp.custom_route("/stats/live", methods=["GET"])
+async def stats_live(request: Request) -> HTMLResponse:
+    """Calls, errors, latency and bytes out over the last minutes-to-24 hours,
+    per tool and per SPARQL endpoint, from memory (togo_mcp.live) — what is
+    failing NOW, which the monthly /stats tables cannot show."""
+    creds = _stats_configured()
+    if creds is None:
+        return HTMLResponse(
+            "<h1>503</h1><p>Stats dashboard not configured.</p>", status_code=503
+        )
+    if not _check_basic_auth(request, creds):
+        return HTMLResponse("Authentication required", status_code=401, headers=_AUTH_HEADERS)
+    from togo_mcp import live as _live_mod
+
+    snap = _live_view(request)
+    if isinstance(snap, str):
+        return HTMLResponse(snap, status_code=400)
+    return HTMLResponse(_live_mod.render_html(snap))
+
+
+@mcp.custom_route("/stats/live.json", methods=["GET"])
+async def stats_live_json(request: Request) -> JSONResponse:
+    creds = _stats_configured()
+    if creds is None:
+        return JSONResponse({"error": "not configured"}, status_code=503)
+    if not _check_basic_auth(request, creds):
+        return JSONResponse({"error": "auth required"}, status_code=401, headers=_AUTH_HEADERS)
+    snap = _live_view(request)
+    if isinstance(snap, str):
+        return JSONResponse({"error": snap}, status_code=400)
+    return JSONResponse(snap)
 
 
 @mcp.custom_route("/stats.json", methods=["GET"])
-async def stats_json(request: Request) -> JSONResponse:
+async def stats_json(request: Request) -> Response:
     creds = _stats_configured()
     if creds is None:
         return JSONResponse({"error": "not configured"}, status_code=503)
     if not _check_basic_auth(request, creds):
         return JSONResponse({"error": "auth required"}, status_code=401, headers=_AUTH_HEADERS)
     try:
-        return JSONResponse(_get_stats())
+        data = await _get_stats()
+        # Keyed on the stats version alone: the writer's live counters change
+        # with every logged call, so they are served by /stats/log_writer.json
+        # rather than folded into (and defeating) this cached body's ETag.
+        entry = _rendered(
+            "json", _stats_cache["version"],
+            lambda: json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")),
+        )
+        return _cached_response(request, entry, "application/json")
     except Exception as exc:
         logger.warning("stats compute failed: %s", exc)
         return JSONResponse({"error": "compute failed"}, status_code=500)
 
 
+@mcp.custom_route("/stats/log_writer.json", methods=["GET"])
+async def stats_log_writer(request: Request) -> JSONResponse:
+    """The log writer's live counters (written, dropped, errors, rotations,
+    queued); null when logging is off. Never cached: drops are what to watch."""
+    creds = _stats_configured()
+    if creds is None:
+        return JSONResponse({"error": "not configured"}, status_code=503)
+    if not _check_basic_auth(request, creds):
+        return JSONResponse({"error": "auth required"}, status_code=401, headers=_AUTH_HEADERS)
+    return JSONResponse(
+        {"log_writer": _tool_call_logger.counters()},
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def prometheus_metrics(request: Request) -> PlainTextResponse:
+    """Live counters and histograms (togo_mcp.metrics) in the Prometheus text
+    format, behind the same Basic auth as /stats."""
+    creds = _stats_configured()
+    if creds is None:
+        return PlainTextResponse("Stats dashboard not configured.", status_code=503)
+    if not _check_basic_auth(request, creds):
+        return PlainTextResponse(
+            "Authentication required", status_code=401, headers=_AUTH_HEADERS
+        )
+    return PlainTextResponse(_metrics.REGISTRY.render(), media_type=_metrics.CONTENT_TYPE)
+
+
 @mcp.custom_route("/tutorial", methods=["GET"])
 async def tutorial_en(request: Request) -> HTMLResponse:
     return HTMLResponse(TUTORIAL_DIR.joinpath("tutorial-en.html").read_text(encoding="utf-8"))
@@ -0,0 +1,205 @@
+"""Mergeable summaries for the usage statistics: quantiles and distinct counts.
+
+:mod:`togo_mcp.stats` used to keep every duration in a list (sorted for each
+percentile) and every ip hash in a set, per month and per tool/client/database,
+so its memory grew linearly with the log. The two classes here bound that while
+staying EXACT where the old code was exact:
+
+  * :class:`QuantileSketch` holds the raw values up to ``EXACT_LIMIT`` and then
+    switches to a DDSketch (log-spaced buckets, 1% relative error on every
+    quantile);
+  * :class:`DistinctCounter` holds the raw set up to ``EXACT_LIMIT`` and then
+    switches to a HyperLogLog (4096 registers, ~1.6% standard error).
+
+Small logs — and every test fixture — therefore produce exactly the numbers
+they always did; only a cell with thousands of observations is approximated.
+
+Both merge EXACTLY: bucket counts add and registers take the maximum, so merging
+two partial summaries gives the same state as summarizing the union in one pass,
+in any order. That is what lets per-file or per-process partial aggregates be
+combined (see ``stats.StatsAccumulator.merge``). Hashing uses blake2b, never the
+per-process-salted ``hash()``, so summaries built in different processes agree.
+
+Standard library only.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+from typing import Iterable
+
+# Raw values/elements kept before switching to the approximate form.
+EXACT_LIMIT = 2048
+
+# DDSketch relative accuracy: every reported quantile is within 1% of a value
+# that is actually at that rank.
+_DD_ALPHA = 0.01
+_DD_GAMMA = (1 + _DD_ALPHA) / (1 - _DD_ALPHA)
+_DD_LOG_GAMMA = math.log(_DD_GAMMA)
+_DD_MIN = 1e-9  # values at or below this (e.g. 0 ms) share one zero bucket
+
+# HyperLogLog precision: 2**12 registers.
+_HLL_P = 12
+_HLL_M = 1 << _HLL_P
+_HLL_ALPHA = 0.7213 / (1 + 1.079 / _HLL_M)
+_HLL_WBITS = 64 - _HLL_P
+
+
+def exact_percentile(sorted_vals: list[float], pct: float) -> float:
+    """Linear-interpolated percentile of an already-sorted list, rounded to 0.01."""
+    if not sorted_vals:
+        return 0.0
+    if len(sorted_vals) == 1:
+        return round(sorted_vals[0], 2)
+    rank = pct / 100 * (len(sorted_vals) - 1)
+    lo = int(rank)
+    hi = min(lo + 1, len(sorted_vals) - 1)
+    frac = rank - lo
+    return round(sorted_vals[lo] * (1 - frac) + sorted_vals[hi] * frac, 2)
+
+
+class QuantileSketch:
+    """Count, sum and quantiles of a stream of non-negative numbers."""
+
+    __slots__ = ("count", "total", "_values", "_buckets", "_zeros")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self._values: list[float] | None = []  # None once switched to buckets
+        self._buckets: dict[int, int] = {}
+        self._zeros = 0
+
+    @property
+    def exact(self) -> bool:
+        return self._values is not None
+
+    def add(self, value: float, n: int = 1) -> None:
+        """Add ``value`` ``n`` times (``n`` > 1: a sampled record's weight)."""
+        self.count += n
+        self.total += value * n
+        if self._values is not None and len(self._values) + n > EXACT_LIMIT:
+            self._to_buckets()  # before, never after: n comes from the log, unbounded
+        if self._values is None:
+            self._bucket(value, n)
+        elif n == 1:
+            self._values.append(value)
+        else:
+            self._values.extend([value] * n)
+
+    def _bucket(self, value: float, n: int = 1) -> None:
+        if value <= _DD_MIN:
+            self._zeros += n
+        else:
+            i = math.ceil(math.log(value) / _DD_LOG_GAMMA)
+            self._buckets[i] = self._buckets.get(i, 0) + n
+
+    def _to_buckets(self) -> None:
+        values, self._values = self._values, None
+        for v in values or ():
+            self._bucket(v)
+
+    def merge(self, other: QuantileSketch) -> None:
+        """Fold ``other`` in; equivalent to having added its values here."""
+        self.count += other.count
+        self.total += other.total
+        if self._values is not None and other._values is not None:
+            self._values.extend(other._values)
+            if len(self._values) > EXACT_LIMIT:
+                self._to_buckets()
+            return
+        if self._values is not None:
+            self._to_buckets()
+        if other._values is not None:
+            for v in other._values:
+                self._bucket(v)
+        else:
+            self._zeros += other._zeros
+            for i, n in other._buckets.items():
+                self._buckets[i] = self._buckets.get(i, 0) + n
+
+    def mean(self) -> float:
+        return round(self.total / self.count, 2) if self.count else 0.0
+
+    def percentile(self, pct: float) -> float:
+        if self._values is not None:
+            return exact_percentile(sorted(self._values), pct)
+        rank = pct / 100 * (self.count - 1)
+        seen = self._zeros
+        if rank < seen:
+            return 0.0
+        for i in sorted(self._buckets):
+            seen += self._buckets[i]
+            if rank < seen:
+                # the value every member of bucket i is within alpha of
+                return round(2 * _DD_GAMMA ** i / (_DD_GAMMA + 1), 2)
+        return 0.0  # not reached: the counts add up to self.count
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big"
+    )
+
+
+class DistinctCounter:
+    """Number of distinct strings seen: exact up to EXACT_LIMIT, HyperLogLog beyond."""
+
+    __slots__ = ("_items", "_registers")
+
+    def __init__(self, items: Iterable[str] = ()) -> None:
+        self._items: set[str] | None = set()
+        self._registers: bytearray | None = None
+        for item in items:
+            self.add(item)
+
+    @property
+    def exact(self) -> bool:
+        return self._items is not None
+
+    def add(self, item: str) -> None:
+        if self._items is not None:
+            self._items.add(item)
+            if len(self._items) > EXACT_LIMIT:
+                self._to_registers()
+        else:
+            self._register(item)
+
+    def _register(self, item: str) -> None:
+        h = _hash64(item)
+        idx = h >> _HLL_WBITS
+        w = h & ((1 << _HLL_WBITS) - 1)
+        rho = _HLL_WBITS - w.bit_length() + 1
+        if rho > self._registers[idx]:  # type: ignore[index]
+            self._registers[idx] = rho  # type: ignore[index]
+
+    def _to_registers(self) -> None:
+        items, self._items = self._items, None
+        self._registers = bytearray(_HLL_M)
+        for item in items or ():
+            self._register(item)
+
+    def merge(self, other: DistinctCounter) -> None:
+        """Fold ``other`` in; equivalent to having added its items here."""
+        if self._items is not None and other._items is not None:
+            self._items |= other._items
+            if len(self._items) > EXACT_LIMIT:
+                self._to_registers()
+            return
+        if self._items is not None:
+            self._to_registers()
+        if other._items is not None:
+            for item in other._items:
+                self._register(item)
+        else:
+            self._registers = bytearray(map(max, self._registers, other._registers))  # type: ignore[arg-type]
+
+    def __len__(self) -> int:
+        if self._items is not None:
+            return len(self._items)
+        regs = self._registers
+        estimate = _HLL_ALPHA * _HLL_M * _HLL_M / sum(2.0 ** -r for r in regs)  # type: ignore[union-attr]
+        zeros = regs.count(0)  # type: ignore[union-attr]
+        if estimate <= 2.5 * _HLL_M and zeros:
+            estimate = _HLL_M * math.log(_HLL_M / zeros)  # small-range correction
+        return int(round(estimate))
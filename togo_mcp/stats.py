@@ -13,7 +13,8 @@ raw address is what ``/stats/log`` is for.
 
 What the collection layer records today (per JSONL line):
   ts, tool, args, status (ok|error), elapsed_ms, session_id/request_id/...,
-  ip_hash (plus raw ip when opted in), error_class, error_message, and for
+  ip_hash (plus raw ip when opted in), error_class, error_message,
+  sample_weight when the log is sampled (every count here adds it), and for
   SPARQL an ``extra`` dict with
   endpoint_url, query_sha256, sparql_status (ok|timeout|endpoint_unresponsive|
   pool_exhausted|network_error|http_4xx|http_5xx|http_gateway), http_code,
@@ -21,7 +22,8 @@ What the collection layer records today (per JSONL line):
   (passed|failed).
 
 This module derives, per calendar month (UTC):
-  * per-tool: call count, error count/rate, duration p50/p95/mean
+  * per-tool: call count, error count/rate, duration p50/p95/mean (exact up
+    to 2048 calls per cell, then within 1% — see :mod:`togo_mcp.sketches`)
   * SPARQL failure classification (syntax/timeout/empty/huge/endpoint-down/...)
   * per-database usage, split by call kind (query / graphs / search / MIE /
     other) so "read the MIE" is never confused with "queried the endpoint",
@@ -30,16 +32,32 @@ This module derives, per calendar month (UTC):
 from __future__ import annotations
 
 import csv
+import gzip
+import hashlib
 import json
 import logging
 import os
 import re
+import threading
 from collections import defaultdict
 from datetime import datetime, timezone
+from functools import partial
 from pathlib import Path
 from typing import Any, Iterable, Iterator
 
-import yaml
+from . import json_codec
+from .log_index import (
+    GZ_SUFFIX,
+    compressed_source,
+    file_head,
+    head_mark,
+    open_log,
+    same_file,
+)
+from .mie_bundle import load_mie_entries
+from .schema_index import SchemaIndex, build_schema_index
+from .sketches import DistinctCounter, QuantileSketch
+from .toolcall_log import rotated_paths
 
 log = logging.getLogger(__name__)
 
@@ -104,12 +122,14 @@ CALL_KINDS = ("query", "graphs", "search", "mie", "other")
 # faldo:, med2rdf:, schema:, d3o:, skos:, dcterms:) — see _SHARED_PREFIXES.
 #
 # Known limitation: several databases are expressed ENTIRELY in shared
-# vocabularies and are therefore invisible here — go, chebi and mondo live under
-# obo:, reactome under bp:, oma/bgee under orth:/genex:, hgnc/brenda under d3o:.
-# A zero in the co-query column means "not detectable", not "not co-queried",
-# for those. Fixing it properly needs the collection layer to record namespace
-# IRIs rather than prefix strings, since a prefix string is the client's choice,
-# not the data's. (bacdive/mediadive are NOT in this list: they own a real
+# vocabularies — reactome under bp:, oma/bgee under orth:/genex:, hgnc/brenda
+# under d3o: — and are therefore invisible here. A zero in the co-query column
+# means "not detectable", not "not co-queried", for those. (go, chebi and mondo
+# share obo: too, but their terms carry an OBO ID space — obo:GO_, obo:CHEBI_,
+# obo:MONDO_ — which the MIE-generated schema index resolves; see
+# _qname_owners.) Fixing it properly needs the collection layer to record
+# namespace IRIs rather than prefix strings, since a prefix string is the
+# client's choice, not the data's. (bacdive/mediadive are NOT in this list: they own a real
 # namespace, they just bind it to a colliding prefix — see
 # _AMBIGUOUS_PREFIX_QNAMES, which recovers them.)
 SIGNATURE_PREFIXES = {
@@ -270,38 +290,37 @@ def sparql_shape(query: str) -> dict[str, Any]:
 def log_paths(base: str) -> list[str]:
     """Return the active log file plus any rotated siblings (base.1, base.2…).
 
-    ``RotatingFileHandler`` writes ``base`` (newest) and ``base.1`` … ``base.N``
-    (older). We read all that exist; order does not matter (records carry ``ts``).
+    The writer keeps ``base`` (newest) and ``base.1`` … ``base.N`` (older), each
+    rotated one plain or gzipped (``base.2.gz``). We read all that exist; order
+    does not matter (records carry ``ts``). Open them with :func:`open_log`.
     """
     if not base:
         return []
-    out = [base] if os.path.exists(base) else []
-    i = 1
-    while True:
-        p = f"{base}.{i}"
-        if not os.path.exists(p):
-            break
-        out.append(p)
-        i += 1
-    return out
+    return ([base] if os.path.exists(base) else []) + rotated_paths(base)
+
+
+def parse_line(line: str | bytes) -> dict[str, Any] | None:
+    """One JSONL line as a record, or None for a blank, malformed or non-object line."""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        rec = json_codec.loads(line)
+    except (ValueError, TypeError):
+        return None
+    return rec if isinstance(rec, dict) else None
 
 
 def iter_records(paths: Iterable[str]) -> Iterator[dict[str, Any]]:
     """Yield one parsed record per JSONL line, silently skipping bad lines."""
     for path in paths:
         try:
-            with open(path, encoding="utf-8") as fh:
+            with open_log(path) as fh:
                 for line in fh:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        rec = json.loads(line)
-                    except (ValueError, TypeError):
-                        continue
-                    if isinstance(rec, dict):
+                    rec = parse_line(line)
+                    if rec is not None:
                         yield rec
-        except OSError:
+        except (OSError, EOFError):  # EOFError: a truncated .gz
             continue
 
 
@@ -426,6 +445,13 @@ def sparql_class(rec: dict[str, Any]) -> str | None:
     return "other_error"
 
 
+def weight_of(rec: dict[str, Any]) -> int:
+    """How many calls a record stands for: its ``sample_weight`` (see
+    :mod:`togo_mcp.log_sampling`), or 1 for an unsampled record."""
+    w = rec.get("sample_weight")
+    return w if isinstance(w, int) and not isinstance(w, bool) and w > 1 else 1
+
+
 def client_of(rec: dict[str, Any]) -> str:
     """Reporting MCP client name ('claude-code', 'openai-mcp', …) or '<unknown>'."""
     meta = rec.get("meta")
@@ -457,12 +483,41 @@ def call_kind(rec: dict[str, Any]) -> str:
     return "other"
 
 
+_schema_index: SchemaIndex | None = None
+
+
+def _bundled_schema_index() -> SchemaIndex:
+    """The schema index over the bundled MIE corpus, built on first use."""
+    global _schema_index
+    if _schema_index is None:
+        _schema_index = build_schema_index(Path(__file__).parent / "data" / "mie")
+    return _schema_index
+
+
+def _qname_owners(qname: str) -> frozenset[str]:
+    """Databases a single qname is evidence of, in precedence order: a colliding
+    prefix by exclusive local name, a signature prefix, then an OBO ID space
+    from the schema index (shared prefixes only reach that last step)."""
+    prefix, _, local = qname.partition(":")
+    if not local:
+        return frozenset()
+    by_local = _AMBIGUOUS_PREFIX_QNAMES.get(prefix)
+    if by_local is not None:
+        # Colliding prefix: only an exclusive local name identifies a database.
+        return frozenset(db for db, names in by_local.items() if local in names)
+    db = SIGNATURE_PREFIXES.get(prefix)
+    if db is not None:
+        return frozenset((db,))
+    return _bundled_schema_index().owners(qname)
+
+
 def co_queried_databases(rec: dict[str, Any], primary: str | None = None) -> set[str]:
     """Databases a SPARQL record touched *besides* its primary attribution.
 
-    Derived from the namespace prefixes in ``extra.query_shape.predicates`` via
-    SIGNATURE_PREFIXES. Empty for non-SPARQL records and for records logged
-    before query_shape existed. See SIGNATURE_PREFIXES for what this cannot see.
+    Derived from the qnames in ``extra.query_shape.predicates`` via
+    SIGNATURE_PREFIXES and the schema index (see _qname_owners). Empty for
+    non-SPARQL records and for records logged before query_shape existed. See
+    SIGNATURE_PREFIXES for what this cannot see.
     """
     extra = rec.get("extra")
     if not isinstance(extra, dict):
@@ -472,19 +527,7 @@ def co_queried_databases(rec: dict[str, Any], primary: str | None = None) -> set
         return set()
     out = set()
     for qname in shape.get("predicates") or []:
-        prefix, _, local = str(qname).partition(":")
-        if not local:
-            continue
-        by_local = _AMBIGUOUS_PREFIX_QNAMES.get(prefix)
-        if by_local is not None:
-            # Colliding prefix: only an exclusive local name identifies a database.
-            for db, names in by_local.items():
-                if local in names:
-                    out.add(db)
-            continue
-        db = SIGNATURE_PREFIXES.get(prefix)
-        if db is not None:
-            out.add(db)
+        out |= _qname_owners(str(qname))
     out.discard(primary)
     if isinstance(primary, str):
         # An endpoint-group primary ("togovar (cross-db)") names the same
@@ -496,18 +539,6 @@ def co_queried_databases(rec: dict[str, Any], primary: str | None = None) -> set
 # --------------------------------------------------------------------------- #
 # Aggregation
 # --------------------------------------------------------------------------- #
-def _percentile(sorted_vals: list[float], pct: float) -> float:
-    if not sorted_vals:
-        return 0.0
-    if len(sorted_vals) == 1:
-        return round(sorted_vals[0], 2)
-    rank = pct / 100 * (len(sorted_vals) - 1)
-    lo = int(rank)
-    hi = min(lo + 1, len(sorted_vals) - 1)
-    frac = rank - lo
-    return round(sorted_vals[lo] * (1 - frac) + sorted_vals[hi] * frac, 2)
-
-
 def parse_excluded_clients(raw: str | None) -> frozenset[str]:
     """Parse TOGOMCP_STATS_EXCLUDE_CLIENTS ('mcp, glyconavi') into a name set."""
     if not raw:
@@ -515,234 +546,328 @@ def parse_excluded_clients(raw: str | None) -> frozenset[str]:
     return frozenset(part.strip() for part in raw.split(",") if part.strip())
 
 
-def aggregate(
-    records: Iterable[dict[str, Any]],
-    endpoint_groups: dict[str, str] | None = None,
-    mie_dates: dict[str, str] | None = None,
-    exclude_clients: Iterable[str] | None = None,
-) -> dict[str, Any]:
-    """Roll records up into a JSON-serializable monthly statistics structure.
+# Per-cell tallies. Module-level factories, not lambdas, so an accumulator can
+# be pickled to or from a worker process.
+def _tool_tally() -> dict[str, Any]:
+    return {"count": 0, "errors": 0, "ips": DistinctCounter()}
 
-    ``exclude_clients`` drops whole clients by reported name — the escape hatch
-    for a known self-inflicted source (a benchmark harness, a catalog sweeper).
-    It is empty by default and never inferred: which traffic is "real" is an
-    operator's judgement, and a wrong guess silently deletes real users. What
-    was dropped is always reported back in ``excluded_clients``.
+
+def _client_tally() -> dict[str, Any]:
+    return {"calls": 0, "errors": 0, "ips": DistinctCounter(), "days": set(),
+            "tools": defaultdict(int)}
+
+
+def _sparql_tally() -> dict[str, int]:
+    return {c: 0 for c in SPARQL_CLASSES}
+
+
+def _db_tally() -> dict[str, Any]:
+    return {
+        "calls": 0,
+        "sparql": 0,
+        **{k: 0 for k in CALL_KINDS},
+        "errors": 0,
+        "empty": 0,
+        "huge": 0,
+        "rows_sum": 0,
+        "rows_n": 0,
+        "co_query": 0,
+        "ips": DistinctCounter(),
+        "clients": set(),
+        "fail_classes": defaultdict(int),
+    }
+
+
+def _merge_tally(into: dict[str, Any], other: dict[str, Any]) -> None:
+    """Add one tally dict into another: counters add, sets union, summaries merge."""
+    for k, v in other.items():
+        if isinstance(v, (DistinctCounter, QuantileSketch)):
+            into[k].merge(v)
+        elif isinstance(v, set):
+            into[k] |= v
+        elif isinstance(v, dict):
+            for kk, n in v.items():
+                into[k][kk] += n
+        else:
+            into[k] += v
+
+
+class StatsAccumulator:
+    """Running state of :func:`aggregate`: ``add`` one record at a time, read
+    the rolled-up structure with ``result``, combine partials with ``merge``.
+
+    Memory is bounded by the number of cells (month × tool / client / database),
+    not by the number of records: durations go into a :class:`QuantileSketch`
+    and distinct ip hashes into a :class:`DistinctCounter` (both exact until a
+    cell has thousands of observations — see :mod:`togo_mcp.sketches`). The
+    monthly rollup and the MIE-trap feed are fed in the same pass.
+
+    Partials merge exactly: accumulating two halves of a log and merging them
+    gives the same result as accumulating the whole, so files or processes can
+    be aggregated independently (:class:`IncrementalStats` keeps one partial
+    per log file). ``result`` does not consume the state.
     """
-    endpoint_groups = endpoint_groups or {}
-    mie_dates = mie_dates or {}
-    excluded = frozenset(exclude_clients or ())
-    records = list(records)  # consumed twice: monthly rollup + trap feed
-    n_excluded = 0
-    if excluded:
-        kept = [r for r in records if client_of(r) not in excluded]
-        n_excluded = len(records) - len(kept)
-        records = kept
-
-    # month -> accumulators
-    tool_durs: dict[str, dict[str, list[float]]] = defaultdict(
-        lambda: defaultdict(list)
-    )
-    tool_counts: dict[str, dict[str, dict[str, Any]]] = defaultdict(
-        lambda: defaultdict(lambda: {"count": 0, "errors": 0, "ips": set()})
+
+    __slots__ = (
+        "endpoint_groups", "excluded", "durations", "tool_counts", "clients",
+        "sparql", "dbs", "co_pairs", "months", "n_total", "n_skipped_no_month",
+        "n_excluded", "traps",
     )
-    # month -> client name -> reach. Call counts alone cannot tell demand from a
-    # benchmark harness: in 2026-08 `mcp` (the SDK default name) sent 8,415 calls
-    # from 11 ip_hashes over 10 days, while openai-mcp sent 693 from 355. Distinct
-    # ip_hash is the discriminator; distinct SESSIONS is not, and is deliberately
-    # not reported — ChatGPT connectors are stateless, so their calls-per-session
-    # is 1.00 for the same reason a scripted sweep's is.
-    clients: dict[str, dict[str, dict[str, Any]]] = defaultdict(
-        lambda: defaultdict(
-            lambda: {"calls": 0, "errors": 0, "ips": set(), "days": set(),
-                     "tools": defaultdict(int)}
+
+    def __init__(
+        self,
+        endpoint_groups: dict[str, str] | None = None,
+        mie_dates: dict[str, str] | None = None,
+        exclude_clients: Iterable[str] | None = None,
+    ) -> None:
+        self.endpoint_groups = endpoint_groups or {}
+        self.excluded = frozenset(exclude_clients or ())
+        # month -> tool -> elapsed_ms summary
+        self.durations: dict[str, dict[str, QuantileSketch]] = defaultdict(
+            partial(defaultdict, QuantileSketch)
         )
-    )
-    sparql: dict[str, dict[str, int]] = defaultdict(
-        lambda: {c: 0 for c in SPARQL_CLASSES}
-    )
-    # month -> db -> tally
-    dbs: dict[str, dict[str, dict[str, Any]]] = defaultdict(
-        lambda: defaultdict(
-            lambda: {
-                "calls": 0,
-                "sparql": 0,
-                **{k: 0 for k in CALL_KINDS},
-                "errors": 0,
-                "empty": 0,
-                "huge": 0,
-                "rows_sum": 0,
-                "rows_n": 0,
-                "co_query": 0,
-                "ips": set(),
-                "clients": set(),
-                "fail_classes": defaultdict(int),
-            }
+        self.tool_counts: dict[str, dict[str, dict[str, Any]]] = defaultdict(
+            partial(defaultdict, _tool_tally)
         )
-    )
-    # month -> (primary db, co-queried db) -> count
-    co_pairs: dict[str, dict[tuple[str, str], int]] = defaultdict(
-        lambda: defaultdict(int)
-    )
-    months: set[str] = set()
-    n_total = 0
-    n_skipped_no_month = 0
+        # month -> client name -> reach. Call counts alone cannot tell demand from a
+        # benchmark harness: in 2026-08 `mcp` (the SDK default name) sent 8,415 calls
+        # from 11 ip_hashes over 10 days, while openai-mcp sent 693 from 355. Distinct
+        # ip_hash is the discriminator; distinct SESSIONS is not, and is deliberately
+        # not reported — ChatGPT connectors are stateless, so their calls-per-session
+        # is 1.00 for the same reason a scripted sweep's is.
+        self.clients: dict[str, dict[str, dict[str, Any]]] = defaultdict(
+            partial(defaultdict, _client_tally)
+        )
+        self.sparql: dict[str, dict[str, int]] = defaultdict(_sparql_tally)
+        # month -> db -> tally
+        self.dbs: dict[str, dict[str, dict[str, Any]]] = defaultdict(
+            partial(defaultdict, _db_tally)
+        )
+        # month -> (primary db, co-queried db) -> count
+        self.co_pairs: dict[str, dict[tuple[str, str], int]] = defaultdict(
+            partial(defaultdict, int)
+        )
+        self.months: set[str] = set()
+        self.n_total = 0
+        self.n_skipped_no_month = 0
+        self.n_excluded = 0
+        self.traps = TrapAccumulator(self.endpoint_groups, mie_dates)
 
-    for rec in records:
-        n_total += 1
+    def add(self, rec: dict[str, Any]) -> None:
+        client = client_of(rec)
+        if client in self.excluded:
+            self.n_excluded += 1
+            return
+        self.traps.add(rec)
+        self.n_total += 1
         month = month_of(rec)
         if month is None:
-            n_skipped_no_month += 1
-            continue
-        months.add(month)
+            self.n_skipped_no_month += 1
+            return
+        self.months.add(month)
         tool = rec.get("tool") or "<unknown>"
         is_error = rec.get("status") == "error"
+        # A sampled record stands for `w` calls; every count below adds w, so
+        # sums stay unbiased. Distinct-ip and day sets are not weighted.
+        w = weight_of(rec)
 
         ip = rec.get("ip_hash") or rec.get("ip")
-        client = client_of(rec)
 
-        tc = tool_counts[month][tool]
-        tc["count"] += 1
+        tc = self.tool_counts[month][tool]
+        tc["count"] += w
         if is_error:
-            tc["errors"] += 1
+            tc["errors"] += w
         if ip:
             tc["ips"].add(ip)
 
-        cl = clients[month][client]
-        cl["calls"] += 1
+        cl = self.clients[month][client]
+        cl["calls"] += w
         if is_error:
-            cl["errors"] += 1
+            cl["errors"] += w
         if ip:
             cl["ips"].add(ip)
         day = day_of(rec)
         if day:
             cl["days"].add(day)
-        cl["tools"][tool] += 1
+        cl["tools"][tool] += w
         dur = rec.get("elapsed_ms")
         if isinstance(dur, (int, float)):
-            tool_durs[month][tool].append(float(dur))
+            self.durations[month][tool].add(float(dur), w)
 
         cls = sparql_class(rec)
         if cls is not None:
-            sparql[month][cls] += 1
+            self.sparql[month][cls] += w
 
-        db = database_of(rec, endpoint_groups)
+        db = database_of(rec, self.endpoint_groups)
         if cls is not None:
             # Credit every database whose namespace the query actually touched.
             # Recorded on its own counter, never folded into `calls`/`sparql` —
             # one query legitimately credits several databases, so mixing them
             # would make a row's numbers stop adding up.
             for co in co_queried_databases(rec, db):
-                dbs[month][co]["co_query"] += 1
+                self.dbs[month][co]["co_query"] += w
                 if db is not None:
-                    co_pairs[month][(db, co)] += 1
+                    self.co_pairs[month][(db, co)] += w
         if db is not None:
-            d = dbs[month][db]
-            d["calls"] += 1
-            d[call_kind(rec)] += 1
+            d = self.dbs[month][db]
+            d["calls"] += w
+            d[call_kind(rec)] += w
             if ip:
                 d["ips"].add(ip)
             d["clients"].add(client)
             if is_error:
-                d["errors"] += 1
+                d["errors"] += w
             if cls is not None:
-                d["sparql"] += 1
-                d["fail_classes"][cls] += 1
+                d["sparql"] += w
+                d["fail_classes"][cls] += w
                 if cls == "empty_result":
-                    d["empty"] += 1
+                    d["empty"] += w
                 elif cls == "huge_result":
-                    d["huge"] += 1
+                    d["huge"] += w
                 extra = rec.get("extra") or {}
                 rows = extra.get("n_rows")
                 if isinstance(rows, (int, float)):
-                    d["rows_sum"] += rows
-                    d["rows_n"] += 1
-
-    by_month: dict[str, Any] = {}
-    for month in sorted(months):
-        tools_out = {}
-        total_calls = total_errors = 0
-        for tool, c in sorted(tool_counts[month].items()):
-            durs = sorted(tool_durs[month].get(tool, []))
-            total_calls += c["count"]
-            total_errors += c["errors"]
-            tools_out[tool] = {
-                "count": c["count"],
-                "errors": c["errors"],
-                "ips": len(c["ips"]),
-                "error_rate": round(c["errors"] / c["count"], 4) if c["count"] else 0,
-                "p50_ms": _percentile(durs, 50),
-                "p95_ms": _percentile(durs, 95),
-                "mean_ms": round(sum(durs) / len(durs), 2) if durs else 0.0,
-            }
-
-        sp = dict(sparql[month])
-        sp_total = sum(sp.values())
-        sp_fail = sp_total - sp["ok"] - sp["empty_result"]
-
-        dbs_out = {}
-        for db, d in sorted(dbs[month].items()):
-            dbs_out[db] = {
-                "calls": d["calls"],
-                # Endpoint hits (query + graphs + SPARQL-backed search wrappers).
-                # Kept because the MIE-candidate feed scores against it; the
-                # human-readable split is the CALL_KINDS breakdown below.
-                "sparql": d["sparql"],
-                **{k: d[k] for k in CALL_KINDS},
-                "errors": d["errors"],
-                "empty": d["empty"],
-                "huge": d["huge"],
-                "avg_rows": round(d["rows_sum"] / d["rows_n"], 1) if d["rows_n"] else None,
-                "co_query": d["co_query"],
-                "ips": len(d["ips"]),
-                "clients": len(d["clients"]),
-                "fail_classes": dict(d["fail_classes"]),
-            }
-
-        by_month[month] = {
-            "tool_calls": total_calls,
-            "errors": total_errors,
-            "error_rate": round(total_errors / total_calls, 4) if total_calls else 0,
-            "tools": tools_out,
-            "sparql": {"total": sp_total, "failures": sp_fail, "classes": sp},
-            "databases": dbs_out,
-            "clients": [
-                {
-                    "client": name,
-                    "calls": c["calls"],
+                    d["rows_sum"] += rows * w
+                    d["rows_n"] += w
+
+    def merge(self, other: StatsAccumulator) -> StatsAccumulator:
+        """Fold ``other`` (built with the same inputs) into this one; returns self.
+
+        ``other`` is left untouched and shares no mutable state with the result.
+        """
+        for month, tools in other.durations.items():
+            for tool, sketch in tools.items():
+                self.durations[month][tool].merge(sketch)
+        for mine, theirs in (
+            (self.tool_counts, other.tool_counts),
+            (self.clients, other.clients),
+            (self.dbs, other.dbs),
+        ):
+            for month, cells in theirs.items():
+                for key, tally in cells.items():
+                    _merge_tally(mine[month][key], tally)
+        for month, classes in other.sparql.items():
+            for cls, n in classes.items():
+                self.sparql[month][cls] += n
+        for month, pairs in other.co_pairs.items():
+            for pair, n in pairs.items():
+                self.co_pairs[month][pair] += n
+        self.months |= other.months
+        self.n_total += other.n_total
+        self.n_skipped_no_month += other.n_skipped_no_month
+        self.n_excluded += other.n_excluded
+        self.traps.merge(other.traps)
+        return self
+
+    def result(self) -> dict[str, Any]:
+        by_month: dict[str, Any] = {}
+        for month in sorted(self.months):
+            tools_out = {}
+            total_calls = total_errors = 0
+            for tool, c in sorted(self.tool_counts[month].items()):
+                durs = self.durations[month].get(tool) or QuantileSketch()
+                total_calls += c["count"]
+                total_errors += c["errors"]
+                tools_out[tool] = {
+                    "count": c["count"],
                     "errors": c["errors"],
                     "ips": len(c["ips"]),
-                    "days": len(c["days"]),
-                    "calls_per_ip": round(c["calls"] / len(c["ips"]), 1) if c["ips"] else None,
-                    "top_tools": [
-                        t for t, _ in sorted(c["tools"].items(), key=lambda kv: -kv[1])[:3]
-                    ],
+                    "error_rate": round(c["errors"] / c["count"], 4) if c["count"] else 0,
+                    "p50_ms": durs.percentile(50),
+                    "p95_ms": durs.percentile(95),
+                    "mean_ms": durs.mean(),
                 }
-                for name, c in sorted(
-                    clients[month].items(), key=lambda kv: -kv[1]["calls"]
-                )
-            ],
-            "co_query_pairs": [
-                {"primary": a, "co_queried": b, "queries": n}
-                for (a, b), n in sorted(
-                    co_pairs[month].items(), key=lambda kv: (-kv[1], kv[0])
-                )
-            ],
+            sp = dict(self.sparql[month])
+            sp_total = sum(sp.values())
+            sp_fail = sp_total - sp["ok"] - sp["empty_result"]
+
+            dbs_out = {}
+            for db, d in sorted(self.dbs[month].items()):
+                dbs_out[db] = {
+                    "calls": d["calls"],
+                    # Endpoint hits (query + graphs + SPARQL-backed search wrappers).
+                    # Kept because the MIE-candidate feed scores against it; the
+                    # human-readable split is the CALL_KINDS breakdown below.
+                    "sparql": d["sparql"],
+                    **{k: d[k] for k in CALL_KINDS},
+                    "errors": d["errors"],
+                    "empty": d["empty"],
+                    "huge": d["huge"],
+                    "avg_rows": round(d["rows_sum"] / d["rows_n"], 1) if d["rows_n"] else None,
+                    "co_query": d["co_query"],
+                    "ips": len(d["ips"]),
+                    "clients": len(d["clients"]),
+                    "fail_classes": dict(d["fail_classes"]),
+                }
+
+            by_month[month] = {
+                "tool_calls": total_calls,
+                "errors": total_errors,
+                "error_rate": round(total_errors / total_calls, 4) if total_calls else 0,
+                "tools": tools_out,
+                "sparql": {"total": sp_total, "failures": sp_fail, "classes": sp},
+                "databases": dbs_out,
+                # Ties broken by name, so the order does not depend on the
+                # order the records were read in.
+                "clients": [
+                    {
+                        "client": name,
+                        "calls": c["calls"],
+                        "errors": c["errors"],
+                        "ips": len(c["ips"]),
+                        "days": len(c["days"]),
+                        "calls_per_ip": round(c["calls"] / len(c["ips"]), 1) if c["ips"] else None,
+                        "top_tools": [
+                            t for t, _ in sorted(
+                                c["tools"].items(), key=lambda kv: (-kv[1], kv[0])
+                            )[:3]
+                        ],
+                    }
+                    for name, c in sorted(
+                        self.clients[month].items(), key=lambda kv: (-kv[1]["calls"], kv[0])
+                    )
+                ],
+                "co_query_pairs": [
+                    {"primary": a, "co_queried": b, "queries": n}
+                    for (a, b), n in sorted(
+                        self.co_pairs[month].items(), key=lambda kv: (-kv[1], kv[0])
+                    )
+                ],
+            }
+
+        return {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "n_records": self.n_total,
+            "excluded_clients": {
+                "names": sorted(self.excluded),
+                "n_records": self.n_excluded,
+            },
+            "n_skipped_no_timestamp": self.n_skipped_no_month,
+            "months": sorted(self.months),
+            "by_month": by_month,
+            "mie_candidates": _mie_candidates(by_month),
+            "mie_trap_candidates": self.traps.result(),
         }
 
-    return {
-        "generated_at": datetime.now(timezone.utc).isoformat(),
-        "n_records": n_total,
-        "excluded_clients": {
-            "names": sorted(excluded),
-            "n_records": n_excluded,
-        },
-        "n_skipped_no_timestamp": n_skipped_no_month,
-        "months": sorted(months),
-        "by_month": by_month,
-        "mie_candidates": _mie_candidates(by_month),
-        "mie_trap_candidates": mie_trap_candidates(records, endpoint_groups, mie_dates),
-    }
+
+def aggregate(
+    records: Iterable[dict[str, Any]],
+    endpoint_groups: dict[str, str] | None = None,
+    mie_dates: dict[str, str] | None = None,
+    exclude_clients: Iterable[str] | None = None,
+) -> dict[str, Any]:
+    """Roll records up into a JSON-serializable monthly statistics structure.
+
+    ``exclude_clients`` drops whole clients by reported name — the escape hatch
+    for a known self-inflicted source (a benchmark harness, a catalog sweeper).
+    It is empty by default and never inferred: which traffic is "real" is an
+    operator's judgement, and a wrong guess silently deletes real users. What
+    was dropped is always reported back in ``excluded_clients``.
+    """
+    acc = StatsAccumulator(endpoint_groups, mie_dates, exclude_clients)
+    for rec in records:
+        acc.add(rec)
+    return acc.result()
 
 
 def _mie_candidates(by_month: dict[str, Any]) -> list[dict[str, Any]]:
@@ -822,6 +947,21 @@ def day_of(rec: dict[str, Any]) -> str | None:
 MIE_SPEC_EXPECTED = 3
 
 
+def mie_signature(mie_dir: str) -> tuple[tuple[str, int, int], ...]:
+    """(name, mtime_ns, size) of every ``*.yaml`` in ``mie_dir``: what
+    :func:`load_mie_dates` reads, cheap enough to check on every refresh."""
+    out = []
+    try:
+        with os.scandir(mie_dir) as it:
+            for e in it:
+                if e.name.endswith(".yaml"):
+                    st = e.stat()
+                    out.append((e.name, st.st_mtime_ns, st.st_size))
+    except OSError:
+        pass
+    return tuple(sorted(out))
+
+
 def load_mie_dates(mie_dir: str) -> dict[str, str]:
     """Map database -> the date its MIE was last FULLY confirmed ('YYYY-MM-DD').
 
@@ -838,25 +978,21 @@ def load_mie_dates(mie_dir: str) -> dict[str, str]:
     corpus - inline flow, flow spanning several lines, and block - and the word
     "verified" also appears in section comments. pyyaml is a hard dependency, so the
     v2-era "no YAML dependency" constraint this function used to carry bought nothing.
+    Parsed documents come from the compiled MIE bundle when it is fresh.
 
     Skips any file not declaring `mie_spec: 3`. The v2->v3 flip silently stranded the
     previous implementation (it scanned for `mie_created`/`mie_updated`, absent from
     v3, and returned {} for a month); an unreadable format must be visible, not empty.
     """
     out: dict[str, str] = {}
-    try:
-        paths = sorted(Path(mie_dir).glob("*.yaml"))
-    except OSError:
-        return out
-    for path in paths:
-        try:
-            doc = yaml.safe_load(path.read_text(encoding="utf-8"))
-        except (OSError, yaml.YAMLError):
-            continue
+    for db, entry in load_mie_entries(mie_dir).items():
+        doc = entry.doc
+        if doc is None:
+            continue  # does not parse
         if not isinstance(doc, dict) or doc.get("mie_spec") != MIE_SPEC_EXPECTED:
             log.warning(
                 "load_mie_dates: skipping %s - mie_spec=%r, expected %d",
-                path.name, (doc or {}).get("mie_spec") if isinstance(doc, dict) else None,
+                entry.name, doc.get("mie_spec") if isinstance(doc, dict) else None,
                 MIE_SPEC_EXPECTED,
             )
             continue
@@ -868,7 +1004,7 @@ def load_mie_dates(mie_dir: str) -> dict[str, str]:
             and ex["verified"].get("date")
         ]
         if dates:
-            out[path.stem] = min(dates)
+            out[db] = min(dates)
     return out
 
 
@@ -886,46 +1022,55 @@ def is_schema_probe(shape: Any) -> bool:
     return bool(flags.get("group")) and shape.get("n_predicates", 0) <= SCHEMA_PROBE_MAX_PREDICATES
 
 
-def mie_trap_candidates(
-    records: Iterable[dict[str, Any]],
-    endpoint_groups: dict[str, str] | None = None,
-    mie_dates: dict[str, str] | None = None,
-) -> dict[str, Any]:
-    """Filtered, deduped MIE-trap feed. See section header for the four filters.
+class TrapAccumulator:
+    """Running state of :func:`mie_trap_candidates`, fed one record at a time."""
 
-    Returns a dict: ``candidates`` (distinct post-MIE traps, ranked by retries then
-    recency) plus transparency tallies of everything excluded.
-    """
-    endpoint_groups = endpoint_groups or {}
-    mie_dates = mie_dates or {}
-    by_query: dict[str, dict[str, Any]] = {}
-    excluded_pre_mie = excluded_probe = grammar_errors = 0
+    __slots__ = (
+        "endpoint_groups", "mie_dates", "by_query", "excluded_pre_mie",
+        "excluded_probe", "grammar_errors", "n_unhashed",
+    )
 
-    for rec in records:
+    def __init__(
+        self,
+        endpoint_groups: dict[str, str] | None = None,
+        mie_dates: dict[str, str] | None = None,
+    ) -> None:
+        self.endpoint_groups = endpoint_groups or {}
+        self.mie_dates = mie_dates or {}
+        self.by_query: dict[str, dict[str, Any]] = {}
+        self.excluded_pre_mie = self.excluded_probe = self.grammar_errors = 0
+        self.n_unhashed = 0
+
+    def add(self, rec: dict[str, Any]) -> None:
         cls = sparql_class(rec)
         if cls is None:
-            continue
+            return
+        w = weight_of(rec)
         if cls == "syntax_error":
-            grammar_errors += 1
-            continue
+            self.grammar_errors += w
+            return
         if cls not in TRAP_CLASSES:
-            continue
+            return
         extra = rec.get("extra") or {}
         shape = extra.get("query_shape")
         if is_schema_probe(shape):
-            excluded_probe += 1
-            continue
-        db = database_of(rec, endpoint_groups)
+            self.excluded_probe += w
+            return
+        db = database_of(rec, self.endpoint_groups)
         day = day_of(rec)
-        mdate = mie_dates.get(db) if db else None
+        mdate = self.mie_dates.get(db) if db else None
         if mdate and day and day <= mdate:  # failure predates the current MIE
-            excluded_pre_mie += 1
-            continue
-        sha = extra.get("query_sha256") or f"nohash:{id(rec)}"
-        cand = by_query.get(sha)
+            self.excluded_pre_mie += w
+            return
+        sha = extra.get("query_sha256")
+        if not sha:
+            # no hash, no dedup: each such record is its own candidate
+            self.n_unhashed += 1
+            sha = f"nohash:{self.n_unhashed}"
+        cand = self.by_query.get(sha)
         if cand is None:
             preds = shape.get("predicates", []) if isinstance(shape, dict) else []
-            cand = by_query[sha] = {
+            cand = self.by_query[sha] = {
                 "database": db,
                 # Other databases the failing query actually touched. A trap in
                 # a UniProt-primary query can be a *Rhea* MIE gap; without this
@@ -938,25 +1083,229 @@ def mie_trap_candidates(
                 "first_seen": day,
                 "last_seen": day,
             }
-        cand["retries"] += 1
+        cand["retries"] += w
         if day:
             if not cand["first_seen"] or day < cand["first_seen"]:
                 cand["first_seen"] = day
             if not cand["last_seen"] or day > cand["last_seen"]:
                 cand["last_seen"] = day
 
-    candidates = sorted(
-        by_query.values(),
-        key=lambda c: (c["retries"], c["last_seen"] or ""),
-        reverse=True,
-    )
-    return {
-        "candidates": candidates,
-        "distinct_queries": len(candidates),
-        "excluded_pre_mie": excluded_pre_mie,
-        "excluded_schema_probe": excluded_probe,
-        "grammar_errors": grammar_errors,
-    }
+    def merge(self, other: TrapAccumulator) -> TrapAccumulator:
+        """Fold ``other`` in; returns self. Retries add and the seen-window widens;
+        a query already known here keeps its database/predicates."""
+        for sha, theirs in other.by_query.items():
+            if sha.startswith("nohash:"):
+                self.n_unhashed += 1
+                sha = f"nohash:{self.n_unhashed}"
+            cand = self.by_query.get(sha)
+            if cand is None:
+                self.by_query[sha] = {
+                    **theirs,
+                    "co_databases": list(theirs["co_databases"]),
+                    "predicates": list(theirs["predicates"]),
+                }
+                continue
+            cand["retries"] += theirs["retries"]
+            for day in (theirs["first_seen"], theirs["last_seen"]):
+                if day:
+                    if not cand["first_seen"] or day < cand["first_seen"]:
+                        cand["first_seen"] = day
+                    if not cand["last_seen"] or day > cand["last_seen"]:
+                        cand["last_seen"] = day
+        self.excluded_pre_mie += other.excluded_pre_mie
+        self.excluded_probe += other.excluded_probe
+        self.grammar_errors += other.grammar_errors
+        return self
+
+    def result(self) -> dict[str, Any]:
+        candidates = sorted(
+            self.by_query.values(),
+            key=lambda c: (c["retries"], c["last_seen"] or "", c["query_sha256"]),
+            reverse=True,
+        )
+        return {
+            "candidates": candidates,
+            "distinct_queries": len(candidates),
+            "excluded_pre_mie": self.excluded_pre_mie,
+            "excluded_schema_probe": self.excluded_probe,
+            "grammar_errors": self.grammar_errors,
+        }
+
+
+def mie_trap_candidates(
+    records: Iterable[dict[str, Any]],
+    endpoint_groups: dict[str, str] | None = None,
+    mie_dates: dict[str, str] | None = None,
+) -> dict[str, Any]:
+    """Filtered, deduped MIE-trap feed. See section header for the four filters.
+
+    Returns a dict: ``candidates`` (distinct post-MIE traps, ranked by retries then
+    recency) plus transparency tallies of everything excluded.
+    """
+    acc = TrapAccumulator(endpoint_groups, mie_dates)
+    for rec in records:
+        acc.add(rec)
+    return acc.result()
+
+
+# --------------------------------------------------------------------------- #
+# Parallel ingestion
+#
+# Parsing is the cost: ``json.loads`` per line, one thread, ~15 µs a record with
+# the stdlib (~2.5 µs with orjson, see :mod:`togo_mcp.json_codec`), so ten
+# rotated 50 MB files are minutes of CPU. Because accumulators merge exactly
+# (see StatsAccumulator.merge), the log can be cut into line-aligned byte ranges
+# — several per file when a file is large — each parsed into a partial
+# accumulator in its own process, and the partials merged in file order. Only
+# the compact partials cross the process boundary, never records.
+#
+# Workers are SPAWNED, not forked: the parent may be the running server (a
+# writer thread, an event loop) and forking a threaded process can deadlock the
+# child on a lock held at fork time. Each worker pays one package import.
+# --------------------------------------------------------------------------- #
+PARALLEL_CHUNK_BYTES = 32 * 1024 * 1024
+
+# (endpoint_groups, mie_dates, excluded) in a worker, set once by _init_worker
+# rather than pickled into every task.
+_worker_inputs: tuple[dict[str, str], dict[str, str], frozenset[str]] | None = None
+
+
+def split_ranges(path: str, start: int, end: int, chunk_bytes: int) -> list[tuple[int, int]]:
+    """Cut bytes ``[start, end)`` of a JSONL file into ranges of about
+    ``chunk_bytes`` that each begin on a line start. ``start`` must be one."""
+    bounds = [start]
+    with open(path, "rb") as fh:
+        b = start + max(1, chunk_bytes)
+        while b < end:
+            fh.seek(b - 1)  # if byte b-1 is a newline, b itself starts a line
+            nb = b - 1 + len(fh.readline())
+            if nb >= end:
+                break
+            bounds.append(nb)
+            b = nb + chunk_bytes
+    bounds.append(end)
+    return list(zip(bounds, bounds[1:]))
+
+
+def _consume(fh: Any, offset: int, acc: StatsAccumulator, end: int | None = None) -> int:
+    """Feed ``acc`` every complete line from ``offset`` (a line start) up to
+    ``end``; return the offset after the last line consumed."""
+    fh.seek(offset)
+    add = acc.add
+    for line in fh:
+        if not line.endswith(b"\n"):
+            break  # a record still being written
+        offset += len(line)
+        rec = parse_line(line)
+        if rec is not None:
+            add(rec)
+        if end is not None and offset >= end:
+            break
+    return offset
+
+
+def _init_worker(
+    endpoint_groups: dict[str, str], mie_dates: dict[str, str], excluded: frozenset[str]
+) -> None:
+    global _worker_inputs
+    _worker_inputs = (endpoint_groups, mie_dates, excluded)
+
+
+def _ingest_range(
+    task: tuple[str, int, int, tuple[int, int] | None],
+) -> tuple[int, StatsAccumulator] | None:
+    """Worker: parse one range into a partial. None if ``path`` is no longer the
+    file (device, inode) the parent planned for — it was rotated in between."""
+    path, start, end, key = task
+    acc = StatsAccumulator(*(_worker_inputs or ({}, {}, frozenset())))
+    try:
+        with open(path, "rb") as fh:
+            st = os.fstat(fh.fileno())
+            if key is not None and (st.st_dev, st.st_ino) != key:
+                return None
+            if path.endswith(GZ_SUFFIX):  # whole file; "consumed" is its size
+                _consume(gzip.GzipFile(fileobj=fh), 0, acc)
+                return st.st_size, acc
+            return _consume(fh, start, acc, end), acc
+    except (OSError, EOFError):  # EOFError: a truncated .gz
+        return None
+
+
+def ingest_parallel(
+    spans: list[tuple[str, int, int, tuple[int, int] | None]],
+    endpoint_groups: dict[str, str] | None = None,
+    mie_dates: dict[str, str] | None = None,
+    exclude_clients: Iterable[str] | None = None,
+    *,
+    jobs: int,
+    chunk_bytes: int = PARALLEL_CHUNK_BYTES,
+) -> list[tuple[int, StatsAccumulator] | None]:
+    """Parse each ``(path, start, end, key)`` span across ``jobs`` processes.
+
+    Returns, per span and in order, ``(offset consumed up to, partial)`` — the
+    partial holds exactly the complete lines in the span — or None when a range
+    of that span hit a different file than ``key`` (pass None to skip the check).
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    total = sum(end - start for _, start, end, _ in spans)
+    # several ranges per worker so one slow range does not leave the others idle
+    chunk = max(1 << 20, min(chunk_bytes, total // (jobs * 4) + 1))
+    tasks, owner = [], []
+    for i, (path, start, end, key) in enumerate(spans):
+        # a gzip stream cannot be entered mid-way: one range per compressed file
+        cuts = [(start, end)] if path.endswith(GZ_SUFFIX) else split_ranges(path, start, end, chunk)
+        for a, b in cuts:
+            tasks.append((path, a, b, key))
+            owner.append(i)
+    inputs = (dict(endpoint_groups or {}), dict(mie_dates or {}),
+              frozenset(exclude_clients or ()))
+    with ProcessPoolExecutor(
+        max_workers=max(1, min(jobs, len(tasks))),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=inputs,
+    ) as pool:
+        parts = list(pool.map(_ingest_range, tasks))
+
+    out: list[tuple[int, StatsAccumulator] | None] = [None] * len(spans)
+    failed: set[int] = set()
+    for i, part in zip(owner, parts):
+        if i in failed:
+            continue
+        if part is None:
+            failed.add(i)
+            out[i] = None
+        elif out[i] is None:
+            out[i] = part
+        else:
+            out[i] = (part[0], out[i][1].merge(part[1]))  # type: ignore[index]
+    return out
+
+
+def aggregate_files(
+    paths: list[str],
+    endpoint_groups: dict[str, str] | None = None,
+    mie_dates: dict[str, str] | None = None,
+    exclude_clients: Iterable[str] | None = None,
+    *,
+    jobs: int = 1,
+    chunk_bytes: int = PARALLEL_CHUNK_BYTES,
+) -> dict[str, Any]:
+    """``aggregate(iter_records(paths), ...)``, parsed by ``jobs`` processes."""
+    if jobs <= 1:
+        return aggregate(iter_records(paths), endpoint_groups, mie_dates, exclude_clients)
+    spans = [(p, 0, os.path.getsize(p), None) for p in paths if os.path.exists(p)]
+    total = StatsAccumulator(endpoint_groups, mie_dates, exclude_clients)
+    # oldest file first, as in IncrementalStats
+    for part in reversed(
+        ingest_parallel(spans, endpoint_groups, mie_dates, exclude_clients,
+                        jobs=jobs, chunk_bytes=chunk_bytes)
+    ):
+        if part is not None:
+            total.merge(part[1])
+    return total.result()
 
 
 # --------------------------------------------------------------------------- #
@@ -967,21 +1316,194 @@ def compute_stats(
     endpoints_csv: str | None = None,
     mie_dir: str | None = None,
 ) -> dict[str, Any]:
-    """Load the configured log (TOGOMCP_QUERY_LOG) and return the aggregate."""
-    log_path = log_path if log_path is not None else os.getenv("TOGOMCP_QUERY_LOG", "").strip()
-    groups = load_endpoint_groups(endpoints_csv) if endpoints_csv else {}
-    mie_dates = load_mie_dates(mie_dir) if mie_dir else {}
-    paths = log_paths(log_path)
-    excluded = parse_excluded_clients(os.getenv("TOGOMCP_STATS_EXCLUDE_CLIENTS"))
-    out = aggregate(iter_records(paths), groups, mie_dates, excluded)
-    # Describe the bytes behind the aggregate so the dashboard's raw-log download
-    # can state its size up front, and so a downloaded file is verifiably the
-    # same input the numbers came from (the download serves exactly `paths`).
-    out["log_files"] = {
-        "n_files": len(paths),
-        "n_bytes": sum(os.path.getsize(p) for p in paths if os.path.exists(p)),
-    }
-    return out
+    """Load the configured log (TOGOMCP_QUERY_LOG) and return the aggregate.
+
+    The result also describes the bytes behind the aggregate (``log_files``), so
+    the dashboard's raw-log download can state its size up front, and so a
+    downloaded file is verifiably the same input the numbers came from (the
+    download serves exactly the same files). A one-shot :class:`IncrementalStats`.
+    """
+    return IncrementalStats(log_path, endpoints_csv, mie_dir).refresh()
+
+
+class IncrementalStats:
+    """``compute_stats`` that parses each log byte once across calls.
+
+    Keeps, per log file, a partial :class:`StatsAccumulator` and the byte offset
+    already folded into it; the result is the merge of the partials. A refresh
+    reads only what was appended since: the dashboard's cost becomes
+    proportional to new traffic, not to the ~550 MB a full set of rotated files
+    holds.
+
+    Files are tracked by inode, not name. Rotation RENAMES `base` to `base.1`
+    and so on, so a tracked file keeps its partial under its new name, and the
+    fresh `base` is read from 0. When `base.1` is then gzipped, the new `.gz`
+    inherits the plain file's partial (its sidecar names the source inode)
+    instead of being decompressed and parsed again. A tracked file that vanishes
+    (the oldest backup being deleted) just drops its partial — nothing else is
+    re-read. Each partial carries a mark of its file's first bytes
+    (:func:`togo_mcp.log_index.head_mark`): a file that shrinks (truncated in
+    place) or fails the mark (a new file on a deleted one's inode) is re-read
+    from the start. A change of the inputs other than the log (endpoints.csv,
+    MIE dates, the excluded-client list) rebuilds everything; the MIE dates are
+    re-parsed only when a file's mtime or size changes. The result always equals
+    a full ``compute_stats``.
+
+    With ``jobs`` > 1, a refresh with at least ``chunk_bytes`` unread (the first
+    one, on a server that has been logging for a while) is parsed by
+    :func:`ingest_parallel`; the small appends after it stay in-thread.
+
+    Only complete lines are consumed; a record caught mid-write is picked up on
+    the next refresh. Thread-safe: the server refreshes from a worker thread.
+
+    A refresh that finds nothing new returns the previous result object itself,
+    without merging, and ``version`` (a digest of the inputs and every file's
+    consumed offset) only moves when the result can have changed, so a caller
+    can key anything it derives from the result on it.
+    """
+
+    __slots__ = (
+        "log_path", "endpoints_csv", "mie_dir", "jobs", "chunk_bytes",
+        "_inputs", "_files", "_mie_dates", "_lock", "_state", "_result", "version",
+    )
+
+    def __init__(
+        self,
+        log_path: str | None = None,
+        endpoints_csv: str | None = None,
+        mie_dir: str | None = None,
+        jobs: int = 1,
+        chunk_bytes: int = PARALLEL_CHUNK_BYTES,
+    ) -> None:
+        self.log_path = log_path
+        self.endpoints_csv = endpoints_csv
+        self.mie_dir = mie_dir
+        self.jobs = jobs
+        self.chunk_bytes = chunk_bytes
+        self._inputs: tuple | None = None
+        # (st_dev, st_ino) -> (bytes consumed, partial accumulator, head mark)
+        self._files: dict[tuple[int, int], tuple[int, StatsAccumulator, str]] = {}
+        self._mie_dates: tuple[tuple, dict[str, str]] | None = None  # (signature, dates)
+        self._lock = threading.Lock()
+        self._state: tuple | None = None
+        self._result: dict[str, Any] | None = None
+        self.version: str | None = None
+
+    def refresh(self) -> dict[str, Any]:
+        """Fold in what was appended since the last call; return ``compute_stats``' result."""
+        with self._lock:
+            return self._refresh()
+
+    def _load_mie_dates(self) -> dict[str, str]:
+        """:func:`load_mie_dates`, re-parsed only when an MIE file changes."""
+        if not self.mie_dir:
+            return {}
+        signature = mie_signature(self.mie_dir)
+        if self._mie_dates is None or self._mie_dates[0] != signature:
+            self._mie_dates = (signature, load_mie_dates(self.mie_dir))
+        return self._mie_dates[1]
+
+    def _refresh(self) -> dict[str, Any]:
+        log_path = (
+            self.log_path if self.log_path is not None
+            else os.getenv("TOGOMCP_QUERY_LOG", "").strip()
+        )
+        groups = load_endpoint_groups(self.endpoints_csv) if self.endpoints_csv else {}
+        mie_dates = self._load_mie_dates()
+        excluded = parse_excluded_clients(os.getenv("TOGOMCP_STATS_EXCLUDE_CLIENTS"))
+        inputs = (log_path, tuple(sorted(groups.items())), tuple(sorted(mie_dates.items())),
+                  excluded)
+        if inputs != self._inputs:
+            self._inputs = inputs
+            self._files = {}
+
+        paths = log_paths(log_path)
+        files: dict[tuple[int, int], tuple[int, StatsAccumulator]] = {}
+        heads: dict[tuple[int, int], bytes] = {}
+        gz: set[tuple[int, int]] = set()
+        handles = []
+        todo = []  # (path, handle, key, size) of files with unread bytes
+        try:
+            for p in paths:
+                try:
+                    fh = open(p, "rb")
+                except OSError:  # rotated away since log_paths looked
+                    continue
+                handles.append(fh)
+                st = os.fstat(fh.fileno())
+                key = (st.st_dev, st.st_ino)
+                head = heads[key] = file_head(fh, p)
+                if p.endswith(GZ_SUFFIX):
+                    gz.add(key)
+                off, acc, mark = self._files.get(key, (0, None, ""))
+                if acc is not None and not same_file(head, mark):
+                    off, acc = 0, None  # the inode now belongs to another file
+                if acc is None and p.endswith(GZ_SUFFIX):
+                    # a segment just compressed: same records as the plain file
+                    # already parsed, if that was parsed to its end
+                    src = compressed_source(p, st)
+                    prior = self._files.get(src[:2]) if src else None
+                    if (
+                        prior is not None
+                        and prior[0] == src[2]  # type: ignore[index]
+                        and same_file(head, prior[2])
+                    ):
+                        off, acc = st.st_size, prior[1]
+                if acc is None or st.st_size < off:
+                    off, acc = 0, StatsAccumulator(groups, mie_dates, excluded)
+                files[key] = (off, acc)
+                if st.st_size > off:
+                    todo.append((p, fh, key, st.st_size))
+
+            unread = sum(size - files[key][0] for _, _, key, size in todo)
+            if self.jobs > 1 and unread >= self.chunk_bytes:
+                parts = ingest_parallel(
+                    [(p, files[key][0], size, key) for p, _, key, size in todo],
+                    groups, mie_dates, excluded, jobs=self.jobs, chunk_bytes=self.chunk_bytes,
+                )
+                for (_, _, key, _), part in zip(todo, parts):
+                    if part is not None:
+                        files[key] = (part[0], files[key][1].merge(part[1]))
+                # a file rotated under the workers is read here instead
+                todo = [t for t, part in zip(todo, parts) if part is None]
+            for p, fh, key, size in todo:
+                off, acc = files[key]
+                if p.endswith(GZ_SUFFIX):  # immutable: read once, whole
+                    try:
+                        _consume(gzip.GzipFile(fileobj=fh), 0, acc)
+                    except (OSError, EOFError) as exc:
+                        log.warning("stats: skipping unreadable %s (%s)", p, exc)
+                        del files[key]
+                        continue
+                    files[key] = (size, acc)
+                else:
+                    files[key] = (_consume(fh, off, acc), acc)
+        finally:
+            for fh in handles:
+                fh.close()
+        # partials of vanished files are dropped here. A .gz offset counts
+        # compressed bytes, but its whole head was read: mark all of it.
+        self._files = {
+            key: (off, acc, head_mark(heads[key], len(heads[key]) if key in gz else off))
+            for key, (off, acc) in files.items()
+        }
+
+        state = (inputs, tuple(paths), tuple((k, off) for k, (off, _) in files.items()))
+        if state == self._state and self._result is not None:
+            return self._result
+        # Oldest file first, so a trap candidate keeps the details of its first
+        # sighting, as a single pass over the log would.
+        total = StatsAccumulator(groups, mie_dates, excluded)
+        for _, acc in reversed(list(files.values())):
+            total.merge(acc)
+        out = total.result()
+        out["log_files"] = {
+            "n_files": len(paths),
+            "n_bytes": sum(os.path.getsize(p) for p in paths if os.path.exists(p)),
+        }
+        self._state, self._result = state, out
+        self.version = hashlib.sha256(repr(state).encode("utf-8")).hexdigest()[:16]
+        return out
 
 
 def _human_bytes(n: Any) -> str:
@@ -1019,7 +1541,8 @@ def render_html(stats: dict[str, Any]) -> str:
         "</style></head><body>",
         "<h1>TogoMCP usage statistics</h1>",
         f"<p class='muted'>Generated {cell(stats.get('generated_at'))} · "
-        f"{cell(stats.get('n_records'))} records · months: {cell(', '.join(months)) or '—'}</p>",
+        f"{cell(stats.get('n_records'))} records · months: {cell(', '.join(months)) or '—'} · "
+        "<a href='/stats/live'>live: last hour</a></p>",
     ]
     _exc = stats.get("excluded_clients") or {}
     if _exc.get("names"):
@@ -1213,19 +1736,32 @@ def render_html(stats: dict[str, Any]) -> str:
 
 def _main(argv: list[str] | None = None) -> int:
     import argparse
+    import sys
+
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["export"]:
+        from .log_export import _main as export_main
 
-    ap = argparse.ArgumentParser(description="Aggregate TogoMCP usage logs.")
+        return export_main(argv[1:])
+
+    ap = argparse.ArgumentParser(
+        description="Aggregate TogoMCP usage logs. "
+        "`export DEST` appends them to a columnar store instead (see togo_mcp.log_export)."
+    )
     ap.add_argument("log_path", nargs="?", default=os.getenv("TOGOMCP_QUERY_LOG", ""),
                     help="JSONL log path (default: $TOGOMCP_QUERY_LOG)")
     ap.add_argument("--endpoints", default="", help="endpoints.csv for DB attribution")
     ap.add_argument("--mie", default="", help="MIE dir for date-filtering trap candidates")
+    ap.add_argument("--jobs", "-j", type=int, default=1,
+                    help="parse with this many processes (0 = one per CPU; default 1)")
     args = ap.parse_args(argv)
     if not args.log_path:
         ap.error("no log path given and TOGOMCP_QUERY_LOG is unset")
-    stats = aggregate(
-        iter_records(log_paths(args.log_path)),
+    stats = aggregate_files(
+        log_paths(args.log_path),
         load_endpoint_groups(args.endpoints) if args.endpoints else {},
         load_mie_dates(args.mie) if args.mie else {},
+        jobs=args.jobs if args.jobs > 0 else (os.cpu_count() or 1),
     )
     print(json.dumps(stats, indent=2, default=str))
     return 0
@@ -2,8 +2,7 @@ import atexit
 import json
 import re
 
-import httpx
-
+from . import json_codec as _json_codec
 from .server import *
 
 
@@ -15,7 +14,7 @@ def _ids_to_csv(ids: str | list[str]) -> str:
         tokens = [str(i).strip() for i in ids if str(i).strip()]
     return ",".join(tokens)
 
-_client = httpx.AsyncClient(base_url="https://api.togoid.dbcls.jp")
+_client = LazyAsyncClient(base_url="https://api.togoid.dbcls.jp")
 
 
 def _close_client():
@@ -125,7 +124,7 @@ async def getRelation(source: str, target: str) -> str:
             "to list valid routes."
         ),
     )
-    return json.dumps(response.json())
+    return json.dumps(_json_codec.loads(response.content))
 
 
 @togoid_mcp.tool(annotations=READ_ONLY_TOOL)
@@ -284,7 +283,7 @@ async def convertId(
     )
     # `results` is absent (not []) when nothing converts — coalesce so the
     # return stays a bare array, never null.
-    return json.dumps(response.json().get("results") or [])
+    return json.dumps(_json_codec.loads(response.content).get("results") or [])
 
 
 @togoid_mcp.tool(annotations=READ_ONLY_TOOL)
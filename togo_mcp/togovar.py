@@ -1,10 +1,11 @@
 import atexit
 import json
+from types import MappingProxyType
 from typing import Annotated, Any
 
-import httpx
 from pydantic import Field
 
+from . import json_codec as _json_codec
 from .server import *
 
 # TogoVar REST API (GRCh38). Cohesive multi-endpoint external API, wrapped as a
@@ -16,7 +17,7 @@ from .server import *
 # payload. Keep the module uniform.
 # The API returns 501 "Not implemented" unless the client asks for JSON, so pin
 # the Accept header on every request via the shared client.
-_client = httpx.AsyncClient(
+_client = LazyAsyncClient(
     base_url="https://grch38.togovar.org/api",
     timeout=30.0,
     headers={"Accept": "application/json"},
@@ -83,8 +84,9 @@ _FREQUENCY_DATASET_BASES = frozenset([
 #   - SO terms (variant `type` and VEP `most_severe_consequence`): resolved
 #     against the Sequence Ontology (accession -> term name).
 # Codes not in a map fall through unchanged, so an unknown value is never lost.
+# Both are read-only views: they are shared by every concurrent projection.
 # --------------------------------------------------------------------------- #
-_SIGNIFICANCE_LABELS = {
+_SIGNIFICANCE_LABELS = MappingProxyType({
     "NC": "Not in ClinVar",
     "P": "Pathogenic",
     "LP": "Likely pathogenic",
@@ -106,9 +108,9 @@ _SIGNIFICANCE_LABELS = {
     "O": "Other",
     "NP": "Not provided",
     "AN": "Association not found",
-}
+})
 
-_SO_LABELS = {
+_SO_LABELS = MappingProxyType({
     # variant types (the `type` field)
     "SO_0001483": "SNV",
     "SO_0002007": "MNV",
@@ -159,7 +161,7 @@ _SO_LABELS = {
     "SO_0001632": "downstream_gene_variant",
     "SO_0001628": "intergenic_variant",
     "SO_0001631": "upstream_gene_variant",
-}
+})
 
 # Allele-rendering bounds (T1: large structural variants carry multi-kb REF/ALT
 # that otherwise blow past the client token budget).
@@ -644,7 +646,7 @@ async def search_gene(
         raise ValueError("Missing gene search term. Pass a symbol via `query`, e.g. 'ALDH2'.")
     response = await _client.get("/search/gene", params={"term": query.strip()})
     raise_for_status_with_body(response, context="TogoVar gene search")
-    hits = response.json()
+    hits = _json_codec.loads(response.content)
     ranked = []
     for h in hits:
         kind, rank = _match_type(h.get("symbol"), query)
@@ -707,7 +709,7 @@ async def search_disease(
         )
     response = await _client.get("/search/disease", params={"term": query.strip()})
     raise_for_status_with_body(response, context="TogoVar disease search")
-    hits = response.json()
+    hits = _json_codec.loads(response.content)
     ranked = []
     for h in hits:
         kind, rank = _match_type(h.get("label"), query)
@@ -891,7 +893,7 @@ async def search_variant(
 
     response = await _client.post("/search/variant", params=params, json=body)
     raise_for_status_with_body(response, context="TogoVar variant search")
-    payload = response.json()
+    payload = _json_codec.loads(response.content)
 
     result: dict[str, Any] = {
         "data": [
@@ -0,0 +1,459 @@
+"""Background JSONL writer for the tool-call log.
+
+``_ToolCallLogger`` (see :mod:`togo_mcp.server`) used to ``json.dumps`` each
+record and write it through a ``RotatingFileHandler`` in the ``finally`` of
+every tool call — on the event loop. A slow disk, or a 50 MB rotation (a rename
+chain of up to ten files), then stalled every concurrent request, not just the
+one being logged.
+
+:class:`JsonlLogWriter` moves all of that to one dedicated thread. ``submit`` is
+a non-blocking put onto a bounded queue; the thread drains it in batches,
+serializes, writes each batch with a single ``write``, and rotates exactly as
+``RotatingFileHandler`` did (``base`` newest, then ``base.1`` … ``base.N``),
+so :func:`togo_mcp.stats.log_paths` and ``/stats/log`` read the files unchanged.
+Given ``index_keys``, it also maintains each file's sidecar block index (see
+:mod:`togo_mcp.log_index`), renaming sidecars along with their files.
+
+After a rotation, a housekeeping thread can gzip the new ``base.1`` into
+``base.1.gz`` (``compress``; see :func:`togo_mcp.log_index.compress_segment`)
+and prune the oldest segments by total size (``retain_bytes``) or age
+(``retain_days``), in place of, or on top of, the fixed ``backup_count``.
+An ``after_rotate`` hook (the columnar export) runs first, while every segment
+is still there.
+Segments keep their numbers, so ``base.3.gz`` is still older than
+``base.2.gz``; :func:`rotated_paths` lists them either way. The next rotation
+waits for the previous housekeeping to finish, so no file is renamed while it
+is being compressed.
+
+When the queue is full the record is DROPPED and counted, never waited for: the
+log is best-effort telemetry and must not turn disk trouble into tool latency.
+The counters (``written``, ``dropped``, ``errors``, ...) are served in
+``/stats.json`` so a lossy period is visible rather than silent.
+
+Durability is a policy (``TOGOMCP_LOG_FSYNC``):
+
+  * ``off`` (default) — flush each batch to the OS; a host crash can lose the
+    last moments of log, a process crash cannot;
+  * ``batch`` — ``fsync`` after every batch;
+  * ``<seconds>`` — ``fsync`` at most that often.
+
+Standard library only.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable
+
+from . import json_codec
+from .log_index import GZ_SUFFIX, BlockIndexWriter, compress_segment, index_path
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 50_000_000
+DEFAULT_BACKUP_COUNT = 10
+DEFAULT_QUEUE_SIZE = 10_000
+DEFAULT_BATCH_SIZE = 512
+DEFAULT_FLUSH_TIMEOUT = 30.0  # seconds flush()/close() wait before giving up
+DEFAULT_RETAIN_MB = 550
+
+_STOP = object()
+
+
+def parse_fsync_policy(value: str | None) -> float | None:
+    """``off``/empty → None (never), ``batch`` → 0.0 (every batch), ``<n>`` → every n s.
+
+    Anything unparseable is treated as ``off`` with a warning, so a typo costs
+    durability, not a failed boot.
+    """
+    v = (value or "").strip().lower()
+    if v in ("", "off", "0", "no", "false", "never"):
+        return None
+    if v in ("batch", "always"):
+        return 0.0
+    try:
+        seconds = float(v)
+    except ValueError:
+        log.warning("TOGOMCP_LOG_FSYNC=%r not understood; using 'off'", value)
+        return None
+    return seconds if seconds > 0 else None
+
+
+def parse_retention(env: Any) -> dict[str, Any]:
+    """Writer keyword arguments for compression and retention, from the environment.
+
+    ``TOGOMCP_LOG_COMPRESS`` (``gzip``, the default, or ``off``) and
+    ``TOGOMCP_LOG_RETAIN_MB`` (default 550, the footprint of the old 50 MB × 10
+    plain rotation, now holding several times the history) with the optional
+    ``TOGOMCP_LOG_RETAIN_DAYS`` replace the fixed backup count. Unparseable
+    values fall back to the defaults with a warning.
+    """
+    compress = (env.get("TOGOMCP_LOG_COMPRESS") or "gzip").strip().lower()
+    if compress not in ("gzip", "off"):
+        log.warning("TOGOMCP_LOG_COMPRESS=%r not understood; using 'gzip'", compress)
+        compress = "gzip"
+    limits: dict[str, float | None] = {}
+    for var, default in (("TOGOMCP_LOG_RETAIN_MB", DEFAULT_RETAIN_MB),
+                         ("TOGOMCP_LOG_RETAIN_DAYS", None)):
+        raw = (env.get(var) or "").strip()
+        try:
+            value = float(raw) if raw else default
+        except ValueError:
+            log.warning("%s=%r not understood; using %s", var, raw, default)
+            value = default
+        limits[var] = value if value and value > 0 else None
+    mb = limits["TOGOMCP_LOG_RETAIN_MB"]
+    return {
+        "backup_count": None,
+        "compress": compress == "gzip",
+        "retain_bytes": int(mb * 1_000_000) if mb else None,
+        "retain_days": limits["TOGOMCP_LOG_RETAIN_DAYS"],
+    }
+
+
+class JsonlLogWriter:
+    """Append JSON records to a size-rotated JSONL file from a background thread."""
+
+    __slots__ = (
+        "path", "max_bytes", "backup_count", "batch_size", "fsync_every",
+        "compress", "retain_bytes", "retain_days", "after_rotate",
+        "_queue", "_thread", "_fh", "_size", "_last_fsync", "_lock", "_index",
+        "_index_keys", "_housekeeper",
+        "written", "dropped", "errors", "batches", "rotations", "compressed", "pruned",
+        "_closed",
+    )
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backup_count: int | None = DEFAULT_BACKUP_COUNT,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        fsync_every: float | None = None,
+        index_keys: Callable[[dict[str, Any]], Any] | None = None,
+        compress: bool = False,
+        retain_bytes: int | None = None,
+        retain_days: float | None = None,
+        after_rotate: Callable[[], Any] | None = None,
+    ) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count  # None: no count limit
+        self.batch_size = batch_size
+        self.fsync_every = fsync_every
+        self.compress = compress
+        self.retain_bytes = retain_bytes
+        self.retain_days = retain_days
+        self.after_rotate = after_rotate  # run by housekeeping, before compression
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()  # guards the counters the loop thread reads
+        self.written = self.dropped = self.errors = self.batches = self.rotations = 0
+        self.compressed = self.pruned = 0
+        self._housekeeper: threading.Thread | None = None
+        self._index_keys = index_keys
+        self._closed = False
+        self._last_fsync = time.monotonic()
+        # Opened here, in the caller, so a bad path fails at construction (and the
+        # server can disable logging) instead of silently inside the thread.
+        self._fh = open(path, "ab")
+        self._size = self._fh.tell()
+        self._index = BlockIndexWriter(index_keys) if index_keys is not None else None
+        self._thread = threading.Thread(
+            target=self._run, name="togomcp-toolcall-log", daemon=True
+        )
+        self._thread.start()
+
+    # --- producer side (event loop) ----------------------------------------
+    def submit(self, record: dict[str, Any]) -> bool:
+        """Queue ``record`` for writing. Never blocks; False if it was dropped.
+
+        The record is serialized later, on the writer thread, so it must not be
+        mutated after it is submitted.
+        """
+        if self._closed:
+            return False
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                n = self.dropped
+            # 1, 2, 4, 8 ... : visible in the server log without flooding it
+            if n & (n - 1) == 0:
+                log.warning("tool-call log queue full: %d record(s) dropped so far", n)
+            return False
+
+    def flush(self, timeout: float | None = DEFAULT_FLUSH_TIMEOUT) -> bool:
+        """Wait until every record submitted so far has been written.
+
+        False if that did not happen within ``timeout`` seconds (None: wait for
+        good), e.g. on a stalled disk, so shutdown never hangs on the log.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        done = self._queue.all_tasks_done
+        with done:
+            while self._queue.unfinished_tasks:
+                if deadline is None:
+                    done.wait()
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._thread.is_alive():
+                    return False
+                done.wait(remaining)
+        return True
+
+    def close(self, timeout: float | None = DEFAULT_FLUSH_TIMEOUT) -> None:
+        """Write what is queued, stop the thread and close the file. Idempotent.
+
+        Gives up after ``timeout`` seconds rather than hang shutdown; the thread
+        is a daemon and records still queued are then lost.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            log.warning("tool-call log: queue still full at close; records lost")
+            return
+        self._thread.join(timeout)
+
+    def counters(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "written": self.written,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "batches": self.batches,
+                "rotations": self.rotations,
+                "compressed": self.compressed,
+                "pruned": self.pruned,
+                "queued": self._queue.qsize(),
+            }
+
+    # --- writer thread ---------------------------------------------------
+    def _run(self) -> None:
+        self._index_call("open", self.path, self._fh)
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [r for r in batch if r is not _STOP]
+            stop = len(records) != len(batch)
+            try:
+                if records:
+                    self._write(records)
+            except Exception as exc:  # never let one batch end the writer thread
+                log.warning("tool-call log write failed (%s); %d record(s) lost", exc, len(records))
+                with self._lock:
+                    self.errors += len(records)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        try:
+            self._index_call("close")
+            self._sync(force=True)
+        finally:
+            self._fh.close()
+            self._await_housekeeping()
+
+    def _write(self, records: list[dict[str, Any]]) -> None:
+        lines = []
+        kept = []
+        bad = 0
+        for r in records:
+            try:
+                lines.append(json_codec.dumps_bytes(r, default=str) + b"\n")
+                kept.append(r)
+            except Exception:  # a record that cannot serialize is lost, not fatal
+                bad += 1
+        data = b"".join(lines)
+        try:
+            if self.max_bytes and self._size and self._size + len(data) > self.max_bytes:
+                self._rotate()
+            start = self._size
+            self._fh.write(data)
+            self._fh.flush()
+            self._size += len(data)
+            self._sync()
+        except Exception as exc:  # OSError, ValueError (file left closed), ...
+            log.warning("tool-call log write failed (%s); %d record(s) lost", exc, len(lines))
+            with self._lock:
+                self.errors += len(records)
+            return
+        if self._index is not None:
+            self._index_batch(start, lines, kept)
+        with self._lock:
+            self.written += len(lines)
+            self.errors += bad
+            self.batches += 1
+
+    def _index_batch(self, offset: int, lines: list[bytes], records: list[dict[str, Any]]) -> None:
+        try:
+            for line, rec in zip(lines, records):
+                self._index.add(offset, len(line), rec)  # type: ignore[union-attr]
+                offset += len(line)
+            self._index.flush()  # type: ignore[union-attr]
+        except Exception as exc:
+            self._index_failed(exc)
+
+    def _index_call(self, method: str, *args: Any) -> None:
+        if self._index is not None:
+            try:
+                getattr(self._index, method)(*args)
+            except Exception as exc:
+                self._index_failed(exc)
+
+    def _index_failed(self, exc: Exception) -> None:
+        # The index only speeds up /stats/log; losing it must not touch the log.
+        # Readers scan whatever it does not cover.
+        log.warning("tool-call log index disabled (%s); /stats/log will scan", exc)
+        index, self._index = self._index, None
+        try:
+            index.close()  # type: ignore[union-attr]
+        except Exception:
+            pass
+
+    def _sync(self, force: bool = False) -> None:
+        if self.fsync_every is None and not force:
+            return
+        now = time.monotonic()
+        if force or now - self._last_fsync >= self.fsync_every:
+            try:
+                os.fsync(self._fh.fileno())
+            except (OSError, ValueError):
+                pass
+            self._last_fsync = now
+
+    def _rotate(self) -> None:
+        """Shift ``base.N`` → ``base.N+1`` … ``base`` → ``base.1``, like RotatingFileHandler."""
+        self._sync(force=self.fsync_every is not None)
+        self._fh.close()
+        self._index_call("close")
+        self._await_housekeeping()
+        try:
+            if self.backup_count == 0:
+                os.remove(self.path)
+                _move_sidecar(self.path, None)
+            else:
+                segments = rotated_paths(self.path)
+                for i in range(len(segments), 0, -1):
+                    src = segments[i - 1]
+                    if self.backup_count is not None and i + 1 > self.backup_count:
+                        _remove_segment(src)
+                        continue
+                    dst = f"{self.path}.{i + 1}" + (GZ_SUFFIX if src.endswith(GZ_SUFFIX) else "")
+                    os.replace(src, dst)
+                    _move_sidecar(src, dst)
+                os.replace(self.path, f"{self.path}.1")
+                _move_sidecar(self.path, f"{self.path}.1")
+            with self._lock:
+                self.rotations += 1
+        finally:
+            # reopened even after a failed rename, so one bad rotation does not
+            # end the log
+            self._fh = open(self.path, "ab")
+            self._size = self._fh.tell()
+            self._index_call("open", self.path, self._fh)
+        if self.backup_count != 0 and (
+            self.compress or self.retain_bytes or self.retain_days or self.after_rotate
+        ):
+            self._housekeeper = threading.Thread(
+                target=self._housekeep, name="togomcp-toolcall-log-housekeeping", daemon=True
+            )
+            self._housekeeper.start()
+
+    # --- housekeeping thread ----------------------------------------------
+    def _await_housekeeping(self) -> None:
+        if self._housekeeper is not None:
+            self._housekeeper.join()
+            self._housekeeper = None
+
+    def _housekeep(self) -> None:
+        newest = f"{self.path}.1"
+        if self.after_rotate is not None:
+            try:
+                self.after_rotate()
+            except Exception as exc:
+                log.warning("tool-call log: after-rotation hook failed (%s)", exc)
+        if self.compress and os.path.exists(newest):
+            try:
+                compress_segment(newest, self._index_keys)  # type: ignore[arg-type]
+                with self._lock:
+                    self.compressed += 1
+            except Exception as exc:  # the plain segment stays; still readable
+                log.warning("tool-call log: could not compress %s (%s)", newest, exc)
+        try:
+            self._prune()
+        except OSError as exc:
+            log.warning("tool-call log: retention pass failed (%s)", exc)
+
+    def _prune(self) -> None:
+        """Drop the oldest segments until the log fits ``retain_bytes`` and none
+        is older than ``retain_days``. The active file always stays."""
+        segments = rotated_paths(self.path)
+        sizes = [os.path.getsize(p) for p in segments]
+        total = sum(sizes) + (os.path.getsize(self.path) if os.path.exists(self.path) else 0)
+        cutoff = time.time() - self.retain_days * 86400 if self.retain_days else None
+        while segments:
+            too_big = self.retain_bytes is not None and total > self.retain_bytes
+            too_old = cutoff is not None and os.path.getmtime(segments[-1]) < cutoff
+            if not (too_big or too_old):
+                break
+            _remove_segment(segments.pop())
+            total -= sizes.pop()
+            with self._lock:
+                self.pruned += 1
+
+
+def rotated_paths(base: str) -> list[str]:
+    """Rotated segments of ``base``, newest first: ``base.1`` … ``base.N``, each
+    plain or ``.gz``. Where both exist (a compression caught mid-swap), the
+    ``.gz`` is the complete one."""
+    out = []
+    i = 1
+    while True:
+        p = f"{base}.{i}"
+        if os.path.exists(p + GZ_SUFFIX):
+            out.append(p + GZ_SUFFIX)
+        elif os.path.exists(p):
+            out.append(p)
+        else:
+            return out
+        i += 1
+
+
+def _remove_segment(path: str) -> None:
+    os.remove(path)
+    _move_sidecar(path, None)
+
+
+def _move_sidecar(src: str, dst: str | None) -> None:
+    """Follow a log file renamed ``src`` → ``dst`` (None: deleted) with its index.
+
+    Without one, ``dst``'s old index is removed: it described the file just
+    replaced. (Readers would reject it by inode anyway.)
+    """
+    try:
+        if dst is None:
+            os.remove(index_path(src))
+        else:
+            os.replace(index_path(src), index_path(dst))
+        return
+    except OSError:  # never fails the rotation of the log itself
+        pass
+    if dst is not None:
+        try:
+            os.remove(index_path(dst))
+        except OSError:
+            pass
@@ -0,0 +1,321 @@
+"""Lightweight spans: where did a slow tool call spend its time?
+
+The tool-call log records one ``elapsed_ms`` per call. For a slow
+``search_chembl_molecule`` or ``pathway_paths`` that does not say whether the
+time went to SPARQL, a REST retry, a rate-limit sleep, KGML parsing or a JSON
+truncation loop. Spans do:
+
+    with tracing.span("parse_kgml", bytes=len(text)):
+        graph = parse_kgml(text)
+
+or, for a whole synchronous function, ``@tracing.traced("fit_graph_to_budget")``.
+
+Spans nest through a ContextVar, so tasks spawned inside a span (asyncio.gather)
+attach to it. Every tool call is a root span (``tool <name>``, opened by the
+server's metrics middleware). Upstream HTTP requests are spanned by
+:class:`TracedAsyncClient`, which every LazyAsyncClient builds. Retry attempts
+(with their attempt number), backoff and rate-limit waits, and the expensive CPU
+phases open their own spans.
+
+Two sinks, either or both:
+
+  * ``TOGOMCP_TRACE_LOG=<path>`` — when a root span ends, its whole tree is
+    written as ONE JSON line (the root, then every descendant with its parent,
+    offset and duration) through the same background ``JsonlLogWriter`` as the
+    tool-call log, rotated and retained by the same TOGOMCP_LOG_* settings.
+    ``TOGOMCP_TRACE_MIN_MS`` keeps only trees whose root took at least that
+    long: the slow calls are the ones worth reading.
+  * ``TOGOMCP_TRACE_OTEL=1`` — every span is also an OpenTelemetry span
+    (opentelemetry-api, already a FastMCP dependency), so it nests under
+    FastMCP's own ``tools/call`` span and goes wherever the process's
+    OpenTelemetry SDK exports. Without an SDK configured it is a no-op.
+
+With neither set, :func:`span` returns a shared no-op object: a global check and
+nothing else.
+
+Offline, ``python -m togo_mcp.tracing spans.jsonl`` ranks span names by SELF
+time (a span's duration minus its children's) per tool, which is where the
+latency actually went.
+"""
+from __future__ import annotations
+
+import argparse
+import atexit
+import functools
+import os
+import sys
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Callable, Mapping, TypeVar
+
+import httpx
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+_current: ContextVar[Span | None] = ContextVar("togomcp_span", default=None)
+
+_enabled = False
+_writer: Any = None  # toolcall_log.JsonlLogWriter for TOGOMCP_TRACE_LOG
+_otel_tracer: Any = None
+_min_ms = 0.0
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> _NoopSpan:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+    def set(self, **attrs: Any) -> None:
+        return None
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    """One timed section. Use as a context manager; ``set()`` adds attributes."""
+
+    __slots__ = (
+        "name", "attrs", "start", "duration", "error", "wall",
+        "id", "parent_id", "_root", "_spans", "_token", "_otel_cm", "_otel_span",
+    )
+
+    def __init__(self, name: str, attrs: dict[str, Any]) -> None:
+        self.name = name
+        self.attrs = attrs
+        self.duration: float | None = None
+        self.error: str | None = None
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> Span:
+        parent = _current.get()
+        if parent is None:
+            self._root, self.parent_id = self, None
+            self._spans: list[Span] = []
+            self.wall = time.time()
+        else:
+            self._root, self.parent_id = parent._root, parent.id
+        root_spans = self._root._spans
+        self.id = len(root_spans)
+        root_spans.append(self)
+        self._token = _current.set(self)
+        self._otel_cm = None
+        if _otel_tracer is not None:
+            self._otel_cm = _otel_tracer.start_as_current_span(self.name)
+            self._otel_span = self._otel_cm.__enter__()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.duration = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        if self._otel_cm is not None:
+            try:
+                self._otel_span.set_attributes(
+                    {k: v for k, v in self.attrs.items() if isinstance(v, (str, bool, int, float))}
+                )
+            finally:
+                self._otel_cm.__exit__(exc_type, exc, tb)
+        try:
+            _current.reset(self._token)
+        except ValueError:  # exited in another context than it was entered in
+            pass
+        if self._root is self:
+            _finish(self)
+
+
+def span(name: str, **attrs: Any) -> Span | _NoopSpan:
+    """A span named ``name`` — or the shared no-op when tracing is off."""
+    if not _enabled:
+        return _NOOP
+    return Span(name, attrs)
+
+
+def traced(name: str) -> Callable[[_F], _F]:
+    """Decorator: run a synchronous function inside a span named ``name``."""
+
+    def decorate(fn: _F) -> _F:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with Span(name, {}):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def _ms(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+def _finish(root: Span) -> None:
+    if _writer is None or (root.duration or 0) * 1000 < _min_ms:
+        return
+    _writer.submit({
+        "ts": datetime.fromtimestamp(root.wall, timezone.utc).isoformat(),
+        "name": root.name,
+        "duration_ms": _ms(root.duration),
+        "error": root.error,
+        "attrs": root.attrs,
+        "spans": [
+            {
+                "id": s.id,
+                "parent": s.parent_id,
+                "name": s.name,
+                "offset_ms": _ms(s.start - root.start),
+                # None: still running when the call returned (a detached task)
+                "duration_ms": _ms(s.duration),
+                "error": s.error,
+                "attrs": s.attrs,
+            }
+            for s in root._spans[1:]
+        ],
+    })
+
+
+def configure(
+    *, log_path: str | None = None, otel: bool = False, min_ms: float = 0.0, **writer_kwargs: Any
+) -> None:
+    """Turn the sinks on or off. ``writer_kwargs`` go to the JSONL writer."""
+    global _enabled, _writer, _otel_tracer, _min_ms
+    if _writer is not None:
+        _writer.close()
+    _writer = _otel_tracer = None
+    if log_path:
+        from .toolcall_log import JsonlLogWriter
+
+        log_dir = os.path.dirname(log_path)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        _writer = JsonlLogWriter(log_path, **writer_kwargs)
+        atexit.register(_writer.close)
+    if otel:
+        try:
+            from opentelemetry import trace as _otel_trace
+
+            _otel_tracer = _otel_trace.get_tracer("togo_mcp")
+        except ImportError:
+            pass
+    _min_ms = min_ms
+    _enabled = _writer is not None or _otel_tracer is not None
+
+
+def configure_from_env(env: Mapping[str, str]) -> None:
+    """TOGOMCP_TRACE_LOG / TOGOMCP_TRACE_OTEL / TOGOMCP_TRACE_MIN_MS; a bad
+    value disables that knob rather than stopping the server."""
+    from .toolcall_log import parse_retention
+
+    otel = env.get("TOGOMCP_TRACE_OTEL", "").strip().lower() in ("1", "true", "yes", "on")
+    try:
+        min_ms = float(env.get("TOGOMCP_TRACE_MIN_MS", "") or 0)
+    except ValueError:
+        min_ms = 0.0
+    try:
+        configure(
+            log_path=env.get("TOGOMCP_TRACE_LOG", "").strip() or None,
+            otel=otel,
+            min_ms=min_ms,
+            **parse_retention(env),
+        )
+    except OSError:  # an unwritable span log must not stop the server booting
+        configure(otel=otel)
+
+
+def flush() -> None:
+    """Block until every finished trace is on disk (tests, shutdown)."""
+    if _writer is not None:
+        _writer.flush()
+
+
+class TracedAsyncClient(httpx.AsyncClient):
+    """An httpx.AsyncClient whose every request is an ``http <host>`` span."""
+
+    async def send(self, request: httpx.Request, **kwargs: Any) -> httpx.Response:
+        with span(
+            f"http {request.url.host}", method=request.method, path=request.url.path
+        ) as sp:
+            response = await super().send(request, **kwargs)
+            sp.set(status=response.status_code)
+            return response
+
+
+# --------------------------------------------------------------------------- #
+# Offline summary
+# --------------------------------------------------------------------------- #
+def self_times(trace: dict[str, Any]) -> list[tuple[str, float]]:
+    """(span name, self ms) for every span of one trace line, root included.
+
+    Self time is a span's duration minus its direct children's, floored at 0 —
+    children run concurrently under asyncio.gather can add up to more than
+    their parent.
+    """
+    spans = [{"id": 0, "parent": None, "name": trace["name"],
+              "duration_ms": trace.get("duration_ms")}]
+    spans += trace.get("spans", [])
+    child_ms: dict[int, float] = {}
+    for s in spans[1:]:
+        child_ms[s["parent"]] = child_ms.get(s["parent"], 0.0) + (s.get("duration_ms") or 0.0)
+    return [
+        (s["name"], max((s.get("duration_ms") or 0.0) - child_ms.get(s["id"], 0.0), 0.0))
+        for s in spans
+    ]
+
+
+def summarize(traces: Any, *, tool: str | None = None) -> list[dict[str, Any]]:
+    """Per (root, span name): count, total self ms, and share of all self time."""
+    cells: dict[tuple[str, str], list[float]] = {}
+    for trace in traces:
+        if tool and trace.get("name") != f"tool {tool}":
+            continue
+        for name, ms in self_times(trace):
+            cells.setdefault((trace["name"], name), []).append(ms)
+    grand = sum(sum(v) for v in cells.values()) or 1.0
+    rows = [
+        {
+            "root": root,
+            "span": name,
+            "count": len(v),
+            "self_ms": round(sum(v), 1),
+            "share": round(sum(v) / grand, 4),
+            "max_self_ms": round(max(v), 1),
+        }
+        for (root, name), v in cells.items()
+    ]
+    rows.sort(key=lambda r: -r["self_ms"])
+    return rows
+
+
+def _main(argv: list[str] | None = None) -> int:
+    from .stats import iter_records
+    from .toolcall_log import rotated_paths
+
+    parser = argparse.ArgumentParser(
+        prog="python -m togo_mcp.tracing",
+        description="Rank span names by self time across a TOGOMCP_TRACE_LOG file.",
+    )
+    parser.add_argument("log", help="span log path (rotated siblings are read too)")
+    parser.add_argument("--tool", help="only traces of this tool")
+    parser.add_argument("--top", type=int, default=25, help="rows to print (default 25)")
+    args = parser.parse_args(argv)
+
+    rows = summarize(iter_records([args.log, *rotated_paths(args.log)]), tool=args.tool)
+    print(f"{'self ms':>12} {'share':>6} {'count':>7} {'max ms':>10}  root / span")
+    for r in rows[: args.top]:
+        print(f"{r['self_ms']:>12} {r['share']:>6.1%} {r['count']:>7} "
+              f"{r['max_self_ms']:>10}  {r['root']} / {r['span']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main())